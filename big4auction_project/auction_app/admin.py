@@ -1,36 +1,186 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import Item, ItemImage, Bid, Transaction, Notification, Feedback, Report, PaymentMethod, Category, User
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+from .exports import EXPORTS, streaming_response
+from .paginators import EstimatedCountPaginator, estimated_row_count
+from .search import get_index
+from .models import Item, ItemImage, Bid, ProxyBid, Transaction, Notification, Feedback, Report, PaymentMethod, Category, User, WebhookEvent
 
+RECENT_INLINE_ROWS = 20
+ADMIN_SEARCH_LIMIT = 1000
+# Below this share of the items table indexed, admin search asks the database instead.
+INDEX_MIN_COVERAGE = 0.9
+
+
+def export_action(fmt, compress=False):
+    """Build an admin action that streams the selected rows as a CSV or JSON Lines file."""
+    label = fmt.upper() + (' (gzip)' if compress else '')
+
+    @admin.action(description=f'Export selected rows as {label}', permissions=['view'])
+    def export(modeladmin, request, queryset):
+        return streaming_response(modeladmin.export, queryset, fmt, compress)
+
+    export.__name__ = f'export_{fmt}' + ('_gz' if compress else '')
+    return export
+
+
+class ExportMixin:
+    """Adds streaming export actions; subclasses set ``export`` to an entry of ``EXPORTS``."""
+    export = None
+    actions = [export_action('csv'), export_action('csv', compress=True), export_action('jsonl')]
+
+
+class RecentInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only loads the first ``RECENT_INLINE_ROWS`` related rows."""
+
+    def get_queryset(self):
+        # The parent filters by the instance, so the slice has to come after it.
+        if not hasattr(self, '_recent'):
+            self._recent = super().get_queryset()[:RECENT_INLINE_ROWS]
+        return self._recent
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        # Share the parent instead of loading it again for every row's label.
+        setattr(form.instance, self.fk.name, self.instance)
+        return form
+
+class RecentInline(admin.TabularInline):
+    """Read-only inline listing the newest related rows; the full list lives on the model's own changelist."""
+    formset = RecentInlineFormSet
+    extra = 0
+    can_delete = False
+    show_change_link = True
+    list_select_related = ()
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 class ItemImageInline(admin.TabularInline):
     model = ItemImage
     extra = 1  # Number of empty forms to display for adding new item images inline
 
-class BidInline(admin.TabularInline):
+class BidInline(RecentInline):
     model = Bid
-    extra = 1  # Number of empty forms to display for adding new bids inline
+    verbose_name_plural = f'Latest {RECENT_INLINE_ROWS} bids'
+    fields = ('bidder', 'bid_amount', 'bid_time')
+    readonly_fields = ('bid_time',)
+    ordering = ('-bid_time', '-id')
+    list_select_related = ('bidder',)
 
-class TransactionInline(admin.TabularInline):
+class TransactionInline(RecentInline):
     model = Transaction
-    extra = 1  # Number of empty forms to display for adding new transactions inline
+    verbose_name_plural = f'Latest {RECENT_INLINE_ROWS} transactions'
+    fields = ('buyer', 'seller', 'transaction_amount', 'payment_method', 'transaction_date')
+    readonly_fields = ('transaction_date',)
+    ordering = ('-transaction_date', '-id')
+    list_select_related = ('buyer', 'seller', 'payment_method')
 
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'message', 'timestamp', 'read_status')
     list_filter = ('read_status',)
+    list_select_related = ('user',)
     search_fields = ('user__username', 'message')
+    autocomplete_fields = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class BidAdmin(ExportMixin, admin.ModelAdmin):
+    export = EXPORTS['bids']
+    list_display = ('item', 'bidder', 'bid_amount', 'bid_time')
+    list_select_related = ('item', 'bidder')
+    autocomplete_fields = ('item', 'bidder')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-class ReportAdmin(admin.ModelAdmin):
+class ProxyBidAdmin(admin.ModelAdmin):
+    list_display = ('item', 'bidder', 'max_amount', 'created_at')
+    list_select_related = ('item', 'bidder')
+    autocomplete_fields = ('item', 'bidder')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class TransactionAdmin(ExportMixin, admin.ModelAdmin):
+    export = EXPORTS['transactions']
+    list_display = ('item', 'buyer', 'seller', 'transaction_amount', 'transaction_date')
+    list_select_related = ('item', 'buyer', 'seller')
+    autocomplete_fields = ('item', 'buyer', 'seller')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class ReportAdmin(ExportMixin, admin.ModelAdmin):
+    export = EXPORTS['reports']
     list_display = ('reporter', 'reported_user', 'item', 'timestamp')
+    list_select_related = ('reporter', 'reported_user', 'item')
     search_fields = ('reporter__username', 'reported_user__username', 'item__title')
     list_filter = ('timestamp',)
+    autocomplete_fields = ('reporter', 'reported_user', 'item')
+
+class FeedbackAdmin(admin.ModelAdmin):
+    list_display = ('user', 'rated_user', 'rating', 'timestamp')
+    list_select_related = ('user', 'rated_user')
+    autocomplete_fields = ('user', 'rated_user')
+
+class ItemImageAdmin(admin.ModelAdmin):
+    list_display = ('item', 'image_url', 'digest')
+    list_select_related = ('item',)
+    autocomplete_fields = ('item',)
+
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ('category_name',)
 
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ('title', 'start_time', 'end_time', 'current_bid', 'status')
-    search_fields = ('title', 'seller__username')
+    list_display = ('title', 'seller', 'category', 'start_time', 'end_time', 'current_bid', 'status')
+    list_select_related = ('seller', 'category')
+    search_fields = ('title',)
     list_filter = ('status', 'category')
     prepopulated_fields = {'slug':('title',)}
+    autocomplete_fields = ('seller', 'category')
+    readonly_fields = ('bid_history',)
     inlines = [ItemImageInline, BidInline, TransactionInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Find items through the full-text index (title, description, category), or by id."""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        index = get_index()
+        estimate = estimated_row_count(Item)
+        if not len(index) or (estimate is not None and len(index) < estimate * INDEX_MIN_COVERAGE):
+            # The index is missing or stale: search the database.
+            return super().get_search_results(request, queryset, search_term)
+        hits = index.search(term, limit=ADMIN_SEARCH_LIMIT)
+        matches = queryset.filter(pk__in=[item_id for item_id, _ in hits])
+        if len(hits) >= ADMIN_SEARCH_LIMIT:
+            # The index cut the matches short; the database finds the rest.
+            found, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+            return matches | found, may_have_duplicates
+        return matches, False
+
+    @admin.display(description='Bid history')
+    def bid_history(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:auction_app_bid_changelist') + f'?item__id__exact={obj.pk}'
+        return format_html('<a href="{}">All bids on this item</a>', url)
+
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('status', 'type')
+    search_fields = ('event_id',)
+    readonly_fields = ('event_id', 'type', 'payload', 'received_at')
 
 class UserAdmin(BaseUserAdmin):
     model = User
@@ -54,12 +204,14 @@ class UserAdmin(BaseUserAdmin):
 
 # Registering the models with the customized admin classes
 admin.site.register(Item, ItemAdmin)
-admin.site.register(ItemImage)
-admin.site.register(Bid)
-admin.site.register(Transaction)
+admin.site.register(ItemImage, ItemImageAdmin)
+admin.site.register(Bid, BidAdmin)
+admin.site.register(ProxyBid, ProxyBidAdmin)
+admin.site.register(Transaction, TransactionAdmin)
 admin.site.register(Notification, NotificationAdmin)
-admin.site.register(Feedback)
+admin.site.register(Feedback, FeedbackAdmin)
 admin.site.register(Report, ReportAdmin)
 admin.site.register(PaymentMethod)
-admin.site.register(Category)
+admin.site.register(Category, CategoryAdmin)
 admin.site.register(User, UserAdmin)
+admin.site.register(WebhookEvent, WebhookEventAdmin)
@@ -0,0 +1,327 @@
+"""
+Time-bucketed rollups of bids and sales for reporting.
+
+New ``Bid`` and ``Transaction`` rows are streamed in id order past a
+per-stream watermark (``RollupCheckpoint``) and folded into minute, hour
+and day buckets: ``BidRollup`` per item (carrying the item's category)
+and ``SalesRollup`` per category. Each batch merges its buckets and
+advances the watermark in one transaction, so a run that is interrupted
+resumes exactly where the last committed batch ended and no row is
+counted twice.
+
+The query functions below read only the rollup tables; they never touch
+``Bid`` or ``Transaction``.
+"""
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from .models import Bid, BidRollup, RollupCheckpoint, SalesRollup, Transaction
+
+GRANULARITIES = ('minute', 'hour', 'day')
+BATCH_SIZE = 5000
+# Rows younger than this are left for the next run. Ids are assigned when a
+# row is inserted but become visible at commit, so a slow transaction can
+# commit a lower id after a higher one; the lag gives it time to land.
+SETTLE_SECONDS = 5
+CENT = Decimal('0.01')
+
+
+def truncate(moment, granularity):
+    """Return the start of the UTC ``granularity`` bucket containing ``moment``."""
+    moment = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0)
+    if granularity in ('hour', 'day'):
+        moment = moment.replace(minute=0)
+    if granularity == 'day':
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def _add(old, new):
+    return old + new
+
+
+def _latest(old, new):
+    return new
+
+
+class Stream:
+    """
+    One source table rolled up into one summary table.
+
+    Attributes:
+        name (str): Checkpoint name.
+        source (QuerySet): Rows to roll up; must have an ``id`` and ``time_field``.
+        time_field (str): Timestamp that decides the bucket.
+        columns (tuple): Extra ``values_list`` columns passed to ``measure``.
+        rollup (Model): Summary model written to.
+        group_field (str): Summary field identifying the group within a bucket.
+        combine (dict): ``{field: function(old, new)}`` used to merge measures.
+    """
+
+    def __init__(self, name, source, time_field, columns, rollup, group_field, combine, measure):
+        self.name = name
+        self.source = source
+        self.time_field = time_field
+        self.columns = columns
+        self.rollup = rollup
+        self.group_field = group_field
+        self.combine = combine
+        self.measure = measure
+
+    def fold(self, rows):
+        """Fold ``(id, time, *columns)`` rows into ``{(granularity, group, bucket): measures}``."""
+        deltas = {}
+        for _, moment, *columns in rows:
+            group, measures = self.measure(*columns)
+            for granularity in GRANULARITIES:
+                key = (granularity, group, truncate(moment, granularity))
+                current = deltas.get(key)
+                if current is None:
+                    deltas[key] = dict(measures)
+                else:
+                    for field, value in measures.items():
+                        current[field] = self.combine[field](current[field], value)
+        return deltas
+
+    def merge(self, deltas):
+        """
+        Merge folded buckets into the summary table.
+
+        Existing buckets are locked and read with one query per
+        granularity and combined in Python; the merged rows are then
+        written back with a single upsert on the rollup's unique key.
+        Call this inside the transaction that advances the checkpoint.
+        """
+        existing = {}
+        for granularity in GRANULARITIES:
+            keys = [key for key in deltas if key[0] == granularity]
+            if not keys:
+                continue
+            buckets = [bucket for _, _, bucket in keys]
+            rows = self.rollup.objects.select_for_update().filter(
+                granularity=granularity,
+                **{f'{self.group_field}__in': {group for _, group, _ in keys}},
+                bucket__range=(min(buckets), max(buckets)),
+            ).values('granularity', self.group_field, 'bucket', *self.combine)
+            for row in rows:
+                existing[(row['granularity'], row[self.group_field], row['bucket'])] = row
+
+        merged = []
+        for (granularity, group, bucket), measures in deltas.items():
+            row = existing.get((granularity, group, bucket))
+            if row is not None:
+                measures = {field: self.combine[field](row[field], value) for field, value in measures.items()}
+            merged.append(self.rollup(granularity=granularity, bucket=bucket, **{self.group_field: group}, **measures))
+        # MySQL upserts on any unique key and rejects an explicit conflict target.
+        features = connections[router.db_for_write(self.rollup)].features
+        self.rollup.objects.bulk_create(
+            merged, batch_size=500, update_conflicts=True,
+            unique_fields=(['granularity', self.group_field.removesuffix('_id'), 'bucket']
+                           if features.supports_update_conflicts_with_target else None),
+            update_fields=[field.removesuffix('_id') for field in self.combine],
+        )
+
+    def advance(self, batch_size=BATCH_SIZE, settle=SETTLE_SECONDS):
+        """
+        Roll up the next batch of rows past the checkpoint.
+
+        The checkpoint row is locked for the whole batch, so concurrent
+        runs of the same stream serialize instead of double counting.
+
+        Returns:
+            int: Rows rolled up; 0 when the stream is caught up.
+        """
+        cutoff = timezone.now() - timedelta(seconds=settle)
+        with transaction.atomic():
+            RollupCheckpoint.objects.get_or_create(name=self.name)
+            checkpoint = RollupCheckpoint.objects.select_for_update().get(name=self.name)
+            rows = list(
+                self.source.filter(id__gt=checkpoint.last_id).order_by('id')
+                .values_list('id', self.time_field, *self.columns)[:batch_size]
+            )
+            # Stop at the first unsettled row so the watermark never passes it.
+            for position, row in enumerate(rows):
+                if row[1] > cutoff:
+                    rows = rows[:position]
+                    break
+            if not rows:
+                return 0
+            self.merge(self.fold(rows))
+            checkpoint.last_id = rows[-1][0]
+            checkpoint.save(update_fields=['last_id', 'updated_at'])
+        return len(rows)
+
+
+def _measure_bid(item_id, category_id, amount):
+    return item_id, {
+        'category_id': category_id,
+        'bid_count': 1,
+        'amount_total': amount,
+        'amount_low': amount,
+        'amount_high': amount,
+    }
+
+
+def _measure_sale(category_id, amount):
+    return category_id, {'sales_count': 1, 'revenue': amount}
+
+
+STREAMS = {
+    'bids': Stream(
+        'bids', Bid.objects.all(), 'bid_time', ('item_id', 'item__category_id', 'bid_amount'),
+        BidRollup, 'item_id',
+        {'category_id': _latest, 'bid_count': _add, 'amount_total': _add, 'amount_low': min, 'amount_high': max},
+        _measure_bid,
+    ),
+    'sales': Stream(
+        'sales', Transaction.objects.all(), 'transaction_date', ('item__category_id', 'transaction_amount'),
+        SalesRollup, 'category_id',
+        {'sales_count': _add, 'revenue': _add},
+        _measure_sale,
+    ),
+}
+
+
+def run(streams=None, batch_size=BATCH_SIZE, settle=SETTLE_SECONDS, max_batches=None):
+    """
+    Roll up every stream until it is caught up.
+
+    Args:
+        streams (list): Stream names; all of ``STREAMS`` by default.
+        batch_size (int): Source rows per transaction.
+        settle (float): Seconds a row must have existed before it is rolled up.
+        max_batches (int): Stop each stream after this many batches.
+
+    Returns:
+        dict: ``{stream: rows rolled up}``.
+    """
+    totals = {}
+    for name in streams or STREAMS:
+        stream, totals[name], batches = STREAMS[name], 0, 0
+        while max_batches is None or batches < max_batches:
+            count = stream.advance(batch_size, settle)
+            if not count:
+                break
+            totals[name] += count
+            batches += 1
+    return totals
+
+
+def reset(streams=None):
+    """Delete the rollups and checkpoints of ``streams`` so they rebuild from scratch."""
+    with transaction.atomic():
+        for name in streams or STREAMS:
+            STREAMS[name].rollup.objects.all().delete()
+            RollupCheckpoint.objects.filter(name=name).delete()
+
+
+def status():
+    """
+    Report each stream's watermark and how many source rows are waiting.
+
+    Returns:
+        dict: ``{stream: {'last_id', 'pending', 'updated_at'}}``.
+    """
+    checkpoints = {checkpoint.name: checkpoint for checkpoint in RollupCheckpoint.objects.all()}
+    report = {}
+    for name, stream in STREAMS.items():
+        checkpoint = checkpoints.get(name) or RollupCheckpoint(name=name)
+        report[name] = {
+            'last_id': checkpoint.last_id,
+            'pending': stream.source.filter(id__gt=checkpoint.last_id).count(),
+            'updated_at': checkpoint.updated_at,
+        }
+    return report
+
+
+def pick_granularity(start, end):
+    """Choose the coarsest granularity that still gives a useful number of points."""
+    span = end - start
+    if span <= timedelta(hours=6):
+        return 'minute'
+    if span <= timedelta(days=14):
+        return 'hour'
+    return 'day'
+
+
+def _window(granularity, start, end):
+    return {'granularity': granularity, 'bucket__gte': truncate(start, granularity), 'bucket__lt': end}
+
+
+def _cents(value):
+    # SQLite sums decimals as floats; round back to cents.
+    return Decimal(value or 0).quantize(CENT)
+
+
+def bid_activity(start, end, granularity=None, item_id=None, category_id=None):
+    """
+    Return bid counts and amounts per bucket between ``start`` and ``end``.
+
+    Args:
+        start (datetime): Inclusive; rounded down to its bucket.
+        end (datetime): Exclusive.
+        granularity (str): ``minute``, ``hour`` or ``day``; picked from the span if omitted.
+        item_id (int): Only this item's bids.
+        category_id (int): Only bids on items in this category.
+
+    Returns:
+        list: ``{'bucket', 'bids', 'total', 'low', 'high'}`` for each non-empty bucket, oldest first.
+    """
+    granularity = granularity or pick_granularity(start, end)
+    rows = BidRollup.objects.filter(**_window(granularity, start, end))
+    if item_id is not None:
+        rows = rows.filter(item_id=item_id)
+    if category_id is not None:
+        rows = rows.filter(category_id=category_id)
+    rows = (
+        rows.order_by('bucket').values('bucket')
+        .annotate(bids=Sum('bid_count'), total=Sum('amount_total'), low=Min('amount_low'), high=Max('amount_high'))
+    )
+    return [
+        {'bucket': row['bucket'], 'bids': row['bids'], 'total': _cents(row['total']),
+         'low': _cents(row['low']), 'high': _cents(row['high'])}
+        for row in rows
+    ]
+
+
+def sales_activity(start, end, granularity=None, category_id=None):
+    """
+    Return completed sales and revenue per bucket between ``start`` and ``end``.
+
+    Returns:
+        list: ``{'bucket', 'sales', 'revenue'}`` for each non-empty bucket, oldest first.
+    """
+    granularity = granularity or pick_granularity(start, end)
+    rows = SalesRollup.objects.filter(**_window(granularity, start, end))
+    if category_id is not None:
+        rows = rows.filter(category_id=category_id)
+    rows = rows.order_by('bucket').values('bucket').annotate(sales=Sum('sales_count'), revenue=Sum('revenue'))
+    return [{'bucket': row['bucket'], 'sales': row['sales'], 'revenue': _cents(row['revenue'])} for row in rows]
+
+
+def category_summary(start, end, granularity=None):
+    """
+    Return bids, sales and revenue per category between ``start`` and ``end``.
+
+    Returns:
+        list: ``{'category_id', 'bids', 'sales', 'revenue'}``, highest revenue first.
+    """
+    granularity = granularity or pick_granularity(start, end)
+    window = _window(granularity, start, end)
+    summary = {}
+    bids = BidRollup.objects.filter(**window).order_by().values('category_id').annotate(bids=Sum('bid_count'))
+    for row in bids:
+        summary[row['category_id']] = {'category_id': row['category_id'], 'bids': row['bids'],
+                                       'sales': 0, 'revenue': _cents(0)}
+    sales = (
+        SalesRollup.objects.filter(**window).order_by().values('category_id')
+        .annotate(sales=Sum('sales_count'), revenue=Sum('revenue'))
+    )
+    for row in sales:
+        entry = summary.setdefault(row['category_id'], {'category_id': row['category_id'], 'bids': 0})
+        entry.update(sales=row['sales'], revenue=_cents(row['revenue']))
+    return sorted(summary.values(), key=lambda entry: (-entry['revenue'], -entry['bids'], entry['category_id']))
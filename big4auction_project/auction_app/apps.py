@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuctionAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auction_app'
+
+    def ready(self):
+        # Connect signal receivers.
+        from . import streaming, listings, item_cache, search, inbox, user_stats, closer, routers  # noqa: F401
@@ -0,0 +1,30 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from .models import User
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticate users by email address and password.
+
+    The lookup is a single probe of the unique ``email`` index. Unknown
+    addresses and accounts without a usable password are hashed against
+    anyway, so every rejection costs one password hash and response times
+    do not reveal which addresses have accounts. Credentials passed as
+    ``username`` (the admin login) are left to ``ModelBackend``.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if not email or password is None:
+            return None
+        try:
+            user = User._default_manager.get(email=email)
+        except User.DoesNotExist:
+            user = None
+        if user is None or not user.has_usable_password():
+            make_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,118 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Item, Bid
+from .signals import item_changed
+
+
+class BidRejected(Exception):
+    """
+    Raised when a bid cannot be accepted for an item.
+
+    Attributes:
+        reason (str): Short machine-readable reason code.
+        message (str): Human-readable explanation.
+    """
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+
+def soft_close_window():
+    """
+    Return the anti-sniping window.
+
+    A bid placed within this long of an auction's end pushes the end
+    back to this long after the bid. ``SOFT_CLOSE_SECONDS = 0`` turns
+    soft closing off.
+    """
+    return timezone.timedelta(seconds=getattr(settings, 'SOFT_CLOSE_SECONDS', 120))
+
+
+def extended_end_time(end_time, now):
+    """Return the end time a bid at ``now`` sets, or ``None`` if it leaves ``end_time`` alone."""
+    extended = now + soft_close_window()
+    return extended if end_time < extended else None
+
+
+def _rejection_for(item, amount, now):
+    """
+    Work out why a bid on ``item`` was not accepted.
+
+    Only called after the conditional update matched no rows, so the
+    item row is read once more to produce a useful error.
+    """
+    if item is None:
+        return BidRejected('not_found', 'Item does not exist.')
+    if item.status != 'active':
+        return BidRejected('not_active', 'This auction is no longer active.')
+    if now < item.start_time:
+        return BidRejected('not_started', 'This auction has not started yet.')
+    if now >= item.end_time:
+        return BidRejected('ended', 'This auction has ended.')
+    if amount < item.starting_bid:
+        return BidRejected('below_starting_bid', 'Bid must be at least the starting bid.')
+    return BidRejected('outbid', 'Bid must be higher than the current bid.')
+
+
+def place_bid(item_id, bidder, amount, now=None):
+    """
+    Place a bid on an item and raise its current bid in one transaction.
+
+    The item row is bumped with a conditional ``UPDATE ... WHERE
+    current_bid < amount`` so that concurrent bidders racing on the same
+    item are serialized by the database: only bids that are strictly
+    higher than the committed current bid succeed, and ``current_bid``
+    can never move backwards. A bid inside the soft-close window also
+    moves ``end_time`` out in the same ``UPDATE``; the end only ever
+    moves later, so ``start_time_before_end_time`` still holds.
+    ``item_changed`` is sent once the transaction commits, with the new
+    ``end_time`` when it moved.
+
+    Args:
+        item_id (int): Primary key of the item being bid on.
+        bidder (User): User placing the bid.
+        amount (Decimal): Bid amount.
+        now (datetime, optional): Time of the bid. Defaults to now.
+
+    Returns:
+        Bid: The newly created bid.
+
+    Raises:
+        BidRejected: If the item is missing, not open for bidding, or the
+            amount does not beat the starting and current bids.
+    """
+    amount = Decimal(amount)
+    now = now or timezone.now()
+
+    extended = now + soft_close_window()
+    with transaction.atomic():
+        biddable = Item.objects.filter(
+            pk=item_id,
+            status='active',
+            start_time__lte=now,
+            end_time__gt=now,
+            starting_bid__lte=amount,
+            current_bid__lt=amount,
+        )
+        # Most bids land outside the window and cost the one UPDATE.
+        end_time = None
+        updated = biddable.filter(end_time__gte=extended).update(current_bid=amount)
+        if not updated and extended > now:
+            updated = biddable.filter(end_time__lt=extended).update(current_bid=amount, end_time=extended)
+            end_time = extended
+
+        if not updated:
+            item = Item.objects.filter(pk=item_id).first()
+            raise _rejection_for(item, amount, now)
+
+        bid = Bid.objects.create(item_id=item_id, bidder=bidder, bid_amount=amount)
+        transaction.on_commit(lambda: item_changed.send(
+            sender=Item, item_id=item_id, current_bid=amount, new_bids=1, end_time=end_time,
+        ))
+        return bid
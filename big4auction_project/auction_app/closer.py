@@ -0,0 +1,264 @@
+import heapq
+import threading
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Item, Bid, Transaction
+from .notifications import send as send_notifications
+from .orderbook import order_book
+from .proxy import proxy_engine
+from .user_stats import record_listings, record_transactions
+from .signals import item_changed
+
+
+def _winning_bids(item_ids):
+    """
+    Return ``{item_id: (title, reserve_price, winner_id, amount, seller_id)}`` for ``item_ids``.
+
+    The highest bid per item is resolved with a correlated subquery, so
+    the whole batch is answered by one query.
+    """
+    top = Bid.objects.filter(item=OuterRef('pk')).order_by('-bid_amount', 'bid_time')
+    rows = (
+        Item.objects.filter(pk__in=item_ids)
+        .annotate(
+            winner_id=Subquery(top.values('bidder_id')[:1]),
+            winning_amount=Subquery(top.values('bid_amount')[:1]),
+        )
+        .values_list('id', 'title', 'reserve_price', 'winner_id', 'winning_amount', 'seller_id')
+    )
+    return {item_id: row for item_id, *row in rows}
+
+
+def close_due_items(now=None, batch_size=500):
+    """
+    Close one batch of active items whose ``end_time`` has passed.
+
+    Items whose highest bid meets the reserve price become ``sold``; the
+    rest become ``expired``. Each sold item with a seller gets its
+    ``Transaction`` (winning bidder, seller, winning bid; the payment
+    method is filled in when the buyer pays). Winners, losing bidders and
+    sellers are notified, and the sellers' active listing counts are
+    decremented. Every step is a set-based query over the batch, apart
+    from one stats ``UPDATE`` per buyer and seller of a sale, so the
+    number of queries does not grow with the number of items. Due rows
+    are locked with ``SKIP LOCKED`` where the database supports it, so
+    several closers can run side by side.
+
+    Args:
+        now (datetime, optional): Cut-off time. Defaults to now.
+        batch_size (int): Maximum number of items to close.
+
+    Returns:
+        tuple: Lists of ``(sold_ids, expired_ids)``.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(
+            Item.objects.select_for_update(skip_locked=True)
+            .filter(status='active', end_time__lte=now)
+            .order_by('end_time')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not due:
+            return [], []
+
+        winners = _winning_bids(due)
+        sold = [
+            item_id for item_id, (_, reserve, winner_id, amount, _) in winners.items()
+            if winner_id is not None and amount >= reserve
+        ]
+        sold_ids = set(sold)
+        expired = [item_id for item_id in due if item_id not in sold_ids]
+
+        Item.objects.filter(pk__in=sold, status='active').update(status='sold')
+        Item.objects.filter(pk__in=expired, status='active').update(status='expired')
+        sales = Transaction.objects.bulk_create([
+            Transaction(item_id=item_id, buyer_id=winners[item_id][2], seller_id=winners[item_id][4],
+                        transaction_amount=winners[item_id][3])
+            for item_id in sold if winners[item_id][4] is not None
+        ])
+        # bulk_create sends no post_save, so count the sales here.
+        record_transactions(sales)
+
+        bidders = Bid.objects.filter(item_id__in=due).values_list('item_id', 'bidder_id').distinct()
+        notifications = []
+        for item_id, bidder_id in bidders:
+            title, _, winner_id, amount, _ = winners[item_id]
+            if item_id in sold_ids and bidder_id == winner_id:
+                message = f'You won "{title}" with a bid of {amount}.'
+            elif item_id in sold_ids:
+                message = f'The auction for "{title}" has ended. You were outbid.'
+            else:
+                message = f'The auction for "{title}" ended without meeting the reserve price.'
+            notifications.append((bidder_id, message))
+        for item_id in due:
+            title, _, _, amount, seller_id = winners[item_id]
+            if seller_id is None:
+                continue
+            if item_id in sold_ids:
+                message = f'Your item "{title}" sold for {amount}.'
+            else:
+                message = f'Your auction for "{title}" ended without a sale.'
+            notifications.append((seller_id, message))
+        send_notifications(notifications, batch_size=batch_size)
+        record_listings([(winners[item_id][4], 'active', -1) for item_id in due])
+
+        def announce():
+            for item_id in sold:
+                order_book.evict(item_id)
+                proxy_engine.evict(item_id)
+                item_changed.send(sender=Item, item_id=item_id, status='sold')
+            for item_id in expired:
+                order_book.evict(item_id)
+                proxy_engine.evict(item_id)
+                item_changed.send(sender=Item, item_id=item_id, status='expired')
+
+        transaction.on_commit(announce)
+    return sold, expired
+
+
+def close_all_due(now=None, batch_size=500):
+    """
+    Call ``close_due_items()`` until no due items are left.
+
+    Returns:
+        tuple: Total ``(sold, expired)`` counts.
+    """
+    now = now or timezone.now()
+    sold = expired = 0
+    while True:
+        batch_sold, batch_expired = close_due_items(now, batch_size)
+        sold += len(batch_sold)
+        expired += len(batch_expired)
+        if len(batch_sold) + len(batch_expired) < batch_size:
+            return sold, expired
+
+
+class AuctionScheduler:
+    """
+    Min-heap of upcoming ``end_time``s used to close items promptly.
+
+    The heap is filled from a range scan on the ``(status, end_time)``
+    index covering the next ``horizon`` seconds, and refreshed every
+    ``refresh`` seconds. Items whose deadline changes can be pushed with
+    ``schedule()``; superseded heap entries are skipped when they come
+    up. Soft-close extensions are committed by the web workers, not in
+    the closer's process, so they are caught when the old deadline comes
+    up: closing re-checks ``end_time`` in the database, and the new one
+    is read back by primary key and requeued.
+
+    Attributes:
+        horizon (float): How far ahead to load end times, in seconds.
+        refresh (float): How often to reload from the database, in seconds.
+        batch_size (int): Maximum items closed per query batch.
+    """
+
+    def __init__(self, horizon=300, refresh=30, batch_size=500):
+        self.horizon = horizon
+        self.refresh = refresh
+        self.batch_size = batch_size
+        self._heap = []
+        self._deadlines = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def schedule(self, item_id, end_time):
+        """Add or move an item's deadline and wake the worker if it is sooner."""
+        with self._lock:
+            heapq.heappush(self._heap, (end_time, item_id))
+            self._deadlines[item_id] = end_time
+            self._drop_superseded()
+            soonest = self._heap[0][0] == end_time
+        if soonest:
+            self._wakeup.set()
+
+    def _drop_superseded(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def load(self, now=None):
+        """Load end times falling within the horizon from the database."""
+        now = now or timezone.now()
+        until = now + timezone.timedelta(seconds=self.horizon)
+        rows = (
+            Item.objects.filter(status='active', end_time__lte=until)
+            .order_by('end_time')
+            .values_list('end_time', 'id')
+        )
+        with self._lock:
+            for end_time, item_id in rows:
+                if item_id not in self._deadlines:
+                    heapq.heappush(self._heap, (end_time, item_id))
+                    self._deadlines[item_id] = end_time
+
+    def next_deadline(self):
+        """Return the soonest scheduled end time, or ``None``."""
+        with self._lock:
+            self._drop_superseded()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return ids of items whose scheduled end time has passed."""
+        due = []
+        with self._lock:
+            self._drop_superseded()
+            while self._heap and self._heap[0][0] <= now:
+                _, item_id = heapq.heappop(self._heap)
+                del self._deadlines[item_id]
+                due.append(item_id)
+                self._drop_superseded()
+        return due
+
+    def run_once(self, now=None):
+        """
+        Close everything that is due according to the heap.
+
+        Returns:
+            tuple: Total ``(sold, expired)`` counts.
+        """
+        now = now or timezone.now()
+        due = self.pop_due(now)
+        if not due:
+            return 0, 0
+        closed = close_all_due(now, self.batch_size)
+        # Items extended since they were scheduled are still open; requeue them.
+        extended = Item.objects.filter(pk__in=due, status='active', end_time__gt=now).values_list('id', 'end_time')
+        for item_id, end_time in extended:
+            self.schedule(item_id, end_time)
+        return closed
+
+    def run_forever(self, on_close=None):
+        """
+        Sleep until the next deadline, close due items, and repeat until ``stop()``.
+
+        Args:
+            on_close (callable, optional): Called with ``(sold, expired)``
+                counts after each round that closed something.
+        """
+        last_load = None
+        while not self._stopped.is_set():
+            now = timezone.now()
+            if last_load is None or (now - last_load).total_seconds() >= self.refresh:
+                self.load(now)
+                last_load = now
+
+            sold, expired = self.run_once(now)
+            if on_close and (sold or expired):
+                on_close(sold, expired)
+
+            deadline = self.next_deadline()
+            timeout = self.refresh - (timezone.now() - last_load).total_seconds()
+            if deadline is not None:
+                timeout = min(timeout, (deadline - timezone.now()).total_seconds())
+            self._wakeup.wait(max(0.0, timeout))
+            self._wakeup.clear()
+
+    def stop(self):
+        """Ask ``run_forever()`` to return."""
+        self._stopped.set()
+        self._wakeup.set()
+
@@ -43,4 +43,33 @@ class LoginForm(AuthenticationForm):
             **kwargs: Keyword arguments.
         """
         super().__init__(*args, **kwargs)
-        del self.fields['username']
\ No newline at end of file
+        del self.fields['username']
+
+class BidForm(forms.Form):
+    """
+    Form for placing a bid on an item.
+
+    Either a bid amount or a maximum bid is required; given a maximum,
+    the site bids on the user's behalf up to it and the amount is ignored.
+
+    Attributes:
+        bid_amount (forms.DecimalField): Amount of the bid.
+        max_bid (forms.DecimalField): Most the user will pay.
+    """
+    bid_amount = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0.01, required=False)
+    max_bid = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0.01, required=False)
+
+    def clean(self):
+        """
+        Require a bid amount or a maximum bid.
+
+        Returns:
+            dict: Cleaned form data.
+
+        Raises:
+            forms.ValidationError: If neither is given.
+        """
+        cleaned_data = super().clean()
+        if cleaned_data.get('bid_amount') is None and cleaned_data.get('max_bid') is None:
+            raise forms.ValidationError('Enter a bid amount or a maximum bid.')
+        return cleaned_data
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 at the cost set by ``settings.PASSWORD_ITERATIONS``.
+
+    It shares Django's algorithm name, so existing hashes verify unchanged.
+    A hash made at any other iteration count reports ``must_update``, and
+    ``check_password`` rehashes it at the configured cost on the user's
+    next successful login, whether the cost was raised or lowered.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,207 @@
+"""
+Upload pipeline for item images.
+
+Uploads are decoded and resized in a pool of ``IMAGE_WORKERS`` processes
+(``imaging.render_variants``), so a large photo neither ties up the
+interpreter serving other requests nor runs inside it. Every size in
+``IMAGE_SIZES`` is encoded in every format in ``IMAGE_FORMATS`` and kept
+in an ``ImageStore`` under the SHA-256 of its bytes:
+
+* a file is written once however many images share it;
+* an upload whose SHA-256 was seen before reuses that image's variants
+  without being decoded again;
+* a stored file's name is its content hash, so a URL never comes to
+  point at other bytes and can be cached for good: ``serve`` (and a
+  front-end server mapping ``IMAGE_STORE_URL`` onto ``IMAGE_STORE_ROOT``)
+  sends ``Cache-Control: immutable`` with a one-year lifetime.
+
+The variants are recorded on ``ItemImage.variants``.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .imaging import InvalidImage, render_variants
+from .models import ItemImage
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+CONTENT_TYPES = {'webp': 'image/webp', 'jpg': 'image/jpeg'}
+NAME_RE = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.(webp|jpg)$')
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ImageRejected(Exception):
+    """
+    Raised when an upload cannot be turned into item image variants.
+
+    Attributes:
+        reason (str): ``too_large``, ``invalid`` or ``unavailable``.
+        message (str): Human-readable explanation.
+    """
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+
+class ImageStore:
+    """
+    Content-addressed files under ``root``, named ``ab/cd/abcd...ef.ext`` after their SHA-256.
+
+    Files are written to a temporary name and renamed into place, so
+    readers never see a partial file and concurrent writers of the same
+    content do not clash.
+    """
+
+    def __init__(self, root, base_url):
+        self.root = str(root)
+        self.base_url = base_url
+
+    def save(self, data, extension):
+        """Store ``data`` unless a file with the same content exists, and return its name."""
+        digest = hashlib.sha256(data).hexdigest()
+        name = f'{digest[:2]}/{digest[2:4]}/{digest}.{extension}'
+        path = os.path.join(self.root, name)
+        if os.path.exists(path):
+            return name
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(temp, 0o644)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        return name
+
+    def path(self, name):
+        """Return the file path for a stored name, or ``None`` if ``name`` is not one."""
+        if not NAME_RE.match(name):
+            return None
+        return os.path.join(self.root, name)
+
+    def url(self, name):
+        return self.base_url + name
+
+
+def get_store():
+    """Return the store configured by ``IMAGE_STORE_ROOT`` and ``IMAGE_STORE_URL``."""
+    return ImageStore(settings.IMAGE_STORE_ROOT, settings.IMAGE_STORE_URL)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Return the process-wide worker pool, starting it on first use.
+
+    Workers are spawned rather than forked: forking a threaded server
+    process can copy a lock some other thread holds.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker pool; the next upload starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def render(data):
+    """
+    Render the configured variants of ``data``, in the pool or, with ``IMAGE_WORKERS = 0``, in this process.
+
+    Raises:
+        ImageRejected: If the data is not an acceptable image or no worker answered.
+    """
+    args = (
+        data,
+        getattr(settings, 'IMAGE_SIZES', {'thumb': 240}),
+        tuple(getattr(settings, 'IMAGE_FORMATS', ('webp', 'jpeg'))),
+        getattr(settings, 'IMAGE_QUALITY', 80),
+        getattr(settings, 'IMAGE_MAX_PIXELS', 40_000_000),
+    )
+    try:
+        if not getattr(settings, 'IMAGE_WORKERS', 2):
+            return render_variants(*args)
+        return get_pool().submit(render_variants, *args).result(getattr(settings, 'IMAGE_TIMEOUT', 30))
+    except InvalidImage as e:
+        raise ImageRejected('invalid', str(e))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start afresh next time.
+        logger.exception('Image worker pool broke; restarting it')
+        shutdown_pool()
+        raise ImageRejected('unavailable', 'Image processing failed; try again.')
+    except FutureTimeout:
+        raise ImageRejected('unavailable', 'Image processing timed out; try again.')
+
+
+def _covers(variants):
+    formats = getattr(settings, 'IMAGE_FORMATS', ('webp', 'jpeg'))
+    return (set(variants) == set(getattr(settings, 'IMAGE_SIZES', {'thumb': 240}))
+            and all(fmt in variant for variant in variants.values() for fmt in formats))
+
+
+def process_image(data):
+    """
+    Turn uploaded bytes into stored variants.
+
+    Returns:
+        tuple: The upload's SHA-256 and the variants to record on an ``ItemImage``:
+        name to ``width``, ``height`` and a stored file name per format.
+
+    Raises:
+        ImageRejected: If the upload is too large or not an acceptable image.
+    """
+    max_bytes = getattr(settings, 'IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+    if len(data) > max_bytes:
+        raise ImageRejected('too_large', f'Images may be at most {max_bytes // (1024 * 1024)} MB.')
+    digest = hashlib.sha256(data).hexdigest()
+    for variants in ItemImage.objects.filter(digest=digest).values_list('variants', flat=True):
+        if _covers(variants):
+            return digest, variants
+
+    store = get_store()
+    variants = {}
+    for name, variant in render(data).items():
+        variants[name] = {'width': variant['width'], 'height': variant['height']}
+        for fmt, encoded in variant['data'].items():
+            variants[name][fmt] = store.save(encoded, EXTENSIONS[fmt])
+    return digest, variants
+
+
+def add_image(item, data):
+    """
+    Process an upload and attach it to ``item``.
+
+    Raises:
+        ImageRejected: If the upload is too large or not an acceptable image.
+    """
+    digest, variants = process_image(data)
+    return ItemImage.objects.create(item=item, digest=digest, variants=variants)
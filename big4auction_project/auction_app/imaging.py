@@ -0,0 +1,76 @@
+"""
+Decoding and resizing of uploaded item images.
+
+This runs in the worker processes of ``auction_app.images`` and imports
+nothing from Django, so a freshly spawned worker only loads Pillow.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+ACCEPTED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'method': 4},
+    'jpeg': {'format': 'JPEG', 'optimize': True, 'progressive': True},
+}
+
+
+class InvalidImage(Exception):
+    """Raised when uploaded data is not an image the pipeline accepts."""
+
+
+def _flatten(image):
+    """Return ``image`` as RGB, with any transparency laid over white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(data, sizes, formats=('webp', 'jpeg'), quality=80, max_pixels=40_000_000):
+    """
+    Decode ``data`` and encode it at every size in every format.
+
+    JPEG sources are decoded at the smallest scale that still covers the
+    largest size (``Image.draft``), and sizes are rendered largest first,
+    each from the one before, so the full-resolution pixels are only
+    resampled once. Metadata such as EXIF (and its GPS position) is not
+    copied; the EXIF orientation is applied first.
+
+    Args:
+        data (bytes): The uploaded file.
+        sizes (dict): Variant name to its longest edge in pixels. Images are never enlarged.
+        formats (tuple): Output formats, keys of ``SAVE_OPTIONS``.
+        quality (int): Encoder quality, 1-100.
+        max_pixels (int): Largest source image accepted, in pixels.
+
+    Returns:
+        dict: Variant name to ``width``, ``height`` and ``data``, the encoded bytes per format.
+
+    Raises:
+        InvalidImage: If the data is not a JPEG, PNG, WebP or GIF image, or is too large.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.format not in ACCEPTED_FORMATS:
+            raise InvalidImage(f'Unsupported image format {image.format}.')
+        if image.width * image.height > max_pixels:
+            raise InvalidImage(f'Images may have at most {max_pixels:,} pixels.')
+        largest = max(sizes.values())
+        image.draft('RGB', (largest, largest))
+        image = _flatten(ImageOps.exif_transpose(image))
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f'Cannot decode image: {e}')
+
+    variants = {}
+    for name, edge in sorted(sizes.items(), key=lambda size: -size[1]):
+        image.thumbnail((edge, edge), Image.LANCZOS, reducing_gap=3.0)
+        encoded = {}
+        for fmt in formats:
+            buffer = io.BytesIO()
+            image.save(buffer, quality=quality, **SAVE_OPTIONS[fmt])
+            encoded[fmt] = buffer.getvalue()
+        variants[name] = {'width': image.width, 'height': image.height, 'data': encoded}
+    return variants
@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import threading
+
+from django.core import signing
+from django.db.models import Q
+from django.dispatch import receiver
+
+from .listings import InvalidCursor
+from .models import Notification
+from .routers import PRIMARY
+from .signals import notifications_sent
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+WAIT_TIMEOUT = 25
+MAX_WAIT_TIMEOUT = 60
+CURSOR_SALT = 'auction_app.inbox.cursor'
+
+
+def encode_cursor(notification):
+    """Return an opaque cursor pointing just after ``notification`` (newest first)."""
+    return signing.dumps([notification.timestamp.isoformat(), notification.id], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """
+    Turn an inbox cursor back into a keyset filter.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded.
+    """
+    try:
+        timestamp, notification_id = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+    return Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=notification_id)
+
+
+def serialize_notification(notification):
+    """Render a notification as an inbox entry."""
+    return {
+        'id': notification.id,
+        'message': notification.message,
+        'timestamp': notification.timestamp.isoformat(),
+        'read_status': notification.read_status,
+    }
+
+
+def fetch_inbox(user_id, read_status=None, cursor=None, page_size=PAGE_SIZE):
+    """
+    Fetch one page of a user's notifications, newest first.
+
+    Pages are ordered by ``(timestamp, id)`` descending and continue from
+    ``cursor`` with a keyset condition. Filtering on ``read_status`` is
+    served by the ``(user, read_status, timestamp)`` index.
+
+    Returns:
+        dict: ``notifications`` and ``next_cursor`` (``None`` on the last page).
+    """
+    queryset = Notification.objects.filter(user_id=user_id)
+    if read_status is not None:
+        queryset = queryset.filter(read_status=read_status)
+    if cursor:
+        queryset = queryset.filter(decode_cursor(cursor))
+    notifications = list(queryset.order_by('-timestamp', '-id')[:page_size + 1])
+    next_cursor = None
+    if len(notifications) > page_size:
+        notifications = notifications[:page_size]
+        next_cursor = encode_cursor(notifications[-1])
+    return {
+        'notifications': [serialize_notification(notification) for notification in notifications],
+        'next_cursor': next_cursor,
+    }
+
+
+async def fetch_new(user_id, after_id, limit=PAGE_SIZE):
+    """
+    Return up to ``limit`` notifications with an id above ``after_id``, oldest first.
+
+    Waiters are woken by commits on the primary, which a replica may not
+    have applied yet, so this always reads the primary.
+    """
+    queryset = Notification.objects.using(PRIMARY).filter(user_id=user_id, id__gt=after_id).order_by('id')[:limit]
+    return [serialize_notification(notification) async for notification in queryset]
+
+
+class InboxHub:
+    """
+    In-process registry of requests waiting for a user's next notification.
+
+    Each waiting request parks on its own ``asyncio.Event``; ``notify()``
+    sets the events of the given users from any thread. Waiting costs no
+    queries, so idle connected users put no load on the database.
+    """
+
+    def __init__(self):
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def listen(self, user_id):
+        """Register the current task as a waiter for ``user_id`` and yield its event."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(user_id, set()).add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self._lock:
+                group = self._waiters.get(user_id)
+                if group is not None:
+                    group.discard(waiter)
+                    if not group:
+                        del self._waiters[user_id]
+
+    def listeners(self, user_id):
+        """Return the number of requests waiting for ``user_id``."""
+        with self._lock:
+            return len(self._waiters.get(user_id, ()))
+
+    def notify(self, user_ids):
+        """Wake every request waiting for any of ``user_ids``."""
+        with self._lock:
+            waiters = [waiter for user_id in user_ids for waiter in self._waiters.get(user_id, ())]
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop has been closed; its waiter is gone.
+                pass
+
+
+async def wait_for_new(user_id, after_id, timeout=WAIT_TIMEOUT, limit=PAGE_SIZE):
+    """
+    Return notifications newer than ``after_id``, waiting up to ``timeout`` seconds for one.
+
+    The waiter is registered before the first check, so a notification
+    committed in between still wakes it. While parked the request runs
+    no queries; it re-queries once when woken.
+
+    Returns:
+        list: Serialized notifications, empty if none arrived in time.
+    """
+    with inbox_hub.listen(user_id) as event:
+        notifications = await fetch_new(user_id, after_id, limit)
+        if notifications:
+            return notifications
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+    return await fetch_new(user_id, after_id, limit)
+
+
+inbox_hub = InboxHub()
+
+
+@receiver(notifications_sent)
+def wake_waiters(sender, user_ids, **kwargs):
+    inbox_hub.notify(user_ids)
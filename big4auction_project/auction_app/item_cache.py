@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+
+from .models import Item, ItemImage
+from .routers import PRIMARY, lagging
+from .signals import item_changed
+
+STATIC_TIMEOUT = 60 * 60
+LIVE_TIMEOUT = 30
+
+
+def _static_key(item_id):
+    return f'item:{item_id}:static'
+
+
+def _live_key(item_id):
+    return f'item:{item_id}:live'
+
+
+def get_static(item_id):
+    """
+    Return the rarely changing part of an item page.
+
+    The title, description, category and image gallery are rendered once
+    into an HTML fragment and cached together with the fields needed to
+    build the canonical URL. Bids never touch this entry.
+
+    Returns:
+        dict: ``html``, ``url`` and ``title``, or ``None`` if the item does not exist.
+    """
+    key = _static_key(item_id)
+    static = cache.get(key)
+    if static is not None:
+        return static
+
+    # Read on the primary: the fragment is kept for an hour, far longer
+    # than a replica may lag behind an edit.
+    item = Item.objects.using(PRIMARY).select_related('category').prefetch_related('images').filter(pk=item_id).first()
+    if item is None:
+        return None
+    static = {
+        'title': item.title,
+        'url': item.get_absolute_url(),
+        'html': render_to_string('auction_app/_item_static.html', {
+            'item': item,
+            'gallery': [{'variant': image.variant('card'), 'url': image.image_url} for image in item.images.all()],
+        }),
+    }
+    cache.set(key, static, STATIC_TIMEOUT)
+    return static
+
+
+def get_live(item_id):
+    """
+    Return the bid-dependent part of an item page.
+
+    This is a tiny entry that every bid or status change invalidates. It
+    may be read from the replica, but not cached from one that is behind.
+
+    Returns:
+        dict: ``current_bid``, ``bid_count``, ``status`` and ``end_time``.
+    """
+    key = _live_key(item_id)
+    live = cache.get(key)
+    if live is not None:
+        return live
+
+    queryset = (
+        Item.objects.filter(pk=item_id)
+        .annotate(bid_count=Count('bid'))
+        .values('current_bid', 'bid_count', 'status', 'end_time')
+    )
+    live = queryset.first()
+    if live is not None and queryset.db != PRIMARY and lagging({item_id: live}):
+        live = queryset.using(PRIMARY).first()
+    if live is not None:
+        cache.set(key, live, LIVE_TIMEOUT)
+    return live
+
+
+@receiver(item_changed)
+def invalidate_live(sender, item_id, **kwargs):
+    cache.delete(_live_key(item_id))
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_item(sender, instance, **kwargs):
+    cache.delete_many([_static_key(instance.id), _live_key(instance.id)])
+
+
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+def invalidate_gallery(sender, instance, **kwargs):
+    cache.delete(_static_key(instance.item_id))
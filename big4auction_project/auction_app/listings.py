@@ -0,0 +1,175 @@
+import hashlib
+import time
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Item
+from .routers import refresh_stale
+from .signals import item_changed
+
+PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+PAGE_TIMEOUT = 60
+SORT_KEYS = {
+    'ending': 'end_time',
+    'price': 'current_bid',
+}
+CURSOR_SALT = 'auction_app.listings.cursor'
+GENERATION_KEY = 'listings:generation'
+
+
+class InvalidCursor(Exception):
+    """Raised when a listing cursor is malformed, tampered with, or for another sort."""
+
+
+def encode_cursor(sort, item):
+    """Return an opaque cursor pointing just after ``item`` in ``sort`` order."""
+    value = getattr(item, SORT_KEYS[sort])
+    return signing.dumps([sort, str(value), item.id], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(sort, cursor):
+    """
+    Turn a cursor back into a keyset filter.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded or was issued for another sort.
+    """
+    try:
+        cursor_sort, value, item_id = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+    if cursor_sort != sort:
+        raise InvalidCursor('Cursor does not match the requested sort.')
+    field = SORT_KEYS[sort]
+    return Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': item_id})
+
+
+def serialize_item(item):
+    """Render an item as a listing entry, with the first uploaded image's thumbnail (if any) for the list view."""
+    images = list(item.images.all())
+    thumbnails = [image.variant('thumb') for image in images if image.variants]
+    return {
+        'id': item.id,
+        'title': item.title,
+        'slug': item.slug,
+        'url': item.get_absolute_url(),
+        'category': {'id': item.category_id, 'name': item.category.category_name},
+        'starting_bid': str(item.starting_bid),
+        'current_bid': str(item.current_bid),
+        'end_time': item.end_time.isoformat(),
+        'status': item.status,
+        'images': [image.url('thumb') for image in images],
+        'thumbnail': thumbnails[0] if thumbnails else None,
+    }
+
+
+def fetch_page(category_id=None, status='active', sort='ending', cursor=None, page_size=PAGE_SIZE, seller_id=None):
+    """
+    Fetch one page of items from the database.
+
+    Pages are ordered by ``(sort key, id)`` and continue from ``cursor``
+    with a keyset condition, so deep pages cost the same as the first
+    one. A page always takes two queries: the items (with their
+    category joined) and their images. Filtering by ``seller_id`` reads
+    the ``(seller, status, end_time)`` index. Items a lagging replica
+    returned with an outdated bid or status are re-read from the primary.
+
+    Returns:
+        dict: ``items`` and ``next_cursor`` (``None`` on the last page).
+    """
+    field = SORT_KEYS[sort]
+    queryset = Item.objects.filter(status=status)
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+    if seller_id is not None:
+        queryset = queryset.filter(seller_id=seller_id)
+    if cursor:
+        queryset = queryset.filter(decode_cursor(sort, cursor))
+    queryset = queryset.select_related('category').prefetch_related('images')
+    items = refresh_stale(list(queryset.order_by(field, 'id')[:page_size + 1]), queryset)
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(sort, items[-1])
+    return {
+        'items': [serialize_item(item) for item in items],
+        'next_cursor': next_cursor,
+    }
+
+
+def _page_key(category_id, status, sort, cursor, page_size, seller_id=None):
+    generation = cache.get_or_set(GENERATION_KEY, time.time_ns, timeout=None)
+    digest = hashlib.md5((cursor or '').encode()).hexdigest()
+    return (f'listings:{generation}:{category_id or "all"}:{seller_id or "all"}:'
+            f'{status}:{sort}:{page_size}:{digest}')
+
+
+def _item_key(item_id):
+    return f'listings:item:{item_id}'
+
+
+def get_page(category_id=None, status='active', sort='ending', cursor=None, page_size=PAGE_SIZE, seller_id=None):
+    """
+    Return a listing page, serving it from the cache when possible.
+
+    Every cached page is also recorded under each of its items, so
+    ``invalidate_item()`` can drop exactly the pages that show an item
+    when one of its bids or its status changes. New and deleted items
+    bump a global generation instead, since they shift every page.
+    Pages expire after ``PAGE_TIMEOUT`` seconds regardless, which bounds
+    staleness for items moving between pages under the price sort.
+    """
+    if cursor:
+        decode_cursor(sort, cursor)
+    key = _page_key(category_id, status, sort, cursor, page_size, seller_id)
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    page = fetch_page(category_id, status, sort, cursor, page_size, seller_id)
+    cache.set(key, page, PAGE_TIMEOUT)
+    item_keys = [_item_key(item['id']) for item in page['items']]
+    existing = cache.get_many(item_keys)
+    cache.set_many({
+        item_key: existing.get(item_key, []) + [key] for item_key in item_keys
+    }, PAGE_TIMEOUT)
+    return page
+
+
+def invalidate_item(item_id):
+    """Drop every cached listing page that shows ``item_id``."""
+    item_key = _item_key(item_id)
+    pages = cache.get(item_key)
+    if pages:
+        cache.delete_many(pages + [item_key])
+
+
+def invalidate_all():
+    """Drop every cached listing page."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+@receiver(item_changed)
+def invalidate_changed_item(sender, item_id, **kwargs):
+    invalidate_item(item_id)
+
+
+@receiver(post_save, sender=Item)
+def invalidate_saved_item(sender, instance, created, **kwargs):
+    if created:
+        invalidate_all()
+    else:
+        invalidate_item(instance.id)
+
+
+@receiver(post_delete, sender=Item)
+def invalidate_deleted_item(sender, instance, **kwargs):
+    invalidate_all()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from auction_app.closer import AuctionScheduler, close_all_due
+
+
+class Command(BaseCommand):
+    help = 'Close auctions whose end time has passed, marking items sold or expired.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Close everything currently due and exit.')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--horizon', type=float, default=300, help='Seconds of upcoming end times to keep in memory.')
+        parser.add_argument('--refresh', type=float, default=30, help='Seconds between schedule reloads.')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            sold, expired = close_all_due(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Closed {sold} sold and {expired} expired auctions.'))
+            return
+
+        scheduler = AuctionScheduler(
+            horizon=options['horizon'],
+            refresh=options['refresh'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write('Auction closer running. Press Ctrl+C to stop.')
+        try:
+            scheduler.run_forever(
+                on_close=lambda sold, expired: self.stdout.write(f'Closed {sold} sold and {expired} expired auctions.')
+            )
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -0,0 +1,63 @@
+import sys
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from auction_app.exports import CHUNK_SIZE, EXPORTS, FORMATS, render
+
+
+def _moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Invalid date: {value!r}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = 'Stream bids, transactions or reports to a CSV or JSON Lines file in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=list(EXPORTS))
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output on the fly.')
+        parser.add_argument('--output', default='-', help='File to write; "-" for standard output.')
+        parser.add_argument('--since', help='Only rows at or after this date or datetime.')
+        parser.add_argument('--until', help='Only rows before this date or datetime.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options['export']]
+        queryset = export.model.objects.all()
+        if options['since']:
+            queryset = queryset.filter(**{f'{export.time_field}__gte': _moment(options['since'])})
+        if options['until']:
+            queryset = queryset.filter(**{f'{export.time_field}__lt': _moment(options['until'])})
+
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        blocks = render(export, counted(export.rows(queryset, options['chunk_size'])),
+                        options['format'], options['gzip'])
+        to_stdout = options['output'] == '-'
+        out = sys.stdout.buffer if to_stdout else open(options['output'], 'wb')
+        try:
+            for block in blocks:
+                out.write(block)
+        finally:
+            if to_stdout:
+                out.flush()
+            else:
+                out.close()
+        self.stderr.write(f'Exported {count} {export.name}.')
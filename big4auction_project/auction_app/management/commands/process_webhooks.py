@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from auction_app.webhooks import WebhookWorker, process_pending
+
+
+class Command(BaseCommand):
+    help = 'Process queued payment webhook events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit.')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            total = 0
+            while claimed := process_pending(options['batch_size']):
+                total += claimed
+            self.stdout.write(self.style.SUCCESS(f'Processed {total} webhook events.'))
+            return
+
+        workers = [
+            WebhookWorker(options['batch_size'], options['poll'], name=f'webhook-worker-{i}')
+            for i in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f'{len(workers)} webhook workers running. Press Ctrl+C to stop.')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.stop()
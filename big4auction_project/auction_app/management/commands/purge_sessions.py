@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auction_app.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions from the database in bounded chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Sessions deleted per statement.')
+        parser.add_argument('--grace', type=float, default=None,
+                            help='Seconds past expiry to keep sessions (default: SESSION_BATCH_SECONDS).')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        deleted = SessionStore.clear_expired(chunk_size=options['chunk_size'], grace=options['grace'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions.'))
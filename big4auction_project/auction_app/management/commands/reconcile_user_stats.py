@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from auction_app.user_stats import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Check the incrementally maintained user stats against a full recomputation and fix drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report mismatches; exit with status 1 if any.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        mismatches = reconcile(chunk_size=options['chunk_size'], fix=not options['check'])
+        for user_id, field, stored, actual in mismatches[:50]:
+            self.stdout.write(f'user {user_id}: {field} is {stored}, expected {actual}')
+        if len(mismatches) > 50:
+            self.stdout.write(f'... and {len(mismatches) - 50} more')
+        users = len({user_id for user_id, *_ in mismatches})
+        if options['check']:
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} mismatched values across {users} users.')
+            self.stdout.write(self.style.SUCCESS('User stats are consistent.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(mismatches)} values across {users} users.'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from auction_app.webhooks import replay, process_pending
+
+
+class Command(BaseCommand):
+    help = 'Re-queue stored payment webhook events so the workers run them again.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', help='Provider event ids (evt_...).')
+        parser.add_argument('--type', help='Only events of this type.')
+        parser.add_argument('--since', help='Only events received at or after this ISO timestamp.')
+        parser.add_argument('--failed', action='store_true', help='Only events that exhausted their attempts.')
+        parser.add_argument('--process', action='store_true', help='Process the queue here instead of leaving it to the workers.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f'Invalid --since timestamp: {options["since"]}')
+        if not (options['event_ids'] or options['type'] or since or options['failed']):
+            raise CommandError('Give event ids or at least one of --type, --since, --failed.')
+
+        count = replay(options['event_ids'], options['type'], since, options['failed'])
+        self.stdout.write(f'Re-queued {count} webhook events.')
+        if options['process']:
+            total = 0
+            while claimed := process_pending():
+                total += claimed
+            self.stdout.write(self.style.SUCCESS(f'Processed {total} webhook events.'))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auction_app.analytics import BATCH_SIZE, SETTLE_SECONDS, STREAMS, reset, run, status
+
+
+class Command(BaseCommand):
+    help = 'Roll new bids and transactions up into minute/hour/day reporting buckets, resuming from the last checkpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stream', action='append', choices=list(STREAMS), help='Only this stream (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Source rows per transaction.')
+        parser.add_argument('--settle', type=float, default=SETTLE_SECONDS,
+                            help='Seconds a row must have existed before it is rolled up.')
+        parser.add_argument('--max-batches', type=int, help='Stop each stream after this many batches.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, catching up every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=30.0)
+        parser.add_argument('--rebuild', action='store_true', help='Delete the rollups and checkpoints first.')
+        parser.add_argument('--status', action='store_true', help='Show the checkpoints and pending rows, then exit.')
+
+    def handle(self, *args, **options):
+        streams = options['stream'] or list(STREAMS)
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        if options['status']:
+            for name, state in status().items():
+                if name in streams:
+                    self.stdout.write(f"{name}: last id {state['last_id']}, {state['pending']} pending, "
+                                      f"updated {state['updated_at'] or 'never'}")
+            return
+        if options['rebuild']:
+            reset(streams)
+
+        while True:
+            started = time.monotonic()
+            totals = run(streams, options['batch_size'], options['settle'], options['max_batches'])
+            summary = ', '.join(f'{count} {name}' for name, count in totals.items())
+            self.stdout.write(self.style.SUCCESS(f'Rolled up {summary} in {time.monotonic() - started:.2f}s.'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from auction_app.search import SearchIndex, index_path
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the on-disk item search index from the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Index file to write. Defaults to SEARCH_INDEX_PATH.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        index = SearchIndex(options['path'] or index_path())
+        index.rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(index)} items into {index.path}.'))
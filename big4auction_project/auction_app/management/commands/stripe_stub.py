@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from auction_app.payments import StubBackend
+from auction_app.stripe_stub import StubServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local Stripe API stub for offline development and load tests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every call.')
+
+    def handle(self, *args, **options):
+        server = StubServer(options['host'], options['port'], StubBackend(latency=options['latency']))
+        self.stdout.write(f'Stripe stub listening on {server.url}; set STRIPE_API_BASE={server.url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0006_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', 'end_time'], name='item_status_end_time_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0007_item_status_end_time_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['item', '-bid_amount'], name='bid_item_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['bidder', '-bid_time'], name='bid_bidder_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', 'category', 'end_time'], name='item_status_cat_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'read_status', '-timestamp'], name='notif_user_read_time_idx'),
+        ),
+    ]
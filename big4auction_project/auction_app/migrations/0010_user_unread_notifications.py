@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_unread(apps, schema_editor):
+    User = apps.get_model('auction_app', 'User')
+    Notification = apps.get_model('auction_app', 'Notification')
+    unread = (
+        Notification.objects.filter(user=OuterRef('pk'), read_status='unread')
+        .order_by()
+        .values('user')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    User.objects.update(unread_notifications=Coalesce(Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0009_webhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0010_user_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('sales_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('purchases_count', models.PositiveIntegerField(default=0)),
+                ('purchases_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bids_count', models.PositiveIntegerField(default=0)),
+                ('bids_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('feedback_count', models.PositiveIntegerField(default=0)),
+                ('feedback_rating_sum', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
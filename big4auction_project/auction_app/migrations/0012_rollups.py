@@ -0,0 +1,63 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0011_userstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=6)),
+                ('bucket', models.DateTimeField()),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auction_app.category')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BidRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=6)),
+                ('bucket', models.DateTimeField()),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('amount_low', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('amount_high', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auction_app.category')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='auction_app.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'bucket'], name='bidrollup_gran_bucket_idx'), models.Index(fields=['granularity', 'category', 'bucket'], name='bidrollup_gran_cat_bucket_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bidrollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'item', 'bucket'), name='bidrollup_gran_item_bucket_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='salesrollup',
+            index=models.Index(fields=['granularity', 'bucket'], name='salesrollup_gran_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesrollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'category', 'bucket'), name='salesrollup_gran_cat_bucket_uniq'),
+        ),
+    ]
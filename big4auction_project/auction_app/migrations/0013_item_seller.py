@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-17 05:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0012_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='seller',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='listings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='userstats',
+            name='active_listings',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['seller', 'status', 'end_time'], name='item_seller_status_end_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def backfill_sellers(apps, schema_editor):
+    """
+    Fill ``Item.seller`` from the item's first transaction.
+
+    Items are walked in primary key order, ``BATCH_SIZE`` at a time, and
+    each batch is its own short transaction, so row locks are held only
+    for one batch and the table stays writable throughout. Items that
+    never sold keep an empty seller.
+    """
+    Item = apps.get_model('auction_app', 'Item')
+    Transaction = apps.get_model('auction_app', 'Transaction')
+    db = schema_editor.connection.alias
+    first_seller = (
+        Transaction.objects.using(db).filter(item=OuterRef('pk'))
+        .order_by('transaction_date', 'id').values('seller')[:1]
+    )
+    last_id = 0
+    while True:
+        ids = list(
+            Item.objects.using(db).filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            return
+        last_id = ids[-1]
+        with transaction.atomic(using=db):
+            Item.objects.using(db).filter(pk__in=ids, seller__isnull=True).update(seller=Subquery(first_seller))
+
+
+def count_active_listings(apps, schema_editor):
+    """
+    Seed ``UserStats.active_listings`` from the backfilled sellers.
+    """
+    Item = apps.get_model('auction_app', 'Item')
+    UserStats = apps.get_model('auction_app', 'UserStats')
+    db = schema_editor.connection.alias
+    now = timezone.now()
+    counts = (
+        Item.objects.using(db).filter(status='active', seller__isnull=False).order_by()
+        .values_list('seller').annotate(total=Count('id'))
+    )
+    rows = [UserStats(user_id=seller_id, active_listings=total, updated_at=now) for seller_id, total in counts]
+    target = ['user'] if schema_editor.connection.features.supports_update_conflicts_with_target else None
+    for start in range(0, len(rows), BATCH_SIZE):
+        with transaction.atomic(using=db):
+            UserStats.objects.using(db).bulk_create(
+                rows[start:start + BATCH_SIZE], update_conflicts=True,
+                unique_fields=target, update_fields=['active_listings', 'updated_at'],
+            )
+
+
+class Migration(migrations.Migration):
+
+    # Each batch commits on its own instead of the whole backfill holding locks.
+    atomic = False
+
+    dependencies = [
+        ('auction_app', '0013_item_seller'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sellers, migrations.RunPython.noop),
+        migrations.RunPython(count_active_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-17 05:58
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def blank_emails_to_null(apps, schema_editor):
+    """
+    Store missing emails as ``NULL`` so they do not collide in the unique index.
+
+    Duplicated addresses cannot be resolved automatically, since either
+    account may be the one its owner logs in to, so the migration stops
+    and lists them for the accounts to be merged by hand.
+    """
+    User = apps.get_model('auction_app', 'User')
+    db = schema_editor.connection.alias
+    User.objects.using(db).filter(email='').update(email=None)
+    duplicates = list(
+        User.objects.using(db).filter(email__isnull=False).values('email')
+        .annotate(accounts=Count('id')).filter(accounts__gt=1).values_list('email', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Cannot make User.email unique; these addresses belong to several accounts: ' + ', '.join(duplicates)
+        )
+
+
+def null_emails_to_blank(apps, schema_editor):
+    User = apps.get_model('auction_app', 'User')
+    User.objects.using(schema_editor.connection.alias).filter(email__isnull=True).update(email='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0015_proxybid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, default=None, max_length=254, null=True),
+        ),
+        migrations.RunPython(blank_emails_to_null, null_emails_to_blank),
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(blank=True, default=None, max_length=254, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-17 06:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0016_user_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemimage',
+            name='digest',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='itemimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='itemimage',
+            name='image_url',
+            field=models.URLField(blank=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-17 06:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0018_transaction_payment_method_optional'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bid',
+            name='bid_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
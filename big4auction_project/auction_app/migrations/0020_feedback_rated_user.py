@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 06:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auction_app', '0019_bid_time_accept_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='rated_user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feedback_received', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,9 +1,41 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.urls import reverse
+from django.utils import timezone
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.exceptions import ValidationError
 
+class LoadedValuesMixin:
+    """
+    Keeps the values of ``tracked_fields`` as last read from or written to the database.
+
+    Receivers that need to know what a save changed compare the instance
+    with ``loaded_values`` instead of reading the row again. It is
+    ``None`` for instances not loaded from the database or loaded with a
+    tracked field deferred; whoever saves the instance calls
+    ``remember_loaded()`` once the row holds its values.
+    """
+
+    tracked_fields = ()
+    loaded_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_loaded()
+
+    def remember_loaded(self):
+        if all(name in self.__dict__ for name in self.tracked_fields):
+            self.loaded_values = tuple(self.__dict__[name] for name in self.tracked_fields)
+        else:
+            self.loaded_values = None
+
 class PaymentMethod(models.Model):
     """
     Represents a payment method available in the system.
@@ -35,24 +67,37 @@ class User(AbstractUser):
     Represents a user in the system.
 
     Attributes:
+        email (EmailField, optional): Email address the user logs in with. Unique
+            when set; users without one store ``NULL`` rather than an empty string.
         address (CharField, optional): Address of the user. Can be empty.
         phone_number (CharField): Phone number of the user.
         stripe_customer_id (CharField, optional): Stripe customer ID.
+        unread_notifications (PositiveIntegerField): Denormalized count of unread
+            notifications, maintained by ``auction_app.notifications``.
     """
     username = models.CharField(max_length=150, unique=True, blank=True, null=True)
+    email = models.EmailField(unique=True, blank=True, null=True, default=None)
     address = models.CharField(max_length=255, null=False, blank=True, default='')
     phone_number = models.CharField(max_length=255, unique=True)
     stripe_customer_id = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    unread_notifications = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return '{} {}'.format(self.first_name, self.last_name)
 
-class Item(models.Model):
+    def save(self, *args, **kwargs):
+        # create_user() and forms turn a missing email into '', which the unique index would reject twice.
+        if not self.email:
+            self.email = None
+        super().save(*args, **kwargs)
+
+class Item(LoadedValuesMixin, models.Model):
     """
     Represents an item for sale in the system.
 
     Attributes:
-        seller (ForeignKey to User): Reference to the user who is selling the item.
+        seller (ForeignKey to User): Reference to the user who is selling the item. Empty only for
+            legacy listings whose seller could not be recovered from a transaction.
         title (CharField): Title of the item.
         slug (SlugField): SEO-friendly URL slug for the item.
         description (TextField): Description of the item.
@@ -71,7 +116,10 @@ class Item(models.Model):
         ('expired', 'Expired'),
         ('sold', 'Sold'),
     ]
+    # Active listing counts follow the seller and status.
+    tracked_fields = ('seller_id', 'status')
 
+    seller = models.ForeignKey('User', related_name='listings', on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=250)
     description = models.TextField()
@@ -110,6 +158,11 @@ class Item(models.Model):
                 name='start_time_before_end_time'
             ),
         ]
+        indexes = [
+            models.Index(fields=['status', 'end_time'], name='item_status_end_time_idx'),
+            models.Index(fields=['status', 'category', 'end_time'], name='item_status_cat_end_idx'),
+            models.Index(fields=['seller', 'status', 'end_time'], name='item_seller_status_end_idx'),
+        ]
 
 class ItemImage(models.Model):
     """
@@ -117,14 +170,38 @@ class ItemImage(models.Model):
 
     Attributes:
         item (ForeignKey to Item): Reference to the auction item.
-        image_url (URLField): URL to the image of the item.
+        image_url (URLField): URL to an external image of the item; empty for uploads.
+        digest (CharField): SHA-256 of the uploaded file, used to skip re-processing duplicates.
+        variants (JSONField): Rendered sizes of an upload (see ``auction_app.images``):
+            name to ``width``, ``height`` and a stored file name per format.
     """
 
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='images')
-    image_url = models.URLField()
+    image_url = models.URLField(blank=True)
+    digest = models.CharField(max_length=64, blank=True, db_index=True)
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f'Image #{self.pk} for {self.item.title}'
+
+    def variant(self, name):
+        """
+        Return one rendered size of an upload with the URL of each format.
+
+        Returns:
+            dict: ``width``, ``height`` and e.g. ``webp`` and ``jpeg`` URLs, or ``None``
+            for an image only known by ``image_url``.
+        """
+        variant = self.variants.get(name)
+        if not variant:
+            return None
+        return {key: settings.IMAGE_STORE_URL + value if isinstance(value, str) else value
+                for key, value in variant.items()}
+
+    def url(self, name='thumb', fmt='jpeg'):
+        """Return the URL of one size and format of an upload, or ``image_url``."""
+        variant = self.variant(name)
+        return variant[fmt] if variant and fmt in variant else self.image_url
         
 class Bid(models.Model):
     """
@@ -140,11 +217,45 @@ class Bid(models.Model):
     bidder = models.ForeignKey('User', on_delete=models.CASCADE)
     item = models.ForeignKey('Item', on_delete=models.CASCADE)
     bid_amount = models.DecimalField(max_digits=10, decimal_places=2)
-    bid_time = models.DateTimeField(auto_now_add=True)
+    bid_time = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f'Bid #{self.pk} on {self.item.title} by {self.bidder.username}'
-    
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', '-bid_amount'], name='bid_item_amount_idx'),
+            models.Index(fields=['bidder', '-bid_time'], name='bid_bidder_time_idx'),
+        ]
+
+class ProxyBid(models.Model):
+    """
+    Represents the maximum a bidder is willing to pay for an item.
+
+    Rows are never updated: raising a maximum adds a new row, and the
+    latest row per bidder is the one in force. The visible ``Bid`` rows
+    are placed on the bidder's behalf by ``auction_app.proxy``.
+
+    Attributes:
+        bidder (ForeignKey to User): Reference to the user bidding.
+        item (ForeignKey to Item): Reference to the item bid on.
+        max_amount (DecimalField): Highest amount the bidder will pay.
+        created_at (DateTimeField): Date and time when the maximum was set.
+    """
+
+    bidder = models.ForeignKey('User', on_delete=models.CASCADE)
+    item = models.ForeignKey('Item', on_delete=models.CASCADE)
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'Proxy bid of up to {self.max_amount} on item #{self.item_id}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'id'], name='proxybid_item_id_idx'),
+        ]
+
 class Transaction(models.Model):
     """
     Represents a transaction between a buyer and a seller for a specific item.
@@ -155,7 +266,8 @@ class Transaction(models.Model):
         item (ForeignKey to Item): Reference to the item involved in the transaction.
         transaction_date (DateTimeField): Date and time when the transaction occurred.
         transaction_amount (DecimalField): Amount of the transaction.
-        payment_method (ForeignKey to PaymentMethod): Reference to the payment method used in the transaction.
+        payment_method (ForeignKey to PaymentMethod): Reference to the payment method used in the
+            transaction; empty until the buyer pays, e.g. for sales recorded when an auction closes.
     """
 
     buyer = models.ForeignKey('User', related_name='buyer_transactions', on_delete=models.CASCADE)
@@ -163,10 +275,14 @@ class Transaction(models.Model):
     item = models.ForeignKey('Item', on_delete=models.CASCADE)
     transaction_date = models.DateTimeField(auto_now_add=True)
     transaction_amount = models.DecimalField(max_digits=10, decimal_places=2)
-    payment_method = models.ForeignKey('PaymentMethod', on_delete=models.CASCADE)
+    payment_method = models.ForeignKey('PaymentMethod', on_delete=models.SET_NULL, null=True, blank=True)
 
     def __str__(self):
         return f'Transaction #{self.pk} - {self.buyer.username} bought {self.item.title} from {self.seller.username}'
+
+    def clean(self):
+        if self.item_id and self.seller_id and self.item.seller_id not in (None, self.seller_id):
+            raise ValidationError("Seller must be the user who listed the item.")
     
 class Notification(models.Model):
     """
@@ -192,19 +308,74 @@ class Notification(models.Model):
 
     def __str__(self):
         return f'Notification #{self.pk} for {self.user.username}' 
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'read_status', '-timestamp'], name='notif_user_read_time_idx'),
+        ]
     
-class Feedback(models.Model):
+class UserStats(models.Model):
+    """
+    Represents running totals for a user's dashboard.
+
+    Rows are maintained incrementally by ``auction_app.user_stats`` as
+    transactions, bids and feedback are written, and reconciled nightly
+    against a full recomputation.
+
+    Attributes:
+        user (OneToOneField to User): The user these totals belong to.
+        sales_count (PositiveIntegerField): Number of transactions as seller.
+        sales_total (DecimalField): Sum of transaction amounts as seller.
+        purchases_count (PositiveIntegerField): Number of transactions as buyer.
+        purchases_total (DecimalField): Sum of transaction amounts as buyer.
+        bids_count (PositiveIntegerField): Number of bids placed.
+        bids_total (DecimalField): Sum of bid amounts placed.
+        feedback_count (PositiveIntegerField): Number of feedback entries about the user.
+        feedback_rating_sum (PositiveIntegerField): Sum of the ratings of those entries.
+        active_listings (PositiveIntegerField): Number of the user's items still open for bidding.
+        updated_at (DateTimeField, optional): When the totals last changed.
+    """
+
+    user = models.OneToOneField('User', primary_key=True, related_name='stats', on_delete=models.CASCADE)
+    sales_count = models.PositiveIntegerField(default=0)
+    sales_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    purchases_count = models.PositiveIntegerField(default=0)
+    purchases_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    bids_count = models.PositiveIntegerField(default=0)
+    bids_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    feedback_count = models.PositiveIntegerField(default=0)
+    feedback_rating_sum = models.PositiveIntegerField(default=0)
+    active_listings = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def average_rating(self):
+        """Return the mean feedback rating, or ``None`` without feedback."""
+        if not self.feedback_count:
+            return None
+        return self.feedback_rating_sum / self.feedback_count
+
+    def __str__(self):
+        return f'Stats for user #{self.user_id}'
+
+class Feedback(LoadedValuesMixin, models.Model):
     """
     Represents feedback provided by users.
 
     Attributes:
         user (ForeignKey to User): Reference to the user who provided the feedback.
+        rated_user (ForeignKey to User, optional): Reference to the user the feedback is about, whose
+            average rating it counts towards.
         rating (IntegerField): Rating given by the user (values between 0 and 5).
         comment (TextField): Comment or additional information provided by the user.
         timestamp (DateTimeField): Date and time when the feedback was submitted.
     """
 
+    tracked_fields = ('rated_user_id', 'rating')
+
     user = models.ForeignKey('User', on_delete=models.CASCADE)
+    rated_user = models.ForeignKey('User', related_name='feedback_received', on_delete=models.CASCADE,
+                                   null=True, blank=True)
     rating = models.IntegerField(
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
@@ -236,4 +407,143 @@ class Report(models.Model):
         return f'Report #{self.pk} by {self.reporter.username} against {self.reported_user.username}'
     
     class Meta:
-        unique_together = ['reporter', 'reported_user']
\ No newline at end of file
+        unique_together = ['reporter', 'reported_user']
+
+class WebhookEvent(models.Model):
+    """
+    Represents a payment provider webhook event, stored as received.
+
+    Rows are only ever inserted by the webhook endpoint; workers update
+    the processing columns. The provider's event id is unique, so a
+    redelivered event is dropped on insert.
+
+    Attributes:
+        event_id (CharField): The provider's event id, e.g. ``evt_...``.
+        type (CharField): Event type, e.g. ``payment_method.attached``.
+        payload (TextField): Raw, signature-verified request body.
+        received_at (DateTimeField): Date and time when the event was received.
+        status (CharField): Processing status (pending, processing, done, failed).
+        attempts (PositiveIntegerField): Number of processing attempts so far.
+        claimed_at (DateTimeField, optional): When a worker last claimed the event.
+        processed_at (DateTimeField, optional): When processing finished.
+        last_error (TextField): Error from the last failed attempt.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=255)
+    payload = models.TextField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+
+    def __str__(self):
+        return f'{self.type} {self.event_id} ({self.status})'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='webhook_status_id_idx'),
+        ]
+
+
+class BidRollup(models.Model):
+    """
+    Represents the bids placed on one item during one time bucket.
+
+    Written only by ``auction_app.analytics``; reporting reads these rows
+    instead of the live ``Bid`` table.
+
+    Attributes:
+        granularity (CharField): Bucket size (minute, hour, day).
+        bucket (DateTimeField): Start of the bucket, in UTC.
+        item (ForeignKey to Item): The item the bids were placed on.
+        category (ForeignKey to Category): The item's category, copied for grouping.
+        bid_count (PositiveIntegerField): Number of bids in the bucket.
+        amount_total (DecimalField): Sum of the bid amounts.
+        amount_low (DecimalField): Lowest bid amount.
+        amount_high (DecimalField): Highest bid amount.
+    """
+
+    GRANULARITY_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    granularity = models.CharField(max_length=6, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    item = models.ForeignKey('Item', on_delete=models.CASCADE)
+    category = models.ForeignKey('Category', on_delete=models.CASCADE)
+    bid_count = models.PositiveIntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    amount_low = models.DecimalField(max_digits=10, decimal_places=2)
+    amount_high = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f'{self.bid_count} bids on item #{self.item_id} ({self.granularity} {self.bucket})'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'item', 'bucket'], name='bidrollup_gran_item_bucket_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket'], name='bidrollup_gran_bucket_idx'),
+            models.Index(fields=['granularity', 'category', 'bucket'], name='bidrollup_gran_cat_bucket_idx'),
+        ]
+
+
+class SalesRollup(models.Model):
+    """
+    Represents completed transactions in one category during one time bucket.
+
+    Attributes:
+        granularity (CharField): Bucket size (minute, hour, day).
+        bucket (DateTimeField): Start of the bucket, in UTC.
+        category (ForeignKey to Category): Category of the items sold.
+        sales_count (PositiveIntegerField): Number of transactions.
+        revenue (DecimalField): Sum of the transaction amounts.
+    """
+
+    granularity = models.CharField(max_length=6, choices=BidRollup.GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    category = models.ForeignKey('Category', on_delete=models.CASCADE)
+    sales_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f'{self.sales_count} sales in category #{self.category_id} ({self.granularity} {self.bucket})'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'category', 'bucket'], name='salesrollup_gran_cat_bucket_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket'], name='salesrollup_gran_bucket_idx'),
+        ]
+
+
+class RollupCheckpoint(models.Model):
+    """
+    Represents how far a rollup stream has been processed.
+
+    Attributes:
+        name (CharField): Stream name, e.g. ``bids``.
+        last_id (BigIntegerField): Highest source row id already rolled up.
+        updated_at (DateTimeField): When the checkpoint last advanced.
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name} @ {self.last_id}'
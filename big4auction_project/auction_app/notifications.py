@@ -0,0 +1,231 @@
+import logging
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Notification, User
+from .signals import notifications_sent
+
+logger = logging.getLogger(__name__)
+
+# Counts are filled on a cache miss from a read that a concurrent send()
+# or mark_read() may already have overtaken, and nothing compares the two,
+# so a stale count may be served until it expires.
+UNREAD_TIMEOUT = 30
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _forget_counts(user_ids):
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def send(notifications, batch_size=500):
+    """
+    Write notifications and bump their recipients' unread counters.
+
+    Rows are inserted with ``bulk_create`` in ``batch_size`` chunks, and
+    counters are bumped with one ``UPDATE`` per distinct increment (in
+    practice one, since most batches hold a single notification per
+    user). Runs in the caller's transaction if there is one; once it
+    commits, cached counts are dropped and ``notifications_sent`` fires.
+
+    Args:
+        notifications (iterable): ``(user_id, message)`` pairs.
+        batch_size (int): Rows per ``INSERT``.
+
+    Returns:
+        int: Number of notifications written.
+    """
+    rows = [Notification(user_id=user_id, message=message) for user_id, message in notifications]
+    if not rows:
+        return 0
+    per_user = Counter(row.user_id for row in rows)
+    by_increment = {}
+    for user_id, increment in per_user.items():
+        by_increment.setdefault(increment, []).append(user_id)
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(rows, batch_size=batch_size)
+        for increment, user_ids in by_increment.items():
+            User.objects.filter(pk__in=user_ids).update(
+                unread_notifications=F('unread_notifications') + increment
+            )
+        def announce():
+            _forget_counts(per_user)
+            notifications_sent.send(sender=Notification, user_ids=list(per_user))
+
+        transaction.on_commit(announce)
+    return len(rows)
+
+
+def unread_count(user_id):
+    """
+    Return a user's unread notification count without counting rows.
+
+    Served from the cache, falling back to the ``unread_notifications``
+    column (a primary key lookup). Writers drop the cached count once
+    they commit; a count filled from a read that raced with a writer is
+    kept for at most ``UNREAD_TIMEOUT`` seconds.
+    """
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = User.objects.filter(pk=user_id).values_list('unread_notifications', flat=True).first() or 0
+        cache.add(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def mark_all_read(user_id):
+    """
+    Mark every unread notification of a user as read.
+
+    The notifications are flipped with a single ``UPDATE`` on the
+    ``(user, read_status, timestamp)`` index and the counter is reset in
+    the same transaction. The cached count is dropped rather than set
+    to zero, as a ``send()`` committed meanwhile would be overwritten.
+
+    Returns:
+        int: Number of notifications marked read.
+    """
+    with transaction.atomic():
+        marked = Notification.objects.filter(user_id=user_id, read_status='unread').update(read_status='read')
+        User.objects.filter(pk=user_id).update(unread_notifications=0)
+        transaction.on_commit(lambda: _forget_counts([user_id]))
+    return marked
+
+
+def mark_read(user_id, notification_ids):
+    """
+    Mark some of a user's notifications as read.
+
+    Returns:
+        int: Number of notifications that were unread.
+    """
+    with transaction.atomic():
+        marked = Notification.objects.filter(
+            user_id=user_id, pk__in=notification_ids, read_status='unread'
+        ).update(read_status='read')
+        if marked:
+            User.objects.filter(pk=user_id, unread_notifications__gte=marked).update(
+                unread_notifications=F('unread_notifications') - marked
+            )
+            transaction.on_commit(lambda: _forget_counts([user_id]))
+    return marked
+
+
+def reconcile_unread(user_ids=None):
+    """
+    Recount unread notifications into the counter column.
+
+    This is the only place that counts rows; use it to repair counters
+    after manual data fixes.
+
+    Returns:
+        int: Number of users updated.
+    """
+    unread = (
+        Notification.objects.filter(user=OuterRef('pk'), read_status='unread')
+        .order_by()
+        .values('user')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    users = User.objects.all() if user_ids is None else User.objects.filter(pk__in=user_ids)
+    updated = users.update(unread_notifications=Coalesce(Subquery(unread), 0))
+    if user_ids is None:
+        user_ids = users.values_list('id', flat=True).iterator(chunk_size=2000)
+    chunk = []
+    for user_id in user_ids:
+        chunk.append(user_id)
+        if len(chunk) == 2000:
+            _forget_counts(chunk)
+            chunk = []
+    _forget_counts(chunk)
+    return updated
+
+
+class NotificationDispatcher:
+    """
+    Buffer of outgoing notifications written in batches by ``send()``.
+
+    Producers call ``add()`` from any thread and return immediately; a
+    ``DispatchFlusher`` (or an explicit ``flush()``) writes the buffer.
+    A batch that fails to write is put back for the next flush.
+
+    Attributes:
+        batch_size (int): Maximum notifications written per flush.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, user_id, message):
+        with self._lock:
+            self._pending.append((user_id, message))
+
+    def extend(self, notifications):
+        with self._lock:
+            self._pending.extend(notifications)
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """
+        Write everything buffered so far.
+
+        Returns:
+            int: Number of notifications written.
+        """
+        written = 0
+        while True:
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+            if not batch:
+                return written
+            try:
+                written += send(batch, self.batch_size)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+
+
+class DispatchFlusher(threading.Thread):
+    """
+    Background thread calling ``NotificationDispatcher.flush()`` every ``interval`` seconds.
+    """
+
+    def __init__(self, dispatcher, interval=0.5):
+        super().__init__(daemon=True, name='notification-flusher')
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    self.dispatcher.flush()
+                except Exception:
+                    logger.exception('Notification flush failed; notifications kept for retry')
+        finally:
+            self.dispatcher.flush()
+            connection.close()
+
+    def stop(self):
+        """Stop the thread after a final flush."""
+        self._stopped.set()
+        self.join()
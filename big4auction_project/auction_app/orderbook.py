@@ -0,0 +1,276 @@
+import heapq
+import logging
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .bidding import BidRejected, extended_end_time
+from .models import Item, Bid
+from .signals import item_changed
+from .user_stats import record_bids
+
+logger = logging.getLogger(__name__)
+
+
+class ItemBook:
+    """
+    In-memory state for a single hot item.
+
+    Attributes:
+        item_id (int): Primary key of the item.
+        starting_bid (Decimal): Minimum acceptable bid.
+        current_bid (Decimal): Highest accepted bid, including bids not yet flushed.
+        start_time (datetime): When bidding opens.
+        end_time (datetime): When bidding closes.
+        top (list): Min-heap of the top-N ``(amount, bidder_id)`` pairs.
+        lock (threading.Lock): Serializes bids on this item.
+    """
+
+    def __init__(self, item, top_bids, depth):
+        self.item_id = item.id
+        self.starting_bid = item.starting_bid
+        self.current_bid = item.current_bid
+        self.start_time = item.start_time
+        self.end_time = item.end_time
+        self.depth = depth
+        self.top = []
+        self.lock = threading.Lock()
+        for amount, bidder_id in top_bids:
+            self._remember(amount, bidder_id)
+
+    def _remember(self, amount, bidder_id):
+        if len(self.top) < self.depth:
+            heapq.heappush(self.top, (amount, bidder_id))
+        else:
+            heapq.heappushpop(self.top, (amount, bidder_id))
+
+    def top_bids(self):
+        """Return the remembered bids, highest first."""
+        return sorted(self.top, reverse=True)
+
+    def check(self, amount, now):
+        """Raise ``BidRejected`` if ``amount`` cannot be accepted at ``now``."""
+        if now < self.start_time:
+            raise BidRejected('not_started', 'This auction has not started yet.')
+        if now >= self.end_time:
+            raise BidRejected('ended', 'This auction has ended.')
+        if amount < self.starting_bid:
+            raise BidRejected('below_starting_bid', 'Bid must be at least the starting bid.')
+        if amount <= self.current_bid:
+            raise BidRejected('outbid', 'Bid must be higher than the current bid.')
+
+
+class OrderBook:
+    """
+    Process-local order book for hot auctions with write-behind persistence.
+
+    Bids are validated and accepted against in-memory state under a
+    per-item lock, then queued and written to the database in batches by
+    ``flush()``. Items are loaded lazily from the ``Bid`` table the first
+    time they are touched, which doubles as the recovery path after a
+    restart: nothing is kept in memory that cannot be rebuilt from the
+    database plus the unflushed queue.
+
+    Attributes:
+        depth (int): Number of top bids kept per item.
+        batch_size (int): Maximum rows per ``bulk_create`` call.
+    """
+
+    def __init__(self, depth=10, batch_size=500):
+        self.depth = depth
+        self.batch_size = batch_size
+        self._books = {}
+        self._books_lock = threading.Lock()
+        self._pending = []
+        self._extensions = {}
+        self._pending_lock = threading.Lock()
+
+    def _load(self, item_id):
+        item = Item.objects.filter(pk=item_id, status='active').first()
+        if item is None:
+            exists = Item.objects.filter(pk=item_id).exists()
+            if exists:
+                raise BidRejected('not_active', 'This auction is no longer active.')
+            raise BidRejected('not_found', 'Item does not exist.')
+        top_bids = (
+            Bid.objects.filter(item_id=item_id)
+            .order_by('-bid_amount')
+            .values_list('bid_amount', 'bidder_id')[:self.depth]
+        )
+        return ItemBook(item, list(top_bids), self.depth)
+
+    def book_for(self, item_id):
+        """Return the book for ``item_id``, loading it from the database on a miss."""
+        book = self._books.get(item_id)
+        if book is not None:
+            return book
+        with self._books_lock:
+            book = self._books.get(item_id)
+            if book is None:
+                book = self._books[item_id] = self._load(item_id)
+        return book
+
+    def recover(self, item_ids=None):
+        """
+        Rebuild books from the database, e.g. when a worker starts.
+
+        Args:
+            item_ids (iterable, optional): Items to load. Defaults to all
+                active items that have at least one bid.
+
+        Returns:
+            int: Number of books loaded.
+        """
+        if item_ids is None:
+            item_ids = (
+                Item.objects.filter(status='active', end_time__gt=timezone.now(), bid__isnull=False)
+                .values_list('id', flat=True)
+                .distinct()
+            )
+        with self._books_lock:
+            for item_id in item_ids:
+                self._books[item_id] = self._load(item_id)
+            return len(self._books)
+
+    def evict(self, item_id):
+        """Forget an item, e.g. once its auction has closed."""
+        with self._books_lock:
+            self._books.pop(item_id, None)
+
+    def submit(self, item_id, bidder_id, amount, now=None):
+        """
+        Accept or reject a bid against in-memory state.
+
+        Accepted bids, and any soft-close extension of the item's end
+        time, are queued for the next ``flush()``, which sends
+        ``item_changed`` once they are committed.
+
+        Returns:
+            Decimal: The new current bid.
+
+        Raises:
+            BidRejected: If the bid does not beat the item's current state.
+        """
+        amount = Decimal(amount)
+        now = now or timezone.now()
+        book = self.book_for(item_id)
+        with book.lock:
+            book.check(amount, now)
+            book.current_bid = amount
+            book._remember(amount, bidder_id)
+            end_time = extended_end_time(book.end_time, now)
+            if end_time is not None:
+                book.end_time = end_time
+        with self._pending_lock:
+            self._pending.append(Bid(item_id=item_id, bidder_id=bidder_id, bid_amount=amount, bid_time=now))
+            if end_time is not None:
+                self._extensions[item_id] = end_time
+        return amount
+
+    def pending(self):
+        """Return the number of accepted bids not yet written to the database."""
+        return len(self._pending)
+
+    def flush(self):
+        """
+        Write queued bids to the database in batches.
+
+        Bids are checked against the committed item rows, read with a
+        row lock: bids on an item that is no longer active, or at or
+        below its committed ``current_bid`` (another writer got there
+        first), are dropped, and that item's book is evicted so the next
+        bid reloads it from the database. Each remaining item's
+        ``current_bid`` is raised to its highest flushed bid, and its
+        ``end_time`` to its latest extension, with conditional updates,
+        so a flush never moves either backwards. Bids keep the time they
+        were accepted as ``bid_time``. ``item_changed`` is sent per item
+        once the batch is committed.
+
+        Returns:
+            int: Number of bids written.
+        """
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+            extensions, self._extensions = self._extensions, {}
+        if not batch:
+            return 0
+
+        try:
+            with transaction.atomic():
+                committed = {
+                    item_id: (current_bid, status) for item_id, current_bid, status in
+                    Item.objects.select_for_update().filter(pk__in={bid.item_id for bid in batch})
+                    .values_list('id', 'current_bid', 'status')
+                }
+                accepted = {}
+                for bid in batch:
+                    current_bid, status = committed.get(bid.item_id, (None, None))
+                    if status == 'active' and bid.bid_amount > current_bid:
+                        accepted.setdefault(bid.item_id, []).append(bid)
+                highest = {}
+                for item_id, bids in list(accepted.items()):
+                    amount = max(bid.bid_amount for bid in bids)
+                    if Item.objects.filter(pk=item_id, status='active', current_bid__lt=amount).update(
+                            current_bid=amount):
+                        highest[item_id] = amount
+                    else:
+                        del accepted[item_id]
+                written = [bid for bids in accepted.values() for bid in bids]
+                Bid.objects.bulk_create(written, batch_size=self.batch_size)
+                # bulk_create skips post_save, so count the bids explicitly.
+                record_bids(written)
+                for item_id, end_time in extensions.items():
+                    if item_id in accepted:
+                        Item.objects.filter(pk=item_id, end_time__lt=end_time).update(end_time=end_time)
+
+                def announce():
+                    for item_id, amount in highest.items():
+                        item_changed.send(sender=Item, item_id=item_id, current_bid=amount,
+                                          new_bids=len(accepted[item_id]), end_time=extensions.get(item_id))
+
+                transaction.on_commit(announce)
+        except Exception:
+            with self._pending_lock:
+                self._pending[:0] = batch
+                for item_id, end_time in extensions.items():
+                    self._extensions.setdefault(item_id, end_time)
+            raise
+        if len(written) < len(batch):
+            logger.warning('Order book dropped %d bids overtaken in the database', len(batch) - len(written))
+            for item_id in {bid.item_id for bid in batch} - set(accepted):
+                self.evict(item_id)
+        return len(written)
+
+
+class Flusher(threading.Thread):
+    """
+    Background thread calling ``OrderBook.flush()`` every ``interval`` seconds.
+    """
+
+    def __init__(self, book, interval=0.25):
+        super().__init__(daemon=True, name='orderbook-flusher')
+        self.book = book
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    self.book.flush()
+                except Exception:
+                    logger.exception('Order book flush failed; bids kept for retry')
+        finally:
+            self.book.flush()
+            connection.close()
+
+    def stop(self):
+        """Stop the thread after a final flush."""
+        self._stopped.set()
+        self.join()
+
+
+order_book = OrderBook()
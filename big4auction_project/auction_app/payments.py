@@ -0,0 +1,299 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import stripe
+from django.conf import settings
+
+RETRYABLE_ERRORS = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+
+
+class PaymentError(Exception):
+    """
+    Raised when a payment provider call fails for good.
+
+    Attributes:
+        operation (str): The gateway operation that failed.
+        retryable (bool): Whether the last failure was transient.
+    """
+
+    def __init__(self, operation, message, retryable=False):
+        super().__init__(message)
+        self.operation = operation
+        self.retryable = retryable
+
+
+def is_retryable(error):
+    """Return whether a provider error is worth retrying with the same idempotency key."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    status = getattr(error, 'http_status', None)
+    return status is not None and status >= 500
+
+
+class GatewayMetrics:
+    """
+    Per-operation call counts and a rolling window of latencies.
+
+    Attributes:
+        window (int): Number of latency samples kept per operation.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, operation, elapsed, outcome):
+        """Record one attempt; ``outcome`` is ``ok``, ``retry`` or ``error``."""
+        with self._lock:
+            samples = self._samples.setdefault(operation, deque(maxlen=self.window))
+            samples.append(elapsed)
+            key = (operation, outcome)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def snapshot(self):
+        """
+        Return ``{operation: {...}}`` with counts and p50/p99 latency in milliseconds.
+        """
+        with self._lock:
+            result = {}
+            for operation, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[operation] = {
+                    'ok': self._counts.get((operation, 'ok'), 0),
+                    'retry': self._counts.get((operation, 'retry'), 0),
+                    'error': self._counts.get((operation, 'error'), 0),
+                    'p50_ms': ordered[len(ordered) // 2] * 1e3,
+                    'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e3,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+class StripeBackend:
+    """
+    Stripe API calls over one pooled, keep-alive HTTP session.
+
+    The stock Stripe client opens a session per thread with default pool
+    limits and no timeout short enough for a request path; this backend
+    shares a single ``requests`` session sized for the worker's thread
+    pool and applies ``timeout`` to every call. Stripe's own retries are
+    disabled because ``PaymentGateway`` retries instead.
+
+    Attributes:
+        api_key (str): Stripe secret key.
+        timeout (float): Per-request timeout in seconds.
+        pool_size (int): Maximum keep-alive connections.
+        api_base (str, optional): Override for the Stripe API URL, e.g. a local stub.
+    """
+
+    def __init__(self, api_key, timeout=5, pool_size=20, api_base=None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool_size = pool_size
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.session = session
+        stripe.default_http_client = stripe.RequestsClient(timeout=timeout, session=session)
+        stripe.max_network_retries = 0
+        if api_base:
+            stripe.api_base = api_base
+
+    def create_customer(self, idempotency_key, **params):
+        return stripe.Customer.create(api_key=self.api_key, idempotency_key=idempotency_key, **params)
+
+    def create_setup_intent(self, customer_id, idempotency_key, **params):
+        return stripe.SetupIntent.create(
+            api_key=self.api_key, idempotency_key=idempotency_key, customer=customer_id, **params
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class StubBackend:
+    """
+    In-process stand-in for Stripe used by tests and offline load tests.
+
+    Objects are plain dicts shaped like Stripe's. Repeating a call with
+    the same idempotency key returns the original object, as Stripe does.
+
+    Attributes:
+        latency (float): Seconds each call sleeps, to simulate the network.
+        failures (int): Number of upcoming calls that raise a connection error.
+        calls (list): ``(operation, idempotency_key)`` for every call received.
+    """
+
+    def __init__(self, latency=0.0, failures=0):
+        self.latency = latency
+        self.failures = failures
+        self.calls = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._responses = {}
+
+    def _respond(self, operation, idempotency_key, build):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((operation, idempotency_key))
+            if self.failures:
+                self.failures -= 1
+                raise stripe.APIConnectionError('Stub connection failure.')
+            key = (operation, idempotency_key)
+            if key not in self._responses:
+                self._responses[key] = build(next(self._ids))
+            return self._responses[key]
+
+    def create_customer(self, idempotency_key, **params):
+        return self._respond('create_customer', idempotency_key, lambda n: {
+            'id': f'cus_stub{n}', 'object': 'customer', **params,
+        })
+
+    def create_setup_intent(self, customer_id, idempotency_key, **params):
+        return self._respond('create_setup_intent', idempotency_key, lambda n: {
+            'id': f'seti_stub{n}', 'object': 'setup_intent', 'customer': customer_id,
+            'client_secret': f'seti_stub{n}_secret_stub', 'status': 'requires_payment_method', **params,
+        })
+
+    def close(self):
+        pass
+
+
+class PaymentGateway:
+    """
+    Retrying, instrumented front end over a payment backend.
+
+    Every operation takes an idempotency key, which is reused across
+    retries so a request that reached the provider but timed out on the
+    way back is not applied twice. Transient failures are retried up to
+    ``max_retries`` times with exponential backoff and full jitter. Each
+    attempt is timed into ``metrics``.
+
+    The ``a``-prefixed variants run each blocking attempt on the
+    gateway's own thread pool, sized like the HTTP connection pool, and
+    sleep between retries with ``asyncio.sleep``, so ASGI views never
+    block the event loop and are not limited by the loop's default
+    executor.
+
+    Attributes:
+        backend: ``StripeBackend``, ``StubBackend`` or anything with the same methods.
+        max_retries (int): Retries after the first attempt.
+        backoff (float): Base delay in seconds before the first retry.
+        max_backoff (float): Upper bound on a single delay.
+        metrics (GatewayMetrics): Latency and outcome counters.
+        workers (int): Threads available to the async variants.
+    """
+
+    def __init__(self, backend, max_retries=2, backoff=0.2, max_backoff=2.0, metrics=None, workers=20):
+        self.backend = backend
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics or GatewayMetrics()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='payments')
+
+    def _delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _attempt(self, operation, args, kwargs):
+        """Run one attempt; return ``(result, None)`` or ``(None, error)`` for retryable errors."""
+        start = time.perf_counter()
+        try:
+            result = getattr(self.backend, operation)(*args, **kwargs)
+        except stripe.StripeError as error:
+            retryable = is_retryable(error)
+            self.metrics.record(operation, time.perf_counter() - start, 'retry' if retryable else 'error')
+            if not retryable:
+                raise PaymentError(operation, str(error)) from error
+            return None, error
+        self.metrics.record(operation, time.perf_counter() - start, 'ok')
+        return result, None
+
+    def call(self, operation, *args, **kwargs):
+        """
+        Call ``backend.<operation>`` with retries.
+
+        Raises:
+            PaymentError: If the call fails with a permanent error, or
+                still fails after ``max_retries`` retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            result, error = self._attempt(operation, args, kwargs)
+            if error is None:
+                return result
+            if attempt < self.max_retries:
+                time.sleep(self._delay(attempt))
+        raise PaymentError(operation, str(error), retryable=True) from error
+
+    async def acall(self, operation, *args, **kwargs):
+        """Async version of ``call()``."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            result, error = await loop.run_in_executor(self.executor, self._attempt, operation, args, kwargs)
+            if error is None:
+                return result
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._delay(attempt))
+        raise PaymentError(operation, str(error), retryable=True) from error
+
+    def create_customer(self, idempotency_key, **params):
+        return self.call('create_customer', idempotency_key, **params)
+
+    def create_setup_intent(self, customer_id, idempotency_key, **params):
+        return self.call('create_setup_intent', customer_id, idempotency_key, **params)
+
+    async def acreate_customer(self, idempotency_key, **params):
+        return await self.acall('create_customer', idempotency_key, **params)
+
+    async def acreate_setup_intent(self, customer_id, idempotency_key, **params):
+        return await self.acall('create_setup_intent', customer_id, idempotency_key, **params)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def build_gateway():
+    """Build a gateway from the ``PAYMENTS_*`` and ``STRIPE_*`` settings."""
+    if settings.PAYMENTS_BACKEND == 'stub':
+        backend = StubBackend()
+    else:
+        backend = StripeBackend(
+            api_key=settings.STRIPE_SECRET_KEY,
+            timeout=settings.PAYMENTS_TIMEOUT,
+            pool_size=settings.PAYMENTS_POOL_SIZE,
+            api_base=settings.STRIPE_API_BASE,
+        )
+    return PaymentGateway(
+        backend, max_retries=settings.PAYMENTS_MAX_RETRIES, workers=settings.PAYMENTS_POOL_SIZE
+    )
+
+
+def get_gateway():
+    """Return the process-wide gateway, building it on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = build_gateway()
+    return _gateway
+
+
+def set_gateway(gateway):
+    """Replace the process-wide gateway (used by tests and benchmarks)."""
+    global _gateway
+    _gateway = gateway
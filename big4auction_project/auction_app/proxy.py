@@ -0,0 +1,267 @@
+"""
+Proxy bidding: bidders state a maximum and the site bids for them.
+
+Each item's competing maximums are kept in a ``ProxyLadder``. An
+incoming maximum is resolved against it in one step, eBay-style: the
+highest maximum leads at one increment above the runner-up, and only the
+visible bids that result are written, instead of the stream of small
+manual bids users place by hand near the close.
+"""
+import heapq
+import threading
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .bidding import BidRejected, _rejection_for, extended_end_time
+from .models import Item, Bid, ProxyBid
+from .signals import item_changed
+
+# (bound, increment): prices below ``bound`` rise by ``increment``.
+BID_INCREMENTS = (
+    (Decimal('1.00'), Decimal('0.05')),
+    (Decimal('5.00'), Decimal('0.25')),
+    (Decimal('25.00'), Decimal('0.50')),
+    (Decimal('100.00'), Decimal('1.00')),
+    (Decimal('250.00'), Decimal('2.50')),
+    (Decimal('500.00'), Decimal('5.00')),
+    (Decimal('1000.00'), Decimal('10.00')),
+    (Decimal('2500.00'), Decimal('25.00')),
+    (Decimal('5000.00'), Decimal('50.00')),
+)
+TOP_INCREMENT = Decimal('100.00')
+_BOUNDS = [bound for bound, _ in BID_INCREMENTS]
+
+
+def increment_for(price):
+    """Return the bid increment that applies at ``price``."""
+    index = bisect_right(_BOUNDS, price)
+    return BID_INCREMENTS[index][1] if index < len(BID_INCREMENTS) else TOP_INCREMENT
+
+
+class ProxyLadder:
+    """
+    The competing maximum bids on one item.
+
+    Maximums are kept in a heap, highest first and earliest first among
+    equals, so the earlier of two equal maximums wins. Raising a maximum
+    pushes a new entry and the superseded one is dropped when it reaches
+    the top or the heap is compacted, so resolving a bid is O(log n) in
+    the number of bidders.
+
+    Attributes:
+        floor (Decimal): Price of the first bid.
+        price (Decimal): Current visible price, or ``None`` before the first bid.
+        leader_id (int): Bidder holding the visible high bid, or ``None``.
+    """
+
+    def __init__(self, floor, price=None, leader_id=None):
+        self.floor = floor
+        self.price = price
+        self.leader_id = leader_id
+        self._heap = []
+        self._maximums = {}
+
+    def add(self, bidder_id, max_amount, seq):
+        """Record ``bidder_id``'s maximum, placed at ``seq``, without bidding."""
+        self._maximums[bidder_id] = (max_amount, seq)
+        heapq.heappush(self._heap, (-max_amount, seq, bidder_id))
+        if len(self._heap) > 2 * len(self._maximums) + 16:
+            # Superseded entries below the top are only dropped here; the
+            # rebuild is O(n) once per n pushes, so pushes stay O(log n).
+            self._heap = [(-amount, seq, bidder_id) for bidder_id, (amount, seq) in self._maximums.items()]
+            heapq.heapify(self._heap)
+
+    def maximum(self, bidder_id):
+        """Return ``bidder_id``'s maximum, or ``None``."""
+        return self._maximums.get(bidder_id, (None, None))[0]
+
+    def _drop_superseded(self):
+        while self._heap:
+            amount, seq, bidder_id = self._heap[0]
+            if self._maximums[bidder_id] == (-amount, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def top_two(self):
+        """Return the ``(max_amount, bidder_id)`` of the leading two bidders; either may be ``None``."""
+        self._drop_superseded()
+        if not self._heap:
+            return None, None
+        first = heapq.heappop(self._heap)
+        self._drop_superseded()
+        second = self._heap[0] if self._heap else None
+        heapq.heappush(self._heap, first)
+        return (-first[0], first[2]), second and (-second[0], second[2])
+
+    def minimum_bid(self):
+        """Return the lowest maximum a new bidder may enter."""
+        if self.price is None:
+            return self.floor
+        return self.price + increment_for(self.price)
+
+    def bid(self, bidder_id, max_amount, seq, exact=False):
+        """
+        Resolve a new maximum from ``bidder_id`` against the others.
+
+        The leader may raise their own maximum without moving the price.
+        Anyone else must enter at least ``minimum_bid()``; the highest
+        maximum then leads at one increment above the runner-up's
+        maximum, capped at its own.
+
+        Args:
+            bidder_id (int): Bidder entering the maximum.
+            max_amount (Decimal): The new maximum.
+            seq (int): Increasing sequence number; breaks ties between equal maximums.
+            exact (bool): The amount is a manual bid: if it takes the lead,
+                the price is ``max_amount`` rather than the lowest winning price.
+
+        Returns:
+            list: The visible ``(bidder_id, amount)`` bids that result, in
+            increasing order. The last one is the new price.
+
+        Raises:
+            BidRejected: If the maximum is too low.
+        """
+        if bidder_id == self.leader_id:
+            if max_amount <= self.maximum(bidder_id):
+                raise BidRejected('below_maximum', 'A new maximum bid must be higher than your current one.')
+            self.add(bidder_id, max_amount, seq)
+            return []
+        minimum = self.minimum_bid()
+        if max_amount < minimum:
+            raise BidRejected('outbid', f'Bid must be at least {minimum}.')
+
+        previous = self.price
+        self.add(bidder_id, max_amount, seq)
+        (top, winner_id), runner = self.top_two()
+        if runner is None:
+            price = self.floor
+        else:
+            price = min(top, runner[0] + increment_for(runner[0]))
+
+        bids = []
+        if winner_id == bidder_id:
+            if exact:
+                price = max_amount
+            # The outbid runner-up's bid rises to their maximum first.
+            if runner is not None and (previous is None or runner[0] > previous):
+                bids.append((runner[1], runner[0]))
+        elif max_amount < price:
+            bids.append((bidder_id, max_amount))
+        bids.append((winner_id, price))
+        self.price, self.leader_id = price, winner_id
+        return bids
+
+
+class ProxyEngine:
+    """
+    Place proxy bids against cached ladders backed by ``ProxyBid`` rows.
+
+    Ladders are built from the database the first time an item is bid on
+    and kept between bids. Every bid locks the item row, and a ladder is
+    rebuilt whenever the item's current bid or latest ``ProxyBid`` is not
+    the one it last saw, so other processes and manual bids through
+    ``bidding.place_bid`` are picked up.
+    """
+
+    def __init__(self):
+        self._ladders = {}
+        self._lock = threading.Lock()
+
+    def _load(self, item):
+        ladder = ProxyLadder(max(item.starting_bid, item.current_bid))
+        leader_id = (
+            Bid.objects.filter(item_id=item.id).order_by('-bid_amount', 'bid_time')
+            .values_list('bidder_id', flat=True).first()
+        )
+        if leader_id is not None:
+            ladder.price, ladder.leader_id = item.current_bid, leader_id
+            # A leader who bid by hand defends only their visible bid.
+            ladder.add(leader_id, item.current_bid, 0)
+        maximums = ProxyBid.objects.filter(item_id=item.id).order_by('id').values_list('id', 'bidder_id', 'max_amount')
+        for seq, bidder_id, max_amount in maximums:
+            if max_amount > (ladder.maximum(bidder_id) or 0):
+                ladder.add(bidder_id, max_amount, seq)
+        return ladder
+
+    def has_proxies(self, item_id):
+        """Return whether anyone has entered a maximum bid on ``item_id``."""
+        return ProxyBid.objects.filter(item_id=item_id).exists()
+
+    def evict(self, item_id):
+        """Forget an item's ladder, e.g. once its auction has closed."""
+        with self._lock:
+            self._ladders.pop(item_id, None)
+
+    def place(self, item_id, bidder, max_amount, now=None, exact=False):
+        """
+        Enter ``bidder``'s maximum on an item and place the resulting bids.
+
+        The maximum is recorded, resolved against the item's ladder, and
+        the visible bids, the item's ``current_bid`` and any soft-close
+        extension of its ``end_time`` are written in the same transaction.
+        ``item_changed`` is sent once it commits.
+
+        Args:
+            item_id (int): Primary key of the item being bid on.
+            bidder (User): User entering the maximum.
+            max_amount (Decimal): Most the user will pay.
+            now (datetime, optional): Time of the bid. Defaults to now.
+            exact (bool): Bid ``max_amount`` itself if it takes the lead,
+                as a manual bid does.
+
+        Returns:
+            tuple: ``(bids, leader_id, current_bid)`` with the new ``Bid``
+            rows, the leading bidder's id and the item's current bid.
+
+        Raises:
+            BidRejected: If the item is missing or not open for bidding,
+                or the maximum is too low.
+        """
+        max_amount = Decimal(max_amount)
+        now = now or timezone.now()
+        try:
+            with transaction.atomic():
+                item = Item.objects.select_for_update().filter(pk=item_id).first()
+                if item is None or item.status != 'active' or not item.start_time <= now < item.end_time:
+                    raise _rejection_for(item, max_amount, now)
+                version = (
+                    ProxyBid.objects.filter(item_id=item_id).order_by('-id').values_list('id', flat=True).first()
+                )
+                with self._lock:
+                    cached = self._ladders.get(item_id)
+                if cached is not None and cached[1:] == (version, item.current_bid):
+                    ladder = cached[0]
+                else:
+                    ladder = self._load(item)
+
+                proxy = ProxyBid.objects.create(item_id=item_id, bidder=bidder, max_amount=max_amount)
+                placed = ladder.bid(bidder.id, max_amount, proxy.pk, exact)
+                bids = [Bid.objects.create(item_id=item_id, bidder_id=bidder_id, bid_amount=amount)
+                        for bidder_id, amount in placed]
+                current_bid = item.current_bid
+                if bids:
+                    current_bid = ladder.price
+                    end_time = extended_end_time(item.end_time, now)
+                    changes = {'current_bid': current_bid}
+                    if end_time is not None:
+                        changes['end_time'] = end_time
+                    Item.objects.filter(pk=item_id).update(**changes)
+                    transaction.on_commit(lambda: item_changed.send(
+                        sender=Item, item_id=item_id, current_bid=current_bid, new_bids=len(bids), end_time=end_time,
+                    ))
+        except BidRejected:
+            raise
+        except Exception:
+            # The ladder may hold the rolled-back maximum.
+            self.evict(item_id)
+            raise
+        with self._lock:
+            self._ladders[item_id] = (ladder, proxy.pk, current_bid)
+        return bids, ladder.leader_id, current_bid
+
+
+proxy_engine = ProxyEngine()
@@ -0,0 +1,206 @@
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+``RateLimitMiddleware`` looks up the resolved URL name in
+``settings.RATE_LIMITS`` and charges the request to a bucket keyed by the
+client's IP or user. A client whose bucket is empty gets a 429 with a
+``Retry-After`` header before the view runs, so a flood of logins does
+not reach the password hasher and a flood of setup intents does not reach
+Stripe.
+
+Buckets use the generic cell rate algorithm: a bucket is a single number,
+the time at which it will next be full ("theoretical arrival time"). A
+request is let through while that time is less than a burst's worth of
+refills ahead of now, and pushes it one refill further. Keeping one number
+instead of a token count and a timestamp lets the cache backend advance a
+bucket with a single ``incr``.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+KEY_FUNCTIONS = ('ip', 'user')
+
+
+def parse_rate(rate):
+    """
+    Parse a rate such as ``'10/m'`` or ``'100/5m'``.
+
+    Returns:
+        tuple: ``(count, seconds)``.
+
+    Raises:
+        ValueError: If the rate is malformed.
+    """
+    count, _, period = rate.partition('/')
+    multiplier, unit = period[:-1] or '1', period[-1:]
+    if unit not in RATE_PERIODS or not count.isdigit() or not multiplier.isdigit() or int(count) < 1:
+        raise ValueError(f'Invalid rate {rate!r}; expected e.g. "10/m".')
+    return int(count), int(multiplier) * RATE_PERIODS[unit]
+
+
+class Policy:
+    """
+    The limit on one route.
+
+    Attributes:
+        name (str): URL name the policy applies to; also the bucket namespace.
+        interval (float): Seconds for the bucket to regain one request.
+        burst (int): Requests a full bucket allows at once.
+        key (str): ``'ip'`` for one bucket per client address, or ``'user'``
+            for one per signed-in user (anonymous clients fall back to their IP).
+        methods (tuple): HTTP methods that are charged; others pass freely.
+    """
+
+    def __init__(self, name, rate, burst=None, key='ip', methods=('POST',)):
+        if key not in KEY_FUNCTIONS:
+            raise ValueError(f'Invalid rate limit key {key!r}; expected one of {KEY_FUNCTIONS}.')
+        count, seconds = parse_rate(rate)
+        self.name = name
+        self.interval = seconds / count
+        self.burst = burst or count
+        self.key = key
+        self.methods = tuple(method.upper() for method in methods)
+        # How far ahead of now a bucket may be and still admit a request.
+        self.tolerance = (self.burst - 1) * self.interval
+
+    def bucket_key(self, request):
+        """Return the cache key of the bucket ``request`` is charged to."""
+        user = getattr(request, 'user', None)
+        if self.key == 'user' and user is not None and user.is_authenticated:
+            return f'ratelimit:{self.name}:user:{user.pk}'
+        return f'ratelimit:{self.name}:ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+class LocalBackend:
+    """
+    Buckets in this process's memory.
+
+    Costs no cache round trip, but each worker process enforces the limit
+    on its own, so the effective limit is multiplied by the worker count.
+    Full buckets are forgotten once more than ``max_keys`` are held.
+    """
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, policy, now):
+        """
+        Charge one request to ``key``.
+
+        Returns:
+            float: 0 if the request is allowed, else seconds until it would be.
+        """
+        with self._lock:
+            full_at = max(self._buckets.get(key, now), now)
+            if full_at - now > policy.tolerance:
+                return full_at - now - policy.tolerance
+            self._buckets[key] = full_at + policy.interval
+            if len(self._buckets) > self.max_keys:
+                self._buckets = {key: value for key, value in self._buckets.items() if value > now}
+            return 0.0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBackend:
+    """
+    Buckets in a Django cache shared by every process.
+
+    A bucket is stored as its full-at time in milliseconds and advanced
+    with one ``incr``, which is the only cache operation while a client
+    keeps sending requests. A new bucket, or one that has refilled since
+    the client's last request, is restarted with one ``set`` instead.
+
+    Requests are charged before the limit is checked, so rejected ones
+    count too: refunding them would cost a second operation on exactly the
+    requests an abusive client sends. The penalty is capped because a
+    bucket's key expires one full refill after it was started.
+
+    The cache must be big enough to hold every active bucket: an evicted
+    bucket starts full again. Django's default local-memory cache keeps
+    only 300 entries.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def hit(self, key, policy, now):
+        """
+        Charge one request to ``key``.
+
+        Returns:
+            float: 0 if the request is allowed, else seconds until it would be.
+        """
+        cache = caches[self.alias]
+        interval = round(policy.interval * 1000)
+        now_ms = int(now * 1000)
+        timeout = max(1, math.ceil(policy.burst * policy.interval))
+        try:
+            full_at = cache.incr(key, interval) - interval
+        except ValueError:
+            full_at = None
+        if full_at is None or full_at < now_ms:
+            cache.set(key, now_ms + interval, timeout)
+            return 0.0
+        wait = (full_at - now_ms) / 1000 - policy.tolerance
+        return min(wait, timeout) if wait > 0 else 0.0
+
+
+_local_backend = LocalBackend()
+_policies = (None, {})
+
+
+def get_backend():
+    """Return the backend named by ``settings.RATE_LIMIT_BACKEND``."""
+    name = getattr(settings, 'RATE_LIMIT_BACKEND', 'cache')
+    if name == 'local':
+        return _local_backend
+    return CacheBackend(getattr(settings, 'RATE_LIMIT_CACHE', 'default'))
+
+
+def get_policies():
+    """Return the ``Policy`` for each URL name in ``settings.RATE_LIMITS``."""
+    global _policies
+    source = getattr(settings, 'RATE_LIMITS', {})
+    if _policies[0] is not source:
+        _policies = (source, {name: Policy(name, **options) for name, options in source.items()})
+    return _policies[1]
+
+
+def too_many_requests(wait):
+    """Return the 429 response for a client that must wait ``wait`` seconds."""
+    response = JsonResponse(
+        {'error': 'rate_limited', 'message': 'Too many requests, please retry later.'}, status=429,
+    )
+    response['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Reject requests to rate-limited routes once their client's bucket is empty.
+
+    Being both sync- and async-capable keeps ASGI's async views, such as
+    the inbox long poll, from being moved onto a thread of their own.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        policy = get_policies().get(match.url_name) if match is not None else None
+        if policy is None or request.method not in policy.methods:
+            return None
+        wait = get_backend().hit(policy.bucket_key(request), policy, time.time())
+        if wait:
+            return too_many_requests(wait)
+        return None
@@ -0,0 +1,245 @@
+"""
+Read-replica routing for browse, search and analytics traffic.
+
+Views wrapped in ``replica_reads`` (listings, item pages, search, the
+inbox history, analytics) send their reads to ``REPLICA_DATABASE``;
+everything else, and every write, uses the primary. Two rules keep a
+lagging replica from showing users stale data:
+
+* read-your-writes: once a request writes, it reads the primary for the
+  rest of the request, and ``ReplicaRoutingMiddleware`` sets a cookie
+  that keeps the user on the primary for ``REPLICA_PIN_SECONDS``;
+* bid freshness: every ``item_changed`` signal records the committed
+  ``current_bid``, ``status`` and ``end_time`` in the cache for
+  ``REPLICA_MAX_LAG`` seconds. ``refresh_stale()`` and ``lagging()``
+  compare replica rows against them, and code that caches what it read
+  re-reads from the primary any item the replica has not caught up on.
+
+Without a replica configured none of this costs anything: the router
+returns the primary and the middleware sets no cookie.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import receiver
+
+from .signals import item_changed
+
+PRIMARY = 'default'
+PIN_COOKIE = 'primary_until'
+BID_FIELDS = ('current_bid', 'status', 'end_time')
+# Kept on the primary and left out of pinning: sessions are cached, a
+# lagging replica would log users out, and nearly any request may refresh one.
+PRIMARY_MODELS = {'sessions.session'}
+
+
+class RoutingState:
+    """
+    Routing decisions for the request being served.
+
+    Attributes:
+        use_replica (bool): Set by ``replica_reads``; reads may go to the replica.
+        pinned (bool): The user wrote within ``REPLICA_PIN_SECONDS``.
+        wrote (bool): This request has written to the primary.
+    """
+    __slots__ = ('use_replica', 'pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.use_replica = False
+        self.pinned = pinned
+        self.wrote = False
+
+    @property
+    def on_primary(self):
+        return self.pinned or self.wrote
+
+
+# Holds a mutable state, so writes made in sync_to_async threads are seen by the middleware.
+_state = ContextVar('auction_app.routers.state', default=None)
+
+
+def replica_alias():
+    """Return the replica's database alias, or ``None`` when there is none."""
+    return getattr(settings, 'REPLICA_DATABASE', None)
+
+
+def read_alias():
+    """
+    Return the database for reads that are known to be read-only.
+
+    Used for querysets evaluated after the view returns, such as
+    streamed exports, and outside requests: the replica, unless the
+    current request wrote or its user is pinned to the primary.
+    """
+    alias = replica_alias()
+    state = _state.get()
+    if alias is None or (state is not None and state.on_primary):
+        return PRIMARY
+    return alias
+
+
+class ReplicaRouter:
+    """Send reads of ``replica_reads`` views to the replica and all writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.on_primary:
+            return None
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return PRIMARY
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.label_lower not in PRIMARY_MODELS:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Track writes per request and pin users who wrote to the primary.
+
+    Must come before any middleware that writes on the user's behalf,
+    e.g. ``AuthenticationMiddleware`` updating ``last_login``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if replica_alias() is None:
+            return self.get_response(request)
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        if replica_alias() is None:
+            return await self.get_response(request)
+        state = self.start(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        try:
+            until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            until = 0
+        now = time.time()
+        # A forged far-future cookie only pins its own sender, and not for long.
+        return RoutingState(pinned=now < until <= now + getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+    def finish(self, state, response):
+        if state.wrote:
+            seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + seconds:.3f}', max_age=seconds,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def replica_reads(view):
+    """
+    Mark a view as read-only, so its queries may be served by the replica.
+
+    Users who wrote within ``REPLICA_PIN_SECONDS`` still read the primary.
+    """
+    def mark():
+        state = _state.get()
+        if state is not None:
+            state.use_replica = True
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            mark()
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            mark()
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+def _committed_key(item_id, field):
+    return f'replica:item:{item_id}:{field}'
+
+
+def lagging(rows):
+    """
+    Return the ids of items whose replica copy is behind the last committed bid state.
+
+    Args:
+        rows (dict): Item id to the model instance or ``values()`` dict read from the replica.
+
+    Returns:
+        set: Ids whose ``BID_FIELDS`` differ from the values committed in the last ``REPLICA_MAX_LAG`` seconds.
+    """
+    keys = {_committed_key(item_id, field): (item_id, field) for item_id in rows for field in BID_FIELDS}
+    stale = set()
+    for key, value in cache.get_many(keys).items():
+        item_id, field = keys[key]
+        row = rows[item_id]
+        current = row[field] if isinstance(row, dict) else getattr(row, field)
+        if current != value:
+            stale.add(item_id)
+    return stale
+
+
+def refresh_stale(items, queryset):
+    """
+    Replace items read from a lagging replica with their primary copies.
+
+    Args:
+        items (list): Items read through ``queryset``.
+        queryset (QuerySet): The unsliced query they came from; it is
+            re-run on the primary for the stale ids, so an item that no
+            longer matches it (e.g. was sold off an active listing) is dropped.
+
+    Returns:
+        list: ``items`` in order, with stale ones refreshed or dropped.
+    """
+    if not items or queryset.db == PRIMARY:
+        return items
+    stale = lagging({item.pk: item for item in items})
+    if not stale:
+        return items
+    fresh = queryset.using(PRIMARY).in_bulk(stale)
+    return [fresh.get(item.pk) if item.pk in stale else item for item in items
+            if item.pk not in stale or item.pk in fresh]
+
+
+@receiver(item_changed)
+def record_committed(sender, item_id, **kwargs):
+    if replica_alias() is None:
+        return
+    # None means unchanged, e.g. ``end_time`` for a bid that did not extend the auction.
+    values = {_committed_key(item_id, field): kwargs[field] for field in BID_FIELDS if kwargs.get(field) is not None}
+    if values:
+        cache.set_many(values, getattr(settings, 'REPLICA_MAX_LAG', 30))
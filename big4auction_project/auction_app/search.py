@@ -0,0 +1,670 @@
+import bisect
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Item, Category
+from .signals import item_changed
+
+FIELD_WEIGHTS = {'title': 3.0, 'category': 2.0, 'description': 1.0}
+STATUS_CODES = {status: code for code, (status, _) in enumerate(Item.STATUS_CHOICES)}
+STATUS_NAMES = {code: status for status, code in STATUS_CODES.items()}
+STOP_WORDS = frozenset('a an and are as at be by for from in is it of on or the to with'.split())
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+SUFFIXES = ('ational', 'ization', 'iveness', 'fulness', 'ousness', 'ations', 'ation', 'ness',
+            'ment', 'ings', 'able', 'ible', 'ing', 'ies', 'ied', 'est', 'ers', 'ed', 'er', 'ly')
+MAX_PREFIX_EXPANSION = 50
+K1 = 1.2
+B = 0.75
+
+MAGIC = b'B4SIDX01'
+HEADER = struct.Struct('<8sQQQQQQQQQQQ')
+
+
+def stem(token):
+    """
+    Strip a common English suffix from ``token``.
+
+    This is a deliberately small suffix stripper rather than a full
+    Porter stemmer: it folds plurals and the usual verb/adjective endings
+    so that "bidding", "bids" and "bid" land on the same term.
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith('es') and token[:-2].endswith(('s', 'x', 'z', 'ch', 'sh')):
+        token = token[:-2]
+    elif token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        token = token[:-1]
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                token += 'y'
+            break
+    if len(token) > 3 and token[-1] == token[-2] and token[-1] not in 'aeiouls':
+        token = token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Split ``text`` into stemmed terms, dropping stop words."""
+    return [stem(token) for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _price_cents(amount):
+    return int(Decimal(amount) * 100)
+
+
+def _document(item, category_name=None):
+    """Return ``(weights, attrs)`` for an item: term weights and filter attributes."""
+    weights = defaultdict(float)
+    if category_name is None:
+        category_name = item.category.category_name
+    fields = {'title': item.title, 'category': category_name, 'description': item.description}
+    length = 0
+    for field, text in fields.items():
+        terms = tokenize(text)
+        length += len(terms)
+        for term in terms:
+            weights[term] += FIELD_WEIGHTS[field]
+    attrs = (item.category_id, STATUS_CODES[item.status], _price_cents(item.current_bid), max(length, 1))
+    return dict(weights), attrs
+
+
+class _Array:
+    """Read-only typed view over a slice of a memory-mapped file."""
+
+    def __init__(self, buffer, offset, count, fmt):
+        size = struct.calcsize(fmt)
+        self.view = memoryview(buffer)[offset:offset + count * size].cast(fmt)
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, index):
+        return self.view[index]
+
+
+class _Terms:
+    """Sorted term dictionary stored as offsets into a UTF-8 blob."""
+
+    def __init__(self, buffer, offsets, blob_offset):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.blob_offset = blob_offset
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start = self.blob_offset + self.offsets[index]
+        end = self.blob_offset + self.offsets[index + 1]
+        return self.buffer[start:end].decode()
+
+
+class Segment:
+    """
+    Immutable on-disk index segment, read through ``mmap``.
+
+    Layout (little-endian), each section 8-byte aligned::
+
+        header
+        doc ids          uint64[n_docs]        sorted
+        doc categories   uint64[n_docs]
+        doc prices       int64[n_docs]         cents
+        doc lengths      uint32[n_docs]
+        doc statuses     uint8[n_docs]
+        term offsets     uint64[n_terms + 1]   into the term blob
+        posting offsets  uint64[n_terms + 1]   into the posting arrays
+        term blob        utf-8, terms sorted
+        posting doc ids  uint64[n_postings]
+        posting weights  float32[n_postings]   field-weighted term frequency
+        posting impacts  float32[n_postings]   BM25 term score without idf
+
+    Opening a segment only reads the header; everything else is paged in
+    by the OS on demand, so worker startup does not rebuild anything.
+    Impacts are computed when the segment is written, so queries never
+    need a document's length.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = self._mmap
+        (magic, n_docs, n_terms, n_postings, total_length,
+         docs_at, categories_at, prices_at, lengths_at, statuses_at,
+         terms_at, postings_at) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a search index segment.')
+        self.n_docs = n_docs
+        self.total_length = total_length
+        self.doc_ids = _Array(buffer, docs_at, n_docs, 'Q')
+        self.categories = _Array(buffer, categories_at, n_docs, 'Q')
+        self.prices = _Array(buffer, prices_at, n_docs, 'q')
+        self.lengths = _Array(buffer, lengths_at, n_docs, 'I')
+        self.statuses = _Array(buffer, statuses_at, n_docs, 'B')
+        term_offsets = _Array(buffer, terms_at, n_terms + 1, 'Q')
+        self.posting_offsets = _Array(buffer, terms_at + (n_terms + 1) * 8, n_terms + 1, 'Q')
+        blob_at = terms_at + 2 * (n_terms + 1) * 8
+        self.terms = _Terms(buffer, term_offsets, blob_at)
+        self.posting_docs = _Array(buffer, postings_at, n_postings, 'Q')
+        weights_at = postings_at + n_postings * 8
+        self.posting_weights = _Array(buffer, weights_at, n_postings, 'f')
+        self.posting_impacts = _Array(buffer, weights_at + n_postings * 4, n_postings, 'f')
+
+    def close(self):
+        for array in (self.doc_ids, self.categories, self.prices, self.lengths, self.statuses,
+                      self.terms.offsets, self.posting_offsets, self.posting_docs, self.posting_weights,
+                      self.posting_impacts):
+            array.view.release()
+        self._mmap.close()
+
+    def term_index(self, term):
+        index = bisect.bisect_left(self.terms, term)
+        if index < len(self.terms) and self.terms[index] == term:
+            return index
+        return None
+
+    def terms_with_prefix(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        for index in range(start, len(self.terms)):
+            term = self.terms[index]
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def posting_range(self, term):
+        """Return the ``(start, end)`` posting positions of ``term``, or ``None``."""
+        index = self.term_index(term)
+        if index is None:
+            return None
+        return self.posting_offsets[index], self.posting_offsets[index + 1]
+
+    def iter_postings(self):
+        """Yield ``(term, doc_ids, weights)`` for every term, in term order."""
+        for index in range(len(self.terms)):
+            start, end = self.posting_offsets[index], self.posting_offsets[index + 1]
+            yield (self.terms[index], self.posting_docs.view[start:end].tolist(),
+                   self.posting_weights.view[start:end].tolist())
+
+    def attrs(self, doc_id):
+        index = bisect.bisect_left(self.doc_ids.view, doc_id)
+        if index < self.n_docs and self.doc_ids[index] == doc_id:
+            return self.categories[index], self.statuses[index], self.prices[index], self.lengths[index]
+        return None
+
+    def iter_docs(self):
+        for index in range(self.n_docs):
+            yield self.doc_ids[index], (
+                self.categories[index], self.statuses[index], self.prices[index], self.lengths[index])
+
+
+def bm25_impact(weight, length, avg_length):
+    """Return the BM25 contribution of a term to a document, before idf."""
+    return weight * (K1 + 1) / (weight + K1 * (1 - B + B * length / avg_length))
+
+
+def write_segment(path, docs, postings):
+    """
+    Write a segment atomically.
+
+    Args:
+        path (str): Destination file.
+        docs (dict): ``{doc_id: (category_id, status_code, price_cents, length)}``.
+        postings (dict): ``{term: {doc_id: weight}}``.
+    """
+    doc_ids = sorted(docs)
+    terms = sorted(term for term, entries in postings.items() if entries)
+    blobs = [term.encode() for term in terms]
+
+    def pad(size):
+        return (size + 7) & ~7
+
+    n_docs, n_terms = len(doc_ids), len(terms)
+    n_postings = sum(len(postings[term]) for term in terms)
+    docs_at = pad(HEADER.size)
+    categories_at = docs_at + n_docs * 8
+    prices_at = categories_at + n_docs * 8
+    lengths_at = prices_at + n_docs * 8
+    statuses_at = lengths_at + n_docs * 4
+    terms_at = pad(statuses_at + n_docs)
+    blob_size = sum(len(blob) for blob in blobs)
+    postings_at = pad(terms_at + 2 * (n_terms + 1) * 8 + blob_size)
+    total_length = sum(attrs[3] for attrs in docs.values())
+    avg_length = total_length / max(n_docs, 1)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, n_docs, n_terms, n_postings, total_length,
+                            docs_at, categories_at, prices_at, lengths_at, statuses_at,
+                            terms_at, postings_at))
+        f.write(b'\0' * (docs_at - HEADER.size))
+        f.write(struct.pack(f'<{n_docs}Q', *doc_ids))
+        f.write(struct.pack(f'<{n_docs}Q', *(docs[d][0] for d in doc_ids)))
+        f.write(struct.pack(f'<{n_docs}q', *(docs[d][2] for d in doc_ids)))
+        f.write(struct.pack(f'<{n_docs}I', *(docs[d][3] for d in doc_ids)))
+        f.write(struct.pack(f'<{n_docs}B', *(docs[d][1] for d in doc_ids)))
+        f.write(b'\0' * (terms_at - statuses_at - n_docs))
+
+        term_offsets, posting_offsets = [0], [0]
+        for term, blob in zip(terms, blobs):
+            term_offsets.append(term_offsets[-1] + len(blob))
+            posting_offsets.append(posting_offsets[-1] + len(postings[term]))
+        f.write(struct.pack(f'<{n_terms + 1}Q', *term_offsets))
+        f.write(struct.pack(f'<{n_terms + 1}Q', *posting_offsets))
+        f.write(b''.join(blobs))
+        f.write(b'\0' * (postings_at - terms_at - 2 * (n_terms + 1) * 8 - blob_size))
+
+        for term in terms:
+            entries = postings[term]
+            f.write(struct.pack(f'<{len(entries)}Q', *sorted(entries)))
+        for term in terms:
+            entries = postings[term]
+            f.write(struct.pack(f'<{len(entries)}f', *(entries[d] for d in sorted(entries))))
+        for term in terms:
+            entries = postings[term]
+            f.write(struct.pack(f'<{len(entries)}f', *(
+                bm25_impact(entries[d], docs[d][3], avg_length) for d in sorted(entries))))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SearchIndex:
+    """
+    Inverted index over item titles, descriptions and category names.
+
+    The index is an immutable memory-mapped ``Segment`` plus an
+    in-memory delta. Saves and deletes go to the delta (and hide the
+    document's segment copy), bid and status changes only touch the
+    delta's attribute overrides, and ``save()`` merges both into a new
+    segment.
+
+    Queries use AND semantics over stemmed terms, treat the last term as
+    a prefix, rank with BM25 and apply category/status/price filters
+    before ranking.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.segment = Segment(path) if path and os.path.exists(path) else None
+        self._postings = defaultdict(dict)
+        self._doc_terms = {}
+        self._docs = {}
+        self._overrides = {}
+        self._hidden = set()
+        self._sorted_terms = None
+        self._lock = threading.RLock()
+        self._mtime = os.path.getmtime(path) if self.segment else None
+
+    # Writes
+
+    def add(self, doc_id, weights, attrs):
+        """Add or replace a document given its term weights and filter attributes."""
+        with self._lock:
+            self._remove_from_delta(doc_id)
+            if self.segment is not None and self.segment.attrs(doc_id) is not None:
+                self._hidden.add(doc_id)
+            for term, weight in weights.items():
+                if term not in self._postings:
+                    self._sorted_terms = None
+                self._postings[term][doc_id] = weight
+            self._doc_terms[doc_id] = list(weights)
+            self._docs[doc_id] = attrs
+            self._overrides.pop(doc_id, None)
+
+    def add_item(self, item, category_name=None):
+        """Index or re-index an ``Item``."""
+        self.add(item.id, *_document(item, category_name))
+
+    def remove(self, doc_id):
+        """Remove a document."""
+        with self._lock:
+            self._remove_from_delta(doc_id)
+            self._overrides.pop(doc_id, None)
+            if self.segment is not None and self.segment.attrs(doc_id) is not None:
+                self._hidden.add(doc_id)
+
+    def update_attrs(self, doc_id, status=None, price=None):
+        """Update a document's status or current price without re-tokenizing it."""
+        with self._lock:
+            attrs = self._attrs(doc_id)
+            if attrs is None:
+                return
+            category_id, status_code, price_cents, length = attrs
+            if status is not None:
+                status_code = STATUS_CODES[status]
+            if price is not None:
+                price_cents = max(price_cents, _price_cents(price))
+            attrs = (category_id, status_code, price_cents, length)
+            if doc_id in self._docs:
+                self._docs[doc_id] = attrs
+            else:
+                self._overrides[doc_id] = attrs
+
+    def _remove_from_delta(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            entries = self._postings[term]
+            entries.pop(doc_id, None)
+            if not entries:
+                del self._postings[term]
+                self._sorted_terms = None
+        self._docs.pop(doc_id, None)
+
+    def absorb(self, other):
+        """
+        Apply the unsaved changes of ``other`` on top of this index.
+
+        Used when a newer segment replaces ``other``'s: documents added or
+        removed since ``other`` was saved, and its bid and status updates,
+        are replayed here so they are not lost until the next rebuild.
+        """
+        with other._lock:
+            added = {
+                doc_id: ({term: other._postings[term][doc_id] for term in other._doc_terms[doc_id]}, attrs)
+                for doc_id, attrs in other._docs.items()
+            }
+            removed = other._hidden - set(other._docs)
+            overrides = dict(other._overrides)
+        with self._lock:
+            for doc_id in removed:
+                self.remove(doc_id)
+            for doc_id, (weights, attrs) in added.items():
+                self.add(doc_id, weights, attrs)
+            for doc_id, (_, status_code, price_cents, _) in overrides.items():
+                self.update_attrs(doc_id, status=STATUS_NAMES[status_code], price=Decimal(price_cents) / 100)
+
+    # Reads
+
+    def _attrs(self, doc_id):
+        if doc_id in self._docs:
+            return self._docs[doc_id]
+        if doc_id in self._hidden or self.segment is None:
+            return None
+        return self._overrides.get(doc_id) or self.segment.attrs(doc_id)
+
+    def __len__(self):
+        base = self.segment.n_docs - len(self._hidden) if self.segment else 0
+        return base + len(self._docs)
+
+    def _stats(self):
+        # Called with the lock held, like every read of ``self.segment``.
+        count = len(self) or 1
+        total = sum(attrs[3] for attrs in self._docs.values())
+        if self.segment is not None:
+            total += self.segment.total_length
+        return count, total / count
+
+    def _expand(self, prefix):
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        expanded = []
+        start = bisect.bisect_left(terms, prefix)
+        for term in terms[start:]:
+            if not term.startswith(prefix) or len(expanded) >= MAX_PREFIX_EXPANSION:
+                break
+            expanded.append(term)
+        if self.segment is not None:
+            for term in self.segment.terms_with_prefix(prefix):
+                if len(expanded) >= MAX_PREFIX_EXPANSION:
+                    break
+                expanded.append(term)
+        return set(expanded)
+
+    def _plan(self, group, count):
+        """Return ``(size, terms)`` for a query group, or ``None`` if nothing matches."""
+        terms = []
+        size = 0
+        for term in group:
+            span = self.segment.posting_range(term) if self.segment is not None else None
+            delta = self._postings.get(term, {})
+            df = (span[1] - span[0] if span else 0) + len(delta)
+            if df:
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                terms.append((idf, span, delta))
+                size += df
+        return (size, terms) if terms else None
+
+    def _group_scores(self, terms, avg_length):
+        """Score every document matching a group; each keeps its best-scoring term."""
+        scores = {}
+        for idf, span, delta in terms:
+            if span is not None:
+                doc_ids = self.segment.posting_docs.view[span[0]:span[1]].tolist()
+                impacts = self.segment.posting_impacts.view[span[0]:span[1]].tolist()
+                hidden = self._hidden
+                for doc_id, impact in zip(doc_ids, impacts):
+                    if doc_id in hidden:
+                        continue
+                    score = idf * impact
+                    if score > scores.get(doc_id, 0.0):
+                        scores[doc_id] = score
+            for doc_id, weight in delta.items():
+                score = idf * bm25_impact(weight, self._docs[doc_id][3], avg_length)
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def _best_score(self, terms, doc_id, avg_length):
+        """Return a document's best score within a group, or ``None`` if it does not match."""
+        best = None
+        for idf, span, delta in terms:
+            if doc_id in delta:
+                score = idf * bm25_impact(delta[doc_id], self._docs[doc_id][3], avg_length)
+            elif span is not None and doc_id not in self._hidden:
+                docs = self.segment.posting_docs.view
+                position = bisect.bisect_left(docs, doc_id, span[0], span[1])
+                if position == span[1] or docs[position] != doc_id:
+                    continue
+                score = idf * self.segment.posting_impacts.view[position]
+            else:
+                continue
+            if best is None or score > best:
+                best = score
+        return best
+
+    def _matches(self, doc_id, category_id, status_code, low, high):
+        attrs = self._attrs(doc_id)
+        if attrs is None:
+            return False
+        doc_category, doc_status, price, _ = attrs
+        if category_id is not None and doc_category != category_id:
+            return False
+        if status_code is not None and doc_status != status_code:
+            return False
+        return not ((low is not None and price < low) or (high is not None and price > high))
+
+    def search(self, query, category_id=None, status=None, min_price=None, max_price=None, limit=20):
+        """
+        Return up to ``limit`` ``(item_id, score)`` pairs, best first.
+
+        Only the rarest query group is expanded into a candidate set, and
+        filters are applied to it first. Each other group is then either
+        probed per candidate with a binary search over its sorted
+        postings or expanded and intersected, whichever touches fewer
+        postings.
+
+        Args:
+            query (str): Free text. The last word also matches as a prefix
+                unless the query ends with whitespace.
+            category_id (int, optional): Only items in this category.
+            status (str, optional): Only items with this status.
+            min_price (Decimal, optional): Minimum current bid.
+            max_price (Decimal, optional): Maximum current bid.
+            limit (int): Maximum number of results.
+        """
+        words = TOKEN_RE.findall(query.lower())
+        if not words:
+            return []
+        prefix = None if query[-1:].isspace() else words.pop()
+        status_code = STATUS_CODES.get(status) if status else None
+        low = _price_cents(min_price) if min_price is not None else None
+        high = _price_cents(max_price) if max_price is not None else None
+        filtered = category_id is not None or status_code is not None or low is not None or high is not None
+
+        # One lock spans the whole query, so it sees a single segment even
+        # if ``save()`` swaps in a new one meanwhile.
+        with self._lock:
+            groups = [{stem(word)} for word in words if word not in STOP_WORDS]
+            if prefix is not None:
+                groups.append(self._expand(prefix) | {stem(prefix)})
+            count, avg_length = self._stats()
+            plans = []
+            for group in groups:
+                plan = self._plan(group, count)
+                if plan is None:
+                    return []
+                plans.append(plan)
+            plans.sort(key=lambda plan: plan[0])
+
+            scores = self._group_scores(plans[0][1], avg_length)
+            if filtered:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if self._matches(doc_id, category_id, status_code, low, high)
+                }
+            for size, terms in plans[1:]:
+                narrowed = {}
+                if len(scores) * len(terms) < size:
+                    for doc_id, score in scores.items():
+                        best = self._best_score(terms, doc_id, avg_length)
+                        if best is not None:
+                            narrowed[doc_id] = score + best
+                else:
+                    group = self._group_scores(terms, avg_length)
+                    for doc_id, score in scores.items():
+                        if doc_id in group:
+                            narrowed[doc_id] = score + group[doc_id]
+                scores = narrowed
+                if not scores:
+                    return []
+        best = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+        return [(doc_id, score) for doc_id, score in best]
+
+    # Persistence
+
+    def save(self, path=None):
+        """Merge the segment and the delta into a new segment on disk and reopen it."""
+        path = path or self.path
+        with self._lock:
+            docs = {}
+            postings = defaultdict(dict)
+            if self.segment is not None:
+                for doc_id, attrs in self.segment.iter_docs():
+                    if doc_id not in self._hidden:
+                        docs[doc_id] = self._overrides.get(doc_id, attrs)
+                for term, doc_ids, weights in self.segment.iter_postings():
+                    entries = postings[term]
+                    for doc_id, weight in zip(doc_ids, weights):
+                        if doc_id not in self._hidden:
+                            entries[doc_id] = weight
+            docs.update(self._docs)
+            for term, entries in self._postings.items():
+                postings[term].update(entries)
+
+            write_segment(path, docs, postings)
+            if self.segment is not None:
+                self.segment.close()
+            self.path = path
+            self.segment = Segment(path)
+            self._mtime = os.path.getmtime(path)
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._docs.clear()
+            self._overrides.clear()
+            self._hidden.clear()
+            self._sorted_terms = None
+
+    def rebuild(self, queryset=None, chunk_size=2000):
+        """Index every item from the database and save a fresh segment."""
+        queryset = queryset if queryset is not None else Item.objects.all()
+        with self._lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._docs.clear()
+            self._overrides.clear()
+            self._hidden.clear()
+            self._sorted_terms = None
+            for item in queryset.select_related('category').iterator(chunk_size=chunk_size):
+                self.add_item(item)
+            if self.path:
+                self.save()
+
+
+_index = None
+_index_lock = threading.Lock()
+_checked_at = 0.0
+RELOAD_CHECK_SECONDS = 5
+
+
+def index_path():
+    return getattr(settings, 'SEARCH_INDEX_PATH', os.path.join(settings.BASE_DIR, 'search_index.bin'))
+
+
+def get_index():
+    """
+    Return the process-wide index, opening the segment on first use.
+
+    Each process applies its own save signals to its in-memory delta.
+    When another process writes a new segment (e.g. ``manage.py
+    search_index --rebuild``), it is picked up within
+    ``RELOAD_CHECK_SECONDS`` and the delta is carried over to it. The
+    old segment is not closed: threads still searching the old index
+    hold views into its mapping, which is unmapped once they drop it.
+    """
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < RELOAD_CHECK_SECONDS:
+        return _index
+    with _index_lock:
+        _checked_at = now
+        path = index_path()
+        if _index is None:
+            _index = SearchIndex(path)
+        elif os.path.exists(path) and os.path.getmtime(path) != _index._mtime:
+            fresh = SearchIndex(path)
+            with _index._lock:
+                fresh.absorb(_index)
+                _index = fresh
+    return _index
+
+
+@receiver(post_save, sender=Item)
+def index_saved_item(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_index().add_item(instance)
+
+
+@receiver(post_delete, sender=Item)
+def unindex_deleted_item(sender, instance, **kwargs):
+    get_index().remove(instance.id)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    index = get_index()
+    for item in Item.objects.filter(category=instance).iterator():
+        index.add_item(item, category_name=instance.category_name)
+
+
+@receiver(item_changed)
+def update_item_attrs(sender, item_id, current_bid=None, status=None, **kwargs):
+    get_index().update_attrs(item_id, status=status, price=current_bid)
@@ -0,0 +1,261 @@
+"""
+Session engine for ``SESSION_SAVE_EVERY_REQUEST`` traffic.
+
+With the stock database engine every request that touches the session
+rewrites its ``django_session`` row, just to push the expiry 30 minutes
+out. This engine keeps sessions in the cache, in front of the database:
+
+* a session whose data changed is written through to the database and
+  the cache at once, as ``cached_db`` does;
+* a session whose data did not change is left alone until less than
+  ``SESSION_REFRESH_THRESHOLD`` seconds of it remain. Its new expiry then
+  goes to the cache at once and to the database in a batch, one
+  ``UPDATE`` for up to ``SESSION_BATCH_SIZE`` sessions or
+  ``SESSION_BATCH_SECONDS`` of refreshes. A due batch is written by the
+  next refresh or at the end of the next request, and whatever is left
+  when the process exits;
+* views wrapped in ``read_only_session`` never save an unchanged session.
+
+The cache must be shared by every worker process, as for ``cached_db``:
+another process's local-memory cache would go on serving a session after
+it was changed or logged out here.
+"""
+import atexit
+import logging
+import threading
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.signals import request_finished
+from django.db import DatabaseError
+from django.dispatch import receiver
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'auction_app.sessions'
+
+
+class ExpiryBatch:
+    """
+    Session expiry refreshes waiting to be written to the database.
+
+    Only the latest expiry per session is kept. The batch is written by
+    whichever ``add()`` fills it or finds it older than its interval, by
+    ``flush_if_due()`` at the end of each request, so a quiet site does
+    not hold refreshes back, and at interpreter exit.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._started = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _due(self):
+        # Called with the lock held.
+        if not self._pending:
+            return False
+        size = getattr(settings, 'SESSION_BATCH_SIZE', 100)
+        interval = getattr(settings, 'SESSION_BATCH_SECONDS', 10)
+        return len(self._pending) >= size or time.monotonic() - self._started >= interval
+
+    def add(self, model, session_key, expire_date):
+        """
+        Queue ``session_key``'s new expiry, writing the batch if it is due.
+
+        Returns:
+            int: Number of sessions written.
+        """
+        with self._lock:
+            self._pending[session_key] = expire_date
+            self._model = model
+            if self._started is None:
+                self._started = time.monotonic()
+            if not self._due():
+                return 0
+        return self.flush(model)
+
+    def flush_if_due(self):
+        """
+        Write the batch if it is full or older than its interval.
+
+        Returns:
+            int: Number of sessions written.
+        """
+        with self._lock:
+            if not self._due():
+                return 0
+        return self.flush()
+
+    def discard(self, session_key):
+        """Drop a queued refresh, e.g. because the session was just written in full or deleted."""
+        with self._lock:
+            self._pending.pop(session_key, None)
+
+    def flush(self, model=None):
+        """
+        Write every queued expiry in one statement.
+
+        ``model`` defaults to the session model of the last ``add()``.
+
+        A failed write is logged and its refreshes requeued, since failing
+        the request that happened to fill the batch would not help.
+
+        Returns:
+            int: Number of sessions written.
+        """
+        with self._lock:
+            batch, self._pending, self._started = self._pending, {}, None
+            model = model or self._model
+        if not batch:
+            return 0
+        try:
+            model.objects.bulk_update(
+                [model(session_key=key, expire_date=expire_date) for key, expire_date in batch.items()],
+                ['expire_date'],
+            )
+        except DatabaseError:
+            logger.exception('Session expiry flush failed; refreshes kept for retry')
+            with self._lock:
+                batch.update(self._pending)
+                self._pending = batch
+                self._started = self._started or time.monotonic()
+            return 0
+        return len(batch)
+
+
+expiry_batch = ExpiryBatch()
+
+
+@receiver(request_finished)
+def flush_due_expiries(sender, **kwargs):
+    expiry_batch.flush_if_due()
+
+
+@atexit.register
+def flush_expiries_at_exit():
+    try:
+        expiry_batch.flush()
+    except Exception:
+        logger.exception('Session expiry flush at exit failed')
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cached, database-backed sessions that are saved only when needed.
+
+    The cache holds ``(data, expire_date)``, so the remaining lifetime is
+    known without reading the database.
+
+    Attributes:
+        read_only (bool): Set by ``read_only_session``; an unchanged session is not saved.
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self.read_only = False
+        self._expire_date = None
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # As in cached_db: some backends reject malformed keys.
+            entry = None
+        if entry is not None:
+            data, self._expire_date = entry
+            return data
+        s = self._get_session_from_db()
+        if not s:
+            return {}
+        data = self.decode(s.session_data)
+        self._expire_date = s.expire_date
+        self._cache.set(self.cache_key, (data, s.expire_date), self.get_expiry_age(expiry=s.expire_date))
+        return data
+
+    def _needs_refresh(self):
+        if self._expire_date is None:
+            return True
+        remaining = (self._expire_date - timezone.now()).total_seconds()
+        return remaining < getattr(settings, 'SESSION_REFRESH_THRESHOLD', 0)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if must_create or self.modified or self._expire_date is None:
+            # New or changed data is written through.
+            super(CachedDBStore, self).save(must_create)
+            expiry_batch.discard(self.session_key)
+        elif self.read_only or not self._needs_refresh():
+            return
+        else:
+            expiry_batch.add(self.model, self.session_key, self.get_expiry_date())
+        data = self._get_session(no_load=must_create)
+        self._expire_date = self.get_expiry_date()
+        self._cache.set(self.cache_key, (data, self._expire_date), self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        if session_key is None and self.session_key is not None:
+            session_key = self.session_key
+        if session_key is not None:
+            expiry_batch.discard(session_key)
+        super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls, chunk_size=1000, grace=None):
+        """
+        Delete expired sessions ``chunk_size`` rows at a time.
+
+        Each chunk is its own short statement, so a backlog of expired
+        sessions does not hold locks on the table for one long ``DELETE``.
+        Sessions are kept for ``grace`` seconds (default
+        ``SESSION_BATCH_SECONDS``) past their stored expiry, as a refresh
+        may still be waiting in another process's batch.
+
+        Returns:
+            int: Number of sessions deleted.
+        """
+        model = cls.get_model_class()
+        if grace is None:
+            grace = getattr(settings, 'SESSION_BATCH_SECONDS', 10)
+        cutoff = timezone.now() - timezone.timedelta(seconds=grace)
+        deleted = 0
+        while True:
+            keys = list(model.objects.filter(expire_date__lt=cutoff).values_list('pk', flat=True)[:chunk_size])
+            if not keys:
+                return deleted
+            model.objects.filter(pk__in=keys, expire_date__lt=cutoff).delete()
+            deleted += len(keys)
+
+
+def read_only_session(view):
+    """
+    Mark a view as never changing the session, so serving it saves none.
+
+    Polling endpoints wrapped in this do not keep a session alive; the
+    user's other requests do.
+    """
+    def mark(request):
+        session = getattr(request, 'session', None)
+        if session is not None:
+            session.read_only = True
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            mark(request)
+            return await view(request, *args, **kwargs)
+    else:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            mark(request)
+            return view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,11 @@
+from django.dispatch import Signal
+
+# Sent after an item's bidding state changes and the change is committed.
+# Keyword arguments: ``item_id`` and any of ``current_bid``, ``new_bids``,
+# ``status`` and ``end_time`` that changed. Receivers must be cheap: this
+# fires on every accepted bid.
+item_changed = Signal()
+
+# Sent after notifications are committed. Keyword argument: ``user_ids``,
+# the recipients. Used to wake long-polling inbox requests.
+notifications_sent = Signal()
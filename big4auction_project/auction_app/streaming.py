@@ -0,0 +1,298 @@
+import asyncio
+import json
+import re
+import threading
+
+from django.db.models import Count
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Item
+from .signals import item_changed
+
+HEARTBEAT_SECONDS = 15
+
+
+class Subscription:
+    """
+    A single watcher of an item's bid stream.
+
+    Messages are kept in a bounded queue. Only the latest state matters to
+    a watcher, so when a slow consumer falls behind the oldest pending
+    message is dropped instead of growing the queue without bound.
+
+    Attributes:
+        item_id (int): Item being watched.
+        loop (asyncio.AbstractEventLoop): Loop the watcher runs on.
+        queue (asyncio.Queue): Pending state updates.
+    """
+
+    def __init__(self, item_id, loop, maxsize):
+        self.item_id = item_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, state):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(state)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class ItemChannel:
+    """
+    Subscribers and last known state of one item.
+
+    Attributes:
+        state (dict): ``current_bid``, ``bid_count``, ``status`` and
+            ``end_time``, or ``None`` while the first snapshot loads.
+        backlog (list): ``(sequence, change)`` pairs published while the
+            first snapshot loads.
+        subscribers (dict): Subscriptions grouped by event loop.
+    """
+
+    def __init__(self, state=None):
+        self.state = state
+        self.backlog = []
+        self.subscribers = {}
+
+    def apply(self, current_bid=None, new_bids=0, status=None, end_time=None):
+        state = self.state
+        if current_bid is not None and current_bid > state['current_bid']:
+            state['current_bid'] = current_bid
+        state['bid_count'] += new_bids
+        if status is not None:
+            state['status'] = status
+        if end_time is not None:
+            state['end_time'] = end_time
+
+    def install(self, state, sequence):
+        """Start from a snapshot read after change ``sequence``, replaying the later changes."""
+        self.state = state
+        for published, change in self.backlog:
+            if published > sequence:
+                self.apply(**change)
+        self.backlog = []
+
+
+class BidHub:
+    """
+    In-process pub/sub hub fanning bid updates out to item watchers.
+
+    The hub only keeps state for items that currently have watchers. The
+    first watcher of an item loads a snapshot from the database; after
+    that every watcher is fed from ``publish()`` calls, so idle watchers
+    cost no queries at all. ``publish()`` may be called from any thread,
+    e.g. a sync view committing a bid.
+
+    A watcher is registered before the snapshot is read, and changes
+    published meanwhile are kept: those published before the read began
+    are already in the snapshot and dropped, the rest are applied on top
+    of it, so no change falls between the snapshot and the stream.
+
+    Attributes:
+        queue_size (int): Maximum pending messages per subscription.
+    """
+
+    def __init__(self, queue_size=8):
+        self.queue_size = queue_size
+        self._channels = {}
+        self._loading = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    async def _snapshot(self, item_id):
+        """Return the number of changes published before the read, and the item's state."""
+        with self._lock:
+            sequence = self._sequence
+        item = await Item.objects.annotate(bid_count=Count('bid')).aget(pk=item_id)
+        return sequence, {
+            'current_bid': item.current_bid,
+            'bid_count': item.bid_count,
+            'status': item.status,
+            'end_time': item.end_time,
+        }
+
+    async def subscribe(self, item_id):
+        """
+        Start watching ``item_id``.
+
+        Concurrent first watchers of an item share a single snapshot query.
+
+        Raises:
+            Item.DoesNotExist: If the item does not exist.
+        """
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(item_id, loop, self.queue_size)
+        with self._lock:
+            channel = self._channels.get(item_id)
+            if channel is None:
+                channel = self._channels[item_id] = ItemChannel()
+            channel.subscribers.setdefault(loop, set()).add(subscription)
+            loading = None
+            if channel.state is None:
+                loading = self._loading.get((loop, item_id))
+                if loading is None:
+                    loading = self._loading[(loop, item_id)] = loop.create_task(self._snapshot(item_id))
+        if loading is not None:
+            try:
+                sequence, state = await asyncio.shield(loading)
+            except BaseException:
+                self.unsubscribe(subscription)
+                raise
+            finally:
+                with self._lock:
+                    if self._loading.get((loop, item_id)) is loading:
+                        del self._loading[(loop, item_id)]
+            with self._lock:
+                if channel.state is None:
+                    channel.install(dict(state), sequence)
+        with self._lock:
+            subscription.push(dict(channel.state))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop watching; the item's state is dropped with its last watcher."""
+        with self._lock:
+            channel = self._channels.get(subscription.item_id)
+            if channel is None:
+                return
+            group = channel.subscribers.get(subscription.loop)
+            if group is not None:
+                group.discard(subscription)
+                if not group:
+                    del channel.subscribers[subscription.loop]
+            if not channel.subscribers:
+                del self._channels[subscription.item_id]
+
+    def watchers(self, item_id):
+        """Return the number of watchers of ``item_id``."""
+        with self._lock:
+            channel = self._channels.get(item_id)
+            if channel is None:
+                return 0
+            return sum(len(group) for group in channel.subscribers.values())
+
+    def publish(self, item_id, current_bid=None, new_bids=0, status=None, end_time=None):
+        """
+        Apply a change to an item and fan it out to its watchers.
+
+        Does nothing when nobody is watching the item, and only records
+        the change while the item's first snapshot loads.
+
+        Args:
+            item_id (int): Item that changed.
+            current_bid (Decimal, optional): New current bid.
+            new_bids (int): Number of bids to add to the bid count.
+            status (str, optional): New item status.
+            end_time (datetime, optional): New end time.
+        """
+        change = {'current_bid': current_bid, 'new_bids': new_bids, 'status': status, 'end_time': end_time}
+        with self._lock:
+            self._sequence += 1
+            channel = self._channels.get(item_id)
+            if channel is None:
+                return
+            if channel.state is None:
+                channel.backlog.append((self._sequence, change))
+                return
+            channel.apply(**change)
+            snapshot = dict(channel.state)
+            groups = [(loop, list(group)) for loop, group in channel.subscribers.items()]
+
+        for loop, subscriptions in groups:
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscriptions, snapshot)
+            except RuntimeError:
+                # The loop has been closed; its subscriptions are gone.
+                pass
+
+
+def _fan_out(subscriptions, state):
+    for subscription in subscriptions:
+        subscription.push(state)
+
+
+def serialize_state(item_id, state, now=None):
+    """Render a hub state as the JSON payload sent to watchers."""
+    now = now or timezone.now()
+    time_left = max(0, int((state['end_time'] - now).total_seconds()))
+    return json.dumps({
+        'item_id': item_id,
+        'current_bid': str(state['current_bid']),
+        'bid_count': state['bid_count'],
+        'status': state['status'],
+        'time_left': time_left,
+    })
+
+
+async def sse_events(subscription, heartbeat=HEARTBEAT_SECONDS):
+    """
+    Yield Server-Sent Events for a subscription until the client goes away.
+
+    A comment line is sent every ``heartbeat`` seconds of silence so
+    proxies keep the connection open.
+    """
+    try:
+        while True:
+            try:
+                state = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f'event: bid\ndata: {serialize_state(subscription.item_id, state)}\n\n'
+    finally:
+        bid_hub.unsubscribe(subscription)
+
+
+WEBSOCKET_PATH = re.compile(r'^/ws/items/(?P<item_id>\d+)/?$')
+
+
+async def websocket_application(scope, receive, send):
+    """
+    Raw ASGI WebSocket endpoint at ``/ws/items/<id>``.
+
+    Pushes the same JSON payload as the SSE stream. Client messages are
+    ignored; the socket only exists to receive updates.
+    """
+    match = WEBSOCKET_PATH.match(scope['path'])
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if match is None:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    item_id = int(match['item_id'])
+    try:
+        subscription = await bid_hub.subscribe(item_id)
+    except Item.DoesNotExist:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    async def pump():
+        while True:
+            state = await subscription.get()
+            await send({'type': 'websocket.send', 'text': serialize_state(item_id, state)})
+
+    pump_task = asyncio.ensure_future(pump())
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+    finally:
+        pump_task.cancel()
+        bid_hub.unsubscribe(subscription)
+
+
+bid_hub = BidHub()
+
+
+@receiver(item_changed)
+def publish_item_change(sender, item_id, current_bid=None, new_bids=0, status=None, end_time=None, **kwargs):
+    bid_hub.publish(item_id, current_bid=current_bid, new_bids=new_bids, status=status, end_time=end_time)
@@ -0,0 +1,78 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import stripe
+
+from .payments import StubBackend
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Answers the subset of the Stripe REST API that the gateway uses."""
+
+    protocol_version = 'HTTP/1.1'
+    # Buffer writes so headers and body leave in one segment instead of
+    # stalling on Nagle's algorithm and delayed ACKs.
+    wbufsize = -1
+    routes = {
+        '/v1/customers': lambda backend, key, params: backend.create_customer(key, **params),
+        '/v1/setup_intents': lambda backend, key, params: backend.create_setup_intent(
+            params.pop('customer', None), key, **params),
+    }
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        params = dict(parse_qsl(self.rfile.read(length).decode()))
+        route = self.routes.get(self.path)
+        if route is None:
+            return self._reply(404, {'error': {'type': 'invalid_request_error', 'message': 'Unknown path.'}})
+        try:
+            body = route(self.server.backend, self.headers.get('Idempotency-Key'), params)
+        except stripe.APIConnectionError as error:
+            return self._reply(503, {'error': {'type': 'api_error', 'message': str(error)}})
+        self._reply(200, body)
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local HTTP server that speaks enough of the Stripe API for offline runs.
+
+    Point ``STRIPE_API_BASE`` at ``url`` to exercise the real pooled client
+    end to end. State, simulated latency and injected failures come from
+    the wrapped ``StubBackend``.
+
+    Attributes:
+        backend (StubBackend): Object store and failure injection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, backend=None):
+        super().__init__((host, port), StubRequestHandler)
+        self.backend = backend or StubBackend()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a daemon thread and return ``self``."""
+        threading.Thread(target=self.serve_forever, name='stripe-stub', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
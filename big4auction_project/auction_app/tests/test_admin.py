@@ -0,0 +1,189 @@
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import paginators, search
+from auction_app.admin import RECENT_INLINE_ROWS
+from auction_app.models import Item, Category, User, Bid, Transaction
+from auction_app.paginators import EstimatedCountPaginator
+from auction_app.search import SearchIndex
+
+class ItemAdminTest(TestCase):
+    def setUp(self):
+        """
+        Set up a fresh search index, a superuser and an item with a few bids.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(SEARCH_INDEX_PATH=os.path.join(self.tmp.name, 'index.bin'))
+        self.settings_override.enable()
+        search._index = SearchIndex(search.index_path())
+
+        self.admin = User.objects.create_superuser(username='admin', password='pw', phone_number='1111111111')
+        self.bidder = User.objects.create(username='bidder', phone_number='2222222222')
+        self.category = Category.objects.create(category_name='Clocks')
+        self.item = self.make_item('Grandfather clock')
+        self.client.force_login(self.admin)
+
+    def tearDown(self):
+        search._index = None
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def make_item(self, title, category=None):
+        now = timezone.now()
+        return Item.objects.create(
+            title=title,
+            slug=title.lower().replace(' ', '-'),
+            description='Runs well.',
+            category=category or self.category,
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+            starting_bid=10.00,
+            reserve_price=10.00,
+            current_bid=0,
+        )
+
+    def add_bids(self, count, start=0):
+        Bid.objects.bulk_create([
+            Bid(item=self.item, bidder=self.bidder, bid_amount=Decimal(11 + start + i)) for i in range(count)
+        ])
+
+    def queries(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response
+
+    def test_change_page_shows_only_recent_bids_in_constant_queries(self):
+        """
+        Test that the item page lists only the newest bids, read-only, and costs the same queries for 3 or 300 bids.
+        """
+        url = reverse('admin:auction_app_item_change', args=[self.item.pk])
+        self.add_bids(3)
+        self.queries(url)  # Warm the content type cache.
+        few, _ = self.queries(url)
+        self.add_bids(297, start=3)
+        many, response = self.queries(url)
+        self.assertEqual(few, many)
+        inline = response.context['inline_admin_formsets'][1]
+        self.assertEqual(len(inline.formset.forms), RECENT_INLINE_ROWS)
+        self.assertFalse(inline.has_add_permission)
+        self.assertContains(response, '310.00')
+        self.assertNotContains(response, '>11.00<')
+        self.assertContains(response, f'?item__id__exact={self.item.pk}')
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Test that listing items with their categories is a fixed number of queries.
+        """
+        url = reverse('admin:auction_app_item_changelist')
+        few, _ = self.queries(url)
+        for i in range(30):
+            self.make_item(f'Clock {i}')
+        many, _ = self.queries(url)
+        self.assertEqual(few, many)
+
+    def test_bid_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Test that the bid changelist joins items and bidders instead of loading them per row.
+        """
+        url = reverse('admin:auction_app_bid_changelist')
+        self.add_bids(2)
+        few, _ = self.queries(url)
+        self.add_bids(60, start=2)
+        many, _ = self.queries(url)
+        self.assertEqual(few, many)
+
+    def test_search_uses_index_and_ids(self):
+        """
+        Test that changelist search goes through the full-text index, matches descriptions and accepts an id.
+        """
+        clock = self.make_item('Cuckoo clock')
+        Item.objects.filter(pk=clock.pk).update(description='Carved walnut case.')
+        self.make_item('Pocket watch', Category.objects.create(category_name='Watches'))
+        with mock.patch.object(search.SearchIndex, 'search', wraps=search.get_index().search) as searched:
+            response = self.client.get(reverse('admin:auction_app_item_changelist'), {'q': 'clock'})
+        searched.assert_called_once()
+        self.assertEqual({item.pk for item in response.context['cl'].result_list}, {self.item.pk, clock.pk})
+        response = self.client.get(reverse('admin:auction_app_item_changelist'), {'q': str(clock.pk)})
+        self.assertEqual([item.pk for item in response.context['cl'].result_list], [clock.pk])
+
+    def test_search_falls_back_to_database(self):
+        """
+        Test that search asks the database when the index is missing or stale, and adds its matches when the index hits the limit.
+        """
+        url = reverse('admin:auction_app_item_changelist')
+        wall = self.make_item('Wall clock')
+        found = lambda: {item.pk for item in self.client.get(url, {'q': 'clock'}).context['cl'].result_list}
+
+        search._index = SearchIndex(search.index_path())
+        self.assertEqual(found(), {self.item.pk, wall.pk})
+
+        search.get_index().add_item(wall)
+        with mock.patch('auction_app.admin.estimated_row_count', return_value=1000):
+            self.assertEqual(found(), {self.item.pk, wall.pk})
+        self.assertEqual(found(), {wall.pk})
+        with mock.patch('auction_app.admin.ADMIN_SEARCH_LIMIT', 1):
+            self.assertEqual(found(), {self.item.pk, wall.pk})
+
+    def test_foreign_keys_use_autocomplete(self):
+        """
+        Test that user and item pickers are autocomplete widgets rather than full dropdowns.
+        """
+        response = self.client.get(reverse('admin:auction_app_bid_add'))
+        self.assertContains(response, 'class="admin-autocomplete"', count=2)
+        self.assertContains(response, 'data-field-name="item"')
+        self.assertContains(response, 'data-field-name="bidder"')
+        self.assertNotContains(response, f'<option value="{self.bidder.pk}">')
+        self.assertContains(self.client.get(reverse('admin:autocomplete'), {
+            'term': 'grandfather', 'app_label': 'auction_app', 'model_name': 'bid', 'field_name': 'item',
+        }), 'Grandfather clock')
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        """
+        Set up three categories.
+        """
+        for name in ('A', 'B', 'C'):
+            Category.objects.create(category_name=name)
+
+    def test_unfiltered_large_table_uses_estimate(self):
+        """
+        Test that a large unfiltered table is counted from the estimate without running COUNT(*).
+        """
+        with mock.patch.object(paginators, 'estimated_row_count', return_value=5_000_000):
+            with self.assertNumQueries(0):
+                self.assertEqual(EstimatedCountPaginator(Category.objects.all(), 100).count, 5_000_000)
+
+    def test_small_or_unanalyzed_table_counts_exactly(self):
+        """
+        Test that an exact count is used below the threshold or without statistics.
+        """
+        for estimate in (None, 50):
+            with mock.patch.object(paginators, 'estimated_row_count', return_value=estimate):
+                self.assertEqual(EstimatedCountPaginator(Category.objects.all(), 100).count, 3)
+
+    def test_filtered_count_is_capped(self):
+        """
+        Test that filtered counts stop at the limit.
+        """
+        with mock.patch.object(paginators, 'FILTERED_COUNT_LIMIT', 2):
+            self.assertEqual(EstimatedCountPaginator(Category.objects.exclude(category_name='Z'), 100).count, 2)
+        self.assertEqual(EstimatedCountPaginator(Category.objects.filter(category_name='A'), 100).count, 1)
+
+    def test_sqlite_statistics(self):
+        """
+        Test reading the row estimate from SQLite's ANALYZE statistics.
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(paginators.estimated_row_count(Category), 3)
+        self.assertEqual(paginators.estimated_row_count(Transaction), None)
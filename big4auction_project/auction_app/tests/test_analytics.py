@@ -0,0 +1,161 @@
+import json
+from io import StringIO
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import analytics
+from auction_app.analytics import bid_activity, sales_activity, category_summary, run, truncate
+from auction_app.models import Item, Category, User, Bid, Transaction, PaymentMethod, BidRollup, SalesRollup, RollupCheckpoint
+
+class AnalyticsRollupTest(TestCase):
+    def setUp(self):
+        """
+        Set up two items in different categories with bids and a sale spread over two hours.
+        """
+        self.seller = User.objects.create(username='seller', phone_number='1111111111')
+        self.buyer = User.objects.create(username='buyer', phone_number='2222222222')
+        self.card = PaymentMethod.objects.create(method='Card')
+        self.home = Category.objects.create(category_name='Home')
+        self.toys = Category.objects.create(category_name='Toys')
+        now = timezone.now()
+        self.lamp = self.make_item('lamp', self.home, now)
+        self.kite = self.make_item('kite', self.toys, now)
+        self.base = datetime(2024, 3, 1, 10, 0, tzinfo=dt_timezone.utc)
+        self.bid(self.lamp, '12.00', minutes=1)
+        self.bid(self.lamp, '15.00', minutes=1, seconds=30)
+        self.bid(self.lamp, '20.00', minutes=70)
+        self.bid(self.kite, '5.00', minutes=2)
+        sale = Transaction.objects.create(buyer=self.buyer, seller=self.seller, item=self.lamp,
+                                          transaction_amount=Decimal('20.00'), payment_method=self.card)
+        Transaction.objects.filter(pk=sale.pk).update(transaction_date=self.at(minutes=80))
+
+    def make_item(self, slug, category, now):
+        return Item.objects.create(
+            title=slug.title(),
+            slug=slug,
+            description=f'A {slug}.',
+            category=category,
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+            starting_bid=1.00,
+            reserve_price=1.00,
+            current_bid=0,
+        )
+
+    def at(self, minutes=0, seconds=0):
+        return self.base + timezone.timedelta(minutes=minutes, seconds=seconds)
+
+    def bid(self, item, amount, **offset):
+        bid = Bid.objects.create(item=item, bidder=self.buyer, bid_amount=Decimal(amount))
+        Bid.objects.filter(pk=bid.pk).update(bid_time=self.at(**offset))
+        return bid
+
+    def window(self):
+        return self.base, self.base + timezone.timedelta(days=1)
+
+    def test_truncate(self):
+        """
+        Test that moments are rounded down to the start of their UTC bucket.
+        """
+        moment = datetime(2024, 3, 1, 10, 47, 13, 5, tzinfo=dt_timezone.utc)
+        self.assertEqual(truncate(moment, 'minute'), datetime(2024, 3, 1, 10, 47, tzinfo=dt_timezone.utc))
+        self.assertEqual(truncate(moment, 'hour'), datetime(2024, 3, 1, 10, tzinfo=dt_timezone.utc))
+        self.assertEqual(truncate(moment, 'day'), datetime(2024, 3, 1, tzinfo=dt_timezone.utc))
+
+    def test_buckets_per_item_and_category(self):
+        """
+        Test minute, hour and day buckets for bids, and per-category sales.
+        """
+        self.assertEqual(run(settle=0), {'bids': 4, 'sales': 1})
+        start, end = self.window()
+        minutes = bid_activity(start, end, 'minute', item_id=self.lamp.id)
+        self.assertEqual([(row['bucket'].minute, row['bids'], row['high']) for row in minutes],
+                         [(1, 2, Decimal('15.00')), (10, 1, Decimal('20.00'))])
+        hours = bid_activity(start, end, 'hour')
+        self.assertEqual([(row['bucket'].hour, row['bids'], row['total']) for row in hours],
+                         [(10, 3, Decimal('32.00')), (11, 1, Decimal('20.00'))])
+        self.assertEqual(bid_activity(start, end, 'day', category_id=self.toys.id)[0]['low'], Decimal('5.00'))
+        self.assertEqual([(row['sales'], row['revenue']) for row in sales_activity(start, end, 'day')],
+                         [(1, Decimal('20.00'))])
+        self.assertEqual(
+            [(row['category_id'], row['bids'], row['sales']) for row in category_summary(start, end, 'day')],
+            [(self.home.id, 3, 1), (self.toys.id, 1, 0)],
+        )
+
+    def test_incremental_runs_merge_into_existing_buckets(self):
+        """
+        Test that rows arriving after a run are merged into the buckets already written, without double counting.
+        """
+        run(settle=0)
+        self.bid(self.lamp, '9.00', minutes=1, seconds=45)
+        self.assertEqual(run(settle=0), {'bids': 1, 'sales': 0})
+        self.assertEqual(run(settle=0), {'bids': 0, 'sales': 0})
+        row = BidRollup.objects.get(granularity='minute', item=self.lamp, bucket=self.at(minutes=1))
+        self.assertEqual((row.bid_count, row.amount_total, row.amount_low, row.amount_high),
+                         (3, Decimal('36.00'), Decimal('9.00'), Decimal('15.00')))
+        self.assertEqual(BidRollup.objects.get(granularity='day', item=self.lamp).bid_count, 4)
+
+    def test_resumes_from_checkpoint(self):
+        """
+        Test that batches commit with the checkpoint, so a run stopped part-way resumes to the same totals.
+        """
+        run(settle=0, batch_size=1, max_batches=2)
+        checkpoint = RollupCheckpoint.objects.get(name='bids')
+        self.assertEqual(checkpoint.last_id, Bid.objects.order_by('id')[1].id)
+        run(settle=0, batch_size=1)
+        stepped = list(BidRollup.objects.order_by('granularity', 'item', 'bucket').values_list(
+            'granularity', 'item', 'bucket', 'bid_count', 'amount_total'))
+        analytics.reset()
+        self.assertFalse(RollupCheckpoint.objects.exists())
+        run(settle=0)
+        rebuilt = list(BidRollup.objects.order_by('granularity', 'item', 'bucket').values_list(
+            'granularity', 'item', 'bucket', 'bid_count', 'amount_total'))
+        self.assertEqual(stepped, rebuilt)
+
+    def test_unsettled_rows_wait(self):
+        """
+        Test that rows younger than the settle window are left for the next run, along with everything after them.
+        """
+        Bid.objects.create(item=self.kite, bidder=self.buyer, bid_amount=Decimal('6.00'))
+        self.bid(self.kite, '7.00', minutes=3)
+        self.assertEqual(run(settle=60)['bids'], 4)
+        self.assertEqual(run(settle=0)['bids'], 2)
+
+    def test_queries_read_only_rollups(self):
+        """
+        Test that dashboard queries are answered without touching the bid or transaction tables.
+        """
+        run(settle=0)
+        start, end = self.window()
+        with self.assertNumQueries(4) as queries:
+            bid_activity(start, end, 'hour')
+            sales_activity(start, end, 'hour')
+            category_summary(start, end, 'hour')
+        for query in queries.captured_queries:
+            self.assertNotIn('auction_app_bid"', query['sql'])
+            self.assertNotIn('auction_app_transaction"', query['sql'])
+
+    def test_command_and_view(self):
+        """
+        Test the management command, its status output and the staff-only report endpoint.
+        """
+        out = StringIO()
+        call_command('rollup_analytics', '--settle', '0', stdout=out)
+        self.assertIn('4 bids, 1 sales', out.getvalue())
+        call_command('rollup_analytics', '--status', stdout=out)
+        self.assertIn('bids: last id', out.getvalue())
+        self.assertEqual(SalesRollup.objects.count(), 3)
+
+        self.client.force_login(self.buyer)
+        self.assertEqual(self.client.get(reverse('analytics_report')).status_code, 403)
+        User.objects.filter(pk=self.buyer.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(reverse('analytics_report'), {'granularity': 'week'}).status_code, 400)
+        for hours in ('nan', 'inf', '-inf', '0', '-1', 'soon'):
+            self.assertEqual(self.client.get(reverse('analytics_report'), {'hours': hours}).status_code, 400, hours)
+        response = self.client.get(reverse('analytics_report'), {'hours': 1})
+        body = json.loads(response.content)
+        self.assertEqual(body['granularity'], 'minute')
+        self.assertEqual(body['bids'], [])
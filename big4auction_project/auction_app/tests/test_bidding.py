@@ -0,0 +1,139 @@
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.bidding import place_bid, BidRejected
+from auction_app.models import Item, Bid, Category, User
+
+class PlaceBidTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item and two bidders.
+        """
+        self.category = Category.objects.create(category_name='Test Category')
+        self.alice = User.objects.create_user(username='alice', phone_number='1111111111', password='pw')
+        self.bob = User.objects.create_user(username='bob', phone_number='2222222222', password='pw')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=self.category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+            status='active',
+        )
+
+    def test_place_bid_updates_current_bid(self):
+        """
+        Test that an accepted bid is stored and raises the current bid.
+        """
+        bid = place_bid(self.item.id, self.alice, Decimal('12.50'))
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('12.50'))
+        self.assertEqual(bid.bid_amount, Decimal('12.50'))
+        self.assertEqual(Bid.objects.filter(item=self.item).count(), 1)
+
+    def test_lower_or_equal_bid_is_rejected(self):
+        """
+        Test that a bid not above the current bid is rejected and leaves no trace.
+        """
+        place_bid(self.item.id, self.alice, Decimal('15.00'))
+        for amount in (Decimal('15.00'), Decimal('14.00')):
+            with self.assertRaises(BidRejected) as context:
+                place_bid(self.item.id, self.bob, amount)
+            self.assertEqual(context.exception.reason, 'outbid')
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('15.00'))
+        self.assertEqual(Bid.objects.filter(item=self.item).count(), 1)
+
+    def test_bid_below_starting_bid_is_rejected(self):
+        """
+        Test that a bid below the starting bid is rejected.
+        """
+        Item.objects.filter(pk=self.item.pk).update(current_bid=0)
+        with self.assertRaises(BidRejected) as context:
+            place_bid(self.item.id, self.alice, Decimal('5.00'))
+        self.assertEqual(context.exception.reason, 'below_starting_bid')
+
+    def test_bid_after_end_time_is_rejected(self):
+        """
+        Test that bids on an ended auction are rejected.
+        """
+        with self.assertRaises(BidRejected) as context:
+            place_bid(self.item.id, self.alice, Decimal('50.00'), now=self.item.end_time)
+        self.assertEqual(context.exception.reason, 'ended')
+
+    def test_bid_on_inactive_item_is_rejected(self):
+        """
+        Test that bids on sold or expired items are rejected.
+        """
+        Item.objects.filter(pk=self.item.pk).update(status='sold')
+        with self.assertRaises(BidRejected) as context:
+            place_bid(self.item.id, self.alice, Decimal('50.00'))
+        self.assertEqual(context.exception.reason, 'not_active')
+
+    def test_bid_on_missing_item_is_rejected(self):
+        """
+        Test that bids on a nonexistent item are rejected.
+        """
+        with self.assertRaises(BidRejected) as context:
+            place_bid(self.item.id + 1000, self.alice, Decimal('50.00'))
+        self.assertEqual(context.exception.reason, 'not_found')
+
+
+class PlaceBidViewTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item and a logged-in bidder.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        self.user = User.objects.create_user(username='bidder', phone_number='1234567890', password='pw')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+            status='active',
+        )
+        self.url = reverse('place_bid', kwargs={'item_id': self.item.id})
+
+    def test_anonymous_user_cannot_bid(self):
+        """
+        Test that anonymous users receive a 401.
+        """
+        response = self.client.post(self.url, {'bid_amount': '20.00'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_bid_endpoint_accepts_bid(self):
+        """
+        Test that a valid bid returns 201 with the new current bid.
+        """
+        self.client.force_login(self.user)
+        response = self.client.post(self.url, {'bid_amount': '20.00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['current_bid'], '20.00')
+
+    def test_bid_endpoint_rejects_outbid(self):
+        """
+        Test that a losing bid returns 409 with a reason.
+        """
+        self.client.force_login(self.user)
+        response = self.client.post(self.url, {'bid_amount': '9.00'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['error'], 'below_starting_bid')
+
+    def test_bid_endpoint_requires_post(self):
+        """
+        Test that GET is not allowed.
+        """
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
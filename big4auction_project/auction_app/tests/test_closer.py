@@ -0,0 +1,186 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase
+from django.utils import timezone
+from auction_app.closer import AuctionScheduler, close_due_items
+from decimal import Decimal
+from auction_app.models import Item, Bid, Category, Notification, Transaction, User, UserStats
+
+class CloseDueItemsTest(TestCase):
+    def setUp(self):
+        """
+        Set up bidders and a helper for creating items ending at a given time.
+        """
+        self.category = Category.objects.create(category_name='Test Category')
+        self.alice = User.objects.create(username='alice', phone_number='1111111111')
+        self.bob = User.objects.create(username='bob', phone_number='2222222222')
+        self.now = timezone.now()
+
+    def make_item(self, title, ends_in, current_bid=10.00, seller=None):
+        return Item.objects.create(
+            seller=seller,
+            title=title,
+            slug=title.lower(),
+            description='This is a test item.',
+            category=self.category,
+            start_time=self.now - timezone.timedelta(days=1),
+            end_time=self.now + timezone.timedelta(seconds=ends_in),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=current_bid,
+        )
+
+    def test_items_are_sold_or_expired_against_reserve(self):
+        """
+        Test that due items meeting the reserve are sold and others expire.
+        """
+        sold_item = self.make_item('Sold', -5, current_bid=25.00)
+        Bid.objects.create(bidder=self.alice, item=sold_item, bid_amount=15.00)
+        Bid.objects.create(bidder=self.bob, item=sold_item, bid_amount=25.00)
+        under_reserve = self.make_item('Under', -5, current_bid=12.00)
+        Bid.objects.create(bidder=self.alice, item=under_reserve, bid_amount=12.00)
+        no_bids = self.make_item('Empty', -5)
+        running = self.make_item('Running', 3600)
+
+        sold, expired = close_due_items(self.now)
+
+        self.assertEqual(sold, [sold_item.id])
+        self.assertCountEqual(expired, [under_reserve.id, no_bids.id])
+        statuses = dict(Item.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[sold_item.id], 'sold')
+        self.assertEqual(statuses[under_reserve.id], 'expired')
+        self.assertEqual(statuses[no_bids.id], 'expired')
+        self.assertEqual(statuses[running.id], 'active')
+
+    def test_bidders_are_notified(self):
+        """
+        Test that the winner and losing bidders each get one notification and an unread count.
+        """
+        item = self.make_item('Sold', -5, current_bid=25.00)
+        Bid.objects.create(bidder=self.alice, item=item, bid_amount=15.00)
+        Bid.objects.create(bidder=self.alice, item=item, bid_amount=18.00)
+        Bid.objects.create(bidder=self.bob, item=item, bid_amount=25.00)
+
+        close_due_items(self.now)
+
+        self.assertIn('You won', Notification.objects.get(user=self.bob).message)
+        self.assertIn('outbid', Notification.objects.get(user=self.alice).message)
+        self.assertEqual(User.objects.get(pk=self.alice.pk).unread_notifications, 1)
+
+    def test_sold_items_get_a_transaction(self):
+        """
+        Test that each sold item with a seller gets one Transaction for the winning bid, counted in user stats.
+        """
+        carol = User.objects.create(username='carol', phone_number='3333333333')
+        lamp = self.make_item('Lamp', -5, current_bid=25.00, seller=carol)
+        Bid.objects.create(bidder=self.alice, item=lamp, bid_amount=21.00)
+        Bid.objects.create(bidder=self.bob, item=lamp, bid_amount=25.00)
+        vase = self.make_item('Vase', -5, current_bid=30.00, seller=carol)
+        Bid.objects.create(bidder=self.alice, item=vase, bid_amount=30.00)
+        under_reserve = self.make_item('Under', -5, current_bid=12.00, seller=carol)
+        Bid.objects.create(bidder=self.alice, item=under_reserve, bid_amount=12.00)
+
+        close_due_items(self.now)
+
+        self.assertCountEqual(
+            Transaction.objects.values_list('item_id', 'buyer_id', 'seller_id', 'transaction_amount', 'payment_method'),
+            [(lamp.id, self.bob.id, carol.id, Decimal('25.00'), None),
+             (vase.id, self.alice.id, carol.id, Decimal('30.00'), None)],
+        )
+        stats = UserStats.objects.get(user=carol)
+        self.assertEqual((stats.sales_count, stats.sales_total), (2, Decimal('55.00')))
+        stats = UserStats.objects.get(user=self.alice)
+        self.assertEqual((stats.purchases_count, stats.purchases_total), (1, Decimal('30.00')))
+
+        # Closing again finds nothing due and records no second sale.
+        close_due_items(self.now)
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        """
+        Test that closing is set-based rather than a query per item.
+        """
+        def queries_to_close(count):
+            for i in range(count):
+                item = self.make_item(f'Item{count}-{i}', -5, current_bid=25.00)
+                Bid.objects.create(bidder=self.alice, item=item, bid_amount=25.00)
+            with CaptureQueriesContext(connection) as context:
+                sold, _ = close_due_items(self.now)
+            self.assertEqual(len(sold), count)
+            return len(context.captured_queries)
+
+        self.assertEqual(queries_to_close(1), queries_to_close(5))
+
+    def test_batch_size_limits_closed_items(self):
+        """
+        Test that a single call closes at most ``batch_size`` items, soonest first.
+        """
+        first = self.make_item('First', -30)
+        self.make_item('Second', -10)
+        sold, expired = close_due_items(self.now, batch_size=1)
+        self.assertEqual(expired, [first.id])
+        self.assertEqual(Item.objects.filter(status='active').count(), 1)
+
+    def test_close_auctions_command(self):
+        """
+        Test the management command in one-shot mode.
+        """
+        self.make_item('Due', -5)
+        out = StringIO()
+        call_command('close_auctions', '--once', stdout=out)
+        self.assertIn('Closed 0 sold and 1 expired auctions.', out.getvalue())
+
+
+class AuctionSchedulerTest(TestCase):
+    def setUp(self):
+        """
+        Set up items ending soon, later, and beyond the scheduler horizon.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        self.now = timezone.now()
+        self.items = {}
+        for title, ends_in in (('Soon', 5), ('Later', 60), ('Far', 3600)):
+            self.items[title] = Item.objects.create(
+                title=title,
+                slug=title.lower(),
+                description='This is a test item.',
+                category=category,
+                start_time=self.now - timezone.timedelta(days=1),
+                end_time=self.now + timezone.timedelta(seconds=ends_in),
+                starting_bid=10.00,
+                reserve_price=20.00,
+                current_bid=10.00,
+            )
+
+    def test_load_only_keeps_items_within_horizon(self):
+        """
+        Test that only deadlines inside the horizon are kept in the heap.
+        """
+        scheduler = AuctionScheduler(horizon=120)
+        scheduler.load(self.now)
+        self.assertEqual(scheduler.next_deadline(), self.items['Soon'].end_time)
+        later = self.now + timezone.timedelta(seconds=120)
+        self.assertCountEqual(scheduler.pop_due(later), [self.items['Soon'].id, self.items['Later'].id])
+        self.assertIsNone(scheduler.next_deadline())
+
+    def test_run_once_closes_due_items(self):
+        """
+        Test that due heap entries close their items and others are untouched.
+        """
+        scheduler = AuctionScheduler(horizon=120)
+        scheduler.load(self.now)
+        self.assertEqual(scheduler.run_once(self.now), (0, 0))
+        self.assertEqual(scheduler.run_once(self.now + timezone.timedelta(seconds=10)), (0, 1))
+        self.assertEqual(Item.objects.get(pk=self.items['Soon'].id).status, 'expired')
+        self.assertEqual(Item.objects.get(pk=self.items['Later'].id).status, 'active')
+
+    def test_schedule_moves_deadline(self):
+        """
+        Test that a pushed deadline is picked up without reloading.
+        """
+        scheduler = AuctionScheduler(horizon=120)
+        far = self.items['Far']
+        scheduler.schedule(far.id, self.now + timezone.timedelta(seconds=1))
+        self.assertEqual(scheduler.pop_due(self.now + timezone.timedelta(seconds=2)), [far.id])
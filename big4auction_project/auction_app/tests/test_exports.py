@@ -0,0 +1,132 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import exports
+from auction_app.exports import EXPORTS, render
+from auction_app.models import Item, Category, User, Bid, Transaction, PaymentMethod, Report
+
+class ExportTest(TestCase):
+    def setUp(self):
+        """
+        Set up an item with three bids, a sale and a report whose text looks like a spreadsheet formula.
+        """
+        self.seller = User.objects.create(username='seller', phone_number='1111111111')
+        self.buyer = User.objects.create(username='buyer', phone_number='2222222222')
+        now = timezone.now()
+        self.item = Item.objects.create(
+            title='Lamp, brass',
+            slug='lamp',
+            description='A lamp.',
+            category=Category.objects.create(category_name='Home'),
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+            starting_bid=10.00,
+            reserve_price=10.00,
+            current_bid=0,
+        )
+        self.bids = [Bid.objects.create(item=self.item, bidder=self.buyer, bid_amount=Decimal(amount))
+                     for amount in ('11.00', '12.50', '14.00')]
+        Bid.objects.filter(pk=self.bids[0].pk).update(bid_time=now - timezone.timedelta(days=3))
+        Transaction.objects.create(buyer=self.buyer, seller=self.seller, item=self.item,
+                                   transaction_amount=Decimal('14.00'),
+                                   payment_method=PaymentMethod.objects.create(method='Card'))
+        Report.objects.create(reporter=self.buyer, reported_user=self.seller, report_description='=HYPERLINK("x")')
+
+    def export(self, name, fmt='csv', compress=False):
+        export = EXPORTS[name]
+        return b''.join(render(export, export.rows(), fmt, compress))
+
+    def test_csv_selects_columns_in_one_query(self):
+        """
+        Test the CSV header and rows, with foreign keys joined into a single query.
+        """
+        with self.assertNumQueries(1):
+            data = self.export('bids')
+        rows = list(csv.reader(io.StringIO(data.decode())))
+        self.assertEqual(rows[0], ['id', 'item_id', 'item', 'bidder_id', 'bidder', 'amount', 'bid_time'])
+        self.assertEqual([row[5] for row in rows[1:]], ['11.00', '12.50', '14.00'])
+        self.assertEqual(rows[1][2], 'Lamp, brass')
+
+    def test_rows_are_paged_by_primary_key(self):
+        """
+        Test that rows are read in keyset pages of the chunk size, continuing after the last primary key seen.
+        """
+        with self.assertNumQueries(2):
+            rows = list(EXPORTS['bids'].rows(chunk_size=2))
+        self.assertEqual([row[0] for row in rows], [bid.pk for bid in self.bids])
+        with self.assertNumQueries(1):
+            rows = list(EXPORTS['bids'].rows(Bid.objects.filter(pk__gt=self.bids[0].pk), chunk_size=5))
+        self.assertEqual([row[5] for row in rows], [Decimal('12.50'), Decimal('14.00')])
+
+    def test_formula_cells_are_escaped(self):
+        """
+        Test that user text starting with a formula character is quoted, and missing values are empty.
+        """
+        rows = list(csv.reader(io.StringIO(self.export('reports').decode())))
+        self.assertEqual(rows[1][5], '\'=HYPERLINK("x")')
+        self.assertEqual(rows[1][3], '')
+
+    def test_jsonl(self):
+        """
+        Test that JSON Lines output has one object per row.
+        """
+        lines = self.export('transactions', 'jsonl').decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['amount'], '14.00')
+        self.assertEqual(json.loads(lines[0])['payment_method'], 'Card')
+
+    def test_gzip_round_trip(self):
+        """
+        Test that compressed output decompresses to the plain export.
+        """
+        self.assertEqual(gzip.decompress(self.export('bids', compress=True)), self.export('bids'))
+
+    def test_output_is_emitted_in_bounded_blocks(self):
+        """
+        Test that rendering yields blocks as it goes instead of one body.
+        """
+        rows = ((i, i, 'item', i, 'bidder', Decimal('1.00'), 'now') for i in range(1000))
+        with mock.patch.object(exports, 'BLOCK_SIZE', 1024):
+            blocks = list(render(EXPORTS['bids'], rows))
+        self.assertGreater(len(blocks), 10)
+        self.assertLess(max(len(block) for block in blocks), 1024 + 100)
+
+    def test_admin_action_streams_selected_rows(self):
+        """
+        Test that the admin export action returns a streaming download of the selected rows only.
+        """
+        admin_user = User.objects.create_superuser(username='admin', password='pw', phone_number='3333333333')
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:auction_app_bid_changelist'), {
+            'action': 'export_csv_gz',
+            '_selected_action': [self.bids[0].pk, self.bids[2].pk],
+        })
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(gzip.decompress(b''.join(response.streaming_content)).decode())))
+        self.assertEqual([int(row[0]) for row in rows[1:]], [self.bids[0].pk, self.bids[2].pk])
+
+    def test_command(self):
+        """
+        Test the export command writing a filtered, compressed file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bids.jsonl.gz')
+            err = io.StringIO()
+            since = (timezone.now() - timezone.timedelta(days=1)).date().isoformat()
+            call_command('export_data', 'bids', '--format', 'jsonl', '--gzip', '--since', since,
+                         '--output', path, stderr=err)
+            with gzip.open(path, 'rt') as f:
+                ids = [json.loads(line)['id'] for line in f]
+        self.assertEqual(ids, [self.bids[1].pk, self.bids[2].pk])
+        self.assertIn('Exported 2 bids.', err.getvalue())
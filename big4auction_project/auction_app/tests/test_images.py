@@ -0,0 +1,149 @@
+import io
+import os
+import tempfile
+from unittest import mock
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import images
+from auction_app.images import ImageRejected, ImageStore, add_image, process_image
+from auction_app.models import Category, Item, ItemImage, User
+
+SIZES = {'thumb': 60, 'card': 200}
+
+def make_image(size=(800, 400), fmt='PNG', mode='RGBA', color=(200, 40, 40, 128)):
+    """
+    Return the bytes of a solid image with a vertical stripe, so resizes are not trivially uniform.
+    """
+    image = Image.new(mode, size, color if mode == 'RGBA' else color[:3])
+    image.paste((0, 0, 0, 255) if mode == 'RGBA' else (0, 0, 0), (0, 0, size[0] // 10, size[1]))
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+class ImagePipelineTest(TestCase):
+    def setUp(self):
+        """
+        Set up an item, its seller and an empty image store in a temporary directory.
+        """
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        override = override_settings(IMAGE_STORE_ROOT=self.root, IMAGE_STORE_URL='/media/images/', IMAGE_SIZES=SIZES,
+                                     IMAGE_FORMATS=('webp', 'jpeg'), IMAGE_WORKERS=0, RATE_LIMITS={})
+        override.enable()
+        self.addCleanup(override.disable)
+        now = timezone.now()
+        self.seller = User.objects.create_user(username='seller', phone_number='1111111111')
+        self.item = Item.objects.create(
+            seller=self.seller, title='Lamp', slug='lamp', description='A lamp.',
+            category=Category.objects.create(category_name='Lamps'),
+            start_time=now - timezone.timedelta(hours=1), end_time=now + timezone.timedelta(hours=1),
+            starting_bid=10, reserve_price=20, current_bid=10,
+        )
+
+    def stored_files(self):
+        return sorted(os.path.join(base, name) for base, _, names in os.walk(self.root) for name in names)
+
+    def test_store_is_content_addressed(self):
+        """
+        Test that equal bytes are stored once under their hash, and only well-formed names resolve.
+        """
+        store = ImageStore(self.root, '/media/images/')
+        name = store.save(b'thumbnail bytes', 'jpg')
+        self.assertEqual(store.save(b'thumbnail bytes', 'jpg'), name)
+        self.assertRegex(name, r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(store.path(name), os.path.join(self.root, name))
+        self.assertIsNone(store.path('../../settings.py'))
+        self.assertIsNone(store.path('00/11/' + name.rsplit('/', 1)[1]))
+
+    def test_upload_is_rendered_at_every_size_and_format(self):
+        """
+        Test that an upload gets a WebP and a JPEG per size, scaled to fit, with transparency flattened.
+        """
+        image = add_image(self.item, make_image())
+        self.assertEqual(image.variants['card']['width'], 200)
+        self.assertEqual((image.variants['thumb']['width'], image.variants['thumb']['height']), (60, 30))
+        self.assertEqual(len(self.stored_files()), 4)
+        with Image.open(os.path.join(self.root, image.variants['thumb']['webp'])) as webp:
+            self.assertEqual((webp.format, webp.size), ('WEBP', (60, 30)))
+        with Image.open(os.path.join(self.root, image.variants['card']['jpeg'])) as jpeg:
+            self.assertEqual((jpeg.format, jpeg.mode), ('JPEG', 'RGB'))
+        self.assertEqual(image.url('thumb', 'webp'), '/media/images/' + image.variants['thumb']['webp'])
+
+        # Small images are never enlarged.
+        small = add_image(self.item, make_image((40, 20), 'JPEG', 'RGB'))
+        self.assertEqual((small.variants['card']['width'], small.variants['card']['height']), (40, 20))
+
+    def test_duplicate_upload_reuses_variants(self):
+        """
+        Test that the same bytes uploaded again are not decoded and share the first upload's files.
+        """
+        data = make_image()
+        first = add_image(self.item, data)
+        with mock.patch('auction_app.images.render_variants') as render:
+            second = add_image(self.item, data)
+        render.assert_not_called()
+        self.assertEqual((second.digest, second.variants), (first.digest, first.variants))
+        self.assertEqual(len(self.stored_files()), 4)
+
+        # A new size list renders again.
+        with override_settings(IMAGE_SIZES={'thumb': 60}):
+            self.assertEqual(list(process_image(data)[1]), ['thumb'])
+
+    def test_bad_uploads_are_rejected(self):
+        """
+        Test that non-images, oversized files and images with too many pixels are rejected before anything is stored.
+        """
+        with self.assertRaises(ImageRejected) as raised:
+            process_image(b'not an image')
+        self.assertEqual(raised.exception.reason, 'invalid')
+        with override_settings(IMAGE_MAX_BYTES=100), self.assertRaises(ImageRejected) as raised:
+            process_image(make_image())
+        self.assertEqual(raised.exception.reason, 'too_large')
+        with override_settings(IMAGE_MAX_PIXELS=1000), self.assertRaises(ImageRejected) as raised:
+            process_image(make_image())
+        self.assertEqual(raised.exception.reason, 'invalid')
+        self.assertEqual(self.stored_files(), [])
+
+    def test_upload_view_and_immutable_serving(self):
+        """
+        Test that only the seller can upload, listings show the thumbnail, and files are served as immutable.
+        """
+        url = reverse('upload_item_image', args=[self.item.id])
+        upload = lambda: SimpleUploadedFile('lamp.png', make_image(), content_type='image/png')
+        self.assertEqual(self.client.post(url, {'image': upload()}).status_code, 401)
+        self.client.force_login(User.objects.create_user(username='other', phone_number='2222222222'))
+        self.assertEqual(self.client.post(url, {'image': upload()}).status_code, 403)
+        self.client.force_login(self.seller)
+        self.assertEqual(self.client.post(url, {}).json()['error'], 'invalid')
+        response = self.client.post(url, {'image': upload()})
+        self.assertEqual(response.status_code, 201)
+        thumb = response.json()['variants']['thumb']
+        self.assertEqual(ItemImage.objects.get(pk=response.json()['id']).item_id, self.item.id)
+
+        listed = self.client.get(reverse('item_list'), {'format': 'json'}).json()['items'][0]
+        self.assertEqual((listed['thumbnail'], listed['images']), (thumb, [thumb['jpeg']]))
+
+        response = self.client.get(thumb['webp'])
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'image/webp'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response.headers['ETag'], '"%s"' % thumb['webp'].rsplit('/', 1)[1].split('.')[0])
+        self.assertEqual(self.client.get(thumb['webp'], HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/media/images/00/00/missing.jpg').status_code, 404)
+
+    @override_settings(IMAGE_WORKERS=1)
+    def test_worker_pool_renders(self):
+        """
+        Test that uploads are rendered in a worker process and decode errors come back as rejections.
+        """
+        self.addCleanup(images.shutdown_pool)
+        image = add_image(self.item, make_image())
+        self.assertEqual(image.variants['thumb']['width'], 60)
+        with self.assertRaises(ImageRejected):
+            process_image(b'not an image')
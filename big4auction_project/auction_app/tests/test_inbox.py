@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.inbox import fetch_inbox, wait_for_new, inbox_hub
+from auction_app.listings import InvalidCursor
+from auction_app.models import Notification, User
+from auction_app.notifications import send
+
+class InboxTest(TestCase):
+    def setUp(self):
+        """
+        Set up a user with five notifications, two of them sharing a timestamp, and one read.
+        """
+        cache.clear()
+        self.user = User.objects.create(username='reader', phone_number='1234567890')
+        self.other = User.objects.create(username='other', phone_number='0987654321')
+        send([(self.user.id, f'Message {i}') for i in range(5)] + [(self.other.id, 'Not yours')])
+        now = timezone.now()
+        notifications = list(Notification.objects.filter(user=self.user).order_by('id'))
+        for i, notification in enumerate(notifications):
+            # Two notifications share a timestamp to exercise the id tie-breaker.
+            notification.timestamp = now - timezone.timedelta(minutes=10 - min(i, 3))
+        Notification.objects.bulk_update(notifications, ['timestamp'])
+        Notification.objects.filter(pk=notifications[0].pk).update(read_status='read')
+        self.notifications = notifications
+
+    def collect(self, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = fetch_inbox(self.user.id, cursor=cursor, page_size=2, **kwargs)
+            ids += [notification['id'] for notification in page['notifications']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_cursor_pages_newest_first(self):
+        """
+        Test that walking the cursors returns every notification once, newest first.
+        """
+        expected = [n.id for n in sorted(self.notifications, key=lambda n: (n.timestamp, n.id), reverse=True)]
+        self.assertEqual(self.collect(), expected)
+
+    def test_read_status_filter(self):
+        """
+        Test filtering on read_status.
+        """
+        self.assertEqual(self.collect(read_status='read'), [self.notifications[0].id])
+        self.assertEqual(len(self.collect(read_status='unread')), 4)
+
+    def test_invalid_cursor(self):
+        """
+        Test that a tampered cursor is rejected.
+        """
+        with self.assertRaises(InvalidCursor):
+            fetch_inbox(self.user.id, cursor='garbage')
+
+    def test_inbox_view(self):
+        """
+        Test the JSON endpoint, including the unread badge count and authentication.
+        """
+        self.assertEqual(self.client.get(reverse('notification_inbox')).status_code, 401)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('notification_inbox'), {'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(len(body['notifications']), 3)
+        self.assertIsNotNone(body['next_cursor'])
+        self.assertEqual(body['unread'], 5)
+        self.assertEqual(self.client.get(reverse('notification_inbox'), {'read_status': 'bogus'}).status_code, 400)
+        waited = self.client.get(reverse('notification_inbox'), {'wait': 1, 'after': self.notifications[2].id})
+        self.assertEqual([n['id'] for n in json.loads(waited.content)['notifications']],
+                         [n.id for n in self.notifications[3:]])
+
+    def test_read_all_view(self):
+        """
+        Test that the read-all endpoint marks every unread notification.
+        """
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('notifications_read_all'))
+        self.assertEqual(json.loads(response.content), {'marked': 4})
+        self.assertFalse(Notification.objects.filter(user=self.user, read_status='unread').exists())
+
+
+class LongPollTest(TestCase):
+    def setUp(self):
+        """
+        Set up a user with one existing notification.
+        """
+        cache.clear()
+        self.user = User.objects.create(username='waiter', phone_number='1234567890')
+        send([(self.user.id, 'Old')])
+        self.last_id = Notification.objects.get(user=self.user).id
+
+    def send_committed(self, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            send([(self.user.id, message)])
+
+    def test_returns_immediately_when_something_is_new(self):
+        """
+        Test that a wait returns at once when there is already a newer notification.
+        """
+        notifications = async_to_sync(wait_for_new)(self.user.id, 0, timeout=5)
+        self.assertEqual([n['message'] for n in notifications], ['Old'])
+
+    def test_wakes_on_dispatch(self):
+        """
+        Test that a parked request is woken by the dispatcher rather than by polling.
+        """
+        async def scenario():
+            waiting = asyncio.ensure_future(wait_for_new(self.user.id, self.last_id, timeout=5))
+            while inbox_hub.listeners(self.user.id) == 0:
+                await asyncio.sleep(0.01)
+            started = time.perf_counter()
+            await sync_to_async(self.send_committed)('Outbid!')
+            notifications = await waiting
+            return notifications, time.perf_counter() - started
+
+        notifications, elapsed = async_to_sync(scenario)()
+        self.assertEqual([n['message'] for n in notifications], ['Outbid!'])
+        self.assertLess(elapsed, 1)
+        self.assertEqual(inbox_hub.listeners(self.user.id), 0)
+
+    def test_timeout_returns_empty(self):
+        """
+        Test that a wait with nothing new ends empty after the timeout.
+        """
+        self.assertEqual(async_to_sync(wait_for_new)(self.user.id, self.last_id, timeout=0.05), [])
+        self.assertEqual(inbox_hub.listeners(self.user.id), 0)
@@ -0,0 +1,88 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from auction_app.bidding import place_bid
+from auction_app.item_cache import get_static, get_live
+from auction_app.models import Item, ItemImage, Category, User
+
+class ItemDetailTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item with an image and a bidder.
+        """
+        cache.clear()
+        category = Category.objects.create(category_name='Test Category')
+        self.user = User.objects.create(username='bidder', phone_number='1234567890')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+        )
+        ItemImage.objects.create(item=self.item, image_url='https://example.com/image.jpg')
+
+    def test_detail_page_renders(self):
+        """
+        Test that the detail page shows the static and live parts.
+        """
+        response = self.client.get(self.item.get_absolute_url())
+        self.assertContains(response, 'Test Item')
+        self.assertContains(response, 'https://example.com/image.jpg')
+        self.assertContains(response, 'Test Category')
+        self.assertContains(response, '<dd id="bid-count">0</dd>')
+
+    def test_cached_detail_page_runs_no_queries(self):
+        """
+        Test that a warm detail page needs no database queries.
+        """
+        url = self.item.get_absolute_url()
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_bid_invalidates_only_live_fragment(self):
+        """
+        Test that a bid drops the live entry and keeps the static fragment.
+        """
+        get_static(self.item.id)
+        get_live(self.item.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.item.id, self.user, Decimal('12.00'))
+        with self.assertNumQueries(0):
+            get_static(self.item.id)
+        with self.assertNumQueries(1):
+            live = get_live(self.item.id)
+        self.assertEqual(live['current_bid'], Decimal('12.00'))
+        self.assertEqual(live['bid_count'], 1)
+
+    def test_editing_item_invalidates_static_fragment(self):
+        """
+        Test that saving the item or its images refreshes the static fragment.
+        """
+        get_static(self.item.id)
+        self.item.title = 'Renamed Item'
+        self.item.save()
+        self.assertIn('Renamed Item', get_static(self.item.id)['html'])
+        ItemImage.objects.create(item=self.item, image_url='https://example.com/second.jpg')
+        self.assertIn('second.jpg', get_static(self.item.id)['html'])
+
+    def test_wrong_slug_redirects_to_canonical_url(self):
+        """
+        Test that a stale slug redirects permanently to the canonical URL.
+        """
+        url = self.item.get_absolute_url().replace('test-item', 'old-slug')
+        response = self.client.get(url)
+        self.assertRedirects(response, self.item.get_absolute_url(), status_code=301)
+
+    def test_missing_item_returns_404(self):
+        """
+        Test that an unknown item id returns 404.
+        """
+        url = self.item.get_absolute_url().replace(f'/{self.item.id}/', f'/{self.item.id + 100}/')
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -134,7 +134,10 @@ class ItemModelTest(TestCase):
         with self.assertRaises(Item.DoesNotExist):
             Item.objects.get(pk=item_id)
 
-    '''def test_item_absolute_url(self):
+    def test_item_absolute_url(self):
+        """
+        Test the canonical URL of the Item model.
+        """
         expected_url = reverse('item_detail', kwargs={
             'year': self.item.created.year,
             'month': self.item.created.month,
@@ -142,4 +145,4 @@ class ItemModelTest(TestCase):
             'id': self.item.id,
             'slug': self.item.slug,
         })
-        self.assertEqual(self.item.get_absolute_url(), expected_url)'''
\ No newline at end of file
+        self.assertEqual(self.item.get_absolute_url(), expected_url)
\ No newline at end of file
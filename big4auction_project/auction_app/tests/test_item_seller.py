@@ -0,0 +1,147 @@
+import importlib
+from decimal import Decimal
+from types import SimpleNamespace
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.closer import close_due_items
+from auction_app.listings import get_page
+from auction_app.models import Item, Bid, Category, Notification, PaymentMethod, Transaction, User, UserStats
+
+backfill = importlib.import_module('auction_app.migrations.0014_backfill_item_seller')
+
+class ItemSellerTest(TestCase):
+    def setUp(self):
+        """
+        Set up two sellers, a buyer and a helper for creating their items.
+        """
+        cache.clear()
+        self.category = Category.objects.create(category_name='Test Category')
+        self.seller = User.objects.create(username='seller', phone_number='1111111111')
+        self.other = User.objects.create(username='other', phone_number='2222222222')
+        self.buyer = User.objects.create(username='buyer', phone_number='3333333333')
+        self.now = timezone.now()
+
+    def make_item(self, title, seller=None, ends_in=3600):
+        return Item.objects.create(
+            title=title,
+            slug=title.lower().replace(' ', '-'),
+            description='This is a test item.',
+            category=self.category,
+            seller=seller,
+            start_time=self.now - timezone.timedelta(days=1),
+            end_time=self.now + timezone.timedelta(seconds=ends_in),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+        )
+
+    def active_listings(self, user):
+        return UserStats.objects.filter(user=user).values_list('active_listings', flat=True).first() or 0
+
+    def test_active_listings_follow_saves_and_deletes(self):
+        """
+        Test that creating, reassigning, closing and deleting items keeps the seller's count in step.
+        """
+        first = self.make_item('First', self.seller)
+        second = self.make_item('Second', self.seller)
+        self.assertEqual(self.active_listings(self.seller), 2)
+
+        second.seller = self.other
+        second.save()
+        self.assertEqual((self.active_listings(self.seller), self.active_listings(self.other)), (1, 1))
+
+        first.status = 'expired'
+        first.save()
+        second.delete()
+        self.assertEqual((self.active_listings(self.seller), self.active_listings(self.other)), (0, 0))
+
+    def test_closer_notifies_sellers_and_decrements_listings(self):
+        """
+        Test that closing items tells each seller the outcome and drops them from the active count.
+        """
+        sold = self.make_item('Sold', self.seller, ends_in=-5)
+        Bid.objects.create(bidder=self.buyer, item=sold, bid_amount=Decimal('25.00'))
+        self.make_item('Unsold', self.seller, ends_in=-5)
+        self.make_item('Running', self.seller)
+        self.make_item('Legacy', ends_in=-5)
+
+        close_due_items(self.now)
+
+        self.assertEqual(self.active_listings(self.seller), 1)
+        messages = sorted(Notification.objects.filter(user=self.seller).values_list('message', flat=True))
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0], 'Your auction for "Unsold" ended without a sale.')
+        self.assertTrue(messages[1].startswith('Your item "Sold" sold for 25'))
+
+    def test_transaction_seller_must_match_item(self):
+        """
+        Test that a sale recorded against someone other than the listing's seller is rejected.
+        """
+        item = self.make_item('Lamp', self.seller)
+        sale = Transaction(buyer=self.buyer, seller=self.other, item=item, transaction_amount=Decimal('25.00'),
+                           payment_method=PaymentMethod.objects.create(method='Card'))
+        with self.assertRaises(ValidationError):
+            sale.clean()
+        sale.seller = self.seller
+        sale.clean()
+
+    def test_listings_filter_by_seller(self):
+        """
+        Test the seller filter on listing pages and the signed-in "my listings" view.
+        """
+        mine = [self.make_item(f'Mine {i}', self.seller).id for i in range(3)]
+        self.make_item('Theirs', self.other)
+        page = get_page(seller_id=self.seller.id)
+        self.assertCountEqual([item['id'] for item in page['items']], mine)
+
+        url = reverse('item_list')
+        self.assertEqual(self.client.get(url, {'format': 'json', 'seller': 'me'}).status_code, 401)
+        self.assertEqual(self.client.get(url, {'format': 'json', 'seller': 'x'}).status_code, 400)
+        self.client.force_login(self.seller)
+        response = self.client.get(url, {'format': 'json', 'seller': 'me'})
+        self.assertCountEqual([item['id'] for item in response.json()['items']], mine)
+
+    def test_seller_listing_query_uses_index(self):
+        """
+        Test that a seller's active listings ordered by end time are read from the composite index.
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        queryset = Item.objects.filter(seller_id=self.seller.id, status='active').order_by('end_time')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('item_seller_status_end_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_backfill_takes_seller_from_first_sale(self):
+        """
+        Test that the backfill copies the earliest transaction's seller in batches and leaves unsold items empty.
+        """
+        card = PaymentMethod.objects.create(method='Card')
+        items = [self.make_item(f'Old {i}') for i in range(5)]
+        for item in items[:4]:
+            Transaction.objects.create(buyer=self.buyer, seller=self.seller, item=item,
+                                       transaction_amount=Decimal('25.00'), payment_method=card)
+        later = Transaction.objects.create(buyer=self.buyer, seller=self.other, item=items[0],
+                                           transaction_amount=Decimal('30.00'), payment_method=card)
+        Transaction.objects.filter(pk=later.pk).update(transaction_date=self.now + timezone.timedelta(days=1))
+        UserStats.objects.all().delete()
+
+        schema_editor = SimpleNamespace(connection=connection)
+        backfill.BATCH_SIZE, batch_size = 2, backfill.BATCH_SIZE
+        try:
+            backfill.backfill_sellers(apps, schema_editor)
+            backfill.count_active_listings(apps, schema_editor)
+        finally:
+            backfill.BATCH_SIZE = batch_size
+
+        sellers = dict(Item.objects.filter(pk__in=[item.pk for item in items]).values_list('pk', 'seller_id'))
+        self.assertEqual([sellers[item.pk] for item in items], [self.seller.id] * 4 + [None])
+        self.assertEqual(self.active_listings(self.seller), 4)
@@ -0,0 +1,106 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.bidding import place_bid
+from auction_app.listings import get_page, fetch_page, InvalidCursor
+from auction_app.models import Item, ItemImage, Category, User
+
+class ListingsTest(TestCase):
+    def setUp(self):
+        """
+        Set up two categories with active items and one sold item.
+        """
+        cache.clear()
+        self.books = Category.objects.create(category_name='Books')
+        self.games = Category.objects.create(category_name='Games')
+        self.user = User.objects.create(username='bidder', phone_number='1234567890')
+        now = timezone.now()
+        self.items = []
+        for i in range(7):
+            item = Item.objects.create(
+                title=f'Item {i}',
+                slug=f'item-{i}',
+                description='This is a test item.',
+                category=self.books if i % 2 == 0 else self.games,
+                start_time=now - timezone.timedelta(days=1),
+                # Two items share an end time to exercise the id tie-breaker.
+                end_time=now + timezone.timedelta(hours=min(i, 5)),
+                starting_bid=10.00,
+                reserve_price=20.00,
+                current_bid=10 + (7 - i),
+            )
+            ItemImage.objects.create(item=item, image_url=f'https://example.com/{i}.jpg')
+            self.items.append(item)
+        Item.objects.filter(pk=self.items[0].pk).update(status='sold')
+
+    def collect(self, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page = get_page(cursor=cursor, page_size=2, **kwargs)
+            ids += [item['id'] for item in page['items']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_keyset_pages_cover_all_items_in_order(self):
+        """
+        Test that walking the cursors returns every active item exactly once, ending soonest first.
+        """
+        self.assertEqual(self.collect(), [item.id for item in self.items[1:]])
+
+    def test_price_sort_and_category_filter(self):
+        """
+        Test sorting by current bid within a category.
+        """
+        ids = self.collect(category_id=self.books.id, sort='price')
+        self.assertEqual(ids, [self.items[6].id, self.items[4].id, self.items[2].id])
+
+    def test_page_costs_constant_queries(self):
+        """
+        Test that an uncached page takes two queries and a cached one none.
+        """
+        with self.assertNumQueries(2):
+            fetch_page(page_size=5)
+        get_page(page_size=5)
+        with self.assertNumQueries(0):
+            page = get_page(page_size=5)
+        self.assertEqual(page['items'][0]['images'], ['https://example.com/1.jpg'])
+
+    def test_bid_invalidates_cached_page(self):
+        """
+        Test that a bid on an item drops the cached page showing it.
+        """
+        get_page(page_size=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.items[1].id, self.user, Decimal('100.00'))
+        page = get_page(page_size=5)
+        self.assertEqual(page['items'][0]['current_bid'], '100.00')
+
+    def test_tampered_cursor_is_rejected(self):
+        """
+        Test that a modified or mismatched cursor raises InvalidCursor.
+        """
+        cursor = get_page(page_size=2)['next_cursor']
+        with self.assertRaises(InvalidCursor):
+            get_page(cursor=cursor[:-2] + 'xx')
+        with self.assertRaises(InvalidCursor):
+            get_page(cursor=cursor, sort='price')
+
+    def test_item_list_view(self):
+        """
+        Test the JSON and HTML renderings of the listing endpoint.
+        """
+        url = reverse('item_list')
+        response = self.client.get(url, {'format': 'json', 'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['items']), 3)
+        self.assertIsNotNone(response.json()['next_cursor'])
+
+        response = self.client.get(url)
+        self.assertContains(response, 'Item 1')
+        self.assertNotContains(response, 'Item 0')
+
+        response = self.client.get(url, {'format': 'json', 'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,74 @@
+from unittest import mock
+from django.contrib.auth import authenticate, hashers
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from auction_app.models import User
+
+@override_settings(PASSWORD_ITERATIONS=1000)
+class EmailLoginTest(TestCase):
+    def setUp(self):
+        """
+        Set up a user who logs in with their email address.
+        """
+        self.user = User.objects.create_user(
+            username='alice', email='alice@example.com', phone_number='1111111111', password='secret',
+        )
+
+    def login(self, email, password):
+        return self.client.post(reverse('login'), {'email': email, 'password': password})
+
+    def test_login_by_email(self):
+        """
+        Test that the right password logs in and a wrong one or unknown email is sent back to the form.
+        """
+        self.assertRedirects(self.login('alice@example.com', 'wrong'), reverse('login'), fetch_redirect_response=False)
+        self.assertRedirects(self.login('bob@example.com', 'secret'), reverse('login'), fetch_redirect_response=False)
+        response = self.login('alice@example.com', 'secret')
+        self.assertEqual(response.content, b'success')
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+    def test_admin_username_login_still_works(self):
+        """
+        Test that username credentials fall through to the model backend.
+        """
+        self.assertEqual(authenticate(username='alice', password='secret'), self.user)
+        self.assertIsNone(authenticate(email='alice', password='secret'))
+
+    def test_rehash_on_login(self):
+        """
+        Test that a hash at an old cost or with an old algorithm is replaced at the configured cost.
+        """
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('secret', hasher='pbkdf2_sha1'),
+        )
+        with override_settings(PASSWORD_ITERATIONS=2000):
+            self.assertEqual(authenticate(email='alice@example.com', password='secret'), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertEqual(authenticate(email='alice@example.com', password='secret'), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_every_rejection_costs_one_hash(self):
+        """
+        Test that unknown emails and unusable passwords are hashed against like wrong passwords.
+        """
+        User.objects.create_user(username='bob', email='bob@example.com', phone_number='2222222222')
+        for email, password in (('alice@example.com', 'wrong'), ('nobody@example.com', 'secret'),
+                                ('bob@example.com', 'secret')):
+            with self.subTest(email=email), mock.patch.object(hashers, 'pbkdf2', wraps=hashers.pbkdf2) as pbkdf2:
+                with self.assertNumQueries(1):
+                    self.assertIsNone(authenticate(email=email, password=password))
+                self.assertEqual(pbkdf2.call_count, 1)
+
+    def test_email_is_unique_but_optional(self):
+        """
+        Test that many users may have no email, but two may not share one.
+        """
+        User.objects.create_user(username='bob', phone_number='2222222222')
+        User.objects.bulk_create([User(username='carol', phone_number='3333333333')])
+        self.assertEqual(User.objects.filter(email__isnull=True).count(), 2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username='dave', email='alice@example.com', phone_number='4444444444')
@@ -0,0 +1,133 @@
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from auction_app import notifications
+from auction_app.models import Notification, User
+from auction_app.notifications import NotificationDispatcher, send, unread_count, mark_all_read, mark_read, reconcile_unread
+
+class NotificationsTest(TestCase):
+    def setUp(self):
+        """
+        Set up three users with empty inboxes.
+        """
+        cache.clear()
+        self.users = [
+            User.objects.create(username=f'user{i}', phone_number=f'12345{i}') for i in range(3)
+        ]
+
+    def counts(self):
+        return [User.objects.get(pk=user.pk).unread_notifications for user in self.users]
+
+    def test_send_writes_rows_and_counters_in_bulk(self):
+        """
+        Test that a fan-out is one INSERT plus one counter UPDATE per distinct increment.
+        """
+        pairs = [(user.id, 'Auction closed.') for user in self.users] + [(self.users[0].id, 'You won.')]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(send(pairs), 4)
+        writes = [q['sql'].split()[0] for q in queries.captured_queries if q['sql'].split()[0] in ('INSERT', 'UPDATE')]
+        self.assertEqual(writes, ['INSERT', 'UPDATE', 'UPDATE'])
+        self.assertEqual(self.counts(), [2, 1, 1])
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_unread_count_never_counts_rows(self):
+        """
+        Test that the badge count is read from the column once and then from the cache.
+        """
+        send([(self.users[0].id, 'Hello')] * 3)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(unread_count(self.users[0].id), 3)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries.captured_queries[0]['sql'].upper())
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.users[0].id), 3)
+
+    def test_count_filled_during_a_send_expires_quickly(self):
+        """
+        Test that a count read before a concurrent send committed is served for at most UNREAD_TIMEOUT seconds.
+        """
+        now = time.time()
+        with mock.patch('time.time', return_value=now):
+            self.assertEqual(unread_count(self.users[0].id), 0)
+        # A send that committed, and dropped the cached count, before the stale count above was stored.
+        User.objects.filter(pk=self.users[0].pk).update(unread_notifications=2)
+        with mock.patch('time.time', return_value=now + notifications.UNREAD_TIMEOUT - 1):
+            self.assertEqual(unread_count(self.users[0].id), 0)
+        with mock.patch('time.time', return_value=now + notifications.UNREAD_TIMEOUT + 1):
+            self.assertEqual(unread_count(self.users[0].id), 2)
+
+    def test_send_invalidates_cached_count(self):
+        """
+        Test that a cached badge count is refreshed after new notifications.
+        """
+        self.assertEqual(unread_count(self.users[1].id), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            send([(self.users[1].id, 'Outbid')])
+        self.assertEqual(unread_count(self.users[1].id), 1)
+
+    def test_mark_all_read_is_one_update(self):
+        """
+        Test that marking everything read is a single UPDATE on the notifications plus the counter reset.
+        """
+        send([(self.users[0].id, 'One'), (self.users[0].id, 'Two'), (self.users[1].id, 'Other')])
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(mark_all_read(self.users[0].id), 2)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.counts(), [0, 1, 0])
+        self.assertEqual(unread_count(self.users[0].id), 0)
+        self.assertEqual(Notification.objects.filter(read_status='unread').count(), 1)
+
+    def test_mark_read_decrements(self):
+        """
+        Test that marking some notifications read only counts those that were unread.
+        """
+        send([(self.users[2].id, 'A'), (self.users[2].id, 'B')])
+        first = Notification.objects.filter(user=self.users[2]).first()
+        self.assertEqual(mark_read(self.users[2].id, [first.id]), 1)
+        self.assertEqual(mark_read(self.users[2].id, [first.id]), 0)
+        self.assertEqual(self.counts()[2], 1)
+
+    def test_reconcile_repairs_drift(self):
+        """
+        Test that reconciling recounts the column from the rows.
+        """
+        send([(self.users[0].id, 'A')])
+        User.objects.filter(pk=self.users[0].pk).update(unread_notifications=9)
+        reconcile_unread()
+        self.assertEqual(self.counts(), [1, 0, 0])
+
+
+class NotificationDispatcherTest(TestCase):
+    def setUp(self):
+        """
+        Set up a user and a dispatcher with small batches.
+        """
+        self.user = User.objects.create(username='user', phone_number='1234567890')
+        self.dispatcher = NotificationDispatcher(batch_size=2)
+
+    def test_flush_writes_in_batches(self):
+        """
+        Test that buffered notifications are written in batch_size chunks.
+        """
+        for i in range(5):
+            self.dispatcher.add(self.user.id, f'Message {i}')
+        with mock.patch.object(notifications, 'send', wraps=notifications.send) as sent:
+            self.assertEqual(self.dispatcher.flush(), 5)
+        self.assertEqual([len(call.args[0]) for call in sent.call_args_list], [2, 2, 1])
+        self.assertEqual(self.dispatcher.pending(), 0)
+        self.assertEqual(User.objects.get(pk=self.user.pk).unread_notifications, 5)
+
+    def test_failed_batch_is_kept(self):
+        """
+        Test that a batch that fails to write stays buffered for the next flush.
+        """
+        self.dispatcher.extend([(self.user.id, 'A'), (self.user.id, 'B')])
+        with mock.patch.object(notifications, 'send', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                self.dispatcher.flush()
+        self.assertEqual(self.dispatcher.pending(), 2)
+        self.assertEqual(self.dispatcher.flush(), 2)
@@ -0,0 +1,133 @@
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from auction_app.bidding import BidRejected
+from auction_app.models import Item, Bid, Category, User
+from auction_app.orderbook import OrderBook
+from auction_app.signals import item_changed
+
+class OrderBookTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item, two bidders and an empty order book.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        self.alice = User.objects.create(username='alice', phone_number='1111111111')
+        self.bob = User.objects.create(username='bob', phone_number='2222222222')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+            status='active',
+        )
+        self.book = OrderBook(depth=3, batch_size=2)
+
+    def test_submit_is_write_behind(self):
+        """
+        Test that accepted bids are only written to the database on flush.
+        """
+        self.book.submit(self.item.id, self.alice.id, Decimal('11.00'))
+        self.book.submit(self.item.id, self.bob.id, Decimal('12.00'))
+        self.assertEqual(Bid.objects.count(), 0)
+        self.assertEqual(self.book.pending(), 2)
+
+        self.assertEqual(self.book.flush(), 2)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('12.00'))
+        self.assertEqual(Bid.objects.filter(item=self.item).count(), 2)
+        self.assertEqual(self.book.pending(), 0)
+
+    def test_item_changed_is_sent_after_the_flush_commits(self):
+        """
+        Test that watchers hear about accepted bids only once the flush that saves them has committed.
+        """
+        receiver = mock.Mock()
+        item_changed.connect(receiver)
+        self.addCleanup(item_changed.disconnect, receiver)
+        self.book.submit(self.item.id, self.alice.id, Decimal('11.00'))
+        self.book.submit(self.item.id, self.bob.id, Decimal('12.00'))
+        receiver.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.book.flush()
+            receiver.assert_not_called()
+        self.assertEqual(len(callbacks), 1)
+        receiver.assert_called_once_with(signal=item_changed, sender=Item, item_id=self.item.id,
+                                         current_bid=Decimal('12.00'), new_bids=2, end_time=None)
+
+    def test_flush_drops_bids_overtaken_in_the_database(self):
+        """
+        Test that bids beaten by another writer, or on an item closed since they were accepted, are not written.
+        """
+        accepted_at = timezone.now() - timezone.timedelta(seconds=30)
+        self.book.submit(self.item.id, self.alice.id, Decimal('11.00'), now=accepted_at)
+        self.book.submit(self.item.id, self.bob.id, Decimal('14.00'), now=accepted_at)
+        Item.objects.filter(pk=self.item.pk).update(current_bid=Decimal('12.00'))
+
+        self.assertEqual(self.book.flush(), 1)
+        bid = Bid.objects.get()
+        self.assertEqual((bid.bidder_id, bid.bid_amount, bid.bid_time), (self.bob.id, Decimal('14.00'), accepted_at))
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('14.00'))
+
+        self.book.submit(self.item.id, self.alice.id, Decimal('20.00'))
+        Item.objects.filter(pk=self.item.pk).update(status='sold')
+        self.assertEqual(self.book.flush(), 0)
+        self.assertEqual(Bid.objects.count(), 1)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('14.00'))
+        # The book was evicted, so the next bid sees the closed item.
+        with self.assertRaises(BidRejected):
+            self.book.submit(self.item.id, self.bob.id, Decimal('25.00'))
+
+    def test_submit_rejects_without_database_writes(self):
+        """
+        Test that losing bids are rejected against in-memory state.
+        """
+        self.book.submit(self.item.id, self.alice.id, Decimal('15.00'))
+        with self.assertNumQueries(0):
+            with self.assertRaises(BidRejected) as context:
+                self.book.submit(self.item.id, self.bob.id, Decimal('15.00'))
+        self.assertEqual(context.exception.reason, 'outbid')
+        self.assertEqual(self.book.pending(), 1)
+
+    def test_book_keeps_top_n_bids(self):
+        """
+        Test that only the configured number of top bids is kept.
+        """
+        for amount in ('11', '12', '13', '14', '15'):
+            self.book.submit(self.item.id, self.alice.id, Decimal(amount))
+        top = self.book.book_for(self.item.id).top_bids()
+        self.assertEqual([amount for amount, _ in top], [Decimal('15'), Decimal('14'), Decimal('13')])
+
+    def test_recover_rebuilds_from_bid_table(self):
+        """
+        Test that a fresh book rebuilds its state from persisted bids.
+        """
+        self.book.submit(self.item.id, self.alice.id, Decimal('11.00'))
+        self.book.submit(self.item.id, self.bob.id, Decimal('14.00'))
+        self.book.flush()
+
+        restarted = OrderBook(depth=3)
+        self.assertEqual(restarted.recover(), 1)
+        state = restarted.book_for(self.item.id)
+        self.assertEqual(state.current_bid, Decimal('14.00'))
+        self.assertEqual(state.top_bids()[0], (Decimal('14.00'), self.bob.id))
+        with self.assertRaises(BidRejected):
+            restarted.submit(self.item.id, self.alice.id, Decimal('13.00'))
+
+    def test_inactive_item_is_rejected(self):
+        """
+        Test that items which are not active cannot be loaded into the book.
+        """
+        Item.objects.filter(pk=self.item.pk).update(status='expired')
+        with self.assertRaises(BidRejected) as context:
+            self.book.submit(self.item.id, self.alice.id, Decimal('50.00'))
+        self.assertEqual(context.exception.reason, 'not_active')
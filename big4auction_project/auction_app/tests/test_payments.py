@@ -0,0 +1,127 @@
+import asyncio
+import json
+import stripe
+from django.test import SimpleTestCase
+from django.urls import reverse
+from auction_app import payments
+from auction_app.payments import PaymentGateway, PaymentError, StubBackend, StripeBackend
+from auction_app.stripe_stub import StubServer
+
+class PaymentGatewayTest(SimpleTestCase):
+    def setUp(self):
+        """
+        Set up a gateway over the in-process stub with no backoff delay.
+        """
+        self.backend = StubBackend()
+        self.gateway = PaymentGateway(self.backend, max_retries=2, backoff=0)
+
+    def test_retries_transient_errors_with_the_same_key(self):
+        """
+        Test that connection errors are retried and every attempt reuses the idempotency key.
+        """
+        self.backend.failures = 2
+        customer = self.gateway.create_customer(idempotency_key='k1')
+        self.assertTrue(customer['id'].startswith('cus_'))
+        self.assertEqual(self.backend.calls, [('create_customer', 'k1')] * 3)
+        stats = self.gateway.metrics.snapshot()['create_customer']
+        self.assertEqual((stats['ok'], stats['retry']), (1, 2))
+
+    def test_gives_up_after_max_retries(self):
+        """
+        Test that a persistent outage raises a retryable PaymentError after the retry budget.
+        """
+        self.backend.failures = 10
+        with self.assertRaises(PaymentError) as raised:
+            self.gateway.create_customer(idempotency_key='k2')
+        self.assertTrue(raised.exception.retryable)
+        self.assertEqual(len(self.backend.calls), 3)
+
+    def test_permanent_errors_are_not_retried(self):
+        """
+        Test that a 4xx-style error fails on the first attempt.
+        """
+        def reject(*args, **kwargs):
+            raise stripe.InvalidRequestError('No such customer.', 'customer')
+        self.backend.create_setup_intent = reject
+        with self.assertRaises(PaymentError) as raised:
+            self.gateway.create_setup_intent('cus_missing', idempotency_key='k3')
+        self.assertFalse(raised.exception.retryable)
+        self.assertEqual(self.gateway.metrics.snapshot()['create_setup_intent']['error'], 1)
+
+    def test_idempotent_replay_returns_the_same_object(self):
+        """
+        Test that repeating a call with the same key does not create a second customer.
+        """
+        first = self.gateway.create_customer(idempotency_key='same')
+        second = self.gateway.create_customer(idempotency_key='same')
+        self.assertEqual(first['id'], second['id'])
+
+    def test_async_variant_retries(self):
+        """
+        Test the async variant through a transient failure.
+        """
+        self.backend.failures = 1
+        intent = asyncio.run(self.gateway.acreate_setup_intent('cus_1', idempotency_key='k4'))
+        self.assertEqual(intent['customer'], 'cus_1')
+        self.assertEqual(len(self.backend.calls), 2)
+
+
+class StripeBackendStubServerTest(SimpleTestCase):
+    def setUp(self):
+        """
+        Set up the pooled Stripe client pointed at a local stub server.
+        """
+        self.saved = (stripe.api_base, stripe.default_http_client, stripe.max_network_retries)
+        self.server = StubServer().start()
+        self.backend = StripeBackend('sk_test_stub', timeout=2, pool_size=4, api_base=self.server.url)
+        self.gateway = PaymentGateway(self.backend, backoff=0)
+
+    def tearDown(self):
+        self.backend.close()
+        self.server.stop()
+        stripe.api_base, stripe.default_http_client, stripe.max_network_retries = self.saved
+
+    def test_real_client_round_trip(self):
+        """
+        Test that the real Stripe client works end to end against the stub, including a server error retry.
+        """
+        self.server.backend.failures = 1
+        customer = self.gateway.create_customer(idempotency_key='srv1')
+        intent = self.gateway.create_setup_intent(customer.id, idempotency_key='srv2')
+        self.assertEqual(intent.customer, customer.id)
+        self.assertTrue(intent.client_secret)
+        self.assertEqual(self.gateway.metrics.snapshot()['create_customer']['retry'], 1)
+
+
+class CreateSetupIntentViewTest(SimpleTestCase):
+    def setUp(self):
+        """
+        Set up the view to use a stub-backed gateway.
+        """
+        self.saved = payments._gateway
+        self.backend = StubBackend()
+        payments.set_gateway(PaymentGateway(self.backend, backoff=0))
+
+    def tearDown(self):
+        payments.set_gateway(self.saved)
+
+    def test_returns_client_secret(self):
+        """
+        Test that the view creates a customer and a SetupIntent using the client's idempotency key.
+        """
+        response = self.client.post(reverse('create_setup_intent'), HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertTrue(body['customer'].startswith('cus_'))
+        self.assertTrue(body['client_secret'])
+        self.assertEqual(self.backend.calls, [
+            ('create_customer', 'abc:customer'), ('create_setup_intent', 'abc:setup_intent'),
+        ])
+
+    def test_provider_outage_returns_502(self):
+        """
+        Test that an exhausted retry budget is reported as a 502 instead of an exception.
+        """
+        self.backend.failures = 10
+        response = self.client.post(reverse('create_setup_intent'))
+        self.assertEqual(response.status_code, 502)
@@ -0,0 +1,222 @@
+import random
+from decimal import Decimal
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.bidding import place_bid, BidRejected
+from auction_app.closer import close_due_items
+from auction_app.models import Item, Bid, Category, ProxyBid, User
+from auction_app.proxy import ProxyEngine, ProxyLadder, increment_for
+
+def expected_outcome(maximums, floor):
+    """
+    Work out the leader and price from every bidder's maximum by brute force.
+    """
+    ranked = sorted(maximums.items(), key=lambda entry: (-entry[1][0], entry[1][1]))
+    winner_id, (top, _) = ranked[0]
+    if len(ranked) == 1:
+        return winner_id, floor
+    runner = ranked[1][1][0]
+    return winner_id, min(top, runner + increment_for(runner))
+
+class ProxyLadderPropertyTest(SimpleTestCase):
+    """
+    Random bid sequences checked against a brute-force model of the auction.
+    """
+    RUNS = 100
+
+    def random_amount(self, rng, ladder):
+        minimum = ladder.minimum_bid()
+        choice = rng.random()
+        if choice < 0.15:
+            # Too low, or the leader not raising their maximum.
+            return max(minimum - Decimal(rng.randint(1, 500)) / 100, Decimal('0.01'))
+        if choice < 0.3:
+            return minimum
+        return minimum + Decimal(rng.randint(0, 20000)) / 100
+
+    def test_random_sequences_match_the_model(self):
+        """
+        Test that leader, price and visible bids follow the eBay rules for any order of maximums.
+        """
+        for run in range(self.RUNS):
+            rng = random.Random(run)
+            floor = Decimal(rng.randint(1, 5000)) / 100
+            ladder = ProxyLadder(floor)
+            maximums = {}
+            for seq in range(1, rng.randint(2, 60)):
+                bidder_id = rng.randint(1, rng.choice((2, 5, 30)))
+                amount = self.random_amount(rng, ladder)
+                before = (ladder.price, ladder.leader_id)
+                context = f'run {run}, bid {seq}: bidder {bidder_id} max {amount} at {before}'
+                try:
+                    bids = ladder.bid(bidder_id, amount, seq)
+                except BidRejected as e:
+                    self.assertEqual((ladder.price, ladder.leader_id), before, context)
+                    if bidder_id == ladder.leader_id:
+                        self.assertEqual(e.reason, 'below_maximum', context)
+                        self.assertLessEqual(amount, maximums[bidder_id][0], context)
+                    else:
+                        self.assertEqual(e.reason, 'outbid', context)
+                        self.assertLess(amount, ladder.minimum_bid(), context)
+                    continue
+                maximums[bidder_id] = (amount, seq)
+                if bidder_id == before[1]:
+                    # Raising the leading maximum does not move the price.
+                    self.assertEqual(bids, [], context)
+                    self.assertEqual((ladder.price, ladder.leader_id), before, context)
+                    continue
+                winner_id, price = expected_outcome(maximums, floor)
+                self.assertEqual((ladder.leader_id, ladder.price), (winner_id, price), context)
+                self.assertLessEqual(price, maximums[winner_id][0], context)
+                self.assertIn(len(bids), (1, 2), context)
+                self.assertEqual(bids[-1], (winner_id, price), context)
+                amounts = [bid_amount for _, bid_amount in bids]
+                self.assertEqual(amounts, sorted(set(amounts)), context)
+                if before[0] is not None:
+                    self.assertGreater(amounts[0], before[0], context)
+                for placed_by, bid_amount in bids:
+                    self.assertLessEqual(bid_amount, maximums[placed_by][0], context)
+
+    def test_superseded_maximums_do_not_accumulate(self):
+        """
+        Test that raising a maximum many times leaves the heap proportional to the bidders.
+        """
+        ladder = ProxyLadder(Decimal('1.00'))
+        seq = 0
+        for _ in range(200):
+            for bidder_id in (1, 2, 3):
+                seq += 1
+                if bidder_id != ladder.leader_id:
+                    ladder.bid(bidder_id, ladder.minimum_bid(), seq)
+        self.assertLessEqual(len(ladder._heap), 2 * 3 + 16 + 1)
+        (top, leader_id), (runner, _) = ladder.top_two()
+        self.assertEqual(leader_id, ladder.leader_id)
+        self.assertEqual(top, ladder.price)
+        self.assertLess(runner, top)
+
+    def test_increments(self):
+        """
+        Test the increment table at its boundaries and that it never shrinks as prices rise.
+        """
+        self.assertEqual(increment_for(Decimal('0.99')), Decimal('0.05'))
+        self.assertEqual(increment_for(Decimal('1.00')), Decimal('0.25'))
+        self.assertEqual(increment_for(Decimal('99.99')), Decimal('1.00'))
+        self.assertEqual(increment_for(Decimal('10000')), Decimal('100.00'))
+        prices = [Decimal(cents) / 100 for cents in range(0, 1000000, 997)]
+        increments = [increment_for(price) for price in prices]
+        self.assertEqual(increments, sorted(increments))
+
+    def test_exact_bid_takes_lead_at_its_amount(self):
+        """
+        Test that a manual bid that takes the lead is placed at its own amount.
+        """
+        ladder = ProxyLadder(Decimal('10.00'))
+        ladder.bid(1, Decimal('20.00'), 1)
+        self.assertEqual(ladder.bid(2, Decimal('40.00'), 2, exact=True), [(1, Decimal('20.00')), (2, Decimal('40.00'))])
+        self.assertEqual(ladder.bid(3, Decimal('41.00'), 3, exact=True), [(3, Decimal('41.00'))])
+
+class ProxyEngineTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item, four bidders and a fresh engine.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        self.alice, self.bob, self.carol, self.dave = [
+            User.objects.create_user(username=name, phone_number=str(i) * 10, password='pw')
+            for i, name in enumerate(('alice', 'bob', 'carol', 'dave'), start=1)
+        ]
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+            status='active',
+        )
+        self.engine = ProxyEngine()
+
+    def place(self, user, amount, **kwargs):
+        bids, leader_id, current_bid = self.engine.place(self.item.id, user, Decimal(amount), **kwargs)
+        return [(bid.bidder_id, bid.bid_amount) for bid in bids], leader_id, current_bid
+
+    def test_competing_maximums_place_only_resulting_bids(self):
+        """
+        Test that each maximum is resolved in one step and only the visible bids are stored.
+        """
+        alice, bob, carol = self.alice.id, self.bob.id, self.carol.id
+        self.assertEqual(self.place(self.alice, '50.00'), ([(alice, Decimal('10.00'))], alice, Decimal('10.00')))
+        self.assertEqual(self.place(self.bob, '30.00'),
+                         ([(bob, Decimal('30.00')), (alice, Decimal('31.00'))], alice, Decimal('31.00')))
+        self.assertEqual(self.place(self.carol, '100.00'),
+                         ([(alice, Decimal('50.00')), (carol, Decimal('51.00'))], carol, Decimal('51.00')))
+        self.assertEqual(Bid.objects.filter(item=self.item).count(), 5)
+        self.assertEqual(ProxyBid.objects.filter(item=self.item).count(), 3)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.current_bid, Decimal('51.00'))
+
+    def test_rejected_maximum_is_not_recorded(self):
+        """
+        Test that a maximum below the next increment is rejected and leaves no rows behind.
+        """
+        self.place(self.alice, '50.00')
+        self.place(self.bob, '30.00')
+        with self.assertRaises(BidRejected) as raised:
+            self.place(self.carol, '31.50')
+        self.assertEqual(raised.exception.reason, 'outbid')
+        with self.assertRaises(BidRejected) as raised:
+            self.place(self.alice, '40.00')
+        self.assertEqual(raised.exception.reason, 'below_maximum')
+        self.assertEqual(ProxyBid.objects.count(), 2)
+        self.assertEqual(self.place(self.carol, '32.00')[1:], (self.alice.id, Decimal('33.00')))
+
+    def test_ladder_is_rebuilt_after_outside_changes(self):
+        """
+        Test that a manual bid or another process's maximum is picked up instead of the cached ladder.
+        """
+        place_bid(self.item.id, self.alice, Decimal('25.00'))
+        self.assertEqual(self.place(self.bob, '26.00')[1:], (self.bob.id, Decimal('26.00')))
+        other = ProxyEngine()
+        other.place(self.item.id, self.carol, Decimal('80.00'))
+        # Cached ladder predates Carol's maximum; Dave must not win at 60.
+        self.assertEqual(self.place(self.dave, '60.00')[1:], (self.carol.id, Decimal('61.00')))
+
+        with mock.patch.object(ProxyEngine, '_load', autospec=True, side_effect=ProxyEngine._load) as load:
+            self.place(self.alice, '70.00')
+            self.place(self.bob, '90.00')
+        self.assertEqual(load.call_count, 0)
+
+    def test_closer_awards_highest_maximum(self):
+        """
+        Test that the auction closes in favour of the highest maximum at the proxied price.
+        """
+        self.place(self.alice, '50.00')
+        self.place(self.bob, '45.00')
+        Item.objects.filter(pk=self.item.pk).update(end_time=timezone.now() - timezone.timedelta(seconds=1))
+        sold, _ = close_due_items()
+        self.assertEqual(sold, [self.item.id])
+        top = Bid.objects.filter(item=self.item).order_by('-bid_amount').first()
+        self.assertEqual((top.bidder_id, top.bid_amount), (self.alice.id, Decimal('46.00')))
+
+    def test_bid_endpoint_with_maximum(self):
+        """
+        Test that the bid endpoint accepts a maximum, and that manual bids then compete with it.
+        """
+        url = reverse('place_bid', kwargs={'item_id': self.item.id})
+        self.client.force_login(self.alice)
+        response = self.client.post(url, {'max_bid': '50.00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['current_bid'], '10.00')
+        self.assertTrue(response.json()['leading'])
+
+        self.client.force_login(self.bob)
+        response = self.client.post(url, {'bid_amount': '20.00'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['current_bid'], '20.50')
+        self.assertFalse(response.json()['leading'])
+        self.assertEqual(self.client.post(url, {}).status_code, 400)
@@ -0,0 +1,138 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import ratelimit
+from auction_app.models import Item, Category, User
+from auction_app.ratelimit import CacheBackend, LocalBackend, Policy, parse_rate
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        """
+        Set up a policy of 6 requests a minute with a burst of 3.
+        """
+        cache.clear()
+        self.policy = Policy('test', '6/m', burst=3)
+
+    def hits(self, backend, times):
+        return [backend.hit('bucket', self.policy, now) for now in times]
+
+    def test_parse_rate(self):
+        """
+        Test rates with and without a period multiplier, and that malformed ones are refused.
+        """
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('100/5m'), (100, 300))
+        for rate in ('10', '0/m', '10/w', 'x/s'):
+            with self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def test_burst_then_refill(self):
+        """
+        Test that both backends allow a burst, then one request per interval, and report the wait.
+        """
+        for backend in (LocalBackend(), CacheBackend()):
+            with self.subTest(backend=type(backend).__name__):
+                cache.clear()
+                self.assertEqual(self.hits(backend, [1000, 1000, 1000]), [0, 0, 0])
+                self.assertAlmostEqual(backend.hit('bucket', self.policy, 1000), 10, delta=0.01)
+                self.assertEqual(backend.hit('other', self.policy, 1000), 0)
+                # After a long idle the bucket is full again, but holds no more than a burst.
+                self.assertEqual(self.hits(backend, [2000, 2000, 2000]), [0, 0, 0])
+                self.assertGreater(backend.hit('bucket', self.policy, 2000), 0)
+
+    def test_cache_backend_costs_one_operation(self):
+        """
+        Test that a client sending steadily costs one incr per request and a restarted bucket one set.
+        """
+        backend = CacheBackend()
+        with mock.patch.object(cache, 'incr', wraps=cache.incr) as incr, \
+                mock.patch.object(cache, 'set', wraps=cache.set) as set_:
+            with mock.patch.object(ratelimit, 'caches', {'default': cache}):
+                self.hits(backend, [1000 + i for i in range(20)])
+        self.assertEqual((incr.call_count, set_.call_count), (20, 1))
+
+    def test_local_backend_forgets_full_buckets(self):
+        """
+        Test that the in-process backend drops refilled buckets once it holds too many.
+        """
+        backend = LocalBackend(max_keys=10)
+        for i in range(10):
+            backend.hit(f'old-{i}', self.policy, 1000)
+        backend.hit('new', self.policy, 2000)
+        self.assertEqual(list(backend._buckets), ['new'])
+
+@override_settings(RATE_LIMITS={
+    'login': {'rate': '2/m', 'key': 'ip'},
+    'place_bid': {'rate': '2/m', 'key': 'user'},
+    'create_setup_intent': {'rate': '1/h', 'key': 'ip'},
+})
+class RateLimitMiddlewareTest(TestCase):
+    def setUp(self):
+        """
+        Set up two users and an active item with an empty cache.
+        """
+        cache.clear()
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@example.com', phone_number='1111111111', password='pw',
+        )
+        self.bob = User.objects.create_user(username='bob', phone_number='2222222222', password='pw')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=Category.objects.create(category_name='Test Category'),
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+            status='active',
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, address):
+        return self.client.post(
+            reverse('login'), {'email': 'alice@example.com', 'password': 'wrong'}, REMOTE_ADDR=address,
+        )
+
+    def test_login_is_limited_per_ip(self):
+        """
+        Test that logins past the limit get a 429 with Retry-After, per address, and that GETs are free.
+        """
+        self.assertEqual([self.login('10.0.0.1').status_code for _ in range(2)], [302, 302])
+        response = self.login('10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(response.json()['error'], 'rate_limited')
+        self.assertEqual(self.login('10.0.0.2').status_code, 302)
+        self.assertEqual(self.client.get(reverse('login'), REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    def test_bids_are_limited_per_user(self):
+        """
+        Test that one user's bids running out does not limit another user on the same address.
+        """
+        url = reverse('place_bid', kwargs={'item_id': self.item.id})
+        self.client.force_login(self.alice)
+        statuses = [self.client.post(url, {'bid_amount': amount}).status_code for amount in ('11', '12', '13')]
+        self.assertEqual(statuses, [201, 201, 429])
+        self.client.force_login(self.bob)
+        self.assertEqual(self.client.post(url, {'bid_amount': '14'}).status_code, 201)
+
+    def test_setup_intent_is_limited_before_stripe(self):
+        """
+        Test that a limited setup-intent request never reaches the payment gateway.
+        """
+        gateway = mock.Mock(
+            acreate_customer=mock.AsyncMock(return_value={'id': 'cus_1'}),
+            acreate_setup_intent=mock.AsyncMock(return_value={'client_secret': 'seti_1_secret'}),
+        )
+        with mock.patch('auction_app.views.get_gateway', return_value=gateway):
+            self.assertEqual(self.client.post(reverse('create_setup_intent')).status_code, 200)
+            response = self.client.post(reverse('create_setup_intent'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+        self.assertEqual(gateway.acreate_customer.call_count, 1)
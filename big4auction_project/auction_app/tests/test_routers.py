@@ -0,0 +1,121 @@
+from decimal import Decimal
+from unittest import mock
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.exports import EXPORTS
+from auction_app.item_cache import get_live
+from auction_app.listings import invalidate_all
+from auction_app.models import Bid, Category, Item, User
+from auction_app.routers import PIN_COOKIE, lagging, read_alias
+from auction_app.signals import item_changed
+
+def replicate(*objects):
+    """
+    Copy rows from the primary to the stand-in replica, as replication would.
+    """
+    for obj in objects:
+        type(obj).objects.get(pk=obj.pk).save(using='replica', force_insert=True)
+
+@override_settings(REPLICA_DATABASE='replica', REPLICA_PIN_SECONDS=5, REPLICA_MAX_LAG=30)
+class ReplicaRouterTest(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """
+        Set up an active item and its seller on the primary and a copy of both on the replica.
+        """
+        cache.clear()
+        now = timezone.now()
+        self.seller = User.objects.create_user(username='seller', phone_number='1111111111')
+        self.category = Category.objects.create(category_name='Lamps')
+        self.item = Item.objects.create(
+            seller=self.seller, title='Lamp', slug='lamp', description='A lamp.', category=self.category,
+            start_time=now - timezone.timedelta(hours=1), end_time=now + timezone.timedelta(hours=1),
+            starting_bid=Decimal('10.00'), reserve_price=Decimal('20.00'), current_bid=Decimal('10.00'),
+        )
+        replicate(self.seller, self.category, self.item)
+        Item.objects.using('replica').filter(pk=self.item.pk).update(title='Lamp (replica)')
+
+    def listing(self, client=None):
+        response = (client or self.client).get(reverse('item_list'), {'format': 'json'})
+        return {item['id']: item for item in response.json()['items']}
+
+    def test_read_only_views_read_the_replica(self):
+        """
+        Test that listings are read from the replica and item pages build their cached fragment on the primary.
+        """
+        with CaptureQueriesContext(connections['default']) as primary:
+            self.assertEqual(self.listing()[self.item.id]['title'], 'Lamp (replica)')
+        self.assertEqual(len(primary), 0)
+
+        response = self.client.get(self.item.get_absolute_url())
+        self.assertContains(response, 'Lamp')
+        self.assertNotContains(response, 'Lamp (replica)')
+        # Exports stream after the view returns, so they pick the replica up front.
+        Bid.objects.create(item=self.item, bidder=self.seller, bid_amount=Decimal('12.00'))
+        self.assertEqual(read_alias(), 'replica')
+        self.assertEqual(list(EXPORTS['bids'].rows()), [])
+
+    def test_lagging_bids_are_read_from_the_primary(self):
+        """
+        Test that an item whose committed bid or status the replica lacks is re-read from the primary.
+        """
+        Item.objects.filter(pk=self.item.pk).update(current_bid=Decimal('30.00'))
+        item_changed.send(sender=Item, item_id=self.item.pk, current_bid=Decimal('30.00'), new_bids=1)
+        listed = self.listing()[self.item.id]
+        self.assertEqual((listed['title'], listed['current_bid']), ('Lamp', '30.00'))
+        self.assertEqual(get_live(self.item.pk)['current_bid'], Decimal('30.00'))
+
+        # Once the replica catches up it serves the item again.
+        Item.objects.using('replica').filter(pk=self.item.pk).update(current_bid=Decimal('30.00'))
+        invalidate_all()
+        self.assertEqual(self.listing()[self.item.id]['title'], 'Lamp (replica)')
+
+        Item.objects.filter(pk=self.item.pk).update(status='sold')
+        item_changed.send(sender=Item, item_id=self.item.pk, status='sold')
+        self.assertNotIn(self.item.id, self.listing())
+
+    def test_bid_without_extension_does_not_mark_end_time_stale(self):
+        """
+        Test that a bid which did not extend the auction leaves an up-to-date replica row usable.
+        """
+        Item.objects.filter(pk=self.item.pk).update(current_bid=Decimal('30.00'))
+        item_changed.send(sender=Item, item_id=self.item.pk, current_bid=Decimal('30.00'), new_bids=1, end_time=None)
+        replica_row = Item.objects.using('replica').get(pk=self.item.pk)
+        self.assertEqual(lagging({self.item.pk: replica_row}), {self.item.pk})
+        Item.objects.using('replica').filter(pk=self.item.pk).update(current_bid=Decimal('30.00'))
+        replica_row.refresh_from_db()
+        self.assertEqual(lagging({self.item.pk: replica_row}), set())
+
+    def test_writes_pin_the_user_to_the_primary(self):
+        """
+        Test that a write sets the pin cookie, and the user reads the primary until it runs out.
+        """
+        self.client.force_login(self.seller)
+        response = self.client.post(reverse('notifications_read_all'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.listing()[self.item.id]['title'], 'Lamp')
+
+        invalidate_all()
+        with mock.patch('auction_app.routers.time.time', return_value=float(response.cookies[PIN_COOKIE].value) + 1):
+            self.assertEqual(self.listing()[self.item.id]['title'], 'Lamp (replica)')
+
+        # Merely browsing, which may refresh the session, pins nobody.
+        response = self.client.get(reverse('seller_dashboard'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_without_replica_everything_uses_the_primary(self):
+        """
+        Test that with no replica configured reads go to the primary and writes set no cookie.
+        """
+        with override_settings(REPLICA_DATABASE=None):
+            self.assertEqual(self.listing()[self.item.id]['title'], 'Lamp')
+            self.client.force_login(self.seller)
+            self.assertNotIn(PIN_COOKIE, self.client.post(reverse('notifications_read_all')).cookies)
+            Bid.objects.create(item=self.item, bidder=self.seller, bid_amount=Decimal('12.00'))
+            self.assertEqual(read_alias(), 'default')
+            self.assertEqual(len(list(EXPORTS['bids'].rows())), 1)
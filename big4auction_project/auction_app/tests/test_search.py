@@ -0,0 +1,170 @@
+import os
+import tempfile
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import search
+from auction_app.bidding import place_bid
+from auction_app.models import Item, Category, User
+from auction_app.search import SearchIndex, tokenize
+
+class TokenizeTest(TestCase):
+    def test_tokenize_stems_and_drops_stop_words(self):
+        """
+        Test that plurals and verb forms share a term and stop words are dropped.
+        """
+        self.assertEqual(tokenize('The watches and boxes'), ['watch', 'box'])
+        self.assertEqual(tokenize('Painting painted paints'), ['paint', 'paint', 'paint'])
+        self.assertEqual(tokenize('Shoe shoes'), ['shoe', 'shoe'])
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        """
+        Set up a temporary index location and a few items indexed through signals.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'search_index.bin')
+        self.settings_override = override_settings(SEARCH_INDEX_PATH=self.path)
+        self.settings_override.enable()
+        search._index = SearchIndex(self.path)
+
+        self.watches = Category.objects.create(category_name='Watches')
+        self.art = Category.objects.create(category_name='Art')
+        self.user = User.objects.create(username='bidder', phone_number='1234567890')
+        self.rolex = self.make_item('Vintage Rolex watch', 'Classic steel watch from 1970.', self.watches, 500)
+        self.strap = self.make_item('Leather strap', 'Fits most vintage watches.', self.watches, 20)
+        self.painting = self.make_item('Oil painting', 'Landscape painted in 1920.', self.art, 300)
+
+    def tearDown(self):
+        search._index = None
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def make_item(self, title, description, category, price):
+        return Item.objects.create(
+            title=title,
+            slug=title.lower().replace(' ', '-'),
+            description=description,
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(days=7),
+            starting_bid=price,
+            reserve_price=price,
+            current_bid=price,
+        )
+
+    def ids(self, *args, **kwargs):
+        return [item_id for item_id, _ in search.get_index().search(*args, **kwargs)]
+
+    def test_title_match_ranks_above_description_match(self):
+        """
+        Test that a title hit outranks a description-only hit.
+        """
+        self.assertEqual(self.ids('watches'), [self.rolex.id, self.strap.id])
+
+    def test_prefix_and_category_name_match(self):
+        """
+        Test that the last word matches as a prefix and category names are searchable.
+        """
+        self.assertEqual(self.ids('paint'), [self.painting.id])
+        self.assertEqual(self.ids('vint'), [self.rolex.id, self.strap.id])
+        self.assertEqual(self.ids('art '), [self.painting.id])
+        self.assertEqual(self.ids('zzz'), [])
+
+    def test_all_terms_must_match(self):
+        """
+        Test that multi-word queries use AND semantics.
+        """
+        self.assertEqual(self.ids('vintage leather'), [self.strap.id])
+
+    def test_filters(self):
+        """
+        Test category, status and price range filters.
+        """
+        self.assertEqual(self.ids('vintage', category_id=self.art.id), [])
+        self.assertEqual(self.ids('vintage', max_price=Decimal('100')), [self.strap.id])
+        self.assertEqual(self.ids('vintage', min_price=Decimal('100')), [self.rolex.id])
+        Item.objects.filter(pk=self.strap.pk).update(status='sold')
+        search.get_index().update_attrs(self.strap.id, status='sold')
+        self.assertEqual(self.ids('vintage', status='active'), [self.rolex.id])
+
+    def test_incremental_updates_from_signals(self):
+        """
+        Test that saves, deletes and bids update the index without a rebuild.
+        """
+        self.painting.title = 'Oil portrait'
+        self.painting.save()
+        self.assertEqual(self.ids('portrait'), [self.painting.id])
+        self.assertEqual(self.ids('landscape'), [self.painting.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.strap.id, self.user, Decimal('150.00'))
+        self.assertEqual(self.ids('vintage', max_price=Decimal('100')), [])
+
+        self.rolex.delete()
+        self.assertEqual(self.ids('rolex'), [])
+
+    def test_persisted_segment_is_reopened(self):
+        """
+        Test that a saved index is served from disk by a new process-level index.
+        """
+        search.get_index().save()
+        reopened = SearchIndex(self.path)
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual([item_id for item_id, _ in reopened.search('watches')], [self.rolex.id, self.strap.id])
+
+        reopened.remove(self.rolex.id)
+        reopened.add_item(self.make_item('Pocket watch', 'Gold.', self.watches, 80))
+        self.assertEqual(len(reopened), 3)
+        reopened.save()
+        self.assertEqual(len(SearchIndex(self.path).search('watch')), 2)
+
+    def test_new_segment_is_picked_up_with_the_delta(self):
+        """
+        Test that a segment written by another process replaces the index without breaking its readers or losing its delta.
+        """
+        index = search.get_index()
+        index.save()
+        pocket = self.make_item('Pocket watch', 'Gold.', self.watches, 80)
+        index.update_attrs(self.strap.id, status='sold')
+        index.remove(self.painting.id)
+        held = index.segment.posting_docs.view[0:2]
+        expected = held.tolist()
+
+        other = SearchIndex(self.path)
+        other.add_item(self.make_item('Wall clock', 'Oak.', self.art, 40))
+        other.save()
+        os.utime(self.path, ns=(1, 1))
+        search._checked_at = 0.0
+
+        reloaded = search.get_index()
+        self.assertIsNot(reloaded, index)
+        self.assertEqual(held.tolist(), expected)
+        self.assertCountEqual(self.ids('watch'), [self.rolex.id, self.strap.id, pocket.id])
+        self.assertEqual(self.ids('watch', status='sold'), [self.strap.id])
+        self.assertEqual(self.ids('painting'), [])
+        self.assertEqual(len(self.ids('clock')), 1)
+        self.assertCountEqual([item_id for item_id, _ in index.search('watch')], [self.rolex.id, self.strap.id, pocket.id])
+
+    def test_rebuild_matches_database(self):
+        """
+        Test that a rebuild from the database indexes every item.
+        """
+        index = SearchIndex(self.path)
+        index.rebuild()
+        self.assertEqual(len(index), 3)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_search_view(self):
+        """
+        Test the search endpoint's JSON response and filter validation.
+        """
+        response = self.client.get(reverse('search_items'), {'q': 'vintage', 'max_price': '100'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], [self.strap.id])
+        self.assertEqual(results[0]['category'], 'Watches')
+        response = self.client.get(reverse('search_items'), {'q': 'vintage', 'min_price': 'abc'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,134 @@
+from io import StringIO
+from unittest import mock
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.models import User
+from auction_app.sessions import SessionStore, expiry_batch
+
+@override_settings(SESSION_COOKIE_AGE=1800, SESSION_REFRESH_THRESHOLD=1500, SESSION_BATCH_SIZE=3,
+                   SESSION_BATCH_SECONDS=60)
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        """
+        Set up an empty cache and expiry batch.
+        """
+        cache.clear()
+        expiry_batch.flush(Session)
+
+    def tearDown(self):
+        expiry_batch.flush(Session)
+
+    def new_session(self, **data):
+        store = SessionStore()
+        store.update(data)
+        store.save()
+        return SessionStore(store.session_key)
+
+    def session_writes(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return [query['sql'] for query in context
+                if query['sql'].split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE') and 'django_session' in query['sql']]
+
+    def test_changed_data_is_written_through(self):
+        """
+        Test that a changed session reaches the database at once and is then read from the cache.
+        """
+        store = self.new_session(cart=1)
+        store['cart'] = 2
+        self.assertEqual(len(self.session_writes(store.save)), 1)
+        self.assertEqual(Session.objects.get(pk=store.session_key).get_decoded()['cart'], 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(SessionStore(store.session_key)['cart'], 2)
+        cache.clear()
+        self.assertEqual(SessionStore(store.session_key)['cart'], 2)
+
+    def test_unchanged_session_is_saved_only_below_threshold(self):
+        """
+        Test that an unchanged fresh session costs no query, and one past the threshold is queued for the batch.
+        """
+        store = self.new_session(cart=1)
+        store['cart']
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertEqual(len(expiry_batch), 0)
+
+        store._expire_date = timezone.now() + timezone.timedelta(seconds=60)
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertEqual(len(expiry_batch), 1)
+        # The cache already holds the new expiry.
+        cached = SessionStore(store.session_key)
+        cached.load()
+        self.assertGreater(cached._expire_date, timezone.now() + timezone.timedelta(seconds=1700))
+
+    def test_refreshes_are_written_in_one_batch(self):
+        """
+        Test that queued expiries reach the database in a single UPDATE once the batch is full.
+        """
+        stores = [self.new_session(n=i) for i in range(3)]
+        old = timezone.now() + timezone.timedelta(seconds=60)
+        Session.objects.update(expire_date=old)
+        writes = []
+        for store in stores:
+            store['n']
+            store._expire_date = old
+            writes += self.session_writes(store.save)
+        self.assertEqual(len(writes), 1)
+        self.assertFalse(Session.objects.filter(expire_date__lte=old).exists())
+
+    def test_due_batch_is_written_when_a_request_finishes(self):
+        """
+        Test that a batch past its interval is written at the end of any request, without waiting for another refresh.
+        """
+        store = self.new_session(cart=1)
+        old = timezone.now() + timezone.timedelta(seconds=60)
+        Session.objects.update(expire_date=old)
+        store['cart']
+        store._expire_date = old
+        store.save()
+        self.client.get(reverse('item_list'))
+        self.assertEqual(len(expiry_batch), 1)
+
+        later = expiry_batch._started + 61
+        with mock.patch('auction_app.sessions.time.monotonic', return_value=later):
+            self.client.get(reverse('item_list'))
+        self.assertEqual(len(expiry_batch), 0)
+        self.assertFalse(Session.objects.filter(expire_date__lte=old).exists())
+
+    def test_read_only_session_is_not_saved(self):
+        """
+        Test that read-only endpoints never refresh a session, while other requests do.
+        """
+        user = User.objects.create_user(username='alice', phone_number='1111111111')
+        self.client.force_login(user)
+        key = self.client.session.session_key
+        with override_settings(SESSION_REFRESH_THRESHOLD=1801):
+            self.client.get(reverse('item_list'), {'seller': 'me'})
+            self.assertEqual(len(expiry_batch), 0)
+            self.client.get(reverse('seller_dashboard'))
+            self.assertEqual(len(expiry_batch), 1)
+        self.assertEqual(self.client.session.session_key, key)
+
+    def test_purge_deletes_expired_sessions_in_chunks(self):
+        """
+        Test that the purge command deletes only sessions past the grace period, a chunk per statement.
+        """
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timezone.timedelta(hours=1))
+             for i in range(5)]
+            + [Session(session_key='grace', session_data='', expire_date=now - timezone.timedelta(seconds=5)),
+               Session(session_key='live', session_data='', expire_date=now + timezone.timedelta(hours=1))]
+        )
+        out = StringIO()
+        deletes = self.session_writes(lambda: call_command('purge_sessions', chunk_size=2, grace=60, stdout=out))
+        self.assertEqual(len(deletes), 3)
+        self.assertIn('Deleted 5 expired sessions.', out.getvalue())
+        self.assertEqual(set(Session.objects.values_list('pk', flat=True)), {'grace', 'live'})
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+from django.test import SimpleTestCase
+from big4auction_project.settings.base import database_from_env, env_bool, env_list
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+
+def load_settings(env, *names):
+    """
+    Import the settings in a fresh interpreter with ``env`` and return the named values.
+    """
+    code = (
+        'import json; from django.conf import settings; '
+        f'print(json.dumps({{name: getattr(settings, name) for name in {list(names)!r}}}, default=str))'
+    )
+    clean = {key: value for key, value in os.environ.items() if not key.startswith(('DJANGO_', 'DB_', 'REDIS_'))}
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True,
+        env=dict(clean, DJANGO_SETTINGS_MODULE='big4auction_project.settings', **env),
+    )
+    if result.returncode:
+        return result.stderr.strip().splitlines()[-1]
+    return json.loads(result.stdout)
+
+class SettingsProfileTest(SimpleTestCase):
+    def test_environment_helpers(self):
+        """
+        Test boolean and list parsing and the persistent connection defaults for each server type.
+        """
+        with mock.patch.dict(os.environ, {'FLAG': 'yes', 'HOSTS': 'a.example, b.example,'}):
+            self.assertTrue(env_bool('FLAG'))
+            self.assertTrue(env_bool('MISSING', True))
+            self.assertEqual(env_list('HOSTS'), ['a.example', 'b.example'])
+        with mock.patch.dict(os.environ, {'DB_HOST': 'db.internal'}):
+            database = database_from_env()
+            self.assertEqual((database['HOST'], database['CONN_MAX_AGE']), ('db.internal', 60))
+            self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        with mock.patch.dict(os.environ, {'DJANGO_SERVER': 'asgi'}):
+            self.assertEqual(database_from_env()['CONN_MAX_AGE'], 0)
+        with mock.patch.dict(os.environ, {'DB_ENGINE': 'sqlite', 'DB_NAME': ':memory:'}):
+            self.assertEqual(database_from_env()['NAME'], ':memory:')
+
+    def test_profiles(self):
+        """
+        Test that DEBUG is on only in dev, prod refuses to start without its secrets, and a replica is optional.
+        """
+        self.assertEqual(load_settings({'DJANGO_ENV': 'dev'}, 'DEBUG')['DEBUG'], True)
+        self.assertIn('DJANGO_SECRET_KEY must be set', load_settings({'DJANGO_ENV': 'prod'}, 'DEBUG'))
+        prod = load_settings({
+            'DJANGO_ENV': 'prod', 'DJANGO_SECRET_KEY': 'x', 'DJANGO_ALLOWED_HOSTS': 'example.com',
+            'REDIS_URL': 'redis://cache:6379/0', 'DB_REPLICA_HOST': 'replica.internal',
+        }, 'DEBUG', 'DATABASES', 'SESSION_COOKIE_SECURE')
+        self.assertEqual((prod['DEBUG'], prod['SESSION_COOKIE_SECURE']), (False, True))
+        self.assertEqual(prod['DATABASES']['replica']['HOST'], 'replica.internal')
+        self.assertEqual(prod['DATABASES']['replica']['NAME'], prod['DATABASES']['default']['NAME'])
+        bench = load_settings({'DJANGO_ENV': 'bench'}, 'DEBUG', 'DATABASES')
+        self.assertEqual((bench['DEBUG'], list(bench['DATABASES'])), (False, ['default']))
+        self.assertTrue(bench['DATABASES']['default']['NAME'].endswith('bench.sqlite3'))
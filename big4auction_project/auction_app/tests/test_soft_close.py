@@ -0,0 +1,113 @@
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from auction_app import streaming
+from auction_app.bidding import place_bid
+from auction_app.closer import AuctionScheduler
+from auction_app.models import Item, Category, User
+from auction_app.orderbook import OrderBook
+from auction_app.proxy import ProxyEngine
+
+@override_settings(SOFT_CLOSE_SECONDS=60)
+class SoftCloseTest(TestCase):
+    def setUp(self):
+        """
+        Set up an item ending in 30 seconds, one ending in an hour, and two bidders.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        self.alice = User.objects.create(username='alice', phone_number='1111111111')
+        self.bob = User.objects.create(username='bob', phone_number='2222222222')
+        self.now = timezone.now()
+        self.closing = self.make_item('Closing', category, 30)
+        self.open = self.make_item('Open', category, 3600)
+
+    def make_item(self, title, category, ends_in):
+        return Item.objects.create(
+            title=title,
+            slug=title.lower(),
+            description='This is a test item.',
+            category=category,
+            start_time=self.now - timezone.timedelta(days=1),
+            end_time=self.now + timezone.timedelta(seconds=ends_in),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=10.00,
+        )
+
+    def end_time(self, item):
+        return Item.objects.values_list('end_time', flat=True).get(pk=item.pk)
+
+    def test_late_bid_extends_end_and_tells_watchers(self):
+        """
+        Test that a bid in the window moves the end to the window after the bid and publishes it.
+        """
+        with mock.patch.object(streaming.bid_hub, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                place_bid(self.closing.id, self.alice, Decimal('11.00'), now=self.now)
+        extended = self.now + timezone.timedelta(seconds=60)
+        self.assertEqual(self.end_time(self.closing), extended)
+        self.assertEqual(publish.call_args.kwargs['end_time'], extended)
+
+    def item_updates(self, item, bidder, amount, now):
+        with CaptureQueriesContext(connection) as context:
+            place_bid(item.id, bidder, Decimal(amount), now=now)
+        return [query['sql'] for query in context if query['sql'].startswith('UPDATE "auction_app_item"')]
+
+    def test_early_bid_costs_one_update(self):
+        """
+        Test that bids outside the window leave the end alone in a single item UPDATE, and that 0 turns extensions off.
+        """
+        self.assertEqual(len(self.item_updates(self.open, self.alice, '11.00', self.now)), 1)
+        self.assertEqual(self.end_time(self.open), self.open.end_time)
+        with override_settings(SOFT_CLOSE_SECONDS=0):
+            self.assertEqual(len(self.item_updates(self.closing, self.alice, '11.00', self.now)), 1)
+        self.assertEqual(self.end_time(self.closing), self.closing.end_time)
+
+    def test_proxy_and_order_book_bids_extend(self):
+        """
+        Test that proxy bids extend in their own write and order book extensions are flushed.
+        """
+        ProxyEngine().place(self.closing.id, self.alice, Decimal('50.00'), now=self.now)
+        self.assertEqual(self.end_time(self.closing), self.now + timezone.timedelta(seconds=60))
+
+        book = OrderBook()
+        later = self.now + timezone.timedelta(seconds=10)
+        book.submit(self.closing.id, self.bob.id, Decimal('60.00'), now=later)
+        self.assertEqual(book.book_for(self.closing.id).end_time, later + timezone.timedelta(seconds=60))
+        book.flush()
+        self.assertEqual(self.end_time(self.closing), later + timezone.timedelta(seconds=60))
+
+    def test_scheduler_finds_extension_without_reloading(self):
+        """
+        Test that the closer's heap finds an extension from a bid in the database and closes at the new deadline.
+        """
+        scheduler = AuctionScheduler(horizon=120)
+        scheduler.load(self.now)
+        self.assertEqual(scheduler.next_deadline(), self.closing.end_time)
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.closing.id, self.alice, Decimal('11.00'), now=self.now + timezone.timedelta(seconds=20))
+        extended = self.now + timezone.timedelta(seconds=80)
+
+        with mock.patch.object(AuctionScheduler, 'load') as load:
+            # Bids are placed in the web workers, so nothing is pushed to the closer's heap.
+            self.assertEqual(scheduler.next_deadline(), self.closing.end_time)
+            self.assertEqual(scheduler.run_once(self.now + timezone.timedelta(seconds=40)), (0, 0))
+            self.assertEqual(scheduler.next_deadline(), extended)
+            self.assertEqual(scheduler.run_once(extended), (0, 1))
+        load.assert_not_called()
+
+    def test_scheduler_requeues_extension_from_another_process(self):
+        """
+        Test that an extension the scheduler was not told about is read back when the old deadline comes up.
+        """
+        scheduler = AuctionScheduler(horizon=120)
+        scheduler.load(self.now)
+        extended = self.now + timezone.timedelta(seconds=80)
+        Item.objects.filter(pk=self.closing.pk).update(end_time=extended)
+
+        self.assertEqual(scheduler.run_once(self.closing.end_time), (0, 0))
+        self.assertEqual(Item.objects.get(pk=self.closing.pk).status, 'active')
+        self.assertEqual(scheduler.next_deadline(), extended)
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from decimal import Decimal
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.models import Item, Bid, Category, User
+from auction_app.streaming import BidHub, bid_hub, serialize_state, websocket_application
+
+class BidHubTest(TestCase):
+    def setUp(self):
+        """
+        Set up an active item with one bid.
+        """
+        category = Category.objects.create(category_name='Test Category')
+        user = User.objects.create(username='bidder', phone_number='1234567890')
+        self.item = Item.objects.create(
+            title='Test Item',
+            slug='test-item',
+            description='This is a test item.',
+            category=category,
+            start_time=timezone.now() - timezone.timedelta(hours=1),
+            end_time=timezone.now() + timezone.timedelta(hours=1),
+            starting_bid=10.00,
+            reserve_price=20.00,
+            current_bid=12.00,
+            status='active',
+        )
+        Bid.objects.create(bidder=user, item=self.item, bid_amount=12.00)
+
+    async def test_subscribe_delivers_snapshot(self):
+        """
+        Test that a new watcher first receives the item's current state.
+        """
+        hub = BidHub()
+        subscription = await hub.subscribe(self.item.id)
+        state = await subscription.get()
+        self.assertEqual(state['current_bid'], Decimal('12.00'))
+        self.assertEqual(state['bid_count'], 1)
+        self.assertEqual(hub.watchers(self.item.id), 1)
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.watchers(self.item.id), 0)
+
+    async def test_publish_fans_out_to_all_watchers(self):
+        """
+        Test that a published bid reaches every watcher of the item.
+        """
+        hub = BidHub()
+        subscriptions = [await hub.subscribe(self.item.id) for _ in range(3)]
+        for subscription in subscriptions:
+            await subscription.get()
+
+        hub.publish(self.item.id, current_bid=Decimal('15.00'), new_bids=1)
+        for subscription in subscriptions:
+            state = await asyncio.wait_for(subscription.get(), timeout=1)
+            self.assertEqual(state['current_bid'], Decimal('15.00'))
+            self.assertEqual(state['bid_count'], 2)
+
+    async def test_changes_during_the_snapshot_are_not_lost(self):
+        """
+        Test that a bid published while the first snapshot loads is applied once, and one already in it is not.
+        """
+        class RacingHub(BidHub):
+            async def _snapshot(self, item_id):
+                # Committed and published before the read: already in the snapshot.
+                bidder = await User.objects.aget(username='bidder')
+                await Bid.objects.acreate(bidder=bidder, item_id=item_id, bid_amount=Decimal('13.00'))
+                self.publish(item_id, current_bid=Decimal('13.00'), new_bids=1)
+                result = await super()._snapshot(item_id)
+                # Committed and published after the read.
+                self.publish(item_id, current_bid=Decimal('15.00'), new_bids=1)
+                return result
+
+        hub = RacingHub()
+        subscription = await hub.subscribe(self.item.id)
+        state = await subscription.get()
+        self.assertEqual((state['current_bid'], state['bid_count']), (Decimal('15.00'), 3))
+        self.assertEqual(subscription.queue.qsize(), 0)
+
+    async def test_slow_watcher_queue_is_bounded(self):
+        """
+        Test that a watcher that falls behind keeps only the latest updates.
+        """
+        hub = BidHub(queue_size=2)
+        subscription = await hub.subscribe(self.item.id)
+        for amount in range(13, 23):
+            hub.publish(self.item.id, current_bid=Decimal(amount), new_bids=1)
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.queue.qsize(), 2)
+        await subscription.get()
+        state = await subscription.get()
+        self.assertEqual(state['current_bid'], Decimal(22))
+
+    def test_publish_without_watchers_is_noop(self):
+        """
+        Test that publishing for an unwatched item keeps no state.
+        """
+        hub = BidHub()
+        hub.publish(self.item.id, current_bid=Decimal('99.00'), new_bids=1)
+        self.assertEqual(hub.watchers(self.item.id), 0)
+
+    def test_serialize_state(self):
+        """
+        Test the JSON payload sent to watchers.
+        """
+        now = timezone.now()
+        payload = json.loads(serialize_state(self.item.id, {
+            'current_bid': Decimal('12.00'),
+            'bid_count': 1,
+            'status': 'active',
+            'end_time': now + timezone.timedelta(seconds=90),
+        }, now=now))
+        self.assertEqual(payload, {
+            'item_id': self.item.id,
+            'current_bid': '12.00',
+            'bid_count': 1,
+            'status': 'active',
+            'time_left': 90,
+        })
+
+    async def test_sse_stream_sends_snapshot(self):
+        """
+        Test that the SSE endpoint starts with the item's current state.
+        """
+        response = await self.async_client.get(reverse('item_stream', kwargs={'item_id': self.item.id}))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        first = await anext(aiter(response.streaming_content))
+        response.close()
+        self.assertTrue(first.startswith(b'event: bid\ndata: '))
+        self.assertEqual(json.loads(first.split(b'data: ')[1])['bid_count'], 1)
+
+    async def test_websocket_receives_updates(self):
+        """
+        Test that a WebSocket watcher receives the snapshot and later bids.
+        """
+        inbox = asyncio.Queue()
+        outbox = asyncio.Queue()
+        await inbox.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': f'/ws/items/{self.item.id}'}
+        task = asyncio.ensure_future(websocket_application(scope, inbox.get, outbox.put))
+
+        self.assertEqual((await outbox.get())['type'], 'websocket.accept')
+        self.assertEqual(json.loads((await outbox.get())['text'])['current_bid'], '12.00')
+        bid_hub.publish(self.item.id, current_bid=Decimal('30.00'), new_bids=1)
+        self.assertEqual(json.loads((await outbox.get())['text'])['current_bid'], '30.00')
+
+        await inbox.put({'type': 'websocket.disconnect'})
+        await asyncio.wait_for(task, timeout=1)
+        self.assertEqual(bid_hub.watchers(self.item.id), 0)
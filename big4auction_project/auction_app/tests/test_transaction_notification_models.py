@@ -51,7 +51,7 @@ class TransactionModelTest(TestCase):
             seller=None,  # Seller is required
             item=None,  # Item is required
             transaction_amount=0,  # Amount should be greater than 0
-            payment_method=None,  # Payment method is required
+            payment_method=None,  # Payment method is set once the buyer pays
         )
         with self.assertRaises(ValidationError) as context:
             invalid_transaction.full_clean()
@@ -60,7 +60,7 @@ class TransactionModelTest(TestCase):
         self.assertIn('This field cannot be null.', context.exception.error_dict['buyer'][0])
         self.assertIn('This field cannot be null.', context.exception.error_dict['seller'][0])
         self.assertIn('This field cannot be null.', context.exception.error_dict['item'][0])
-        self.assertIn('This field cannot be null.', context.exception.error_dict['payment_method'][0])
+        self.assertNotIn('payment_method', context.exception.error_dict)
 
 
     def test_transaction_relationships(self):
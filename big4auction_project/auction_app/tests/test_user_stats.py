@@ -0,0 +1,158 @@
+import json
+from io import StringIO
+from decimal import Decimal
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from auction_app.bidding import place_bid
+from auction_app.models import Item, Category, User, Bid, Transaction, PaymentMethod, Feedback, UserStats
+from auction_app.orderbook import OrderBook
+from auction_app.closer import close_due_items
+from auction_app.user_stats import apply, get_dashboard, reconcile
+
+class UserStatsTest(TestCase):
+    def setUp(self):
+        """
+        Set up a seller, a buyer and an active item.
+        """
+        self.seller = User.objects.create(username='seller', phone_number='1111111111')
+        self.buyer = User.objects.create(username='buyer', phone_number='2222222222')
+        self.card = PaymentMethod.objects.create(method='Card')
+        now = timezone.now()
+        self.item = Item.objects.create(
+            title='Lamp',
+            slug='lamp',
+            description='A lamp.',
+            category=Category.objects.create(category_name='Home'),
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+            starting_bid=10.00,
+            reserve_price=10.00,
+            current_bid=0,
+        )
+
+    def stats(self, user):
+        return UserStats.objects.get(pk=user.pk)
+
+    def test_transactions_update_both_parties(self):
+        """
+        Test that a transaction counts as a sale for the seller and a purchase for the buyer, and is uncounted on delete.
+        """
+        sale = Transaction.objects.create(buyer=self.buyer, seller=self.seller, item=self.item,
+                                          transaction_amount=Decimal('40.00'), payment_method=self.card)
+        self.assertEqual((self.stats(self.seller).sales_count, self.stats(self.seller).sales_total), (1, Decimal('40.00')))
+        self.assertEqual(self.stats(self.buyer).purchases_total, Decimal('40.00'))
+        sale.delete()
+        self.assertEqual(self.stats(self.seller).sales_count, 0)
+
+    def test_bids_from_place_bid_and_order_book(self):
+        """
+        Test that bids are counted whether written one by one or flushed in bulk.
+        """
+        place_bid(self.item.id, self.buyer, Decimal('12.00'))
+        book = OrderBook()
+        book.submit(self.item.id, self.buyer.id, Decimal('15.00'))
+        book.flush()
+        stats = self.stats(self.buyer)
+        self.assertEqual((stats.bids_count, stats.bids_total), (2, Decimal('27.00')))
+
+    def test_feedback_average_follows_edits(self):
+        """
+        Test that the average rating of the rated user tracks created, edited and deleted feedback.
+        """
+        first = Feedback.objects.create(user=self.buyer, rated_user=self.seller, rating=5, comment='Great')
+        Feedback.objects.create(user=self.buyer, rated_user=self.seller, rating=3, comment='Fine')
+        self.assertEqual(self.stats(self.seller).average_rating, 4)
+        self.assertFalse(UserStats.objects.filter(pk=self.buyer.pk, feedback_count__gt=0).exists())
+        first.rating = 1
+        first.save()
+        self.assertEqual(self.stats(self.seller).average_rating, 2)
+        Feedback.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.stats(self.seller).average_rating, 3)
+
+        # Moving feedback to another user moves its rating.
+        other = Feedback.objects.get(rating=3)
+        other.rated_user = self.buyer
+        other.save()
+        self.assertEqual((self.stats(self.seller).feedback_count, self.stats(self.buyer).average_rating), (0, 3))
+
+    def test_item_saves_do_not_reread_the_listing(self):
+        """
+        Test that saving a loaded item adjusts active listings without reading its stored seller and status.
+        """
+        self.item.seller = self.seller
+        self.item.save()
+        self.assertEqual(self.stats(self.seller).active_listings, 1)
+        item = Item.objects.get(pk=self.item.pk)
+        with CaptureQueriesContext(connection) as queries:
+            item.current_bid = Decimal('12.00')
+            item.save()
+            item.status = 'sold'
+            item.save()
+            item.save(update_fields=['current_bid'])
+        reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT "auction_app_item"')]
+        self.assertEqual(reads, [])
+        self.assertEqual(self.stats(self.seller).active_listings, 0)
+
+    def test_dashboard_is_one_query(self):
+        """
+        Test that the dashboard figures come from a single lookup, with zeros for an inactive user.
+        """
+        Feedback.objects.create(user=self.buyer, rated_user=self.seller, rating=4, comment='Good')
+        with self.assertNumQueries(1):
+            stats = get_dashboard(self.seller.id)
+        self.assertEqual((stats['feedback_count'], stats['average_rating']), (1, 4))
+        self.assertEqual(get_dashboard(self.buyer.id)['bids_count'], 0)
+
+    def test_dashboard_view(self):
+        """
+        Test the dashboard endpoint for a logged-in user.
+        """
+        self.client.force_login(self.buyer)
+        place_bid(self.item.id, self.buyer, Decimal('12.00'))
+        response = self.client.get(reverse('seller_dashboard'), {'format': 'json'})
+        self.assertEqual(json.loads(response.content)['bids_total'], '12.00')
+        self.assertContains(self.client.get(reverse('seller_dashboard')), 'Bids placed')
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        """
+        Test that the checker finds drifted and missing rows and reconciling repairs them.
+        """
+        Bid.objects.bulk_create([Bid(item=self.item, bidder=self.seller, bid_amount=Decimal('11.00'))])
+        Feedback.objects.create(user=self.seller, rated_user=self.buyer, rating=2, comment='Meh')
+        UserStats.objects.filter(pk=self.buyer.pk).update(feedback_count=7)
+
+        mismatches = reconcile(fix=False)
+        self.assertEqual(
+            sorted((user_id, field) for user_id, field, *_ in mismatches),
+            sorted([(self.seller.id, 'bids_count'), (self.seller.id, 'bids_total'), (self.buyer.id, 'feedback_count')]),
+        )
+        with self.assertRaises(CommandError):
+            call_command('reconcile_user_stats', '--check', stdout=StringIO())
+        call_command('reconcile_user_stats', stdout=StringIO())
+        self.assertEqual(reconcile(fix=False), [])
+        self.assertEqual(self.stats(self.seller).bids_total, Decimal('11.00'))
+
+    def test_drifted_counters_stop_at_zero(self):
+        """
+        Test that closing bulk-created listings the counter never saw leaves it at zero instead of failing the close.
+        """
+        now = timezone.now()
+        Item.objects.bulk_create([
+            Item(seller=self.seller, title=f'Chair {i}', slug=f'chair-{i}', description='A chair.',
+                 category=self.item.category, start_time=now - timezone.timedelta(hours=2),
+                 end_time=now - timezone.timedelta(minutes=1), starting_bid=10, reserve_price=10, current_bid=0)
+            for i in range(3)
+        ])
+        UserStats.objects.create(user=self.seller, active_listings=1, sales_count=1)
+
+        _, expired = close_due_items(now)
+
+        self.assertEqual(len(expired), 3)
+        self.assertEqual(self.stats(self.seller).active_listings, 0)
+        apply({self.seller.id: {'sales_count': -2, 'sales_total': Decimal('-5.00')}})
+        self.assertEqual((self.stats(self.seller).sales_count, self.stats(self.seller).sales_total), (0, Decimal('0.00')))
@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import json
+import time
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from auction_app import webhooks
+from auction_app.models import User, WebhookEvent
+
+SECRET = 'whsec_test'
+
+
+def signed(event, secret=SECRET):
+    """Return ``(body, signature header)`` for ``event`` as Stripe would send it."""
+    body = json.dumps(event)
+    timestamp = int(time.time())
+    digest = hmac.new(secret.encode(), f'{timestamp}.{body}'.encode(), hashlib.sha256).hexdigest()
+    return body, f't={timestamp},v1={digest}'
+
+
+def attached_event(event_id, email, customer='cus_123'):
+    return {
+        'id': event_id,
+        'type': 'payment_method.attached',
+        'data': {'object': {'id': 'pm_1', 'customer': customer, 'billing_details': {'email': email}}},
+    }
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=SECRET)
+class WebhookIngestTest(TestCase):
+    def post(self, event, secret=SECRET):
+        body, signature = signed(event, secret)
+        return self.client.post(reverse('webhook_received'), body, content_type='application/json',
+                                HTTP_STRIPE_SIGNATURE=signature)
+
+    def test_valid_event_is_stored_once(self):
+        """
+        Test that a verified event is queued and a redelivery is acknowledged without a second row.
+        """
+        event = attached_event('evt_1', 'a@example.com')
+        self.assertEqual(self.post(event).status_code, 200)
+        self.assertEqual(self.post(event).status_code, 200)
+        stored = WebhookEvent.objects.get()
+        self.assertEqual((stored.event_id, stored.type, stored.status), ('evt_1', 'payment_method.attached', 'pending'))
+
+    def test_bad_signature_is_rejected(self):
+        """
+        Test that events signed with the wrong secret, or unsigned, are not stored.
+        """
+        self.assertEqual(self.post(attached_event('evt_2', 'a@example.com'), secret='whsec_other').status_code, 400)
+        response = self.client.post(reverse('webhook_received'), '{}', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+
+class WebhookProcessingTest(TestCase):
+    def setUp(self):
+        """
+        Set up a user without a Stripe customer and a queued event for them.
+        """
+        self.user = User.objects.create(username='buyer', email='buyer@example.com', phone_number='1234567890')
+        event = attached_event('evt_10', 'Buyer@example.com')
+        webhooks.enqueue(event, json.dumps(event).encode())
+
+    def test_attach_customer(self):
+        """
+        Test that processing payment_method.attached links the customer to the user.
+        """
+        self.assertEqual(webhooks.process_pending(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.stripe_customer_id, 'cus_123')
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('done', 1))
+        self.assertEqual(webhooks.process_pending(), 0)
+
+    def test_failures_are_retried_then_parked_and_replayed(self):
+        """
+        Test that a failing handler is retried up to MAX_ATTEMPTS and can then be replayed.
+        """
+        broken = mock.Mock(side_effect=RuntimeError('boom'))
+        with mock.patch.dict(webhooks.HANDLERS, {'payment_method.attached': broken}):
+            for _ in range(webhooks.MAX_ATTEMPTS):
+                self.assertEqual(webhooks.process_pending(), 1)
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.status, event.attempts), ('failed', webhooks.MAX_ATTEMPTS))
+        self.assertIn('boom', event.last_error)
+        self.assertEqual(webhooks.process_pending(), 0)
+
+        call_command('replay_webhooks', '--failed', '--process', stdout=mock.Mock())
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('done', 1))
+
+    def test_abandoned_claims_are_reclaimed(self):
+        """
+        Test that an event claimed by a worker that died is claimed again after the timeout.
+        """
+        self.assertEqual(len(webhooks.claim()), 1)
+        self.assertEqual(webhooks.claim(), [])
+        later = timezone.now() + timezone.timedelta(seconds=webhooks.CLAIM_TIMEOUT + 1)
+        self.assertEqual(len(webhooks.claim(now=later)), 1)
@@ -8,4 +8,15 @@ urlpatterns = [
     path('create-setup-intent', views.create_setup_intent, name='create_setup_intent'),
     path('webhook', views.webhook_received, name='webhook_received'),
     path('login', views.login_view, name='login'),
+    path('items', views.item_list, name='item_list'),
+    path('search', views.search_items, name='search_items'),
+    path('items/<int:year>/<int:month>/<int:day>/<int:id>/<slug:slug>', views.item_detail, name='item_detail'),
+    path('items/<int:item_id>/bid', views.place_bid_view, name='place_bid'),
+    path('items/<int:item_id>/images', views.upload_item_image, name='upload_item_image'),
+    path('media/images/<path:name>', views.serve_item_image, name='serve_item_image'),
+    path('items/<int:item_id>/stream', views.item_stream, name='item_stream'),
+    path('dashboard', views.seller_dashboard, name='seller_dashboard'),
+    path('notifications', views.notification_inbox, name='notification_inbox'),
+    path('notifications/read-all', views.notifications_read_all, name='notifications_read_all'),
+    path('analytics', views.analytics_report, name='analytics_report'),
 ]
\ No newline at end of file
@@ -0,0 +1,297 @@
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Bid, Feedback, Item, Transaction, User, UserStats
+
+COUNTERS = (
+    'sales_count', 'sales_total',
+    'purchases_count', 'purchases_total',
+    'bids_count', 'bids_total',
+    'feedback_count', 'feedback_rating_sum',
+    'active_listings',
+)
+CENT = Decimal('0.01')
+
+
+def _increment(field, value):
+    """
+    Return ``field + value`` as an ``UPDATE`` expression.
+
+    Decrements stop at zero: a counter that drifted (e.g. items inserted
+    with ``bulk_create``, which sends no signals) must not fail the
+    ``CHECK`` constraint of its ``PositiveIntegerField`` and with it the
+    write that is being counted.
+    """
+    if value >= 0:
+        return F(field) + value
+    return Greatest(F(field) + value, 0, output_field=UserStats._meta.get_field(field))
+
+
+def _add(deltas, user_id, **changes):
+    fields = deltas.setdefault(user_id, {})
+    for field, value in changes.items():
+        fields[field] = fields.get(field, 0) + value
+
+
+def apply(deltas):
+    """
+    Add ``{user_id: {field: increment}}`` to the users' stats rows.
+
+    Each user costs one ``UPDATE`` with ``F()`` increments, so concurrent
+    writers never lose updates; decrements stop at zero. Missing rows
+    are created on first use; pure decrements of a missing row are
+    dropped, which also keeps cascading deletes of a user from
+    resurrecting their row.
+    Call this inside the transaction that writes the underlying rows.
+    """
+    now = timezone.now()
+    for user_id, changes in deltas.items():
+        changes = {field: value for field, value in changes.items() if value}
+        if not changes:
+            continue
+        increments = {field: _increment(field, value) for field, value in changes.items()}
+        updated = UserStats.objects.filter(pk=user_id).update(updated_at=now, **increments)
+        if not updated and any(value > 0 for value in changes.values()):
+            UserStats.objects.bulk_create([UserStats(user_id=user_id)], ignore_conflicts=True)
+            UserStats.objects.filter(pk=user_id).update(updated_at=now, **increments)
+
+
+def record_bids(bids, sign=1):
+    """Count bids (or, with ``sign=-1``, uncount them) against their bidders."""
+    deltas = {}
+    for bid in bids:
+        _add(deltas, bid.bidder_id, bids_count=sign, bids_total=sign * Decimal(bid.bid_amount))
+    apply(deltas)
+
+
+def record_transactions(transactions, sign=1):
+    """Count transactions (or, with ``sign=-1``, uncount them) as sales of their sellers and purchases of their buyers."""
+    deltas = {}
+    for t in transactions:
+        amount = sign * Decimal(t.transaction_amount)
+        _add(deltas, t.seller_id, sales_count=sign, sales_total=amount)
+        _add(deltas, t.buyer_id, purchases_count=sign, purchases_total=amount)
+    apply(deltas)
+
+
+def record_listings(changes):
+    """
+    Apply ``(seller_id, status, sign)`` changes to the sellers' active listing counts.
+
+    Sellers are grouped by their net change, so closing a batch of
+    items costs one ``UPDATE`` per distinct change rather than one per
+    seller. Counts never go below zero.
+    """
+    net = {}
+    for seller_id, status, sign in changes:
+        if seller_id is not None and status == 'active':
+            net[seller_id] = net.get(seller_id, 0) + sign
+    by_change = {}
+    for seller_id, change in net.items():
+        if change:
+            by_change.setdefault(change, []).append(seller_id)
+    now = timezone.now()
+    for change, seller_ids in by_change.items():
+        if change > 0:
+            UserStats.objects.bulk_create([UserStats(user_id=seller_id) for seller_id in seller_ids],
+                                          ignore_conflicts=True)
+        UserStats.objects.filter(pk__in=seller_ids).update(
+            active_listings=_increment('active_listings', change), updated_at=now,
+        )
+
+
+def compute(user_ids):
+    """
+    Recompute stats for ``user_ids`` from the source tables.
+
+    This is the naive aggregation the stats table replaces: one
+    ``GROUP BY`` per source table.
+
+    Returns:
+        dict: ``{user_id: {field: value}}`` for every id in ``user_ids``.
+    """
+    stats = {user_id: dict.fromkeys(COUNTERS, 0) for user_id in user_ids}
+    sources = [
+        (Transaction.objects.filter(seller_id__in=user_ids), 'seller_id', 'transaction_amount', 'sales'),
+        (Transaction.objects.filter(buyer_id__in=user_ids), 'buyer_id', 'transaction_amount', 'purchases'),
+        (Bid.objects.filter(bidder_id__in=user_ids), 'bidder_id', 'bid_amount', 'bids'),
+    ]
+    for queryset, user_field, amount_field, prefix in sources:
+        rows = queryset.order_by().values(user_field).annotate(count=Count('id'), total=Sum(amount_field))
+        for row in rows:
+            stats[row[user_field]][f'{prefix}_count'] = row['count']
+            # SQLite sums decimals as floats; round back to cents.
+            stats[row[user_field]][f'{prefix}_total'] = Decimal(row['total']).quantize(CENT)
+    feedback = (
+        Feedback.objects.filter(rated_user_id__in=user_ids).order_by()
+        .values('rated_user_id').annotate(count=Count('id'), total=Sum('rating'))
+    )
+    for row in feedback:
+        stats[row['rated_user_id']]['feedback_count'] = row['count']
+        stats[row['rated_user_id']]['feedback_rating_sum'] = row['total']
+    listings = (
+        Item.objects.filter(seller_id__in=user_ids, status='active').order_by()
+        .values('seller_id').annotate(count=Count('id'))
+    )
+    for row in listings:
+        stats[row['seller_id']]['active_listings'] = row['count']
+    return stats
+
+
+def reconcile(chunk_size=1000, fix=True):
+    """
+    Compare every user's stats row with a full recomputation.
+
+    Users are walked in id order, ``chunk_size`` at a time. Within a
+    chunk the existing stats rows are locked before recomputing, so
+    incremental updates that arrive meanwhile wait and land on top of
+    the corrected totals instead of being overwritten. Mismatched rows
+    are rewritten with one upsert per chunk.
+
+    Args:
+        chunk_size (int): Users per chunk.
+        fix (bool): Rewrite mismatched rows; ``False`` only reports them.
+
+    Returns:
+        list: ``(user_id, field, stored, actual)`` for every mismatch found.
+    """
+    mismatches = []
+    last_id = 0
+    while True:
+        user_ids = list(
+            User.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not user_ids:
+            return mismatches
+        last_id = user_ids[-1]
+        with transaction.atomic():
+            stored = {
+                row['user_id']: row
+                for row in UserStats.objects.select_for_update().filter(pk__in=user_ids).values('user_id', *COUNTERS)
+            }
+            actual = compute(user_ids)
+            stale = []
+            for user_id in user_ids:
+                row = stored.get(user_id, {})
+                wrong = [
+                    (user_id, field, row.get(field, 0), actual[user_id][field])
+                    for field in COUNTERS if row.get(field, 0) != actual[user_id][field]
+                ]
+                # A missing row only matters once the user has activity.
+                if wrong and (user_id in stored or any(actual[user_id].values())):
+                    mismatches += wrong
+                    stale.append(UserStats(user_id=user_id, updated_at=timezone.now(), **actual[user_id]))
+            if fix and stale:
+                # MySQL upserts on any unique key and rejects an explicit conflict target.
+                features = connections[router.db_for_write(UserStats)].features
+                UserStats.objects.bulk_create(
+                    stale, update_conflicts=True, update_fields=[*COUNTERS, 'updated_at'],
+                    unique_fields=['user'] if features.supports_update_conflicts_with_target else None,
+                )
+
+
+def get_dashboard(user_id):
+    """
+    Return a user's dashboard figures with a single primary key lookup.
+
+    Returns:
+        dict: Counts, totals and ``average_rating`` (``None`` without feedback).
+    """
+    stats = UserStats.objects.filter(pk=user_id).first() or UserStats(user_id=user_id)
+    return {
+        'sales_count': stats.sales_count,
+        'sales_total': str(stats.sales_total),
+        'purchases_count': stats.purchases_count,
+        'purchases_total': str(stats.purchases_total),
+        'bids_count': stats.bids_count,
+        'bids_total': str(stats.bids_total),
+        'feedback_count': stats.feedback_count,
+        'average_rating': stats.average_rating,
+        'active_listings': stats.active_listings,
+    }
+
+
+@receiver(post_save, sender=Transaction)
+def count_transaction(sender, instance, created, **kwargs):
+    if created:
+        record_transactions([instance])
+
+
+@receiver(post_delete, sender=Transaction)
+def uncount_transaction(sender, instance, **kwargs):
+    record_transactions([instance], sign=-1)
+
+
+@receiver(post_save, sender=Bid)
+def count_bid(sender, instance, created, **kwargs):
+    if created:
+        record_bids([instance])
+
+
+@receiver(post_delete, sender=Bid)
+def uncount_bid(sender, instance, **kwargs):
+    record_bids([instance], sign=-1)
+
+
+def _rate(deltas, rated_user_id, rating, sign):
+    if rated_user_id is not None:
+        _add(deltas, rated_user_id, feedback_count=sign, feedback_rating_sum=sign * rating)
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_feedback(sender, instance, **kwargs):
+    if not instance._state.adding and instance.loaded_values is None:
+        # Not loaded from the database; read the rating this save replaces.
+        instance.loaded_values = Feedback.objects.filter(pk=instance.pk).values_list(*Feedback.tracked_fields).first()
+
+
+@receiver(post_save, sender=Feedback)
+def count_feedback(sender, instance, created, **kwargs):
+    # Feedback counts towards the rated user, not the one who left it.
+    deltas = {}
+    _rate(deltas, instance.rated_user_id, instance.rating, 1)
+    if not created and instance.loaded_values is not None:
+        _rate(deltas, *instance.loaded_values, -1)
+    instance.remember_loaded()
+    apply(deltas)
+
+
+@receiver(post_delete, sender=Feedback)
+def uncount_feedback(sender, instance, **kwargs):
+    deltas = {}
+    _rate(deltas, instance.rated_user_id, instance.rating, -1)
+    apply(deltas)
+
+
+def _touches_listing(update_fields):
+    return update_fields is None or not update_fields.isdisjoint({'seller', 'seller_id', 'status'})
+
+
+@receiver(pre_save, sender=Item)
+def remember_listing(sender, instance, update_fields=None, **kwargs):
+    # Items loaded from the database already know their stored seller and
+    # status, so bid and closer saves cost no extra query.
+    if not instance._state.adding and instance.loaded_values is None and _touches_listing(update_fields):
+        instance.loaded_values = Item.objects.filter(pk=instance.pk).values_list(*Item.tracked_fields).first()
+
+
+@receiver(post_save, sender=Item)
+def count_listing(sender, instance, created, update_fields=None, **kwargs):
+    if not _touches_listing(update_fields):
+        return
+    changes = [(instance.seller_id, instance.status, 1)]
+    if not created and instance.loaded_values is not None:
+        changes.append((*instance.loaded_values, -1))
+    instance.remember_loaded()
+    record_listings(changes)
+
+
+@receiver(post_delete, sender=Item)
+def uncount_listing(sender, instance, **kwargs):
+    record_listings([(instance.seller_id, instance.status, -1)])
@@ -1,19 +1,37 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
-from django.contrib.auth.hashers import make_password, check_password
-from django.http import JsonResponse, HttpResponse
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse, Http404
 from django.views.decorators.csrf import csrf_exempt
-from .forms import RegistrationForm, LoginForm
-from .models import User
+from django.views.decorators.http import condition, require_POST, require_safe
+from .analytics import GRANULARITIES, bid_activity, sales_activity, category_summary, pick_granularity
+from .bidding import place_bid, BidRejected
+from .forms import RegistrationForm, LoginForm, BidForm
+from .item_cache import get_static, get_live
+from .listings import get_page, InvalidCursor, SORT_KEYS, PAGE_SIZE, MAX_PAGE_SIZE
+from .models import User, Item, Notification
+from .notifications import unread_count, mark_all_read
+from .payments import get_gateway, PaymentError
+from .proxy import proxy_engine
+from .routers import replica_reads, refresh_stale
+from .search import get_index
+from .sessions import read_only_session
+from .streaming import bid_hub, sse_events
+from .user_stats import get_dashboard
+from . import images, inbox, webhooks
+from django.conf import settings
 from django.contrib import messages
+from django.utils import timezone
+from asgiref.sync import sync_to_async
 import stripe
+import math
 import os
-import json
+import uuid
+from decimal import Decimal, InvalidOperation
 
 # Retrieve Stripe API keys from environment variables
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
-STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
 stripe.api_key = STRIPE_SECRET_KEY
 
 
@@ -22,53 +40,39 @@ def get_setup_intent_page(request):
     return render(request, 'auction_app/register-card.html')
 
 
+@read_only_session
 def get_publishable_key(request):
     """Return the public key for Stripe."""
     return JsonResponse({'publicKey': STRIPE_PUBLIC_KEY})
 
 
 @csrf_exempt
-def create_setup_intent(request):
+async def create_setup_intent(request):
     """Create a SetupIntent for setting up a payment method."""
-    customer = stripe.Customer.create()
-    setup_intent = stripe.SetupIntent.create(customer=customer.id)
+    # A client retrying the same request sends the same key, so Stripe does not create duplicates
+    key = request.headers.get('Idempotency-Key') or uuid.uuid4().hex
+    gateway = get_gateway()
+    try:
+        customer = await gateway.acreate_customer(idempotency_key=f'{key}:customer')
+        setup_intent = await gateway.acreate_setup_intent(customer['id'], idempotency_key=f'{key}:setup_intent')
+    except PaymentError:
+        return JsonResponse({'error': 'Payment provider unavailable, please retry.'}, status=502)
     return JsonResponse({
-        'client_secret': setup_intent.client_secret,
-        'customer': customer.id
+        'client_secret': setup_intent['client_secret'],
+        'customer': customer['id']
     })
 
 
 @csrf_exempt
+@require_POST
 def webhook_received(request):
-    """Handle Stripe webhook events."""
-    webhook_secret = STRIPE_WEBHOOK_SECRET
-    request_data = json.loads(request.body.decode('utf-8'))
-    payload = request.body
-    sig_header = request.META['HTTP_STRIPE_SIGNATURE']
-    event = None
-    customer_id = None
-
+    """Verify a Stripe webhook event and queue it for the webhook workers."""
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
-    except ValueError as e:
-        # Invalid payload
+        event = webhooks.verify(request.body, request.headers.get('Stripe-Signature'))
+        webhooks.enqueue(event, request.body)
+    except (ValueError, KeyError, stripe.error.SignatureVerificationError):
         return HttpResponse(status=400)
-    except stripe.error.SignatureVerificationError as e:
-        # Invalid signature
-        return HttpResponse(status=400)
-
-    # Handle different Stripe webhook events
-    if event['type'] == 'setup_intent.created':
-        print('🔔 A new SetupIntent was created.')
-    elif event["type"] == "setup_intent.succeeded":
-        print('🔔 A SetupIntent has successfully set up a PaymentMethod for future use.')
-    elif event["type"] == 'payment_method.attached':
-        print('🔔 A PaymentMethod has successfully been saved to a Customer.')
-        customer_id = event['data']['object']['customer']
-    elif event["type"] == 'setup_intent.setup_failed':
-        print('🔔 A SetupIntent has failed the attempt to set up a PaymentMethod.')
-
-    return redirect('registration', customer_id=customer_id)
+    return HttpResponse(status=200)
 
 
 def registration(request, customer_id):
@@ -105,22 +109,285 @@ def registration(request, customer_id):
 def login_view(request):
     """Handle user login."""
     if request.method == 'POST':
-        email = request.POST.get('email').strip()
-        password = request.POST.get('password').strip()
-
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            messages.error(request, 'Invalid email or password')
-            return redirect('login')
+        email = request.POST.get('email', '').strip()
+        password = request.POST.get('password', '').strip()
 
-        if check_password(password, user.password):
-            authenticated_user = user
-            login(request, authenticated_user)
-            return HttpResponse('success')
-        else:
+        user = authenticate(request, email=email, password=password)
+        if user is None:
             messages.error(request, 'Invalid email or password')
             return redirect('login')
+        login(request, user)
+        return HttpResponse('success')
 
     form = LoginForm()
     return render(request, 'auction_app/login.html', {'form': form})
+
+
+@require_POST
+def place_bid_view(request, item_id):
+    """Place a bid, or a maximum bid to be placed by proxy, on an item for the logged-in user."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+
+    form = BidForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'error': 'invalid', 'errors': form.errors}, status=400)
+
+    amount, max_bid = form.cleaned_data['bid_amount'], form.cleaned_data['max_bid']
+    try:
+        if max_bid is None and not proxy_engine.has_proxies(item_id):
+            bid = place_bid(item_id, request.user, amount)
+            bids, leader_id, current_bid = [bid], request.user.id, bid.bid_amount
+        else:
+            # Once anyone bids by maximum, manual bids go through the ladder too.
+            bids, leader_id, current_bid = proxy_engine.place(
+                item_id, request.user, max_bid or amount, exact=max_bid is None,
+            )
+    except BidRejected as e:
+        status = 404 if e.reason == 'not_found' else 409
+        return JsonResponse({'error': e.reason, 'message': e.message}, status=status)
+
+    own = [bid.id for bid in bids if bid.bidder_id == request.user.id]
+    return JsonResponse({
+        'bid_id': own[-1] if own else None,
+        'item_id': item_id,
+        'current_bid': str(current_bid),
+        'leading': leader_id == request.user.id,
+    }, status=201)
+
+
+@require_POST
+def upload_item_image(request, item_id):
+    """Add an uploaded photo to one of the logged-in user's items, rendered at every thumbnail size."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    item = Item.objects.filter(pk=item_id).only('id', 'seller_id').first()
+    if item is None:
+        raise Http404('Item does not exist.')
+    if item.seller_id != request.user.id:
+        return JsonResponse({'error': 'Only the seller can add images.'}, status=403)
+    upload = request.FILES.get('image')
+    if upload is None:
+        return JsonResponse({'error': 'invalid', 'message': 'No image file sent.'}, status=400)
+    if upload.size > settings.IMAGE_MAX_BYTES:
+        return JsonResponse({'error': 'too_large', 'message': 'Image file is too large.'}, status=413)
+
+    try:
+        image = images.add_image(item, upload.read())
+    except images.ImageRejected as e:
+        status = {'too_large': 413, 'unavailable': 503}.get(e.reason, 400)
+        return JsonResponse({'error': e.reason, 'message': e.message}, status=status)
+    return JsonResponse({
+        'id': image.id,
+        'digest': image.digest,
+        'variants': {name: image.variant(name) for name in image.variants},
+    }, status=201)
+
+
+def _image_etag(request, name):
+    match = images.NAME_RE.match(name)
+    return match.group(3) if match else None
+
+
+@require_safe
+@condition(etag_func=_image_etag)
+def serve_item_image(request, name):
+    """Serve a stored image variant; its name is its content hash, so it is cacheable forever."""
+    path = images.get_store().path(name)
+    if path is None:
+        raise Http404('No such image.')
+    try:
+        response = FileResponse(open(path, 'rb'), content_type=images.CONTENT_TYPES[name.rsplit('.', 1)[1]])
+    except FileNotFoundError:
+        raise Http404('No such image.')
+    response['Cache-Control'] = images.CACHE_CONTROL
+    return response
+
+
+@read_only_session
+async def item_stream(request, item_id):
+    """Stream an item's current bid, bid count and time left as Server-Sent Events."""
+    try:
+        subscription = await bid_hub.subscribe(item_id)
+    except Item.DoesNotExist:
+        raise Http404('Item does not exist.')
+
+    response = StreamingHttpResponse(sse_events(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@replica_reads
+@read_only_session
+def item_list(request):
+    """List items as JSON or HTML, filtered by category, seller and status, with keyset pagination."""
+    status = request.GET.get('status', 'active')
+    sort = request.GET.get('sort', 'ending')
+    category = request.GET.get('category')
+    seller = request.GET.get('seller')
+    if status not in dict(Item.STATUS_CHOICES) or sort not in SORT_KEYS:
+        return JsonResponse({'error': 'Invalid status or sort.'}, status=400)
+    if seller == 'me':
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+        seller = str(request.user.id)
+    try:
+        category_id = int(category) if category else None
+        seller_id = int(seller) if seller else None
+        page_size = min(int(request.GET.get('page_size', PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid category, seller or page_size.'}, status=400)
+
+    try:
+        page = get_page(category_id, status, sort, request.GET.get('cursor'), max(page_size, 1), seller_id)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if request.GET.get('format') == 'json' or 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(page)
+    return render(request, 'auction_app/item_list.html', {
+        'page': page,
+        'status': status,
+        'sort': sort,
+        'category_id': category_id,
+        'seller_id': seller_id,
+    })
+
+
+@replica_reads
+def item_detail(request, year, month, day, id, slug):
+    """Show an item page assembled from its cached static and live fragments."""
+    static = get_static(id)
+    if static is None:
+        raise Http404('Item does not exist.')
+    if request.path != static['url']:
+        return redirect(static['url'], permanent=True)
+
+    return render(request, 'auction_app/item_detail.html', {
+        'item_id': id,
+        'static': static,
+        'live': get_live(id),
+    })
+
+
+@replica_reads
+@read_only_session
+def search_items(request):
+    """Search items by title, description and category name, with optional filters."""
+    query = request.GET.get('q', '').strip()
+    status = request.GET.get('status') or None
+    if status is not None and status not in dict(Item.STATUS_CHOICES):
+        return JsonResponse({'error': 'Invalid status.'}, status=400)
+    try:
+        category_id = int(request.GET['category']) if request.GET.get('category') else None
+        min_price = Decimal(request.GET['min_price']) if request.GET.get('min_price') else None
+        max_price = Decimal(request.GET['max_price']) if request.GET.get('max_price') else None
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except (ValueError, InvalidOperation):
+        return JsonResponse({'error': 'Invalid filter value.'}, status=400)
+
+    hits = get_index().search(
+        request.GET.get('q', ''),
+        category_id=category_id,
+        status=status,
+        min_price=min_price,
+        max_price=max_price,
+        limit=limit,
+    ) if query else []
+    queryset = Item.objects.select_related('category')
+    items = list(queryset.filter(pk__in=[item_id for item_id, _ in hits]))
+    items = {item.id: item for item in refresh_stale(items, queryset)}
+    return JsonResponse({'results': [
+        {
+            'id': item_id,
+            'score': round(score, 4),
+            'title': items[item_id].title,
+            'category': items[item_id].category.category_name,
+            'current_bid': str(items[item_id].current_bid),
+            'status': items[item_id].status,
+            'url': items[item_id].get_absolute_url(),
+        }
+        for item_id, score in hits if item_id in items
+    ]})
+
+
+@replica_reads
+@read_only_session
+async def notification_inbox(request):
+    """List the logged-in user's notifications, or wait for new ones with ``wait=1``."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    read_status = request.GET.get('read_status')
+    if read_status is not None and read_status not in dict(Notification.READ_STATUS_CHOICES):
+        return JsonResponse({'error': 'Invalid read_status.'}, status=400)
+    try:
+        page_size = min(max(int(request.GET.get('page_size', inbox.PAGE_SIZE)), 1), inbox.MAX_PAGE_SIZE)
+        after = int(request.GET.get('after', 0))
+        timeout = min(max(float(request.GET.get('timeout', inbox.WAIT_TIMEOUT)), 0), inbox.MAX_WAIT_TIMEOUT)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid page_size, after or timeout.'}, status=400)
+
+    if request.GET.get('wait'):
+        notifications = await inbox.wait_for_new(user.id, after, timeout, page_size)
+        return JsonResponse({'notifications': notifications})
+
+    try:
+        page = await sync_to_async(inbox.fetch_inbox)(user.id, read_status, request.GET.get('cursor'), page_size)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    page['unread'] = await sync_to_async(unread_count)(user.id)
+    return JsonResponse(page)
+
+
+@require_POST
+def notifications_read_all(request):
+    """Mark all of the logged-in user's notifications as read."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required.'}, status=401)
+    return JsonResponse({'marked': mark_all_read(request.user.id)})
+
+
+def seller_dashboard(request):
+    """Show the logged-in user's sales, purchases, bids and feedback totals as JSON or HTML."""
+    if not request.user.is_authenticated:
+        return redirect('login')
+    stats = get_dashboard(request.user.id)
+    if request.GET.get('format') == 'json' or 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(stats)
+    return render(request, 'auction_app/dashboard.html', {'stats': stats})
+
+
+@replica_reads
+def analytics_report(request):
+    """Return bid, sales and category figures for the last ``hours`` from the rollup tables."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff access required.'}, status=403)
+    granularity = request.GET.get('granularity')
+    if granularity is not None and granularity not in GRANULARITIES:
+        return JsonResponse({'error': 'Invalid granularity.'}, status=400)
+    try:
+        hours = float(request.GET.get('hours', 24))
+        if not math.isfinite(hours) or hours <= 0:
+            raise ValueError(hours)
+        hours = min(max(hours, 1 / 60), 24 * 366)
+        item_id = int(request.GET['item']) if request.GET.get('item') else None
+        category_id = int(request.GET['category']) if request.GET.get('category') else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid hours, item or category.'}, status=400)
+
+    end = timezone.now()
+    start = end - timezone.timedelta(hours=hours)
+    granularity = granularity or pick_granularity(start, end)
+    report = {
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'bids': bid_activity(start, end, granularity, item_id=item_id, category_id=category_id),
+    }
+    if item_id is None:
+        report['sales'] = sales_activity(start, end, granularity, category_id=category_id)
+        if category_id is None:
+            report['categories'] = category_summary(start, end, granularity)
+    return JsonResponse(report)
@@ -0,0 +1,197 @@
+import json
+import logging
+import threading
+
+import stripe
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import User, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+CLAIM_TIMEOUT = 300
+HANDLERS = {}
+
+
+def handles(event_type):
+    """Register the decorated function as the handler for ``event_type``."""
+    def register(handler):
+        HANDLERS[event_type] = handler
+        return handler
+    return register
+
+
+def verify(payload, signature, secret=None):
+    """
+    Check a webhook signature and parse the event.
+
+    The signature is checked against the raw bytes, then the body is
+    parsed once into a plain dict.
+
+    Raises:
+        stripe.SignatureVerificationError: If the signature is missing, stale or wrong.
+        ValueError: If the body is not valid JSON.
+    """
+    secret = secret or settings.STRIPE_WEBHOOK_SECRET
+    stripe.WebhookSignature.verify_header(payload.decode('utf-8'), signature, secret, stripe.Webhook.DEFAULT_TOLERANCE)
+    return json.loads(payload)
+
+
+def enqueue(event, payload):
+    """
+    Persist a verified event for the workers.
+
+    This is a single ``INSERT`` that silently skips event ids already
+    stored, so redeliveries cost no more than a fresh event.
+    """
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(event_id=event['id'], type=event['type'], payload=payload.decode('utf-8'))],
+        ignore_conflicts=True,
+    )
+
+
+def claim(batch_size=100, now=None):
+    """
+    Claim up to ``batch_size`` events for processing.
+
+    Pending events are claimed oldest first, together with events whose
+    claim is older than ``CLAIM_TIMEOUT`` seconds (their worker died).
+    Rows are locked with ``SKIP LOCKED`` where supported, so workers
+    never claim the same event.
+
+    Returns:
+        list: The claimed ``WebhookEvent`` objects.
+    """
+    now = now or timezone.now()
+    abandoned = now - timezone.timedelta(seconds=CLAIM_TIMEOUT)
+    with transaction.atomic():
+        ids = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='processing', claimed_at__lt=abandoned))
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        WebhookEvent.objects.filter(pk__in=ids).update(
+            status='processing', claimed_at=now, attempts=F('attempts') + 1
+        )
+    return list(WebhookEvent.objects.filter(pk__in=ids).order_by('id'))
+
+
+def process(event):
+    """
+    Run the handler for one claimed event and record the outcome.
+
+    Events without a handler are marked done. A failing handler puts the
+    event back to ``pending`` until it has been tried ``MAX_ATTEMPTS``
+    times, after which it is marked ``failed`` for ``replay_webhooks``.
+
+    Returns:
+        bool: Whether the event was processed successfully.
+    """
+    handler = HANDLERS.get(event.type)
+    try:
+        if handler is not None:
+            data = json.loads(event.payload)
+            with transaction.atomic():
+                handler(data['data']['object'], data)
+    except Exception as error:
+        logger.exception('Webhook %s (%s) failed', event.event_id, event.type)
+        WebhookEvent.objects.filter(pk=event.pk).update(
+            status='failed' if event.attempts >= MAX_ATTEMPTS else 'pending',
+            last_error=repr(error),
+        )
+        return False
+    WebhookEvent.objects.filter(pk=event.pk).update(status='done', processed_at=timezone.now(), last_error='')
+    return True
+
+
+def process_pending(batch_size=100):
+    """
+    Claim and process one batch of events.
+
+    Returns:
+        int: Number of events claimed.
+    """
+    events = claim(batch_size)
+    for event in events:
+        process(event)
+    return len(events)
+
+
+def replay(event_ids=None, event_type=None, since=None, failed_only=False):
+    """
+    Put stored events back in the queue with a fresh attempt budget.
+
+    Handlers must therefore be idempotent, which also covers the rare
+    case of an abandoned claim being processed twice.
+
+    Returns:
+        int: Number of events re-queued.
+    """
+    events = WebhookEvent.objects.exclude(status='processing')
+    if event_ids:
+        events = events.filter(event_id__in=event_ids)
+    if event_type:
+        events = events.filter(type=event_type)
+    if since:
+        events = events.filter(received_at__gte=since)
+    if failed_only:
+        events = events.filter(status='failed')
+    return events.update(status='pending', attempts=0, claimed_at=None, last_error='')
+
+
+class WebhookWorker(threading.Thread):
+    """
+    Background thread draining the webhook queue.
+
+    Sleeps for ``poll`` seconds whenever the queue is empty. Several
+    workers can run in one process or across machines.
+    """
+
+    def __init__(self, batch_size=100, poll=1.0, name='webhook-worker'):
+        super().__init__(daemon=True, name=name)
+        self.batch_size = batch_size
+        self.poll = poll
+        self._stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+        try:
+            while not self._stopped.is_set():
+                try:
+                    claimed = process_pending(self.batch_size)
+                except Exception:
+                    logger.exception('Claiming webhook events failed')
+                    claimed = 0
+                if not claimed:
+                    self._stopped.wait(self.poll)
+        finally:
+            connection.close()
+
+    def stop(self):
+        """Stop the thread once its current batch is done."""
+        self._stopped.set()
+        self.join()
+
+
+@handles('payment_method.attached')
+def attach_customer(payment_method, event):
+    """Link the Stripe customer to the user with the card's billing email."""
+    email = (payment_method.get('billing_details') or {}).get('email')
+    customer_id = payment_method.get('customer')
+    if email and customer_id:
+        User.objects.filter(email__iexact=email, stripe_customer_id__isnull=True).update(
+            stripe_customer_id=customer_id
+        )
+
+
+@handles('setup_intent.setup_failed')
+def log_setup_failure(setup_intent, event):
+    error = setup_intent.get('last_setup_error') or {}
+    logger.warning('SetupIntent %s failed: %s', setup_intent.get('id'), error.get('message'))
@@ -0,0 +1,111 @@
+"""
+Rollup throughput and dashboard latency from rollups versus raw tables.
+
+Seeds scratch items with bids and transactions spread over the last
+``--days`` days, rolls them up from an empty checkpoint, times an
+incremental catch-up, and then compares an hourly bid chart and a
+per-category summary answered from the rollups against the same
+``GROUP BY`` over the raw ``Bid`` and ``Transaction`` tables::
+
+    python -m benchmarks.analytics_rollups --items 200 --bids 500000 --transactions 20000
+
+Point DJANGO_SETTINGS_MODULE at a disposable database: seeded rows are
+not cleaned up.
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from .common import setup_django, create_fixture_item, create_fixture_users, Timer, report, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--bids', type=int, default=200000)
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--chunk', type=int, default=5000, help='rows per bulk_create')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Count, Sum
+    from django.db.models.functions import TruncHour
+    from django.utils import timezone
+    from auction_app import analytics
+    from auction_app.models import Bid, PaymentMethod, Transaction
+
+    now = timezone.now()
+    start = now - timedelta(days=args.days)
+    span = int((now - start).total_seconds())
+    items = [create_fixture_item('rollup') for _ in range(args.items)]
+    users = [user.id for user in create_fixture_users(200, prefix='rollup')]
+    card = PaymentMethod.objects.create(method='Benchmark card')
+
+    def moment():
+        return start + timedelta(seconds=random.randrange(span))
+
+    def seed(model, total, make, time_field):
+        # bulk_create skips auto_now_add, so timestamps can be spread over the window.
+        for offset in range(0, total, args.chunk):
+            rows = [make() for _ in range(min(args.chunk, total - offset))]
+            for row in rows:
+                setattr(row, time_field, moment())
+            model.objects.bulk_create(rows)
+
+    with Timer() as seeding:
+        seed(Bid, args.bids, lambda: Bid(item=random.choice(items), bidder_id=random.choice(users),
+                                         bid_amount=Decimal(random.randint(100, 100000)) / 100), 'bid_time')
+        seed(Transaction, args.transactions, lambda: Transaction(
+            item=random.choice(items), buyer_id=random.choice(users), seller_id=random.choice(users),
+            transaction_amount=Decimal(random.randint(100, 100000)) / 100, payment_method=card), 'transaction_date')
+
+    analytics.reset()
+    with Timer() as full:
+        totals = analytics.run(batch_size=args.batch_size, settle=0)
+    rows_rolled = sum(totals.values())
+
+    seed(Bid, 1000, lambda: Bid(item=random.choice(items), bidder_id=random.choice(users),
+                                bid_amount=Decimal('1.00')), 'bid_time')
+    with Timer() as incremental:
+        analytics.run(batch_size=args.batch_size, settle=0)
+
+    def time_calls(func):
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return f'{percentile(samples, 50) * 1e3:.2f} / {percentile(samples, 99) * 1e3:.2f}'
+
+    def raw_chart():
+        return list(Bid.objects.filter(bid_time__gte=start).annotate(bucket=TruncHour('bid_time'))
+                    .order_by('bucket').values('bucket').annotate(bids=Count('id'), total=Sum('bid_amount')))
+
+    def raw_categories():
+        bids = list(Bid.objects.filter(bid_time__gte=start).order_by()
+                    .values('item__category_id').annotate(bids=Count('id')))
+        sales = list(Transaction.objects.filter(transaction_date__gte=start).order_by()
+                     .values('item__category_id').annotate(sales=Count('id'), revenue=Sum('transaction_amount')))
+        return bids, sales
+
+    report('Analytics rollups', [
+        ('seeded bids / transactions', f'{args.bids} / {args.transactions} in {seeding.elapsed:.1f}s'),
+        ('full rollup (s)', f'{full.elapsed:.2f}'),
+        ('full rollup (rows/s)', f'{rows_rolled / full.elapsed:,.0f}'),
+        ('incremental 1000 bids (ms)', f'{incremental.elapsed * 1e3:.1f}'),
+        ('rollup rows', ', '.join(f'{name}: {stream.rollup.objects.count()}'
+                                  for name, stream in analytics.STREAMS.items())),
+        ('hourly chart, raw p50/p99 (ms)', time_calls(raw_chart)),
+        ('hourly chart, rollup p50/p99 (ms)', time_calls(lambda: analytics.bid_activity(start, now, 'hour'))),
+        ('categories, raw p50/p99 (ms)', time_calls(raw_categories)),
+        ('categories, rollup p50/p99 (ms)', time_calls(lambda: analytics.category_summary(start, now, 'day'))),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Multi-threaded contention benchmark for ``auction_app.bidding.place_bid``.
+
+Every thread hammers the same hot item with increasing bids. The run
+reports accepted/rejected bids per second and checks that the final
+``Item.current_bid`` equals the highest stored ``Bid``::
+
+    python -m benchmarks.bid_contention --threads 16 --bids 200
+"""
+import argparse
+import random
+import threading
+from decimal import Decimal
+
+from .common import setup_django, Timer, report, create_fixture_item, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--bids', type=int, default=200, help='bids per thread')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.db.models import Max
+    from auction_app.bidding import place_bid, BidRejected
+    from auction_app.models import Bid
+
+    item = create_fixture_item('contention')
+    users = create_fixture_users(args.threads, 'contention')
+    accepted = [0] * args.threads
+    rejected = [0] * args.threads
+    barrier = threading.Barrier(args.threads)
+
+    def worker(index):
+        amount = Decimal(1)
+        barrier.wait()
+        try:
+            for _ in range(args.bids):
+                amount += Decimal(random.randint(1, 100)) / 100
+                try:
+                    place_bid(item.id, users[index], amount)
+                    accepted[index] += 1
+                except BidRejected:
+                    rejected[index] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    item.refresh_from_db()
+    top = Bid.objects.filter(item=item).aggregate(top=Max('bid_amount'))['top']
+    total = sum(accepted) + sum(rejected)
+    report('Bid contention on a single hot item', [
+        ('threads', args.threads),
+        ('attempts', total),
+        ('accepted', sum(accepted)),
+        ('rejected', sum(rejected)),
+        ('elapsed (s)', f'{timer.elapsed:.3f}'),
+        ('attempts/s', f'{total / timer.elapsed:.0f}'),
+        ('accepted/s', f'{sum(accepted) / timer.elapsed:.0f}'),
+        ('current_bid', item.current_bid),
+        ('max bid', top),
+        ('consistent', item.current_bid == top),
+    ])
+
+    category = item.category
+    item.delete()
+    category.delete()
+    for user in users:
+        user.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the project directory as modules, e.g.::
+
+    python -m benchmarks.bid_contention --threads 16
+
+and use whatever database ``DJANGO_SETTINGS_MODULE`` points at. With the
+project settings they default to the ``bench`` profile (``DJANGO_ENV``),
+a disposable SQLite database next to ``manage.py``.
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configure Django so benchmarks can use the ORM, migrating an in-memory database first."""
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'big4auction_project.settings')
+    os.environ.setdefault('DJANGO_ENV', 'bench')
+    import django
+    django.setup()
+
+    from django.db import connection
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile of ``samples`` (0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Timer:
+    """Context manager measuring wall-clock time in seconds."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(title, rows):
+    """Print a small aligned table of ``(label, value)`` rows."""
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f'  {label.ljust(width)}  {value}')
+
+
+def create_fixture_item(prefix='bench', **overrides):
+    """
+    Create a category and an active item for a benchmark run.
+
+    Returns:
+        Item: The new item. Delete it (and its category) when done.
+    """
+    from django.utils import timezone
+    from auction_app.models import Category, Item
+
+    now = timezone.now()
+    category = Category.objects.create(category_name=f'{prefix}-category')
+    fields = dict(
+        title=f'{prefix} item',
+        slug=f'{prefix}-item',
+        description='Benchmark fixture.',
+        category=category,
+        start_time=now - timezone.timedelta(minutes=1),
+        end_time=now + timezone.timedelta(days=1),
+        starting_bid=1,
+        reserve_price=1,
+        current_bid=1,
+        status='active',
+    )
+    fields.update(overrides)
+    return Item.objects.create(**fields)
+
+
+def create_fixture_users(count, prefix='bench'):
+    """Create ``count`` throwaway users and return them."""
+    from auction_app.models import User
+
+    stamp = int(time.time() * 1000)
+    return [
+        User.objects.create(
+            username=f'{prefix}-{stamp}-{i}',
+            email=f'{prefix}-{stamp}-{i}@example.com',
+            phone_number=f'{prefix}-{stamp}-{i}',
+        )
+        for i in range(count)
+    ]
@@ -0,0 +1,82 @@
+"""
+Throughput and memory of streaming bid exports.
+
+Tops the ``Bid`` table up to ``--rows`` rows, then exports it as CSV,
+gzipped CSV and JSON Lines to ``/dev/null``, reporting rows per second,
+output size and the peak Python heap (via ``tracemalloc``, in a separate
+pass) for the full table and for a tenth of it. Constant memory shows
+up as the same peak for both sizes::
+
+    python -m benchmarks.export_stream --rows 10000000
+
+Point DJANGO_SETTINGS_MODULE at a disposable database: seeded rows are
+not cleaned up.
+"""
+import argparse
+import random
+import tracemalloc
+from decimal import Decimal
+
+from .common import setup_django, create_fixture_item, create_fixture_users, Timer, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=2000, help='rows per keyset page')
+    parser.add_argument('--seed-chunk', type=int, default=20000, help='rows per bulk_create')
+    parser.add_argument('--formats', default='csv,csv.gz,jsonl')
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.exports import EXPORTS, render
+    from auction_app.models import Bid
+
+    missing = args.rows - Bid.objects.count()
+    if missing > 0:
+        items = [create_fixture_item('export').id for _ in range(50)]
+        users = [user.id for user in create_fixture_users(500, prefix='export')]
+        for start in range(0, missing, args.seed_chunk):
+            Bid.objects.bulk_create(
+                Bid(item_id=random.choice(items), bidder_id=random.choice(users),
+                    bid_amount=Decimal(random.randint(100, 100000)) / 100)
+                for _ in range(min(args.seed_chunk, missing - start))
+            )
+
+    export = EXPORTS['bids']
+    ids = Bid.objects.order_by('pk').values_list('pk', flat=True)
+    tenth = Bid.objects.filter(pk__lte=ids[max(args.rows // 10, 1) - 1])
+    full = Bid.objects.filter(pk__lte=ids[args.rows - 1])
+
+    def run(queryset, fmt):
+        name, _, suffix = fmt.partition('.')
+        written = 0
+        with open('/dev/null', 'wb') as out:
+            for block in render(export, export.rows(queryset, args.chunk_size), name, suffix == 'gz'):
+                written += len(block)
+                out.write(block)
+        return written
+
+    def peak(queryset, fmt):
+        tracemalloc.start()
+        try:
+            run(queryset, fmt)
+            return tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+    rows = []
+    for fmt in args.formats.split(','):
+        with Timer() as timer:
+            size = run(full, fmt)
+        rows += [
+            (f'{fmt}: rows/s', f'{args.rows / timer.elapsed:,.0f}'),
+            (f'{fmt}: output MB / seconds', f'{size / 2**20:,.1f} / {timer.elapsed:.1f}'),
+            (f'{fmt}: peak heap MB, {args.rows // 10:,} / {args.rows:,} rows',
+             f'{peak(tenth, fmt):.2f} / {peak(full, fmt):.2f}'),
+        ]
+    report(f'Streaming export of {args.rows:,} bids', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Query plan and latency harness for the auction hot queries.
+
+Seeds a scratch database with users, items, bids and notifications,
+then runs each hot query with the composite indexes from migration
+0008 dropped and again with them recreated, printing the query plan and
+p50/p99 latency for both::
+
+    python -m benchmarks.hot_queries --bids 2000000 --notifications 1000000
+    python -m benchmarks.hot_queries --skip-seed      # reuse seeded rows
+
+Point DJANGO_SETTINGS_MODULE at a disposable database: seeded rows are
+not cleaned up.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from .common import setup_django, report, percentile
+
+HOT_INDEXES = [
+    ('Bid', 'bid_item_amount_idx'),
+    ('Bid', 'bid_bidder_time_idx'),
+    ('Item', 'item_status_cat_end_idx'),
+    ('Notification', 'notif_user_read_time_idx'),
+]
+
+
+def seed(args):
+    from django.utils import timezone
+    from auction_app.models import Category, Item, Bid, Notification, User
+
+    stamp = int(time.time())
+    now = timezone.now()
+    categories = Category.objects.bulk_create(
+        Category(category_name=f'seed-{stamp}-{i}') for i in range(args.categories)
+    )
+    users = User.objects.bulk_create(
+        (User(username=f'seed-{stamp}-{i}', phone_number=f'seed-{stamp}-{i}') for i in range(args.users)),
+        batch_size=args.chunk,
+    )
+    statuses = ['active', 'active', 'expired', 'sold']
+    items = Item.objects.bulk_create(
+        (
+            Item(
+                title=f'Seed item {i}',
+                slug=f'seed-item-{i}',
+                description='Seeded for the hot query benchmark.',
+                category=random.choice(categories),
+                start_time=now - timezone.timedelta(days=7),
+                end_time=now + timezone.timedelta(minutes=random.randint(1, 60 * 24 * 14)),
+                starting_bid=1,
+                reserve_price=1,
+                current_bid=1,
+                status=random.choice(statuses),
+            )
+            for i in range(args.items)
+        ),
+        batch_size=args.chunk,
+    )
+    user_ids = [user.id for user in users]
+    item_ids = [item.id for item in items]
+
+    def chunks(total, make):
+        for start in range(0, total, args.chunk):
+            yield [make() for _ in range(min(args.chunk, total - start))]
+
+    for rows in chunks(args.bids, lambda: Bid(
+        item_id=random.choice(item_ids),
+        bidder_id=random.choice(user_ids),
+        bid_amount=Decimal(random.randint(100, 1000000)) / 100,
+    )):
+        Bid.objects.bulk_create(rows)
+    for rows in chunks(args.notifications, lambda: Notification(
+        user_id=random.choice(user_ids),
+        message='Seeded notification.',
+        read_status=random.choice(['read', 'unread']),
+    )):
+        Notification.objects.bulk_create(rows)
+
+
+def hot_queries():
+    from django.db.models import Max, Min
+    from auction_app.models import Category, Item, Bid, Notification, User
+
+    items = Item.objects.aggregate(low=Min('id'), high=Max('id'))
+    users = User.objects.aggregate(low=Min('id'), high=Max('id'))
+    categories = list(Category.objects.values_list('id', flat=True))
+
+    def random_item():
+        return random.randint(items['low'], items['high'])
+
+    def random_user():
+        return random.randint(users['low'], users['high'])
+
+    return [
+        ('top bid per item', lambda: Bid.objects.filter(item_id=random_item()).order_by('-bid_amount')[:1]),
+        ('active items by category', lambda: Item.objects.filter(
+            status='active', category_id=random.choice(categories)).order_by('end_time')[:50]),
+        ('unread notifications', lambda: Notification.objects.filter(
+            user_id=random_user(), read_status='unread').order_by('-timestamp')[:50]),
+        ('user bid history', lambda: Bid.objects.filter(bidder_id=random_user()).order_by('-bid_time')[:50]),
+    ]
+
+
+def toggle_indexes(create):
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for model_name, index_name in HOT_INDEXES:
+            model = apps.get_model('auction_app', model_name)
+            index = next(index for index in model._meta.indexes if index.name == index_name)
+            if create:
+                editor.add_index(model, index)
+            else:
+                editor.remove_index(model, index)
+
+
+def measure(label, repeat):
+    rows = []
+    for name, make_query in hot_queries():
+        print(f'[{label}] {name}')
+        print('  ' + make_query().explain().replace('\n', '\n  '))
+        samples = []
+        for _ in range(repeat):
+            queryset = make_query()
+            start = time.perf_counter()
+            list(queryset)
+            samples.append(time.perf_counter() - start)
+        rows.append((f'{label} {name} p50/p99 (ms)',
+                     f'{percentile(samples, 50) * 1e3:.2f} / {percentile(samples, 99) * 1e3:.2f}'))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--bids', type=int, default=1000000)
+    parser.add_argument('--notifications', type=int, default=1000000)
+    parser.add_argument('--chunk', type=int, default=5000, help='rows per bulk_create')
+    parser.add_argument('--repeat', type=int, default=200, help='runs per query')
+    parser.add_argument('--skip-seed', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(args)
+        print(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+    toggle_indexes(create=False)
+    try:
+        rows = measure('before', args.repeat)
+    finally:
+        toggle_indexes(create=True)
+    rows += measure('after', args.repeat)
+
+    report('Hot query latency', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput of the item image upload pipeline and the bytes it saves listing pages.
+
+Generates ``--images`` synthetic camera-sized JPEGs and renders every
+``IMAGE_SIZES`` variant of each, first in this process and then through
+the pool with ``--workers`` processes, into a temporary store. Reports
+images/s and p50 latency for both, the cost of a duplicate upload (hash
+and lookup only), and the average bytes of an original against its
+thumbnails, i.e. what one listing entry transfers instead of hotlinking
+the full-size photo::
+
+    python -m benchmarks.image_pipeline --images 40 --workers 4 --width 4000 --height 3000
+
+The pool only beats the single process with as many free cores as workers.
+"""
+import argparse
+import io
+import random
+import tempfile
+from concurrent.futures import wait
+
+from .common import setup_django, Timer, report, percentile, create_fixture_item
+
+
+def synthetic_photo(rng, width, height):
+    """Return JPEG bytes of a noisy gradient, which compresses roughly like a photo."""
+    from PIL import Image
+
+    noise = Image.effect_noise((width // 4, height // 4), rng.randint(20, 60)).resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', (noise, gradient, Image.eval(noise, lambda v: 255 - v)))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--images', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from auction_app import images
+
+    settings.IMAGE_STORE_ROOT = tempfile.mkdtemp()
+    rng = random.Random(0)
+    uploads = [synthetic_photo(rng, args.width, args.height) for _ in range(args.images)]
+    render_args = (settings.IMAGE_SIZES, tuple(settings.IMAGE_FORMATS), settings.IMAGE_QUALITY,
+                   settings.IMAGE_MAX_PIXELS)
+
+    rows = []
+    latencies = []
+    with Timer() as inline:
+        for data in uploads:
+            with Timer() as one:
+                rendered = images.render_variants(data, *render_args)
+            latencies.append(one.elapsed)
+    rows.append(('in process: images/s', f'{args.images / inline.elapsed:,.1f}'))
+    rows.append(('in process: p50 per image (ms)', f'{percentile(latencies, 50) * 1000:,.0f}'))
+
+    settings.IMAGE_WORKERS = args.workers
+    pool = images.get_pool()
+    # Start every worker before timing, as a long-running server would have.
+    wait([pool.submit(images.render_variants, uploads[0], *render_args) for _ in range(args.workers)])
+    with Timer() as pooled:
+        wait([pool.submit(images.render_variants, data, *render_args) for data in uploads])
+    images.shutdown_pool()
+    rows.append((f'pool of {args.workers}: images/s', f'{args.images / pooled.elapsed:,.1f}'))
+
+    settings.IMAGE_WORKERS = 0
+    item = create_fixture_item('images')
+    try:
+        images.add_image(item, uploads[0])
+        with Timer() as duplicate:
+            for _ in range(100):
+                images.process_image(uploads[0])
+        rows.append(('duplicate upload (ms)', f'{duplicate.elapsed * 10:,.2f}'))
+    finally:
+        category = item.category
+        item.delete()
+        category.delete()
+
+    original = sum(map(len, uploads)) / len(uploads)
+    rows.append(('original (KB)', f'{original / 1024:,.0f}'))
+    for name, variant in rendered.items():
+        sizes = ' / '.join(f'{fmt} {len(data) / 1024:,.1f}' for fmt, data in variant['data'].items())
+        rows.append((f'{name} {variant["width"]}x{variant["height"]} (KB)', sizes))
+    report(f'{args.images} uploads of {args.width}x{args.height}, sizes {settings.IMAGE_SIZES}', rows)
+
+
+if __name__ == '__main__':
+    main()
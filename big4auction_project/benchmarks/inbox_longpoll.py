@@ -0,0 +1,97 @@
+"""
+Idle database load and delivery latency of long-polling inbox requests.
+
+Parks one ``wait_for_new()`` call per scratch user on a single event
+loop, counts the queries issued while they sit idle, then dispatches
+notifications to a sample of them and measures how long each parked
+request takes to return after the dispatch commits::
+
+    python -m benchmarks.inbox_longpoll --users 2000 --idle 10 --deliver 200
+
+Scratch users and their notifications are deleted afterwards.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from .common import setup_django, create_fixture_users, report, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=2000, help='connected users, one parked request each')
+    parser.add_argument('--idle', type=float, default=10, help='seconds to sit idle while counting queries')
+    parser.add_argument('--deliver', type=int, default=200, help='users who then receive a notification')
+    args = parser.parse_args()
+
+    setup_django()
+    from asgiref.sync import ThreadSensitiveContext, async_to_sync, sync_to_async
+    from django.db.backends.signals import connection_created
+    from django.db.models import Max
+    from auction_app.inbox import wait_for_new
+    from auction_app.models import Notification, User
+    from auction_app.notifications import send
+
+    queries = [0]
+
+    def count(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    connection_created.connect(lambda sender, connection, **kwargs: connection.execute_wrappers.append(count),
+                               weak=False)
+
+    users = create_fixture_users(args.users, prefix='inbox')
+    user_ids = [user.id for user in users]
+    after = Notification.objects.aggregate(last=Max('id'))['last'] or 0
+
+    async def scenario():
+        returned = {}
+
+        async def park(user_id):
+            # Each ASGI request gets its own thread for sync work; mirror that.
+            async with ThreadSensitiveContext():
+                await wait_for_new(user_id, after, timeout=args.idle + 60)
+            returned[user_id] = time.perf_counter()
+
+        started_queries = queries[0]
+        tasks = [asyncio.ensure_future(park(user_id)) for user_id in user_ids]
+        # Every parked request runs exactly one check before it sleeps.
+        while queries[0] - started_queries < len(user_ids):
+            await asyncio.sleep(0.05)
+        parked_queries = queries[0]
+        await asyncio.sleep(args.idle)
+        idle_queries = queries[0] - parked_queries
+
+        recipients = random.sample(user_ids, min(args.deliver, len(user_ids)))
+        sent_at = time.perf_counter()
+        await sync_to_async(send)([(user_id, 'Benchmark notification') for user_id in recipients])
+        committed_at = time.perf_counter()
+        delivered = [user_id for user_id in recipients if user_id in returned]
+        while len(delivered) < len(recipients):
+            await asyncio.sleep(0.001)
+            delivered = [user_id for user_id in recipients if user_id in returned]
+        latencies = [returned[user_id] - committed_at for user_id in recipients]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return idle_queries, committed_at - sent_at, latencies
+
+    try:
+        idle_queries, send_time, latencies = async_to_sync(scenario)()
+    finally:
+        Notification.objects.filter(user_id__in=user_ids).delete()
+        User.objects.filter(pk__in=user_ids).delete()
+
+    report('Inbox long-poll', [
+        ('parked requests', len(user_ids)),
+        (f'queries while idle for {args.idle:g}s', idle_queries),
+        ('delivered', len(latencies)),
+        ('send() for all recipients (ms)', f'{send_time * 1e3:.2f}'),
+        ('commit to response p50/p99 (ms)', f'{percentile(latencies, 50) * 1e3:.2f} / {percentile(latencies, 99) * 1e3:.2f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Requests/second for the item detail page with and without caching.
+
+Renders the page in-process with the Django test client, once with the
+configured cache and once with a dummy cache that never stores
+anything, while a background loop places a bid every ``--bid-every``
+requests to exercise live-fragment invalidation::
+
+    python -m benchmarks.item_detail --requests 2000 --images 8
+"""
+import argparse
+from decimal import Decimal
+
+from .common import setup_django, Timer, report, create_fixture_item, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--bid-every', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.test import Client
+    from django.test.utils import override_settings
+    from auction_app.bidding import place_bid
+    from auction_app.models import ItemImage
+
+    item = create_fixture_item('detail', description='Benchmark fixture. ' * 200)
+    ItemImage.objects.bulk_create(
+        ItemImage(item=item, image_url=f'https://example.com/{i}.jpg') for i in range(args.images)
+    )
+    bidder = create_fixture_users(1, 'detail')[0]
+    url = item.get_absolute_url()
+    amount = [Decimal(1)]
+
+    def run(client):
+        with Timer() as timer:
+            for i in range(args.requests):
+                if args.bid_every and i % args.bid_every == 0:
+                    amount[0] += 1
+                    place_bid(item.id, bidder, amount[0])
+                response = client.get(url, HTTP_HOST='localhost')
+                assert response.status_code == 200, response.status_code
+        return args.requests / timer.elapsed
+
+    with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+        uncached = run(Client())
+    cache.clear()
+    cached = run(Client())
+
+    report('Item detail page', [
+        ('requests', args.requests),
+        ('bid every N requests', args.bid_every),
+        ('uncached req/s', f'{uncached:.0f}'),
+        ('cached req/s', f'{cached:.0f}'),
+        ('speedup', f'{cached / uncached:.1f}x'),
+    ])
+
+    category = item.category
+    item.delete()
+    category.delete()
+    bidder.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Concurrent login benchmark for the email authentication backend.
+
+``--threads`` clients post to the login view through the full middleware
+stack, with rate limits turned off. Seven logins in ten use the right password, two a wrong one, and one
+an unknown email. The run reports logins per second and p50/p99 latency
+per outcome; the wrong-password and unknown-email rows should match, since
+both cost exactly one password hash::
+
+    python -m benchmarks.login_throughput --threads 8 --logins 50 --iterations 720000
+
+``--iterations`` sets ``PASSWORD_ITERATIONS``; users are created at that cost.
+Point DJANGO_SETTINGS_MODULE at a disposable database.
+"""
+import argparse
+import random
+import threading
+import time
+
+from .common import setup_django, Timer, report, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=50, help='logins per thread')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=None, help='PASSWORD_ITERATIONS (default: settings)')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    from auction_app.models import User
+
+    settings.RATE_LIMITS = {}
+    if args.iterations:
+        settings.PASSWORD_ITERATIONS = args.iterations
+    stamp = int(time.time() * 1000)
+    encoded = make_password('benchmark password')
+    users = User.objects.bulk_create(
+        User(username=f'login-{stamp}-{i}', email=f'login-{stamp}-{i}@example.com',
+             phone_number=f'login-{stamp}-{i}', password=encoded)
+        for i in range(args.users)
+    )
+    url = reverse('login')
+    samples = {'success': [], 'wrong password': [], 'unknown email': []}
+    failures = []
+    barrier = threading.Barrier(args.threads)
+
+    def worker(index):
+        rng = random.Random(index)
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR=f'10.1.{index // 256}.{index % 256}')
+        barrier.wait()
+        try:
+            for _ in range(args.logins):
+                email = f'login-{stamp}-{rng.randrange(args.users)}@example.com'
+                password, outcome = 'benchmark password', 'success'
+                choice = rng.random()
+                if choice < 0.2:
+                    password, outcome = 'wrong password', 'wrong password'
+                elif choice < 0.3:
+                    email, outcome = f'nobody-{stamp}-{rng.random()}@example.com', 'unknown email'
+                with Timer() as timer:
+                    response = client.post(url, {'email': email, 'password': password})
+                if (response.status_code == 200) != (outcome == 'success'):
+                    failures.append((outcome, response.status_code))
+                samples[outcome].append(timer.elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    with Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    total = sum(len(latencies) for latencies in samples.values())
+    rows = [
+        ('PASSWORD_ITERATIONS', f'{settings.PASSWORD_ITERATIONS:,}'),
+        ('logins/s', f'{total / timer.elapsed:.1f}'),
+        ('unexpected responses', len(failures)),
+    ]
+    for outcome, latencies in samples.items():
+        rows.append((f'{outcome}: count, p50 / p99 (ms)',
+                     f'{len(latencies)}, {percentile(latencies, 50) * 1000:.0f} / '
+                     f'{percentile(latencies, 99) * 1000:.0f}'))
+    report(f'{args.threads} threads logging in to {args.users:,} accounts', rows)
+    User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+
+if __name__ == '__main__':
+    main()
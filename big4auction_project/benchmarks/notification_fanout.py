@@ -0,0 +1,75 @@
+"""
+Notification write throughput: per-row create() versus the batched dispatcher.
+
+Creates scratch users, writes a sample of notifications one ``create()``
+(plus counter bump) at a time, then pushes the full volume through
+``NotificationDispatcher`` and reports both rates in notifications per
+minute, alongside badge-count and mark-all-read latency::
+
+    python -m benchmarks.notification_fanout --notifications 100000 --users 5000
+
+The target is 100k notifications/minute. Scratch users and their
+notifications are deleted afterwards.
+"""
+import argparse
+import random
+import time
+
+from .common import setup_django, create_fixture_users, Timer, report, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--notifications', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--naive', type=int, default=2000, help='notifications written one by one')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import F
+    from auction_app.models import Notification, User
+    from auction_app.notifications import NotificationDispatcher, unread_count, mark_all_read
+
+    users = create_fixture_users(args.users, prefix='fanout')
+    user_ids = [user.id for user in users]
+    try:
+        with Timer() as naive:
+            for n in range(args.naive):
+                user_id = random.choice(user_ids)
+                Notification.objects.create(user_id=user_id, message=f'Naive notification {n}')
+                User.objects.filter(pk=user_id).update(unread_notifications=F('unread_notifications') + 1)
+
+        dispatcher = NotificationDispatcher(batch_size=args.batch_size)
+        with Timer() as batched:
+            for n in range(args.notifications):
+                dispatcher.add(random.choice(user_ids), f'Batched notification {n}')
+            written = dispatcher.flush()
+
+        badge = []
+        for user_id in random.sample(user_ids, min(500, len(user_ids))):
+            start = time.perf_counter()
+            unread_count(user_id)
+            badge.append(time.perf_counter() - start)
+        read_all = []
+        for user_id in random.sample(user_ids, min(200, len(user_ids))):
+            start = time.perf_counter()
+            mark_all_read(user_id)
+            read_all.append(time.perf_counter() - start)
+
+        report('Notification fan-out', [
+            ('per-row create() /min', f'{args.naive / naive.elapsed * 60:,.0f}'),
+            (f'dispatcher (batch {args.batch_size}) /min', f'{written / batched.elapsed * 60:,.0f}'),
+            ('dispatcher notifications', f'{written:,}'),
+            ('badge count p50/p99 (ms)', f'{percentile(badge, 50) * 1e3:.3f} / {percentile(badge, 99) * 1e3:.3f}'),
+            ('mark all read p50/p99 (ms)', f'{percentile(read_all, 50) * 1e3:.2f} / {percentile(read_all, 99) * 1e3:.2f}'),
+        ])
+    finally:
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            Notification.objects.filter(user_id__in=chunk).delete()
+            User.objects.filter(pk__in=chunk).delete()
+
+
+if __name__ == '__main__':
+    main()
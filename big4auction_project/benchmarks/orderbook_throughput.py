@@ -0,0 +1,62 @@
+"""
+Throughput benchmark for the in-memory order book versus direct DB bids.
+
+Submits a burst of bids on one hot item through ``OrderBook.submit``
+with a background flusher, then through ``bidding.place_bid``, and
+reports bids/second and per-bid latency for each path::
+
+    python -m benchmarks.orderbook_throughput --bids 5000
+"""
+import argparse
+import time
+from decimal import Decimal
+
+from .common import setup_django, Timer, report, percentile, create_fixture_item, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bids', type=int, default=5000)
+    parser.add_argument('--interval', type=float, default=0.1, help='flush interval in seconds')
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.bidding import place_bid
+    from auction_app.models import Bid
+    from auction_app.orderbook import OrderBook, Flusher
+
+    users = create_fixture_users(2, 'orderbook')
+
+    def run(label, submit, finish=lambda: None):
+        item = create_fixture_item(f'orderbook-{label}')
+        latencies = []
+        with Timer() as timer:
+            for i in range(args.bids):
+                start = time.perf_counter()
+                submit(item, users[i % 2], Decimal(2 + i))
+                latencies.append(time.perf_counter() - start)
+            finish()
+        stored = Bid.objects.filter(item=item).count()
+        category = item.category
+        item.delete()
+        category.delete()
+        return [
+            (f'{label} bids/s', f'{args.bids / timer.elapsed:.0f}'),
+            (f'{label} p50 (us)', f'{percentile(latencies, 50) * 1e6:.1f}'),
+            (f'{label} p99 (us)', f'{percentile(latencies, 99) * 1e6:.1f}'),
+            (f'{label} stored', stored),
+        ]
+
+    book = OrderBook()
+    flusher = Flusher(book, interval=args.interval)
+    flusher.start()
+    rows = run('orderbook', lambda item, user, amount: book.submit(item.id, user.id, amount), flusher.stop)
+    rows += run('direct', lambda item, user, amount: place_bid(item.id, user, amount))
+
+    report('Hot item bid throughput', rows)
+    for user in users:
+        user.delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput and latency of the payment gateway against the local Stripe stub.
+
+Starts ``StubServer`` in-process with simulated network latency, then
+drives customer + SetupIntent creation through the real Stripe client,
+first from a thread pool and then from asyncio tasks, for a pooled
+session and for a one-connection pool that has to reconnect::
+
+    python -m benchmarks.payments_gateway --concurrency 32 --calls 2000 --latency 0.02
+    python -m benchmarks.payments_gateway --failure-rate 0.05   # exercise retries
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import stripe
+
+from .common import setup_django, Timer, report
+
+
+class FlakyBackend:
+    """Stub backend wrapper that fails a random share of calls."""
+
+    def __init__(self, backend, rate):
+        self.backend = backend
+        self.rate = rate
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def create_customer(self, idempotency_key, **params):
+        if random.random() < self.rate:
+            raise stripe.APIConnectionError('Injected failure.')
+        return self.backend.create_customer(idempotency_key, **params)
+
+    def create_setup_intent(self, customer_id, idempotency_key, **params):
+        if random.random() < self.rate:
+            raise stripe.APIConnectionError('Injected failure.')
+        return self.backend.create_setup_intent(customer_id, idempotency_key, **params)
+
+
+def signup(gateway):
+    key = uuid.uuid4().hex
+    customer = gateway.create_customer(idempotency_key=f'{key}:customer')
+    gateway.create_setup_intent(customer['id'], idempotency_key=f'{key}:setup_intent')
+
+
+async def asignup(gateway, semaphore):
+    async with semaphore:
+        key = uuid.uuid4().hex
+        customer = await gateway.acreate_customer(idempotency_key=f'{key}:customer')
+        await gateway.acreate_setup_intent(customer['id'], idempotency_key=f'{key}:setup_intent')
+
+
+def run(label, gateway, args):
+    rows = []
+    gateway.metrics.reset()
+    with ThreadPoolExecutor(args.concurrency) as pool, Timer() as threaded:
+        list(pool.map(lambda _: signup(gateway), range(args.calls)))
+    stats = gateway.metrics.snapshot()['create_customer']
+    rows.append((f'{label} threads signups/s', f'{args.calls / threaded.elapsed:.0f}'))
+    rows.append((f'{label} threads customer p50/p99 (ms)', f'{stats["p50_ms"]:.1f} / {stats["p99_ms"]:.1f}'))
+    rows.append((f'{label} threads retries', stats['retry']))
+
+    async def drive():
+        semaphore = asyncio.Semaphore(args.concurrency)
+        await asyncio.gather(*(asignup(gateway, semaphore) for _ in range(args.calls)))
+
+    gateway.metrics.reset()
+    with Timer() as asynchronous:
+        asyncio.run(drive())
+    stats = gateway.metrics.snapshot()['create_customer']
+    rows.append((f'{label} asyncio signups/s', f'{args.calls / asynchronous.elapsed:.0f}'))
+    rows.append((f'{label} asyncio customer p50/p99 (ms)', f'{stats["p50_ms"]:.1f} / {stats["p99_ms"]:.1f}'))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--calls', type=int, default=1000, help='signups per run')
+    parser.add_argument('--latency', type=float, default=0.02, help='stub latency per call, seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.payments import PaymentGateway, StubBackend, StripeBackend
+    from auction_app.stripe_stub import StubServer
+
+    stub = StubBackend(latency=args.latency)
+    server = StubServer(backend=FlakyBackend(stub, args.failure_rate) if args.failure_rate else stub).start()
+    rows = [('stub latency (ms)', f'{args.latency * 1e3:.0f}'), ('concurrency', args.concurrency)]
+    try:
+        for label, pool_size in (('pool=1', 1), (f'pool={args.concurrency}', args.concurrency)):
+            backend = StripeBackend('sk_test_stub', timeout=5, pool_size=pool_size, api_base=server.url)
+            rows += run(label, PaymentGateway(backend, backoff=0.01, workers=args.concurrency), args)
+            backend.close()
+    finally:
+        server.stop()
+    report('Payment gateway', rows)
+
+
+if __name__ == '__main__':
+    main()
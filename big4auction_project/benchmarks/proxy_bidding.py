@@ -0,0 +1,108 @@
+"""
+Throughput of proxy-bid resolution and of the proxy-bid engine.
+
+First resolves bids against in-memory ladders already holding 10 to
+100,000 competing maximums, showing the per-bid cost growing with
+log(n) rather than n. Then fights the same auctions twice, bidders
+with fixed valuations either entering them once as maximums through
+``ProxyEngine.place`` or outbidding each other by one increment through
+``place_bid``, and reports requests/second, requests and ``Bid`` rows
+per auction, and the final prices::
+
+    python -m benchmarks.proxy_bidding --bidders 50 --wars 10
+
+Point DJANGO_SETTINGS_MODULE at a disposable database.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from .common import setup_django, Timer, report, percentile, create_fixture_item, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bidders', type=int, default=50)
+    parser.add_argument('--wars', type=int, default=10, help='auctions fought through each path')
+    parser.add_argument('--ladder-bids', type=int, default=20000, help='bids per ladder size')
+    parser.add_argument('--sizes', default='10,1000,100000', help='competing maximums per ladder')
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.bidding import BidRejected, place_bid
+    from auction_app.models import Bid
+    from auction_app.proxy import ProxyEngine, ProxyLadder, increment_for
+
+    rng = random.Random(0)
+    rows = []
+    for size in map(int, args.sizes.split(',')):
+        ladder = ProxyLadder(Decimal('1.00'))
+        for bidder_id in range(size):
+            ladder.add(bidder_id, Decimal(rng.randint(100, 100000)) / 100, bidder_id)
+        ladder.price, ladder.leader_id = Decimal('1000.00'), ladder.top_two()[0][1]
+        latencies = []
+        for seq in range(size, size + args.ladder_bids):
+            amount = ladder.minimum_bid() + Decimal(rng.randint(0, 500)) / 100
+            start = time.perf_counter()
+            ladder.bid(seq, amount, seq)
+            latencies.append(time.perf_counter() - start)
+        rows += [
+            (f'ladder n={size:,}: bids/s', f'{len(latencies) / sum(latencies):,.0f}'),
+            (f'ladder n={size:,}: p50 / p99 (us)',
+             f'{percentile(latencies, 50) * 1e6:.1f} / {percentile(latencies, 99) * 1e6:.1f}'),
+        ]
+
+    users = create_fixture_users(args.bidders, 'proxy')
+    valuations = [Decimal(rng.randint(1000, 100000)) / 100 for _ in users]
+    engine = ProxyEngine()
+
+    def proxy_war(item):
+        for user, value in zip(users, valuations):
+            try:
+                engine.place(item.id, user, value)
+            except BidRejected:
+                pass
+            yield
+
+    def manual_war(item):
+        # Everyone outbids the leader by one increment until nobody can afford to.
+        current, leader = item.current_bid, None
+        while True:
+            progressed = False
+            for user, value in zip(users, valuations):
+                step = current + increment_for(current)
+                if user is not leader and step <= value:
+                    place_bid(item.id, user, step)
+                    current, leader, progressed = step, user, True
+                    yield
+            if not progressed:
+                return
+
+    def run(label, war):
+        calls, written, finals = 0, 0, set()
+        with Timer() as timer:
+            for n in range(args.wars):
+                item = create_fixture_item(f'proxy-{label}-{n}')
+                calls += sum(1 for _ in war(item))
+                item.refresh_from_db()
+                finals.add(item.current_bid)
+                written += Bid.objects.filter(item=item).count()
+                category = item.category
+                item.delete()
+                category.delete()
+        return [
+            (f'{label}: requests/s', f'{calls / timer.elapsed:,.0f}'),
+            (f'{label}: requests / Bid rows per auction', f'{calls / args.wars:,.0f} / {written / args.wars:,.0f}'),
+            (f'{label}: final price', ', '.join(map(str, sorted(finals)))),
+        ]
+
+    rows += run('proxy engine', proxy_war)
+    rows += run('manual place_bid', manual_war)
+    report('Proxy bidding', rows)
+    for user in users:
+        user.delete()
+
+
+if __name__ == '__main__':
+    main()
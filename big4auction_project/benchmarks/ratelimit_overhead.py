@@ -0,0 +1,90 @@
+"""
+Microbenchmark of the rate limiter's per-request overhead.
+
+Replays requests from ``--clients`` addresses through
+``RateLimitMiddleware.process_view`` for the ``login`` policy, once with
+each backend. One client in ten floods; the rest stay under the limit.
+It reports the time the limiter adds per request, the cache operations
+it costs, and how many requests were turned away, next to the cost of
+the ``check_password`` it saves on a rejected login::
+
+    python -m benchmarks.ratelimit_overhead --requests 100000 --clients 1000
+
+The cache backend uses whatever ``CACHES['default']`` is configured. With
+Django's default local-memory cache, more than 300 addresses evict each
+other's buckets and the cache backend lets through far more requests.
+"""
+import argparse
+import random
+from unittest import mock
+
+from .common import setup_django, Timer, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=1000, help='distinct client addresses')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.core.cache import cache
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.urls import resolve, reverse
+    from auction_app import ratelimit
+
+    rng = random.Random(0)
+    factory = RequestFactory()
+    match = resolve(reverse('login'))
+    requests = []
+    for _ in range(args.requests):
+        client = rng.randrange(args.clients)
+        # Every tenth client sends half of all requests.
+        if rng.random() < 0.5:
+            client -= client % 10
+        request = factory.post('/login/', REMOTE_ADDR=f'10.{client // 65536}.{client // 256 % 256}.{client % 256}')
+        request.resolver_match = match
+        requests.append(request)
+    middleware = ratelimit.RateLimitMiddleware(lambda request: HttpResponse())
+
+    def run(backend):
+        settings.RATE_LIMIT_BACKEND = backend
+        cache.clear()
+        ratelimit._local_backend.clear()
+        operations = 0
+
+        def counted(method):
+            def wrapper(*args, **kwargs):
+                nonlocal operations
+                operations += 1
+                return method(*args, **kwargs)
+            return wrapper
+
+        rejected = 0
+        with mock.patch.object(cache, 'incr', counted(cache.incr)), \
+                mock.patch.object(cache, 'set', counted(cache.set)), \
+                mock.patch.object(ratelimit, 'caches', {'default': cache}), Timer() as timer:
+            for request in requests:
+                if middleware.process_view(request, match.func, (), {}) is not None:
+                    rejected += 1
+        return [
+            (f'{backend}: overhead per request (us)', f'{timer.elapsed / len(requests) * 1e6:.1f}'),
+            (f'{backend}: cache operations per request', f'{operations / len(requests):.2f}'),
+            (f'{backend}: rejected', f'{rejected:,} of {len(requests):,}'),
+        ]
+
+    encoded = make_password('correct password')
+    with Timer() as timer:
+        check_password('wrong password', encoded)
+    rows = run('local') + run('cache')
+    rows.append(('check_password on a rejected login (us)', f'{timer.elapsed * 1e6:,.0f}'))
+    policy = ratelimit.get_policies()['login']
+    report(f'Rate limiting {args.requests:,} logins from {args.clients:,} addresses '
+           f'({policy.burst} burst, {60 / policy.interval:g}/min)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Share of database reads taken off the primary by the replica router.
+
+``--users`` logged-in clients browse on a virtual clock, one request
+every ``--spacing`` seconds site-wide: listings, item pages, inbox
+history and dashboards, with a ``--bid-share`` of requests placing a
+bid. The same request sequence is replayed without a replica and with
+one, counting ``SELECT`` statements on each connection and how many
+requests were pinned to the primary by an earlier write::
+
+    python -m benchmarks.replica_offload --requests 3000 --users 30 --items 50
+
+Both aliases open the same in-memory SQLite database, so the replica
+never lags; what is measured is where the router sends reads.
+"""
+import argparse
+import os
+import random
+from decimal import Decimal
+from unittest import mock
+
+from .common import setup_django, Timer, report, create_fixture_item, create_fixture_users
+
+MEMORY_DB = 'file:replica_bench?mode=memory&cache=shared'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--users', type=int, default=30)
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--bid-share', type=float, default=0.05)
+    parser.add_argument('--spacing', type=float, default=0.5, help='virtual seconds between requests')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DB_NAME', MEMORY_DB)
+    os.environ.setdefault('DB_REPLICA_NAME', os.environ['DB_NAME'])
+    setup_django()
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db import connections
+    from django.test import Client
+    from django.urls import reverse
+    from auction_app import routers
+
+    settings.RATE_LIMITS = {}
+    users = create_fixture_users(args.users, 'replica')
+    items = [create_fixture_item(f'replica-{i}', seller=users[i % len(users)]) for i in range(args.items)]
+    pages = [(reverse('item_list') + '?format=json', 0.4), (reverse('notification_inbox'), 0.15),
+             (reverse('seller_dashboard') + '?format=json', 0.15)]
+    pages += [(item.get_absolute_url(), 0.3 / len(items)) for item in items]
+
+    def run(replica):
+        settings.REPLICA_DATABASE = replica
+        cache.clear()
+        rng = random.Random(0)
+        clients = []
+        for user in users:
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            clients.append((user, client))
+        selects = {alias: 0 for alias in connections}
+        pinned = 0
+        now = 0.0
+
+        def counter(alias):
+            def counted(execute, sql, params, many, context):
+                if sql.lstrip().upper().startswith('SELECT'):
+                    selects[alias] += 1
+                return execute(sql, params, many, context)
+            return counted
+
+        wrappers = [connections[alias].execute_wrapper(counter(alias)) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            with mock.patch('auction_app.routers.time.time', lambda: now), Timer() as timer:
+                for i in range(args.requests):
+                    now = 1_000_000 + i * args.spacing
+                    user, client = rng.choice(clients)
+                    cookie = client.cookies.get(routers.PIN_COOKIE)
+                    if cookie is not None and cookie.value and float(cookie.value) > now:
+                        pinned += 1
+                    if rng.random() < args.bid_share:
+                        item = rng.choice([item for item in items if item.seller_id != user.id])
+                        item.current_bid += Decimal('1.00')
+                        response = client.post(reverse('place_bid', args=[item.id]), {'bid_amount': item.current_bid})
+                        assert response.status_code in (201, 409), response.status_code
+                        continue
+                    path = rng.choices([path for path, _ in pages], [weight for _, weight in pages])[0]
+                    response = client.get(path)
+                    assert response.status_code == 200, (path, response.status_code)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        total = sum(selects.values()) or 1
+        label = 'with replica' if replica else 'primary only'
+        return [
+            (f'{label}: primary SELECTs per request', f'{selects["default"] / args.requests:.2f}'),
+            (f'{label}: replica share of SELECTs', f'{selects.get("replica", 0) * 100 / total:.0f}%'
+                                                 if replica else '-'),
+            (f'{label}: requests pinned to the primary', f'{pinned * 100 / args.requests:.1f}%'),
+            (f'{label}: requests/s', f'{args.requests / timer.elapsed:,.0f}'),
+        ]
+
+    rows = run(None) + run('replica')
+    report(f'{args.requests:,} requests from {args.users} users over {args.items} items, '
+           f'{args.bid_share:.0%} bids, one every {args.spacing:g}s', rows)
+
+
+if __name__ == '__main__':
+    main()
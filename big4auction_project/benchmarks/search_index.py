@@ -0,0 +1,86 @@
+"""
+Build, open and query latency for the item search index.
+
+Generates a synthetic catalog directly through the index API (no
+database rows), saves it as a segment, reopens it the way a worker
+would, and reports p50/p99 latency for a mix of queries::
+
+    python -m benchmarks.search_index --docs 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from .common import setup_django, Timer, report, percentile
+
+WORDS = ('vintage rolex omega watch strap leather gold silver antique oak table chair lamp painting oil '
+         'canvas portrait landscape camera lens film guitar amp vinyl record poster signed rare mint '
+         'collector edition bronze statue ceramic vase glass bottle coin stamp book novel comic card '
+         'trading console game controller bike frame wheel helmet jacket denim boot sneaker bag').split()
+QUERIES = ['vintage watch', 'rolex', 'signed poster', 'oil paint', 'cam', 'mint condition comic', 'leather b']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--docs', type=int, default=200000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.search import SearchIndex, tokenize, FIELD_WEIGHTS
+
+    vocabulary = WORDS + [f'{word}{i}' for word in WORDS for i in range(40)]
+    rng = random.Random(42)
+    path = os.path.join(tempfile.mkdtemp(), 'search_index.bin')
+    index = SearchIndex(path)
+    with Timer() as build:
+        for doc_id in range(1, args.docs + 1):
+            weights = {}
+            title = tokenize(' '.join(rng.choices(WORDS, k=4)))
+            body = tokenize(' '.join(rng.choices(vocabulary, k=30)))
+            for term in title:
+                weights[term] = weights.get(term, 0) + FIELD_WEIGHTS['title']
+            for term in body:
+                weights[term] = weights.get(term, 0) + FIELD_WEIGHTS['description']
+            attrs = (rng.randint(1, args.categories), rng.choice((0, 0, 0, 1, 2)),
+                     rng.randint(100, 1000000), len(title) + len(body))
+            index.add(doc_id, weights, attrs)
+    with Timer() as save:
+        index.save()
+    size = os.path.getsize(path)
+    del index
+
+    with Timer() as opening:
+        index = SearchIndex(path)
+
+    rows = [
+        ('documents', args.docs),
+        ('build (s)', f'{build.elapsed:.1f}'),
+        ('save (s)', f'{save.elapsed:.1f}'),
+        ('segment size (MB)', f'{size / 1e6:.1f}'),
+        ('open (ms)', f'{opening.elapsed * 1e3:.2f}'),
+    ]
+    filters = [
+        ('no filter', {}),
+        ('category+active', {'category_id': 7, 'status': 'active'}),
+        ('price range', {'min_price': 100, 'max_price': 500}),
+    ]
+    for label, kwargs in filters:
+        samples = []
+        for _ in range(args.repeat):
+            query = rng.choice(QUERIES)
+            start = time.perf_counter()
+            index.search(query, **kwargs)
+            samples.append(time.perf_counter() - start)
+        rows.append((f'{label} p50/p99 (ms)',
+                     f'{percentile(samples, 50) * 1e3:.2f} / {percentile(samples, 99) * 1e3:.2f}'))
+    report('Search index', rows)
+    index.segment.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
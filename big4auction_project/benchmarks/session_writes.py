@@ -0,0 +1,96 @@
+"""
+Database writes per 1,000 requests under each session engine.
+
+``--users`` logged-in clients browse on a virtual clock, one request
+every ``--spacing`` seconds site-wide: listing and search polls
+(read-only endpoints) and dashboard views. The same request sequence
+is replayed with Django's database session engine and with
+``auction_app.sessions``, counting ``INSERT``/``UPDATE``/``DELETE``
+statements on ``django_session``, including the final batch flush, and
+how many expiry refreshes the new engine queued for its batches::
+
+    python -m benchmarks.session_writes --requests 5000 --users 50 --spacing 2
+
+Point DJANGO_SETTINGS_MODULE at a disposable database.
+"""
+import argparse
+import random
+from unittest import mock
+
+from .common import setup_django, Timer, report, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--spacing', type=float, default=2, help='virtual seconds between requests')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.sessions.models import Session
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+    from auction_app.sessions import expiry_batch
+
+    users = create_fixture_users(args.users, 'sessions')
+    paths = [(reverse('item_list'), 0.5), (reverse('search_items') + '?q=lamp', 0.2),
+             (reverse('seller_dashboard') + '?format=json', 0.3)]
+
+    def run(engine):
+        settings.SESSION_ENGINE = engine
+        cache.clear()
+        rng = random.Random(0)
+        start = timezone.now()
+        clients = []
+        for user in users:
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(user)
+            clients.append(client)
+        writes = 0
+
+        def counted(execute, sql, params, many, context):
+            nonlocal writes
+            if sql.split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE') and 'django_session' in sql:
+                writes += 1
+            return execute(sql, params, many, context)
+
+        now = start
+        queued = 0
+        add = expiry_batch.add
+
+        def counted_add(*args):
+            nonlocal queued
+            queued += 1
+            return add(*args)
+
+        # The batch interval runs on the virtual clock too.
+        with connection.execute_wrapper(counted), mock.patch('django.utils.timezone.now', lambda: now), \
+                mock.patch('auction_app.sessions.time.monotonic', lambda: (now - start).total_seconds()), \
+                mock.patch.object(expiry_batch, 'add', counted_add), Timer() as timer:
+            for i in range(args.requests):
+                now = start + timezone.timedelta(seconds=i * args.spacing)
+                path = rng.choices([path for path, _ in paths], [weight for _, weight in paths])[0]
+                response = rng.choice(clients).get(path)
+                assert response.status_code == 200, (path, response.status_code)
+            expiry_batch.flush(Session)
+        Session.objects.all().delete()
+        rows = [(f'{engine}: session writes per 1k requests', f'{writes * 1000 / args.requests:,.1f}')]
+        if engine == 'auction_app.sessions':
+            rows.append((f'{engine}: expiry refreshes per 1k requests', f'{queued * 1000 / args.requests:,.1f}'))
+        rows.append((f'{engine}: requests/s', f'{args.requests / timer.elapsed:,.0f}'))
+        return rows
+
+    rows = run('django.contrib.sessions.backends.db') + run('auction_app.sessions')
+    report(f'{args.requests:,} requests from {args.users} users, one every {args.spacing:g}s '
+           f'({args.requests * args.spacing / 60:,.0f} virtual minutes)', rows)
+    for user in users:
+        user.delete()
+
+
+if __name__ == '__main__':
+    main()
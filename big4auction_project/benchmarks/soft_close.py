@@ -0,0 +1,151 @@
+"""
+Simulation of bursty auction closes with soft-close sniping.
+
+Items end in bursts, and each attracts a random number of snipes in its
+last ``--window`` seconds, every one of which extends the auction. The
+simulation runs on a virtual clock and is replayed twice:
+
+* ``push``: an ``AuctionScheduler`` loaded once, told about extensions
+  through ``item_changed`` and woken exactly at each deadline;
+* ``poll``: ``close_all_due()`` every ``--poll`` seconds, as a cron job
+  would.
+
+For each it reports how late items closed after their final end time,
+snipes lost to an early close, the closer's queries, and wall-clock
+bid and close throughput::
+
+    python -m benchmarks.soft_close --items 500 --bursts 5 --window 120
+
+Point DJANGO_SETTINGS_MODULE at a disposable database.
+"""
+import argparse
+import heapq
+import random
+from decimal import Decimal
+
+from .common import setup_django, Timer, report, percentile, create_fixture_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--bursts', type=int, default=5, help='groups of items ending together')
+    parser.add_argument('--spread', type=float, default=10, help='seconds over which a burst ends')
+    parser.add_argument('--window', type=int, default=120, help='SOFT_CLOSE_SECONDS')
+    parser.add_argument('--max-snipes', type=int, default=6, help='most snipes per item')
+    parser.add_argument('--poll', type=float, default=30, help='poll interval of the cron-style closer')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+    from auction_app.bidding import BidRejected, place_bid
+    from auction_app.closer import AuctionScheduler, close_all_due
+    from auction_app.models import Category, Item
+
+    settings.SOFT_CLOSE_SECONDS = args.window
+    window = timezone.timedelta(seconds=args.window)
+    users = create_fixture_users(10, 'softclose')
+    category = Category.objects.create(category_name='softclose-category')
+
+    def simulate(mode):
+        rng = random.Random(0)
+        start = timezone.now() + timezone.timedelta(days=1)
+        ends = {}
+        for i in range(args.items):
+            burst = start + timezone.timedelta(minutes=10 * (i % args.bursts))
+            ends[i] = burst + timezone.timedelta(seconds=rng.uniform(0, args.spread))
+        items = Item.objects.bulk_create(
+            Item(title=f'softclose {mode} {i}', slug=f'softclose-{mode}-{i}', description='Benchmark fixture.',
+                 category=category, start_time=start - timezone.timedelta(days=1), end_time=end_time,
+                 starting_bid=1, reserve_price=1, current_bid=1)
+            for i, end_time in ends.items()
+        )
+        ids = [item.id for item in items]
+        ends = {ids[i]: end_time for i, end_time in ends.items()}
+        snipes_left = {item_id: rng.randint(0, args.max_snipes) for item_id in ids}
+        events = []
+        for item_id, end_time in ends.items():
+            if snipes_left[item_id]:
+                heapq.heappush(events, (end_time - window * rng.random(), item_id))
+
+        closed_at, lost, bids, extensions = {}, 0, 0, 0
+        scheduler = AuctionScheduler(horizon=10**6, refresh=10**6)
+        closer_queries = 0
+        bid_time = close_time = 0.0
+
+        def counted(execute, sql, params, many, context):
+            nonlocal closer_queries
+            closer_queries += 1
+            return execute(sql, params, many, context)
+
+        def close(now):
+            nonlocal close_time
+            open_before = set(Item.objects.filter(pk__in=ids, status='active').values_list('id', flat=True))
+            with connection.execute_wrapper(counted), Timer() as timer:
+                if mode == 'push':
+                    scheduler.run_once(now)
+                else:
+                    close_all_due(now)
+            close_time += timer.elapsed
+            for item_id in open_before - set(
+                Item.objects.filter(pk__in=open_before, status='active').values_list('id', flat=True)
+            ):
+                closed_at[item_id] = now
+
+        if mode == 'push':
+            with connection.execute_wrapper(counted):
+                scheduler.load(start)
+        next_poll = start
+        while len(closed_at) < len(ids):
+            candidates = [events[0][0]] if events else []
+            if mode == 'push':
+                deadline = scheduler.next_deadline()
+                if deadline is not None:
+                    candidates.append(deadline)
+            else:
+                candidates.append(next_poll)
+            now = min(candidates)
+            if events and events[0][0] == now:
+                _, item_id = heapq.heappop(events)
+                amount = Decimal(bids + 2)
+                try:
+                    with Timer() as timer:
+                        place_bid(item_id, users[bids % len(users)], amount, now=now)
+                    bid_time += timer.elapsed
+                except BidRejected:
+                    lost += 1
+                    continue
+                bids += 1
+                snipes_left[item_id] -= 1
+                if now + window > ends[item_id]:
+                    ends[item_id] = now + window
+                    extensions += 1
+                if snipes_left[item_id]:
+                    heapq.heappush(events, (ends[item_id] - window * rng.random(), item_id))
+            else:
+                close(now)
+                if mode == 'poll':
+                    next_poll = now + timezone.timedelta(seconds=args.poll)
+
+        lags = [(closed_at[item_id] - ends[item_id]).total_seconds() for item_id in ids]
+        Item.objects.filter(pk__in=ids).delete()
+        return [
+            (f'{mode}: bids / extensions / lost snipes', f'{bids:,} / {extensions:,} / {lost:,}'),
+            (f'{mode}: close lag p50 / p99 / max (s)',
+             f'{percentile(lags, 50):.1f} / {percentile(lags, 99):.1f} / {max(lags):.1f}'),
+            (f'{mode}: closer queries', f'{closer_queries:,}'),
+            (f'{mode}: bids/s, closes/s (wall clock)',
+             f'{bids / bid_time:,.0f}, {len(ids) / close_time:,.0f}'),
+        ]
+
+    rows = simulate('push') + simulate('poll')
+    report(f'Soft close of {args.items:,} items in {args.bursts} bursts, {args.window}s window', rows)
+    category.delete()
+    for user in users:
+        user.delete()
+
+
+if __name__ == '__main__':
+    main()
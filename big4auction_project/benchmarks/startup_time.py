@@ -0,0 +1,77 @@
+"""
+Cold start time of each settings profile.
+
+For every ``DJANGO_ENV`` profile a fresh interpreter is started
+``--runs`` times; each times loading the settings, ``django.setup()``,
+building the WSGI application and serving a first request that needs
+no database (the publishable key). The report gives the median of each
+step and of the whole start, which is what a new worker or a scaled-out
+instance costs before it can take traffic::
+
+    python -m benchmarks.startup_time --runs 10
+
+The ``prod`` run uses placeholder secrets; nothing connects to a database,
+but ``dev`` and ``prod`` load the MySQL driver unless ``DB_ENGINE=sqlite``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import PROJECT_DIR, percentile, report
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+from django.conf import settings
+settings.INSTALLED_APPS
+loaded = time.perf_counter()
+import django
+django.setup()
+ready = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+built = time.perf_counter()
+from django.test import Client
+status = Client(HTTP_HOST='localhost').get('/public-key').status_code
+served = time.perf_counter()
+print(json.dumps({'settings': loaded - start, 'setup': ready - loaded, 'wsgi': built - ready,
+                  'first request': served - built, 'total': served - start, 'status': status}))
+'''
+
+PROFILE_ENV = {
+    'prod': {'DJANGO_SECRET_KEY': 'benchmark', 'REDIS_URL': 'redis://localhost:6379/0'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--profiles', default='dev,test,bench,prod')
+    args = parser.parse_args()
+
+    rows = []
+    for profile in args.profiles.split(','):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='big4auction_project.settings', DJANGO_ENV=profile,
+                   DJANGO_ALLOWED_HOSTS='localhost', **PROFILE_ENV.get(profile, {}))
+        samples = []
+        for _ in range(args.runs):
+            result = subprocess.run([sys.executable, '-c', CHILD], cwd=PROJECT_DIR, env=env,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                rows.append((profile, 'failed: ' + result.stderr.strip().splitlines()[-1]))
+                break
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        if not samples:
+            continue
+        medians = {step: percentile([sample[step] for sample in samples], 50) * 1000
+                   for step in ('settings', 'setup', 'wsgi', 'first request', 'total')}
+        rows.append((f'{profile}: settings / setup / wsgi / first request (ms)',
+                     ' / '.join(f'{medians[step]:.0f}' for step in ('settings', 'setup', 'wsgi', 'first request'))))
+        rows.append((f'{profile}: total p50 (ms), status', f'{medians["total"]:.0f}, {samples[0]["status"]}'))
+    report(f'Cold start over {args.runs} runs per profile', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Load test opening thousands of concurrent SSE watchers on one item.
+
+Run against a live ASGI server, e.g.::
+
+    uvicorn big4auction_project.asgi:application
+    python -m benchmarks.stream_load --item 1 --connections 5000 --duration 30
+
+Each connection reads the event stream for ``--duration`` seconds. The
+script reports connection setup latency, how many watchers got the
+initial snapshot, and how many bid events were received in total.
+Place bids while it runs to measure fan-out.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from .common import report, percentile
+
+
+async def watch(host, port, path, duration, stats):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats['failed'] += 1
+        return
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n'.encode())
+    await writer.drain()
+    deadline = start + duration
+    first = True
+    try:
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            line = await asyncio.wait_for(reader.readline(), timeout=remaining)
+            if not line:
+                break
+            if line.startswith(b'event: bid'):
+                if first:
+                    stats['connect'].append(time.perf_counter() - start)
+                    first = False
+                stats['events'] += 1
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        writer.close()
+        if first:
+            stats['no_snapshot'] += 1
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    path = f'/items/{args.item}/stream'
+    stats = {'connect': [], 'events': 0, 'failed': 0, 'no_snapshot': 0}
+    tasks = []
+    for i in range(args.connections):
+        tasks.append(asyncio.create_task(watch(url.hostname, url.port or 80, path, args.duration, stats)))
+        if args.ramp and i % args.ramp == 0:
+            await asyncio.sleep(0.01)
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--item', type=int, required=True)
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--ramp', type=int, default=200, help='pause briefly every N connections')
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args))
+    connect = stats['connect']
+    report(f'SSE fan-out, {args.connections} watchers on item {args.item}', [
+        ('connected', len(connect)),
+        ('failed', stats['failed']),
+        ('no snapshot', stats['no_snapshot']),
+        ('snapshot p50 (ms)', f'{percentile(connect, 50) * 1e3:.1f}'),
+        ('snapshot p99 (ms)', f'{percentile(connect, 99) * 1e3:.1f}'),
+        ('events received', stats['events']),
+    ])
+
+
+if __name__ == '__main__':
+    main()
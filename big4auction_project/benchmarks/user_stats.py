@@ -0,0 +1,97 @@
+"""
+Dashboard latency from the stats table versus naive aggregation.
+
+Seeds scratch users with transactions, bids and feedback, then times
+``get_dashboard()`` (one primary key lookup) against ``compute()`` (one
+GROUP BY per source table) for random users, and times a full
+``reconcile()`` pass::
+
+    python -m benchmarks.user_stats --users 2000 --bids 500000 --transactions 50000
+
+Point DJANGO_SETTINGS_MODULE at a disposable database: seeded rows are
+not cleaned up.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from .common import setup_django, create_fixture_item, Timer, report, percentile
+
+
+def seed(args):
+    from django.utils import timezone
+    from auction_app.models import Bid, Feedback, PaymentMethod, Transaction, User
+    from auction_app.user_stats import reconcile
+
+    stamp = int(time.time())
+    users = User.objects.bulk_create(
+        (User(username=f'stats-{stamp}-{i}', phone_number=f'stats-{stamp}-{i}') for i in range(args.users)),
+        batch_size=args.chunk,
+    )
+    user_ids = [user.id for user in users]
+    items = [create_fixture_item('stats').id for _ in range(20)]
+    card = PaymentMethod.objects.create(method='Benchmark card')
+
+    def chunks(total, make):
+        for start in range(0, total, args.chunk):
+            yield [make() for _ in range(min(args.chunk, total - start))]
+
+    for rows in chunks(args.bids, lambda: Bid(
+            item_id=random.choice(items), bidder_id=random.choice(user_ids),
+            bid_amount=Decimal(random.randint(100, 100000)) / 100)):
+        Bid.objects.bulk_create(rows)
+    for rows in chunks(args.transactions, lambda: Transaction(
+            buyer_id=random.choice(user_ids), seller_id=random.choice(user_ids), item_id=random.choice(items),
+            transaction_amount=Decimal(random.randint(100, 100000)) / 100, payment_method=card)):
+        Transaction.objects.bulk_create(rows)
+    for rows in chunks(args.feedback, lambda: Feedback(
+            user_id=random.choice(user_ids), rating=random.randint(0, 5), comment='Seeded',
+            timestamp=timezone.now())):
+        Feedback.objects.bulk_create(rows)
+    # Seeded with bulk_create, which bypasses the incremental hooks.
+    reconcile()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--bids', type=int, default=200000)
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--feedback', type=int, default=20000)
+    parser.add_argument('--chunk', type=int, default=5000, help='rows per bulk_create')
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+
+    setup_django()
+    from auction_app.user_stats import compute, get_dashboard, reconcile
+
+    with Timer() as seeding:
+        user_ids = seed(args)
+
+    def time_calls(func):
+        samples = []
+        for _ in range(args.repeat):
+            user_id = random.choice(user_ids)
+            start = time.perf_counter()
+            func(user_id)
+            samples.append(time.perf_counter() - start)
+        return f'{percentile(samples, 50) * 1e3:.3f} / {percentile(samples, 99) * 1e3:.3f}'
+
+    naive = time_calls(lambda user_id: compute([user_id]))
+    table = time_calls(get_dashboard)
+    with Timer() as check:
+        mismatches = reconcile(fix=False)
+
+    report('User stats', [
+        ('seed + initial reconcile (s)', f'{seeding.elapsed:.1f}'),
+        ('naive aggregation p50/p99 (ms)', naive),
+        ('stats table p50/p99 (ms)', table),
+        ('full consistency check (s)', f'{check.elapsed:.2f}'),
+        ('mismatches', len(mismatches)),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Acknowledgement latency and drain throughput for the webhook queue.
+
+Fires signed synthetic Stripe events (a share of them redeliveries) at
+the webhook view from several threads, reports how quickly each one is
+acknowledged, then drains the queue with the worker pool::
+
+    python -m benchmarks.webhook_ingest --events 20000 --threads 8 --workers 4
+
+Events are removed afterwards; point DJANGO_SETTINGS_MODULE at a
+disposable database anyway.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import setup_django, Timer, report, percentile
+
+SECRET = 'whsec_benchmark'
+TYPES = ['payment_method.attached', 'setup_intent.created', 'setup_intent.succeeded', 'customer.created']
+
+
+def make_event(prefix, n):
+    event_type = random.choice(TYPES)
+    data = {'id': f'obj_{n}', 'customer': f'cus_{prefix}_{n}'}
+    if event_type == 'payment_method.attached':
+        data['billing_details'] = {'email': f'{prefix}-{n}@example.invalid'}
+    return {'id': f'evt_{prefix}_{n}', 'type': event_type, 'data': {'object': data}}
+
+
+def sign(body):
+    timestamp = int(time.time())
+    digest = hmac.new(SECRET.encode(), f'{timestamp}.{body}'.encode(), hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--duplicates', type=float, default=0.1, help='share of deliveries that repeat an event')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent senders')
+    parser.add_argument('--workers', type=int, default=4, help='queue workers used to drain')
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    from auction_app.models import WebhookEvent
+    from auction_app.webhooks import WebhookWorker
+
+    settings.STRIPE_WEBHOOK_SECRET = SECRET
+    prefix = uuid.uuid4().hex[:8]
+    events = [make_event(prefix, n) for n in range(args.events)]
+    deliveries = events + random.sample(events, int(len(events) * args.duplicates))
+    random.shuffle(deliveries)
+    url = reverse('webhook_received')
+    local = threading.local()
+    samples = []
+
+    def deliver(event):
+        client = getattr(local, 'client', None) or Client()
+        local.client = client
+        body = json.dumps(event)
+        start = time.perf_counter()
+        response = client.post(url, body, content_type='application/json',
+                               HTTP_STRIPE_SIGNATURE=sign(body), HTTP_HOST='localhost')
+        samples.append(time.perf_counter() - start)
+        connection.close()
+        return response.status_code
+
+    with ThreadPoolExecutor(args.threads) as pool, Timer() as ingest:
+        statuses = list(pool.map(deliver, deliveries))
+    stored = WebhookEvent.objects.filter(event_id__startswith=f'evt_{prefix}_').count()
+
+    workers = [WebhookWorker(args.batch_size, poll=0.05, name=f'bench-worker-{i}') for i in range(args.workers)]
+    with Timer() as drain:
+        for worker in workers:
+            worker.start()
+        pending = WebhookEvent.objects.filter(event_id__startswith=f'evt_{prefix}_').exclude(status='done')
+        while pending.exists():
+            time.sleep(0.05)
+        for worker in workers:
+            worker.stop()
+
+    WebhookEvent.objects.filter(event_id__startswith=f'evt_{prefix}_').delete()
+    report('Webhook ingestion', [
+        ('deliveries', len(deliveries)),
+        ('non-200 responses', sum(status != 200 for status in statuses)),
+        ('rows stored (unique events)', f'{stored} ({len(events)})'),
+        ('ack p50/p99 (ms)', f'{percentile(samples, 50) * 1e3:.2f} / {percentile(samples, 99) * 1e3:.2f}'),
+        ('ingest events/s', f'{len(deliveries) / ingest.elapsed:.0f}'),
+        ('drain events/s', f'{stored / drain.elapsed:.0f}'),
+    ])
+
+
+if __name__ == '__main__':
+    main()
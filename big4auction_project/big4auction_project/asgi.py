@@ -2,6 +2,8 @@
 ASGI config for big4auction_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP traffic is handled by Django; WebSocket connections are routed to the
+bid stream in ``auction_app.streaming``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -12,5 +14,16 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'big4auction_project.settings')
+# Requests here do not keep to one thread; see settings.base.database_from_env.
+os.environ.setdefault('DJANGO_SERVER', 'asgi')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from auction_app.streaming import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -0,0 +1,31 @@
+"""
+Settings for big4auction_project, picked by the ``DJANGO_ENV`` variable.
+
+* ``dev`` (default): DEBUG on, reads a local ``.env`` file;
+* ``prod``: DEBUG off, refuses to start without its secrets;
+* ``test``: in-memory SQLite and cheap password hashing;
+* ``bench``: SQLite with DEBUG off, for the scripts in ``benchmarks``.
+
+Everything else comes from ``base`` and the environment.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+if os.getenv('DJANGO_ENV', 'dev') == 'dev':
+    # Only local development reads a .env file; deployments set real variables.
+    from dotenv import load_dotenv
+    load_dotenv()
+
+ENVIRONMENT = os.getenv('DJANGO_ENV', 'dev')
+
+if ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401,F403
+elif ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif ENVIRONMENT == 'test':
+    from .test import *  # noqa: F401,F403
+elif ENVIRONMENT == 'bench':
+    from .bench import *  # noqa: F401,F403
+else:
+    raise ImproperlyConfigured(f'Unknown DJANGO_ENV {ENVIRONMENT!r}; expected dev, prod, test or bench.')
@@ -0,0 +1,311 @@
+"""
+Django settings shared by every environment of big4auction_project.
+
+The profiles in this package (dev, prod, test, bench) start from these
+settings and are picked by ``DJANGO_ENV``; see ``__init__.py``. Values
+that differ between deployments are read from the environment here, so
+a profile only holds what is specific to it.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.0/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def env_bool(name, default=False):
+    """Read a boolean such as ``1``, ``true`` or ``no`` from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name, default=''):
+    """Read a comma-separated list from the environment."""
+    return [item.strip() for item in os.getenv(name, default).split(',') if item.strip()]
+
+
+def database_from_env(prefix='DB', engine='mysql', name=None):
+    """
+    Build a ``DATABASES`` entry from ``<prefix>_*`` environment variables.
+
+    ``<prefix>_ENGINE`` is ``mysql`` or ``sqlite``, defaulting to
+    ``engine``. For SQLite ``<prefix>_NAME`` is a file path or a
+    ``file:...?mode=memory&cache=shared`` URI for a database in memory.
+
+    MySQL connections are kept open for ``DB_CONN_MAX_AGE`` seconds and
+    health-checked before reuse, so each worker thread pays the connect
+    and authentication handshake once rather than on every request: the
+    threads of a sync worker form its connection pool. ASGI requests do
+    not keep to one thread, so there persistent connections would only
+    pile up; under ``DJANGO_SERVER=asgi`` (set by ``asgi.py``) they are
+    closed after each request, and ``<prefix>_HOST`` should point at a
+    pooler such as ProxySQL that keeps the server connections warm.
+    """
+    engine = os.getenv(f'{prefix}_ENGINE', engine)
+    if engine == 'sqlite':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv(f'{prefix}_NAME', name or str(BASE_DIR / 'db.sqlite3')),
+            # Benchmarks write from several threads; wait for the file lock instead of failing.
+            'OPTIONS': {'timeout': 30},
+        }
+    return {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.getenv(f'{prefix}_NAME', name or 'big4auction'),
+        'USER': os.getenv(f'{prefix}_USER', 'root'),
+        'PASSWORD': os.getenv(f'{prefix}_PASSWORD', ''),
+        'HOST': os.getenv(f'{prefix}_HOST', '127.0.0.1'),
+        'PORT': int(os.getenv(f'{prefix}_PORT', '3306')),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0' if os.getenv('DJANGO_SERVER') == 'asgi' else '60')),
+        'CONN_HEALTH_CHECKS': env_bool('DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {'charset': 'utf8mb4'},
+    }
+
+
+# SECURITY WARNING: keep the secret key used in production secret! The
+# production profile refuses to start without DJANGO_SECRET_KEY.
+SECRET_KEY = os.getenv(
+    'DJANGO_SECRET_KEY', 'django-insecure-@l0!gg3s@=)+mam(df2%2(&cdl_lw@$rgeqa9zauv@+y^kgg-i',
+)
+
+# SECURITY WARNING: don't run with debug turned on in production! DEBUG
+# also makes every connection record every query it runs.
+DEBUG = False
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS')
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'auction_app',
+    'crispy_forms',
+    "crispy_bootstrap5",
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'auction_app.routers.ReplicaRoutingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'auction_app.ratelimit.RateLimitMiddleware',
+]
+
+ROOT_URLCONF = 'big4auction_project.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'big4auction_project.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+
+DATABASES = {
+    'default': database_from_env(),
+}
+
+# Optional read replica: DB_REPLICA_HOST (and DB_REPLICA_PORT/USER/PASSWORD
+# where they differ from the primary's) adds a 'replica' connection.
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': int(os.getenv('DB_REPLICA_PORT', DATABASES['default'].get('PORT', 3306))),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default'].get('USER', '')),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default'].get('PASSWORD', '')),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Views marked replica_reads read from REPLICA_DATABASE when there is one.
+# A user who writes stays on the primary for REPLICA_PIN_SECONDS, and bid
+# state committed in the last REPLICA_MAX_LAG seconds (keep it above the
+# worst lag you expect) is checked before replica rows are cached.
+DATABASE_ROUTERS = ['auction_app.routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+REPLICA_MAX_LAG = int(os.getenv('REPLICA_MAX_LAG', '30'))
+
+# Sessions, rate limits and page fragments live in the cache. REDIS_URL
+# gives every worker the same one; without it each process has its own.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # The default of 300 entries is far fewer than the active sessions and rate limit buckets.
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.0/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.0/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+AUTH_USER_MODEL = 'auction_app.User'
+
+# Users log in with their email address; ModelBackend keeps the admin's username login.
+AUTHENTICATION_BACKENDS = [
+    'auction_app.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
+STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
+STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
+
+# Payment gateway (see auction_app.payments). PAYMENTS_BACKEND=stub works
+# offline; STRIPE_API_BASE can point the real client at the stub server.
+PAYMENTS_BACKEND = os.getenv('PAYMENTS_BACKEND', 'stripe')
+PAYMENTS_TIMEOUT = float(os.getenv('PAYMENTS_TIMEOUT', '5'))
+PAYMENTS_MAX_RETRIES = int(os.getenv('PAYMENTS_MAX_RETRIES', '2'))
+PAYMENTS_POOL_SIZE = int(os.getenv('PAYMENTS_POOL_SIZE', '20'))
+STRIPE_API_BASE = os.getenv('STRIPE_API_BASE')
+
+
+# Set session timeout to 30 minutes (adjust as needed)
+SESSION_COOKIE_AGE = 1800  # seconds
+
+# Set session expiration to be refreshed on every request
+SESSION_SAVE_EVERY_REQUEST = True
+
+# Sessions live in the cache in front of the database (see auction_app.sessions).
+# An unchanged session's expiry is refreshed only once less than
+# SESSION_REFRESH_THRESHOLD seconds remain, and those refreshes reach the
+# database in batches of SESSION_BATCH_SIZE or every SESSION_BATCH_SECONDS.
+SESSION_ENGINE = 'auction_app.sessions'
+SESSION_REFRESH_THRESHOLD = SESSION_COOKIE_AGE - 300
+SESSION_BATCH_SIZE = 100
+SESSION_BATCH_SECONDS = 10
+
+# On-disk segment of the item search index (see auction_app.search)
+SEARCH_INDEX_PATH = BASE_DIR / 'search_index.bin'
+
+# Uploaded item images (see auction_app.images): every size (longest edge
+# in pixels) is rendered in every format by IMAGE_WORKERS processes (0
+# renders in the web process) and stored under IMAGE_STORE_ROOT by content
+# hash. Files never change, so a front-end server mapping IMAGE_STORE_URL
+# onto IMAGE_STORE_ROOT should send 'Cache-Control: public,
+# max-age=31536000, immutable', as the fallback view does.
+IMAGE_STORE_ROOT = os.getenv('IMAGE_STORE_ROOT', str(BASE_DIR / 'media' / 'images'))
+IMAGE_STORE_URL = os.getenv('IMAGE_STORE_URL', '/media/images/')
+IMAGE_SIZES = {'thumb': 240, 'card': 640, 'large': 1600}
+IMAGE_FORMATS = ('webp', 'jpeg')
+IMAGE_QUALITY = 80
+IMAGE_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '2'))
+IMAGE_TIMEOUT = 30
+
+# Anti-sniping (see auction_app.bidding): a bid in the last SOFT_CLOSE_SECONDS
+# of an auction moves its end to SOFT_CLOSE_SECONDS after the bid. 0 disables.
+SOFT_CLOSE_SECONDS = int(os.getenv('SOFT_CLOSE_SECONDS', '120'))
+
+CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
+
+CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+# Token-bucket rate limits per URL name (see auction_app.ratelimit). 'rate'
+# is the sustained rate, 'burst' how many requests a full bucket allows at
+# once, 'key' 'ip' or 'user'. Only POSTs are charged unless 'methods' says
+# otherwise. Behind a reverse proxy, REMOTE_ADDR must be the client's address.
+RATE_LIMITS = {
+    'login': {'rate': '10/m', 'burst': 5, 'key': 'ip'},
+    'place_bid': {'rate': '60/m', 'burst': 20, 'key': 'user'},
+    'create_setup_intent': {'rate': '10/h', 'burst': 3, 'key': 'ip'},
+    'upload_item_image': {'rate': '60/h', 'burst': 20, 'key': 'user'},
+}
+# 'cache' shares buckets between processes through the default cache;
+# 'local' keeps them in each process's memory.
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'cache')
+
+# Password hashing cost (see auction_app.hashers). Hashes made at another
+# cost, or with one of the older hashers below, are rehashed at this one on
+# the user's next login. Lower it only where logins need not resist
+# brute force, e.g. test runs.
+PASSWORD_ITERATIONS = int(os.getenv('PASSWORD_ITERATIONS', '720000'))
+PASSWORD_HASHERS = [
+    'auction_app.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
@@ -0,0 +1,22 @@
+"""
+Local benchmarking: SQLite with DEBUG off, so connections do not record queries.
+
+The database is ``bench.sqlite3`` unless ``DB_NAME`` says otherwise; with
+``DB_NAME='file:bench?mode=memory&cache=shared'`` it is kept in memory
+and ``benchmarks.common.setup_django()`` migrates it on startup.
+``DB_REPLICA_NAME`` adds a SQLite ``replica`` that reads are routed to.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, BASE_DIR, database_from_env
+
+# Benchmarks send their requests through the test client as ``localhost``.
+ALLOWED_HOSTS = ALLOWED_HOSTS or ['localhost']
+
+DATABASES = {
+    'default': database_from_env(engine='sqlite', name=str(BASE_DIR / 'bench.sqlite3')),
+}
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = database_from_env('DB_REPLICA', engine='sqlite')
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
@@ -0,0 +1,4 @@
+"""Local development: DEBUG on, database from the DB_* variables."""
+from .base import *  # noqa: F401,F403
+
+DEBUG = True
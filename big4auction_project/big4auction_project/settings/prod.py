@@ -0,0 +1,21 @@
+"""
+Production: DEBUG off, secure cookies, and no fallbacks for secrets.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, env_bool
+
+DEBUG = False
+
+for name in ('DJANGO_SECRET_KEY', 'DJANGO_ALLOWED_HOSTS', 'REDIS_URL'):
+    if not os.getenv(name):
+        # REDIS_URL too: sessions and rate limits must be shared by every worker.
+        raise ImproperlyConfigured(f'{name} must be set in production.')
+if not ALLOWED_HOSTS:
+    raise ImproperlyConfigured('DJANGO_ALLOWED_HOSTS lists no hosts.')
+
+SESSION_COOKIE_SECURE = env_bool('DJANGO_SECURE_COOKIES', True)
+CSRF_COOKIE_SECURE = env_bool('DJANGO_SECURE_COOKIES', True)
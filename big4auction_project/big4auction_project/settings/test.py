@@ -0,0 +1,31 @@
+"""
+Test runs: in-memory SQLite (plus a stand-in replica), a local cache and cheap password hashing.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # A second database to stand in for a read replica. Nothing is routed
+    # to it unless a test sets REPLICA_DATABASE and asks for it in ``databases``.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+REPLICA_DATABASE = None
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+PASSWORD_ITERATIONS = int(os.getenv('PASSWORD_ITERATIONS', '1000'))
+
+# Render uploaded images in the test process; the pool has its own test.
+IMAGE_WORKERS = 0